@@ -0,0 +1,6 @@
+"""
+오프라인 성능 측정 스크립트 모음
+
+각 스크립트는 `python -m benchmarks.<이름>` 으로 실행하고,
+--json 옵션을 주면 결과를 JSON 파일로도 저장한다.
+"""
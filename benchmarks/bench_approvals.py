@@ -0,0 +1,102 @@
+"""
+승인 대기열(common.approvals)로 사람의 승인을 기다리는 대화 수천 개를 처리하는 시간 측정 (API 키 불필요)
+
+    python -m benchmarks.bench_approvals --threads 2000 --concurrency 64
+
+example4 그래프(human_assistance 도구)를 가짜 모델로 실행한다.
+1. start: 모든 대화를 동시에 시작해 interrupt에 걸리면 대기열에 등록한다
+2. restart: 대기열과 체크포인터(SQLite)를 닫고 다시 연다 (프로세스 재시작 흉내)
+3. approve: 모든 대화에 응답을 한 번에 기록한다
+4. resume: 승인된 대화를 --concurrency개씩 동시에 재개한다
+단계마다 걸린 시간, 초당 처리 수, 남은 대기 수, 살아 있는 OS 스레드 수를 출력한다.
+(input()으로 기다리는 드라이버라면 승인을 기다리는 대화마다 스레드 하나가 묶여 있어야 한다)
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.report import print_table, write_json
+from common.approvals import ApprovalQueue, resume_approved, start_turn
+from common.fakes import FakeChatModel, FakeSearchResults
+from common.sqlite_saver import SqliteSaver
+
+QUESTION = "이 거래를 승인해도 될까요? 금액: $10,000"
+
+
+def open_graph(directory: str, llm, search_tool):
+    import example4.main as example4
+
+    checkpointer = SqliteSaver(os.path.join(directory, "checkpoints.sqlite"))
+    queue = ApprovalQueue(os.path.join(directory, "approvals.sqlite"))
+    return example4.setup_graph(checkpointer, llm=llm, search_tool=search_tool), checkpointer, queue
+
+
+def row(stage: str, count: int, seconds: float, queue: ApprovalQueue):
+    return {
+        "stage": stage,
+        "count": count,
+        "seconds": seconds,
+        "per_s": count / seconds if seconds else 0.0,
+        "pending": queue.counts()["pending"],
+        "os_threads": threading.active_count(),
+    }
+
+
+async def run(threads: int, concurrency: int, llm_latency: float):
+    llm = FakeChatModel(latency=llm_latency)
+    search_tool = FakeSearchResults()
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        graph, checkpointer, queue = open_graph(directory, llm, search_tool)
+        thread_ids = [f"review_{i}" for i in range(threads)]
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def start(thread_id):
+            async with semaphore:
+                await start_turn(graph, queue, thread_id, {"messages": [("human", QUESTION)]})
+
+        start_time = time.perf_counter()
+        await asyncio.gather(*(start(thread_id) for thread_id in thread_ids))
+        rows.append(row("start", threads, time.perf_counter() - start_time, queue))
+
+        # 재시작: 대기열과 대화 상태는 파일에만 남는다
+        start_time = time.perf_counter()
+        queue.close()
+        checkpointer.close()
+        graph, checkpointer, queue = open_graph(directory, llm, search_tool)
+        rows.append(row("restart", queue.counts()["pending"], time.perf_counter() - start_time, queue))
+
+        start_time = time.perf_counter()
+        approved = queue.submit_many({thread_id: {"data": "승인"} for thread_id in thread_ids})
+        rows.append(row("approve", approved, time.perf_counter() - start_time, queue))
+
+        start_time = time.perf_counter()
+        resumed = 0
+        while queue.counts()["approved"]:
+            summary = await resume_approved(graph, queue, concurrency, limit=concurrency * 8)
+            resumed += summary["resumed"]
+        rows.append(row("resume", resumed, time.perf_counter() - start_time, queue))
+
+        queue.close()
+        checkpointer.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=2000, help="승인을 기다릴 대화 수")
+    parser.add_argument("--concurrency", type=int, default=64, help="동시에 실행할 대화 수")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="가짜 모델의 첫 토큰 지연(초)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rows = asyncio.run(run(args.threads, args.concurrency, args.llm_latency))
+    print_table("승인 대기열 (시작 → 재시작 → 승인 → 재개)", rows)
+    write_json(args.json, "approvals", rows)
+
+
+if __name__ == "__main__":
+    main()
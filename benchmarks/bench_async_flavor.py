@@ -0,0 +1,114 @@
+"""
+동기/비동기 그래프(flavor) 비교: 이벤트 루프 하나에서 대화 수천 개를 동시에 실행한다 (API 키 불필요)
+
+    python -m benchmarks.bench_async_flavor --conversations 100,1000,5000
+    python -m benchmarks.bench_async_flavor --targets example2 --flavors async --conversations 10000
+
+대화마다 질문 하나(모델 → 도구 → 모델)를 common.batch.run_batch로 한꺼번에 시작한다 (동시 실행 수 = 대화 수).
+- example2: get_weather 도구 (로컬 함수), call_model 노드
+- myproject: 검색 도구 (FakeSearchResults), build_chat_graph의 chatbot
+sync flavor는 동기 노드/도구/라우터가 호출마다 실행기 스레드 풀(기본 min(32, CPU+4)개)로 넘어가므로,
+가짜 모델/검색의 지연(time.sleep)을 스레드 수만큼만 동시에 기다린다.
+async flavor는 같은 지연을 asyncio.sleep으로 기다리므로 스레드 수와 상관없이 모든 대화가 동시에 기다린다.
+대화 수가 더 늘면 기다림 대신 그래프 실행 CPU 시간(cpu_ms_per_turn)이 병목이 된다.
+(myproject는 sync flavor에서도 chatbot이 ainvoke를 쓰므로 차이는 검색 도구와 라우터뿐이다)
+열:
+- turns_per_s / p50_ms / p95_ms: 처리량과 턴 지연 시간
+- ideal_ms: 가짜 모델/검색이 일부러 기다리는 시간의 합 (턴 지연 시간의 하한)
+- cpu_ms_per_turn: 턴 하나에 쓴 프로세스 CPU 시간 (그래프 실행/체크포인트 비용).
+  async flavor의 처리량 상한은 대략 1000 / cpu_ms_per_turn 턴/s이다 (이 값을 넘으면 기다림이 아니라 CPU가 병목)
+- peak_threads: 실행 중 관찰한 최대 스레드 수
+"""
+import argparse
+import asyncio
+import importlib
+import threading
+import time
+
+from benchmarks.report import print_table, write_json
+from common.batch import run_batch
+from common.fakes import FakeChatModel, FakeSearchResults
+
+TARGETS = {
+    # 이름: (모듈, 질문, 검색 도구 사용 여부)
+    "example2": ("example2.main", "서울 날씨 어때?", False),
+    "myproject": ("myproject.main", "최신 뉴스 검색해줘", True),
+}
+
+
+def build(target: str, flavor: str, llm_latency: float, tool_latency: float):
+    module_name, _, search = TARGETS[target]
+    module = importlib.import_module(module_name)
+    module.setup_graph.cache_clear()
+    kwargs = {"llm": FakeChatModel(latency=llm_latency), "flavor": flavor}
+    if search:
+        kwargs["search_tool"] = FakeSearchResults(latency=tool_latency)
+    return module.setup_graph(**kwargs)
+
+
+async def watch_threads(peak: list, interval: float = 0.01):
+    """실행 중 스레드 수의 최댓값을 peak[0]에 기록한다"""
+    while True:
+        peak[0] = max(peak[0], threading.active_count())
+        await asyncio.sleep(interval)
+
+
+async def run(target: str, flavor: str, conversations: int, args) -> dict:
+    graph = build(target, flavor, args.llm_latency, args.tool_latency)
+    question = TARGETS[target][1]
+    jobs = [(f"{flavor}_{index}", f"{question} ({index})") for index in range(conversations)]
+
+    peak = [threading.active_count()]
+    watcher = asyncio.create_task(watch_threads(peak))
+    cpu_start = time.process_time()
+    try:
+        _, summary = await run_batch(graph, jobs, max_concurrency=conversations)
+    finally:
+        watcher.cancel()
+    cpu_seconds = time.process_time() - cpu_start
+    search = TARGETS[target][2]
+    return {
+        "target": target,
+        "flavor": flavor,
+        "conversations": conversations,
+        "errors": summary["errors"],
+        "wall_s": summary["wall_time"],
+        "turns_per_s": summary["throughput"],
+        "p50_ms": summary["latency"]["p50"] * 1000,
+        "p95_ms": summary["latency"]["p95"] * 1000,
+        "ideal_ms": (2 * args.llm_latency + (args.tool_latency if search else 0)) * 1000,
+        "cpu_ms_per_turn": cpu_seconds * 1000 / conversations,
+        "peak_threads": peak[0],
+    }
+
+
+async def main_async(args):
+    rows = []
+    for target in args.targets.split(","):
+        for flavor in args.flavors.split(","):
+            for conversations in (int(value) for value in args.conversations.split(",")):
+                if flavor == "sync" and conversations > args.max_sync:
+                    # 스레드 풀 크기만큼씩 줄을 서므로 오래 걸린다 (--max-sync로 조정)
+                    continue
+                rows.append(await run(target, flavor, conversations, args))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--targets", default=",".join(TARGETS), help=f"쉼표로 구분한 대상 ({', '.join(TARGETS)})")
+    parser.add_argument("--flavors", default="sync,async", help="쉼표로 구분한 flavor 목록")
+    parser.add_argument("--conversations", default="100,1000,5000", help="쉼표로 구분한 동시 대화 수 목록")
+    parser.add_argument("--max-sync", type=int, default=1000, help="sync flavor는 이 대화 수까지만 실행한다")
+    parser.add_argument("--llm-latency", type=float, default=0.1, help="가짜 모델 호출 하나의 지연(초)")
+    parser.add_argument("--tool-latency", type=float, default=0.1, help="가짜 검색 호출 하나의 지연(초)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rows = asyncio.run(main_async(args))
+    print_table("동기/비동기 그래프: 이벤트 루프 하나의 동시 대화", rows)
+    write_json(args.json, "async_flavor", rows)
+
+
+if __name__ == "__main__":
+    main()
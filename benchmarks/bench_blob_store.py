@@ -0,0 +1,103 @@
+"""
+큰 검색 결과를 상태 밖 저장소(common.blob_store)로 옮겼을 때의 체크포인트 크기/직렬화 시간 비교 (API 키 불필요)
+
+    python -m benchmarks.bench_blob_store --threads 4 --turns 20 --content-size 4000
+
+myproject 그래프(가짜 모델/검색)로 thread마다 검색 질문 --turns개를 실행한다.
+thread들은 같은 질문 목록을 쓰므로 같은 검색 결과가 thread마다 다시 나온다 (중복 제거 확인).
+- inline: 검색 결과 ToolMessage를 상태에 그대로 둔다
+- blobs: --threshold 글자 이상인 결과는 BlobStore에 저장하고 참조만 남긴다
+- checkpoint_kb: 마지막 체크포인트 하나의 직렬화 크기
+- storage_mb: 체크포인터가 저장한 전체 바이트 (blobs 모드는 blob_mb를 따로 적는다)
+- save_ms_per_turn: 턴 하나에서 체크포인트 put/put_writes에 쓴 시간
+- next_prompt_kchars: 다음 턴 첫 모델 호출에 보낼 메시지 글자 수 (이전 턴 검색 결과는 미리보기만 보낸다)
+"""
+import argparse
+import importlib
+import time
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from benchmarks.bench_delta_checkpoint import storage_bytes
+from benchmarks.report import print_table, write_json
+from common.blob_store import BlobStore
+from common.fakes import FakeChatModel, FakeSearchResults
+
+
+class TimedMemorySaver(MemorySaver):
+    """put/put_writes(직렬화 + 저장)에 쓴 시간을 잰다"""
+
+    def __init__(self):
+        super().__init__()
+        self.seconds = 0.0
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        start = time.perf_counter()
+        try:
+            return super().put(config, checkpoint, metadata, new_versions)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+    def put_writes(self, config, writes, task_id):
+        start = time.perf_counter()
+        try:
+            return super().put_writes(config, writes, task_id)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+
+def run_mode(mode: str, threads: int, turns: int, content_size: int, threshold: int):
+    myproject = importlib.import_module("myproject.main")
+    saver = TimedMemorySaver()
+    blobs = BlobStore(threshold=threshold) if mode == "blobs" else None
+    graph = myproject.setup_graph(
+        saver, llm=FakeChatModel(), search_tool=FakeSearchResults(content_size=content_size), blobs=blobs
+    )
+
+    start = time.perf_counter()
+    for turn in range(turns):
+        for thread in range(threads):
+            graph.invoke(
+                {"messages": [("human", f"{turn}번째 최신 뉴스 검색해줘")]},
+                {"configurable": {"thread_id": f"{mode}_{thread}"}},
+            )
+    total = time.perf_counter() - start
+
+    config = {"configurable": {"thread_id": f"{mode}_0"}}
+    checkpoint = saver.get_tuple(config).checkpoint
+    messages = graph.get_state(config).values["messages"]
+    prompt = blobs.expand(messages) if blobs is not None else messages
+    stats = blobs.stats() if blobs is not None else {"stored_bytes": 0, "offloaded": 0, "deduplicated": 0}
+    return {
+        "mode": mode,
+        "turns": threads * turns,
+        "checkpoint_kb": len(saver.serde.dumps_typed(checkpoint)[1]) / 1024,
+        "storage_mb": storage_bytes(saver) / 1e6,
+        "blob_mb": stats["stored_bytes"] / 1e6,
+        "save_ms_per_turn": saver.seconds * 1000 / (threads * turns),
+        "turn_ms": total * 1000 / (threads * turns),
+        "next_prompt_kchars": sum(len(str(message.content)) for message in prompt) / 1000,
+        "offloaded": stats["offloaded"],
+        "deduplicated": stats["deduplicated"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=4, help="대화 수 (같은 질문 목록을 쓴다)")
+    parser.add_argument("--turns", type=int, default=20, help="대화마다 실행할 검색 질문 수")
+    parser.add_argument("--content-size", type=int, default=4000, help="검색 결과 하나의 본문 길이(글자)")
+    parser.add_argument("--threshold", type=int, default=2000, help="저장소로 옮길 도구 결과 최소 길이(글자)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rows = [
+        run_mode(mode, args.threads, args.turns, args.content_size, args.threshold)
+        for mode in ("inline", "blobs")
+    ]
+    print_table("큰 도구 결과를 상태 밖 저장소로 옮기기", rows)
+    write_json(args.json, "blob_store", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+일괄 get_state / update_state(common.bulk_state)와 thread별 반복의 처리량 비교 (API 키 불필요)
+
+    python -m benchmarks.bench_bulk_state --threads 2000 --messages 8 --repeat 3
+
+example5 그래프(name/birthday 상태)에 --threads개 대화를 만들어 두고
+모든 대화의 name/birthday를 고친 뒤 다시 읽는 작업을 두 방식으로 실행한다.
+- loop: graph.get_state / graph.update_state를 thread마다 호출
+- bulk: get_states / update_states로 한 번에 호출
+- read_s / update_s: 읽기 / 고치기에 걸린 시간 (두 방식을 번갈아 --repeat번 실행한 중앙값)
+- threads_per_s: (읽기 + 고치기) 기준 초당 thread 수
+- matches: 두 방식으로 고친 결과가 같은 thread 수
+"""
+import argparse
+import importlib
+import os
+import statistics
+import tempfile
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from benchmarks.report import print_table, write_json
+from common.bulk_state import get_states, thread_configs, update_states
+from common.delta_checkpoint import DeltaSqliteSaver
+from common.fakes import FakeChatModel, FakeSearchResults
+from common.sqlite_saver import SqliteSaver
+
+
+def seed(graph, threads: int, messages: int):
+    """thread마다 messages개 메시지와 name/birthday가 있는 상태를 만든다"""
+    configs = thread_configs(f"lookup_{i}" for i in range(threads))
+    history = []
+    for turn in range(messages // 2):
+        history += [HumanMessage(f"질문 {turn}"), AIMessage(f"답변 {turn}")]
+    update_states(
+        graph,
+        [(config, {"messages": history, "name": "LangGraph", "birthday": "Jan 17, 2024"}) for config in configs],
+        as_node="chatbot",
+    )
+    return configs
+
+
+def corrections(configs):
+    return [(config, {"name": f"LangGraph {i}", "birthday": "Jan 22, 2024"}) for i, config in enumerate(configs)]
+
+
+def run_mode(mode: str, graph, configs):
+    updates = corrections(configs)
+    start = time.perf_counter()
+    if mode == "loop":
+        states = [graph.get_state(config) for config in configs]
+    else:
+        states = get_states(graph, configs)
+    read_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if mode == "loop":
+        for config, values in updates:
+            graph.update_state(config, values)
+    else:
+        update_states(graph, updates)
+    update_s = time.perf_counter() - start
+    assert len(states) == len(configs)
+    return read_s, update_s
+
+
+def run_saver(name: str, make_saver, threads: int, messages: int, repeat: int):
+    example5 = importlib.import_module("example5.main")
+    timings = {"loop": [], "bulk": []}
+    finals = {}
+    for attempt in range(repeat):
+        for mode in ("loop", "bulk"):
+            saver = make_saver(f"{mode}_{attempt}")
+            graph = example5.setup_graph(saver, llm=FakeChatModel(), search_tool=FakeSearchResults())
+            configs = seed(graph, threads, messages)
+            timings[mode].append(run_mode(mode, graph, configs))
+            finals[mode] = [(state.values["name"], state.values["birthday"]) for state in get_states(graph, configs)]
+            if hasattr(saver, "close"):
+                saver.close()
+
+    matches = sum(loop == bulk for loop, bulk in zip(finals["loop"], finals["bulk"]))
+    rows = []
+    for mode, runs in timings.items():
+        read_s = statistics.median(read for read, _ in runs)
+        update_s = statistics.median(update for _, update in runs)
+        rows.append({
+            "saver": name,
+            "mode": mode,
+            "threads": threads,
+            "read_s": read_s,
+            "update_s": update_s,
+            "threads_per_s": threads / (read_s + update_s),
+            "matches": matches,
+        })
+    return rows
+
+
+def run(threads: int, messages: int, repeat: int):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, make_saver in [
+            ("SqliteSaver", lambda tag: SqliteSaver(os.path.join(tmp, f"sqlite_{tag}.sqlite"))),
+            ("DeltaSqliteSaver", lambda tag: DeltaSqliteSaver(os.path.join(tmp, f"delta_{tag}.sqlite"))),
+            ("MemorySaver", lambda tag: MemorySaver()),
+        ]:
+            rows += run_saver(name, make_saver, threads, messages, repeat)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=2000, help="고칠 대화 수")
+    parser.add_argument("--messages", type=int, default=8, help="대화마다 미리 넣어 둘 메시지 수")
+    parser.add_argument("--repeat", type=int, default=3, help="두 방식을 번갈아 실행하는 횟수 (중앙값 사용)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rows = run(args.threads, args.messages, args.repeat)
+    print_table("일괄 get_state / update_state (thread별 반복 대비)", rows)
+    write_json(args.json, "bulk_state", rows)
+
+
+if __name__ == "__main__":
+    main()
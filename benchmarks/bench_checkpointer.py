@@ -0,0 +1,121 @@
+"""
+SqliteSaver와 MemorySaver의 쓰기 처리량과 재개(get_state) 지연 시간 비교
+
+    python -m benchmarks.bench_checkpointer --threads 10000 --turns 2
+
+LLM 대신 입력을 그대로 돌려주는 echo 노드를 사용하므로 네트워크 없이 실행된다.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Annotated
+
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START
+from langgraph.graph.message import add_messages
+from typing_extensions import TypedDict
+
+from benchmarks.report import print_table, write_json
+from common.sqlite_saver import SqliteSaver
+from common.stats import summarize_latencies
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def build_graph(checkpointer):
+    def chatbot(state: State):
+        return {"messages": [AIMessage(content=f"echo: {state['messages'][-1].content}")]}
+
+    graph_builder = StateGraph(State)
+    graph_builder.add_node("chatbot", chatbot)
+    graph_builder.add_edge(START, "chatbot")
+    return graph_builder.compile(checkpointer=checkpointer)
+
+
+def bench_writes(graph, thread_ids, turns: int) -> float:
+    """모든 thread에 turns번씩 질문을 넣고 걸린 시간(초)을 돌려준다"""
+    start = time.perf_counter()
+    for turn in range(turns):
+        for thread_id in thread_ids:
+            config = {"configurable": {"thread_id": thread_id}}
+            graph.invoke({"messages": [("human", f"질문 {turn}")]}, config)
+    return time.perf_counter() - start
+
+
+def bench_resume(graph, thread_ids, samples: int):
+    """임의의 thread에 대해 get_state 지연 시간(초) 목록을 돌려준다"""
+    latencies = []
+    for thread_id in random.sample(thread_ids, min(samples, len(thread_ids))):
+        config = {"configurable": {"thread_id": thread_id}}
+        start = time.perf_counter()
+        graph.get_state(config)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _row(name, threads, turns, write_time, resume, cold_resume=None, size_bytes=None):
+    return {
+        "saver": name,
+        "threads": threads,
+        "turns": turns,
+        "write_s": write_time,
+        "turns_per_s": threads * turns / write_time,
+        "resume_p50_ms": resume["p50"] * 1000,
+        "resume_p95_ms": resume["p95"] * 1000,
+        "cold_p50_ms": cold_resume["p50"] * 1000 if cold_resume else None,
+        "cold_p95_ms": cold_resume["p95"] * 1000 if cold_resume else None,
+        "size_mb": size_bytes / 1e6 if size_bytes is not None else None,
+    }
+
+
+def run(threads: int, turns: int, samples: int):
+    thread_ids = [f"thread_{i}" for i in range(threads)]
+    rows = []
+
+    # MemorySaver
+    graph = build_graph(MemorySaver())
+    write_time = bench_writes(graph, thread_ids, turns)
+    resume = summarize_latencies(bench_resume(graph, thread_ids, samples))
+    rows.append(_row("MemorySaver", threads, turns, write_time, resume))
+
+    # SqliteSaver: 같은 프로세스에서 재개 + 새로 연 연결에서 재개(재시작 상황)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite")
+        saver = SqliteSaver(path)
+        graph = build_graph(saver)
+        write_time = bench_writes(graph, thread_ids, turns)
+        resume = summarize_latencies(bench_resume(graph, thread_ids, samples))
+        saver.close()
+
+        with SqliteSaver(path) as reopened:
+            cold_resume = summarize_latencies(
+                bench_resume(build_graph(reopened), thread_ids, samples)
+            )
+        size_bytes = sum(
+            os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp)
+        )
+        rows.append(_row("SqliteSaver", threads, turns, write_time, resume, cold_resume, size_bytes))
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=10000)
+    parser.add_argument("--turns", type=int, default=2)
+    parser.add_argument("--samples", type=int, default=1000, help="get_state 측정 횟수")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rows = run(args.threads, args.turns, args.samples)
+    print_table("체크포인터 비교 (쓰기 처리량 / 재개 지연 시간)", rows)
+    write_json(args.json, "checkpointer", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+대화 기록 압축(compact 노드) 유무에 따른 턴별 프롬프트 토큰 수와 지연 시간 비교
+
+    python -m benchmarks.bench_compaction --turns 200 --max-tokens 3000
+
+LLM 대신 프롬프트 토큰 수에 비례해 지연되는 스크립트 노드를 사용한다.
+4턴마다 한 번씩 검색 도구를 호출하고 큰 검색 결과(ToolMessage)를 돌려준다.
+"""
+import argparse
+import time
+import uuid
+from typing import Annotated
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START
+from langgraph.graph.message import add_messages
+from langgraph.prebuilt import ToolNode, tools_condition
+from typing_extensions import TypedDict
+
+from benchmarks.report import print_table, write_json
+from common.compaction import count_tokens, make_compaction_node, with_summary
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+    summary: str
+
+
+@tool
+def fake_search(query: str) -> str:
+    """검색 결과를 흉내 내는 큰 문자열을 반환합니다"""
+    return f"{query} 검색 결과: " + "LangGraph is a library for building stateful agents. " * 60
+
+
+def build_graph(max_tokens, per_token_s: float, prompt_log: list):
+    def chatbot(state: State):
+        messages = with_summary(state)
+        tokens = count_tokens(messages)
+        prompt_log.append(tokens)
+        # 프롬프트 크기에 비례하는 모델 지연 시간을 흉내 낸다
+        time.sleep(tokens * per_token_s)
+
+        last = state["messages"][-1]
+        if not isinstance(last, ToolMessage) and "검색" in last.content:
+            return {"messages": [AIMessage(
+                content="",
+                tool_calls=[{"name": "fake_search", "args": {"query": last.content}, "id": str(uuid.uuid4())}],
+            )]}
+        return {"messages": [AIMessage(content="네, 알겠습니다. " * 10)]}
+
+    graph_builder = StateGraph(State)
+    graph_builder.add_node("chatbot", chatbot)
+    graph_builder.add_node("tools", ToolNode(tools=[fake_search]))
+    graph_builder.add_conditional_edges("chatbot", tools_condition)
+
+    entry = "chatbot"
+    if max_tokens:
+        graph_builder.add_node("compact", make_compaction_node(max_tokens))
+        graph_builder.add_edge("compact", "chatbot")
+        entry = "compact"
+    graph_builder.add_edge("tools", entry)
+    graph_builder.add_edge(START, entry)
+    return graph_builder.compile(checkpointer=MemorySaver())
+
+
+def run_conversation(max_tokens, turns: int, per_token_s: float):
+    """턴별 (마지막 LLM 호출의 프롬프트 토큰 수, 턴 지연 시간) 목록"""
+    prompt_log = []
+    graph = build_graph(max_tokens, per_token_s, prompt_log)
+    config = {"configurable": {"thread_id": "bench"}}
+
+    per_turn = []
+    for turn in range(turns):
+        question = f"{turn}번째 질문: 최신 소식을 검색해줘" if turn % 4 == 3 else f"{turn}번째 질문입니다"
+        start = time.perf_counter()
+        graph.invoke({"messages": [("human", question)]}, config)
+        per_turn.append((prompt_log[-1], time.perf_counter() - start))
+    return per_turn
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--max-tokens", type=int, default=3000, help="compact 노드의 토큰 예산")
+    parser.add_argument("--per-token-us", type=float, default=5.0, help="프롬프트 토큰당 모델 지연(µs)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    per_token_s = args.per_token_us / 1e6
+    baseline = run_conversation(None, args.turns, per_token_s)
+    compacted = run_conversation(args.max_tokens, args.turns, per_token_s)
+    # compact 노드는 요약까지 포함한 프롬프트를 예산 안에 맞춰야 한다
+    over = [(turn, tokens) for turn, (tokens, _) in enumerate(compacted, 1) if tokens > args.max_tokens]
+    assert not over, f"압축한 프롬프트가 예산({args.max_tokens} 토큰)을 넘었습니다: (턴, 토큰) {over[:5]}"
+
+    checkpoints = sorted({1, 10, 50, 100, 150, args.turns} & set(range(1, args.turns + 1)))
+    rows = [
+        {
+            "turn": turn,
+            "tokens_full": baseline[turn - 1][0],
+            "tokens_compact": compacted[turn - 1][0],
+            "latency_full_ms": baseline[turn - 1][1] * 1000,
+            "latency_compact_ms": compacted[turn - 1][1] * 1000,
+        }
+        for turn in checkpoints
+    ]
+    print_table(f"턴별 프롬프트 토큰 / 지연 시간 (예산 {args.max_tokens} 토큰)", rows)
+    print(f"\n- 최대 프롬프트 토큰: 전체 {max(t for t, _ in baseline)} / 압축 {max(t for t, _ in compacted)}")
+    print(f"- 전체 소요 시간: 전체 {sum(l for _, l in baseline):.2f}s / 압축 {sum(l for _, l in compacted):.2f}s")
+
+    write_json(args.json, "compaction", {
+        "max_tokens": args.max_tokens,
+        "turns": args.turns,
+        "baseline": [{"tokens": t, "latency": l} for t, l in baseline],
+        "compacted": [{"tokens": t, "latency": l} for t, l in compacted],
+    })
+
+
+if __name__ == "__main__":
+    main()
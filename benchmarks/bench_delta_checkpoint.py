@@ -0,0 +1,111 @@
+"""
+메시지 delta 체크포인트(common.delta_checkpoint)와 기존 체크포인터의 저장 크기/쓰기 시간 비교
+
+    python -m benchmarks.bench_delta_checkpoint --threads 4 --turns 500
+
+bench_checkpointer와 같은 echo 그래프(LLM 없음)로 긴 대화를 만든다.
+- storage_mb: 체크포인트/writes로 저장된 직렬화 바이트 합
+- write_ms_first / write_ms_last: 처음/마지막 100턴의 턴당 쓰기 시간 (대화가 길어질수록 늘어나는지)
+- get_state_ms: 마지막 체크포인트 조회 시간, history_s: thread 하나의 get_state_history 전체를 읽는 시간
+- messages: 마지막 상태의 메시지 수 (delta 저장으로 복원한 상태가 같은지 확인)
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from benchmarks.bench_checkpointer import build_graph
+from benchmarks.report import print_table, write_json
+from common.delta_checkpoint import DeltaMemorySaver, DeltaSqliteSaver
+from common.sqlite_saver import SqliteSaver
+
+
+def storage_bytes(saver) -> int:
+    """체크포인터가 저장한 체크포인트/메타데이터/writes 바이트 합"""
+    if isinstance(saver, SqliteSaver):
+        checkpoints = saver.conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) FROM checkpoints"
+        ).fetchone()[0]
+        writes = saver.conn.execute("SELECT COALESCE(SUM(LENGTH(value)), 0) FROM writes").fetchone()[0]
+        return checkpoints + writes
+    total = 0
+    for namespaces in saver.storage.values():
+        for checkpoints in namespaces.values():
+            for checkpoint, metadata, _ in checkpoints.values():
+                total += len(checkpoint[1]) + len(metadata[1])
+    for writes in saver.writes.values():
+        total += sum(len(value[2][1]) for value in writes.values())
+    return total
+
+
+def run_saver(name: str, saver, threads: int, turns: int):
+    graph = build_graph(saver)
+    thread_ids = [f"thread_{i}" for i in range(threads)]
+    turn_ms = []
+    start = time.perf_counter()
+    for turn in range(turns):
+        turn_start = time.perf_counter()
+        for thread_id in thread_ids:
+            graph.invoke({"messages": [("human", f"질문 {turn}")]}, {"configurable": {"thread_id": thread_id}})
+        turn_ms.append((time.perf_counter() - turn_start) * 1000 / threads)
+    write_s = time.perf_counter() - start
+
+    config = {"configurable": {"thread_id": thread_ids[0]}}
+    get_state_ms = []
+    for _ in range(20):
+        get_start = time.perf_counter()
+        state = graph.get_state(config)
+        get_state_ms.append((time.perf_counter() - get_start) * 1000)
+    history_start = time.perf_counter()
+    history = sum(1 for _ in graph.get_state_history(config))
+    history_s = time.perf_counter() - history_start
+
+    window = min(100, turns)
+    return {
+        "saver": name,
+        "threads": threads,
+        "turns": turns,
+        "storage_mb": storage_bytes(saver) / 1e6,
+        "write_s": write_s,
+        "write_ms_first": statistics.mean(turn_ms[:window]),
+        "write_ms_last": statistics.mean(turn_ms[-window:]),
+        "get_state_ms": statistics.median(get_state_ms),
+        "history_s": history_s,
+        "checkpoints": history,
+        "messages": len(state.values["messages"]),
+    }
+
+
+def run(threads: int, turns: int, snapshot_every: int):
+    rows = [
+        run_saver("MemorySaver", MemorySaver(), threads, turns),
+        run_saver("DeltaMemorySaver", DeltaMemorySaver(snapshot_every=snapshot_every), threads, turns),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, cls, kwargs in [
+            ("SqliteSaver", SqliteSaver, {}),
+            ("DeltaSqliteSaver", DeltaSqliteSaver, {"snapshot_every": snapshot_every}),
+        ]:
+            with cls(os.path.join(tmp, f"{name}.sqlite"), **kwargs) as saver:
+                rows.append(run_saver(name, saver, threads, turns))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--snapshot-every", type=int, default=16, help="전체 목록을 저장하는 delta 간격")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rows = run(args.threads, args.turns, args.snapshot_every)
+    print_table("메시지 delta 체크포인트 (저장 크기 / 쓰기 시간)", rows)
+    write_json(args.json, "delta_checkpoint", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+delta 스트림(common.delta_stream)과 stream_mode="values"의 단계당 전송량/CPU 비교 (API 키 불필요)
+
+    python -m benchmarks.bench_delta_stream --history 20,200,1000 --turns 5
+
+example5 그래프(name/birthday 상태)에 --history개 메시지가 쌓인 대화를 만들어 두고
+검색 질문 --turns개를 두 방식으로 스트리밍한다 (이벤트마다 JSON으로 보내고 받는 쪽에서 다시 읽는다).
+- values: 이벤트마다 전체 상태를 보낸다 (받는 쪽은 이벤트마다 전체 메시지를 다시 만든다)
+- delta: StateDelta만 보내고 받는 쪽은 StateReconstructor에 적용한다
+  (처음 한 번 get_state로 전체 상태를 보내 두고, 이후 턴은 받는 쪽이 가진 상태를 base로 차이만 보낸다)
+- bytes_per_step: 이벤트 하나의 JSON 크기 평균
+- cpu_ms_per_step: 스트리밍 + 직렬화 + 받는 쪽 복원에 쓴 CPU 시간(process_time)을 이벤트 수로 나눈 값
+- matches: 두 방식으로 받는 쪽이 만든 마지막 상태가 그래프 상태와 같은지
+"""
+import argparse
+import importlib
+import json
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, message_to_dict, messages_from_dict
+
+from benchmarks.report import print_table, write_json
+from common.delta_stream import StateDelta, StateReconstructor, stream_deltas
+from common.fakes import FakeChatModel, FakeSearchResults
+
+QUESTION = "2024년 LangGraph 최신 뉴스 검색해줘"
+
+
+def seed(graph, config, messages: int):
+    """대화에 messages개 메시지와 name/birthday를 넣어 둔다"""
+    history = []
+    for turn in range(messages // 2):
+        history += [
+            HumanMessage(f"질문 {turn}: " + "LangGraph 상태 관리에 대해 알려줘. " * 3),
+            AIMessage(f"답변 {turn}: " + "LangGraph는 상태 그래프로 에이전트를 만든다. " * 6),
+        ]
+    graph.update_state(config, {"messages": history, "name": "LangGraph", "birthday": "Jan 17, 2024"},
+                       as_node="chatbot")
+
+
+def encode_values(values: dict) -> str:
+    return json.dumps({
+        name: [message_to_dict(message) for message in value] if name == "messages" else value
+        for name, value in values.items()
+    }, ensure_ascii=False)
+
+
+def decode_values(text: str) -> dict:
+    data = json.loads(text)
+    data["messages"] = messages_from_dict(data["messages"])
+    return data
+
+
+def run_mode(mode: str, graph, config, turns: int):
+    steps, sent = 0, 0
+    received = None
+    client = StateReconstructor()
+    start = time.process_time()
+    for _ in range(turns):
+        if mode == "values":
+            for values in graph.stream({"messages": [("human", QUESTION)]}, config, stream_mode="values"):
+                line = encode_values(values)
+                received = decode_values(line)
+                steps += 1
+                sent += len(line.encode("utf-8"))
+        else:
+            if not client.loaded:
+                # 받는 쪽은 처음 한 번 전체 상태를 받아 둔다 (이후 턴은 차이만 받는다)
+                client = StateReconstructor(graph.get_state(config).values)
+            graph_input = {"messages": [("human", QUESTION)]}
+            for delta in stream_deltas(graph, graph_input, config, base=client.values, seq=client.seq):
+                line = delta.to_json()
+                client.apply(StateDelta.from_json(line))
+                steps += 1
+                sent += len(line.encode("utf-8"))
+            received = client.values
+    cpu = time.process_time() - start
+
+    final = graph.get_state(config).values
+    return {
+        "mode": mode,
+        "steps": steps,
+        "bytes_per_step": sent // max(steps, 1),
+        "cpu_ms_per_step": cpu * 1000 / max(steps, 1),
+        "matches": [message.id for message in received["messages"]] == [message.id for message in final["messages"]]
+                   and received["name"] == final["name"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--history", default="20,200,1000", help="대화에 미리 쌓아 둘 메시지 수 (쉼표로 여러 개)")
+    parser.add_argument("--turns", type=int, default=5, help="스트리밍할 턴 수 (턴마다 검색 한 번)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    example5 = importlib.import_module("example5.main")
+    rows = []
+    for history in [int(value) for value in args.history.split(",")]:
+        for mode in ("values", "delta"):
+            graph = example5.setup_graph(llm=FakeChatModel(), search_tool=FakeSearchResults())
+            config = {"configurable": {"thread_id": f"{mode}_{history}"}}
+            seed(graph, config, history)
+            rows.append({"history": history, **run_mode(mode, graph, config, args.turns)})
+    print_table("delta 스트림 vs stream_mode=values (단계당)", rows)
+    write_json(args.json, "delta_stream", rows)
+
+
+if __name__ == "__main__":
+    main()
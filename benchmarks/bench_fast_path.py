@@ -0,0 +1,80 @@
+"""
+fast-path 라우터(common.fast_path)가 간단한 질문을 도구 모델 없이 답할 때 줄어드는 턴 지연 시간 측정 (API 키 불필요)
+
+    python -m benchmarks.bench_fast_path --rounds 5 --llm-latency 0.3 --small-latency 0.08 --search-latency 0.3
+
+example2의 test_questions를 --rounds번 반복해서 (질문마다 새 thread) 순서대로 실행한다.
+- baseline: 모든 질문을 도구가 바인딩된 모델로
+- fast_path: 인사/FAQ와 계산 질문은 바로 답한다
+- fast_path+small: 검색이 필요 없어 보이는 질문은 도구 없는 작은 모델로 보낸다
+- routed: fast-path로 답한 턴 비율, full_calls / small_calls / searches: 모델/검색 호출 수
+- saved_s(추정): 라우터가 계산한 절약 시간, 실제 차이는 total_s를 baseline과 비교한다
+"""
+import argparse
+import importlib
+import time
+
+from benchmarks.report import print_table, write_json
+from common.fakes import FakeChatModel, FakeSearchResults
+from common.fast_path import FastPathRouter
+from common.stats import summarize_latencies
+
+
+def run_mode(mode: str, rounds: int, llm_latency: float, small_latency: float, search_latency: float,
+             token_latency: float):
+    example2 = importlib.import_module("example2.my_example")
+    llm = FakeChatModel(latency=llm_latency, token_latency=token_latency)
+    small_llm = FakeChatModel(model_name="fake-small", latency=small_latency, token_latency=token_latency)
+    search_tool = FakeSearchResults(latency=search_latency)
+    router = None
+    if mode != "baseline":
+        router = FastPathRouter(small_llm=small_llm if mode == "fast_path+small" else None)
+    graph = example2.setup_graph(llm=llm, search_tool=search_tool, fast_path=router)
+
+    latencies = []
+    start = time.perf_counter()
+    for round_index in range(rounds):
+        for question_index, question in enumerate(example2.test_questions):
+            config = {"configurable": {"thread_id": f"{mode}_{round_index}_{question_index}"}}
+            turn_start = time.perf_counter()
+            graph.invoke({"messages": [("human", question)]}, config)
+            latencies.append(time.perf_counter() - turn_start)
+    total = time.perf_counter() - start
+
+    stats = router.stats() if router is not None else {"routed_fraction": 0.0, "saved_seconds": 0.0}
+    summary = summarize_latencies(latencies)
+    return {
+        "mode": mode,
+        "turns": len(latencies),
+        "routed": stats["routed_fraction"],
+        "full_calls": llm.calls,
+        "small_calls": small_llm.calls,
+        "searches": search_tool.calls,
+        "mean_s": summary["mean"],
+        "p50_s": summary["p50"],
+        "p95_s": summary["p95"],
+        "total_s": total,
+        "saved_s": stats["saved_seconds"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=5, help="질문 목록을 반복하는 횟수")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="도구 모델의 첫 토큰 지연(초)")
+    parser.add_argument("--small-latency", type=float, default=0.08, help="작은 모델의 첫 토큰 지연(초)")
+    parser.add_argument("--search-latency", type=float, default=0.3, help="검색 도구 지연(초)")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="토큰 하나당 지연(초)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rows = [
+        run_mode(mode, args.rounds, args.llm_latency, args.small_latency, args.search_latency, args.token_latency)
+        for mode in ("baseline", "fast_path", "fast_path+small")
+    ]
+    print_table("fast-path 라우터 (도구 모델 우회)", rows)
+    write_json(args.json, "fast_path", rows)
+
+
+if __name__ == "__main__":
+    main()
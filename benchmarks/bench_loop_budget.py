@@ -0,0 +1,83 @@
+"""
+턴 예산(common.loop_budget)이 도구를 계속 부르는 모델의 턴을 얼마나 빨리/싸게 끝내는지 측정 (API 키 불필요)
+
+    python -m benchmarks.bench_loop_budget --turns 40 --concurrency 8 --tool-rounds 100
+
+가짜 모델이 턴마다 --tool-rounds번까지 검색을 다시 부르도록 해 두고 (도구를 계속 부르는 모델 흉내)
+--turns개 턴(턴마다 새 thread)을 myproject 그래프로 동시에 실행한다 (ainvoke).
+- baseline: 예산 없이 (recursion limit에 걸린 턴은 errors로 센다)
+- iterations: --max-iterations번까지만 도구를 부르고 finalize 노드에서 답한다
+- tool_seconds: 도구 실행 시간이 --max-tool-seconds를 넘으면 실행 중인 검색을 취소하고 답한다
+- answered: 최종 답변(도구 호출 없는 AIMessage)으로 끝난 턴 수
+- llm_calls / searches: 실제 모델 / 검색 도구 호출 수
+"""
+import argparse
+import importlib
+
+from langchain_core.messages import AIMessage
+
+from benchmarks.report import print_table, write_json
+from common.batch import run_batch_sync
+from common.fakes import FakeChatModel, FakeSearchResults
+from common.loop_budget import LoopBudget
+from common.stats import summarize_latencies
+
+QUESTION = "2024년 최신 AI 뉴스 검색해줘"
+
+
+def run_mode(mode: str, turns: int, concurrency: int, tool_rounds: int, llm_latency: float,
+             search_latency: float, max_iterations: int, max_tool_seconds: float):
+    myproject = importlib.import_module("myproject.main")
+    llm = FakeChatModel(latency=llm_latency, tool_rounds=tool_rounds)
+    search_tool = FakeSearchResults(latency=search_latency)
+    budget = {
+        "baseline": None,
+        "iterations": LoopBudget(max_iterations=max_iterations),
+        "tool_seconds": LoopBudget(max_iterations=None, max_tool_seconds=max_tool_seconds),
+    }[mode]
+    graph = myproject.setup_graph(llm=llm, search_tool=search_tool, budget=budget)
+
+    jobs = [(f"{mode}_{i}", QUESTION) for i in range(turns)]
+    results, summary = run_batch_sync(graph, jobs, concurrency)
+
+    answered = sum(
+        1 for result in results
+        if result.error is None and isinstance(result.messages[-1], AIMessage) and not result.messages[-1].tool_calls
+    )
+    latencies = summarize_latencies([result.latency for result in results])
+    return {
+        "mode": mode,
+        "turns": turns,
+        "errors": summary["errors"],
+        "answered": answered,
+        "p50_s": latencies["p50"],
+        "p99_s": latencies["p99"],
+        "llm_calls": llm.calls,
+        "searches": search_tool.calls,
+        "finalized": budget.stats()["finalized"] if budget is not None else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=40, help="실행할 턴 수 (턴마다 새 thread)")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시에 실행할 턴 수")
+    parser.add_argument("--tool-rounds", type=int, default=100, help="가짜 모델이 한 턴에 검색을 부르는 횟수")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="모델 지연(초)")
+    parser.add_argument("--search-latency", type=float, default=0.1, help="검색 도구 지연(초)")
+    parser.add_argument("--max-iterations", type=int, default=3, help="iterations 모드의 도구 호출 횟수 상한")
+    parser.add_argument("--max-tool-seconds", type=float, default=0.25, help="tool_seconds 모드의 도구 시간 상한(초)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rows = [
+        run_mode(mode, args.turns, args.concurrency, args.tool_rounds, args.llm_latency, args.search_latency,
+                 args.max_iterations, args.max_tool_seconds)
+        for mode in ("baseline", "iterations", "tool_seconds")
+    ]
+    print_table("턴 예산 (도구를 계속 부르는 모델)", rows)
+    write_json(args.json, "loop_budget", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+도구 호출을 한 번에 하나씩 하는 경우와 한 AIMessage에 모아 병렬로 실행하는 경우 비교
+
+    python -m benchmarks.bench_parallel_tools --llm-latency 0.5 --tool-latency 0.3
+
+"검색 + 날씨 조회"가 필요한 질문 하나를 처리할 때
+- serial: 예전처럼 AIMessage 하나에 도구 호출 하나 (chatbot→tools 왕복 2번)
+- parallel: 도구 호출 두 개를 한 번에 내고 route_tool_calls로 병렬 실행
+의 LLM 호출 수와 전체 지연 시간을 잰다. LLM은 지연만 흉내 내는 스크립트 노드다.
+"""
+import argparse
+import asyncio
+import time
+from typing import Annotated
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from langgraph.prebuilt import ToolNode, tools_condition
+from typing_extensions import TypedDict
+
+from benchmarks.report import print_table, write_json
+from common.fakes import FakeSearchResults
+from common.parallel_tools import route_tool_calls
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def build_graph(parallel: bool, llm_latency: float, tool_latency: float, counter: dict):
+    search_tool = FakeSearchResults(latency=tool_latency)
+
+    @tool
+    def get_weather(location: str) -> str:
+        """특정 지역의 날씨 정보를 반환합니다"""
+        time.sleep(tool_latency)
+        return "현재 기온은 15도이고 안개가 끼었습니다."
+
+    planned = [
+        {"name": search_tool.name, "args": {"query": "서울 축제 일정"}, "id": "call_search"},
+        {"name": "get_weather", "args": {"location": "서울"}, "id": "call_weather"},
+    ]
+
+    def chatbot(state: State):
+        counter["llm_calls"] += 1
+        time.sleep(llm_latency)
+        done = {m.tool_call_id for m in state["messages"] if isinstance(m, ToolMessage)}
+        remaining = [call for call in planned if call["id"] not in done]
+        if not remaining:
+            return {"messages": [AIMessage(content="서울 축제는 이번 주말이고 날씨는 15도입니다.")]}
+        # serial 모드는 한 번에 하나씩만 호출한다 (예전 assert len(tool_calls) <= 1 동작)
+        return {"messages": [AIMessage(content="", tool_calls=remaining if parallel else remaining[:1])]}
+
+    graph_builder = StateGraph(State)
+    graph_builder.add_node("chatbot", chatbot)
+    graph_builder.add_node("tools", ToolNode(tools=[search_tool, get_weather]))
+    if parallel:
+        graph_builder.add_conditional_edges("chatbot", route_tool_calls, ["tools", END])
+    else:
+        graph_builder.add_conditional_edges("chatbot", tools_condition)
+    graph_builder.add_edge("tools", "chatbot")
+    graph_builder.add_edge(START, "chatbot")
+    return graph_builder.compile()
+
+
+def run(parallel: bool, use_async: bool, llm_latency: float, tool_latency: float, repeat: int):
+    counter = {"llm_calls": 0}
+    graph = build_graph(parallel, llm_latency, tool_latency, counter)
+    question = {"messages": [("human", "이번 주말 서울 축제 일정과 날씨를 알려줘")]}
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        if use_async:
+            asyncio.run(graph.ainvoke(question))
+        else:
+            graph.invoke(question)
+    elapsed = (time.perf_counter() - start) / repeat
+    return {
+        "mode": "parallel" if parallel else "serial",
+        "runner": "ainvoke" if use_async else "invoke",
+        "llm_calls_per_turn": counter["llm_calls"] / repeat,
+        "turn_s": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--tool-latency", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rows = [
+        run(parallel, use_async, args.llm_latency, args.tool_latency, args.repeat)
+        for use_async in (False, True)
+        for parallel in (False, True)
+    ]
+    print_table("다중 도구 호출: 순차 vs 병렬", rows)
+    write_json(args.json, "parallel_tools", rows)
+
+
+if __name__ == "__main__":
+    main()
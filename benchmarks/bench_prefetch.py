@@ -0,0 +1,93 @@
+"""
+검색 prefetch(common.prefetch)가 검색 질문의 턴 지연을 얼마나 줄이는지 측정 (API 키 불필요)
+
+    python -m benchmarks.bench_prefetch --rounds 5 --llm-latency 0.3 --search-latency 0.3
+
+example2의 test_questions와 "오늘 날씨를 알려줘"(검색이 필요해 보이지만 가짜 모델은 검색하지 않는 질문)를
+--rounds번 반복해서 (질문마다 새 thread) myproject 그래프로 순서대로 실행한다.
+- baseline / prefetch: prefetch 없이 / 있이, invoke와 ainvoke 두 방식으로 실행한다
+- search_p50_s: 검색한 턴의 지연 중앙값, other_p50_s: 검색하지 않은 턴의 지연 중앙값
+- hit_rate: 검색 호출 중 prefetch 결과를 쓴 비율, cancelled: 쓰이지 않아 취소한 prefetch 수
+- searches: 실제 검색 도구 호출 수 (시작했다가 취소된 prefetch도 포함된다)
+"""
+import argparse
+import asyncio
+import importlib
+import time
+
+from benchmarks.report import print_table, write_json
+from common.fakes import FakeChatModel, FakeSearchResults
+from common.prefetch import SearchPrefetcher
+from common.stats import summarize_latencies
+
+
+def questions():
+    example2 = importlib.import_module("example2.my_example")
+    return [*example2.test_questions, "오늘 날씨를 알려줘"]
+
+
+def run_mode(mode: str, flavor: str, rounds: int, llm_latency: float, search_latency: float):
+    myproject = importlib.import_module("myproject.main")
+    llm = FakeChatModel(latency=llm_latency)
+    search_tool = FakeSearchResults(latency=search_latency)
+    prefetch = SearchPrefetcher() if mode == "prefetch" else None
+    graph = myproject.setup_graph(llm=llm, search_tool=search_tool, prefetch=prefetch)
+
+    async def run_turn(question, config):
+        return await graph.ainvoke({"messages": [("human", question)]}, config)
+
+    searched, other = [], []
+    start = time.perf_counter()
+    for round_index in range(rounds):
+        for question_index, question in enumerate(questions()):
+            config = {"configurable": {"thread_id": f"{mode}_{flavor}_{round_index}_{question_index}"}}
+            turn_start = time.perf_counter()
+            if flavor == "sync":
+                graph.invoke({"messages": [("human", question)]}, config)
+            else:
+                asyncio.run(run_turn(question, config))
+            latency = time.perf_counter() - turn_start
+            # prefetch 없이 실행했을 때 검색하는 질문인지로 나눈다
+            (searched if _searches(question) else other).append(latency)
+    total = time.perf_counter() - start
+
+    stats = prefetch.stats() if prefetch is not None else {"hit_rate": 0.0, "cancelled": 0, "saved_seconds": 0.0}
+    return {
+        "mode": mode,
+        "flavor": flavor,
+        "turns": len(searched) + len(other),
+        "search_p50_s": summarize_latencies(searched)["p50"],
+        "other_p50_s": summarize_latencies(other)["p50"],
+        "total_s": total,
+        "hit_rate": stats["hit_rate"],
+        "cancelled": stats["cancelled"],
+        "searches": search_tool.calls,
+        "saved_s": stats["saved_seconds"],
+    }
+
+
+def _searches(question: str) -> int:
+    """가짜 모델이 이 질문에 검색 도구를 부르는지 (common.fakes의 search 규칙)"""
+    keywords = dict(FakeChatModel().tool_rules)["search"]
+    return int(any(keyword in question for keyword in keywords))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=5, help="질문 목록을 반복하는 횟수")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="모델의 첫 토큰 지연(초)")
+    parser.add_argument("--search-latency", type=float, default=0.3, help="검색 도구 지연(초)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rows = [
+        run_mode(mode, flavor, args.rounds, args.llm_latency, args.search_latency)
+        for flavor in ("sync", "async")
+        for mode in ("baseline", "prefetch")
+    ]
+    print_table("검색 prefetch (첫 모델 호출과 동시에 검색)", rows)
+    write_json(args.json, "prefetch", rows)
+
+
+if __name__ == "__main__":
+    main()
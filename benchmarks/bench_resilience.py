@@ -0,0 +1,89 @@
+"""
+hedged 요청/턴 마감 시간(common.resilience)이 꼬리 지연(p99)을 얼마나 줄이는지 측정 (API 키 불필요)
+
+    python -m benchmarks.bench_resilience --turns 400 --concurrency 16 --slow-rate 0.02 --slow-latency 2.0
+
+가짜 모델/검색이 --slow-rate 확률로 --slow-latency초 더 걸리도록 해 두고 (seed 고정)
+example2의 test_questions를 --turns개 턴(턴마다 새 thread)으로 나눠 myproject 그래프로 동시에 실행한다.
+- baseline: resilience 없이
+- hedged: 최근 p95 지연이 지나도 응답이 없으면 같은 요청을 한 번 더 보낸다
+- hedged+deadline: 여기에 --turn-timeout초 턴 마감 시간을 더한다 (넘긴 턴은 errors로 센다)
+- upstream_calls: 가짜 모델 + 검색 호출 수 (baseline 대비 늘어난 비율이 hedge 비용이다)
+- search_swallowed / search_errors: 가짜 검색은 --fail-rate 확률로 Tavily처럼 예외 대신 (repr(e), {})를 돌려준다.
+  search_errors는 검색 도구의 BackendGuard가 실패로 센 수로, resilience 모드에서는 search_swallowed와 같아야 한다
+  (빈 artifact를 실패로 세지 않으면 0으로 나오고 서킷 브레이커가 열리지 않는다)
+"""
+import argparse
+import importlib
+
+from benchmarks.report import print_table, write_json
+from common.batch import run_batch_sync
+from common.fakes import FakeChatModel, FakeSearchResults
+from common.resilience import ResiliencePolicy
+from common.stats import summarize_latencies
+
+
+def run_mode(mode: str, turns: int, concurrency: int, llm_latency: float, search_latency: float,
+             slow_rate: float, slow_latency: float, fail_rate: float, turn_timeout: float):
+    example2 = importlib.import_module("example2.my_example")
+    myproject = importlib.import_module("myproject.main")
+    # 모드마다 같은 seed를 써서 같은 순서로 느린 응답이 나오게 한다
+    llm = FakeChatModel(latency=llm_latency, slow_rate=slow_rate, slow_latency=slow_latency, seed=1)
+    search_tool = FakeSearchResults(latency=search_latency, slow_rate=slow_rate, slow_latency=slow_latency,
+                                    fail_rate=fail_rate, swallow_errors=True, seed=2)
+    policy = ResiliencePolicy() if mode != "baseline" else None
+    graph = myproject.setup_graph(llm=llm, search_tool=search_tool, resilience=policy)
+
+    questions = example2.test_questions
+    jobs = [(f"{mode}_{i}", questions[i % len(questions)]) for i in range(turns)]
+    results, summary = run_batch_sync(
+        graph, jobs, concurrency, turn_timeout=turn_timeout if mode == "hedged+deadline" else None
+    )
+    if policy is not None:
+        # 모드마다 만든 hedge 작업 스레드를 정리한다
+        policy.close()
+
+    latencies = summarize_latencies([result.latency for result in results if result.error is None])
+    guards = policy.stats() if policy is not None else {}
+    stats = list(guards.values())
+    return {
+        "mode": mode,
+        "turns": turns,
+        "errors": summary["errors"],
+        "p50_s": latencies["p50"],
+        "p95_s": latencies["p95"],
+        "p99_s": latencies["p99"],
+        "max_s": latencies["max"],
+        "upstream_calls": llm.calls + search_tool.calls,
+        "hedged": sum(guard["hedged"] for guard in stats),
+        "hedge_wins": sum(guard["hedge_wins"] for guard in stats),
+        "search_swallowed": search_tool.swallowed,
+        "search_errors": guards[search_tool.name]["errors"] if search_tool.name in guards else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=400, help="실행할 턴 수 (턴마다 새 thread)")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시에 실행할 턴 수")
+    parser.add_argument("--llm-latency", type=float, default=0.1, help="모델의 평소 지연(초)")
+    parser.add_argument("--search-latency", type=float, default=0.1, help="검색 도구의 평소 지연(초)")
+    parser.add_argument("--slow-rate", type=float, default=0.02, help="느린 응답이 나올 확률")
+    parser.add_argument("--slow-latency", type=float, default=2.0, help="느린 응답에 더해지는 지연(초)")
+    parser.add_argument("--fail-rate", type=float, default=0.01,
+                        help="가짜 검색이 오류를 삼키고 (repr(e), {})를 돌려줄 확률 (Tavily 방식)")
+    parser.add_argument("--turn-timeout", type=float, default=1.5, help="hedged+deadline 모드의 턴 마감 시간(초)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rows = [
+        run_mode(mode, args.turns, args.concurrency, args.llm_latency, args.search_latency,
+                 args.slow_rate, args.slow_latency, args.fail_rate, args.turn_timeout)
+        for mode in ("baseline", "hedged", "hedged+deadline")
+    ]
+    print_table("hedged 요청 / 턴 마감 시간 (느린 upstream 주입)", rows)
+    write_json(args.json, "resilience", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+검색 도구 single-flight TTL 캐시의 중복 제거율과 지연 시간 절감 측정
+
+    python -m benchmarks.bench_search_cache --requests 400 --queries 20 --concurrency 32
+
+FakeSearchResults(로컬 가짜 검색)를 upstream으로 사용하므로 네트워크 없이 실행된다.
+같은 질의를 대소문자/공백만 바꾼 변형으로 섞어서 동시에 호출한다.
+"""
+import argparse
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.report import print_table, write_json
+from common.fakes import FakeSearchResults
+from common.search_cache import CachedSearchTool, SearchCache
+from common.stats import summarize_latencies
+
+
+def make_workload(requests: int, queries: int, seed: int = 0):
+    rng = random.Random(seed)
+    base = [f"2025년 IT 트렌드 {i}" for i in range(queries)]
+    variants = [
+        lambda q: q,
+        lambda q: q.upper(),
+        lambda q: f"  {q}  ",
+        lambda q: q.replace(" ", "  "),
+    ]
+    return [rng.choice(variants)(rng.choice(base)) for _ in range(requests)]
+
+
+def _timed(tool, query):
+    start = time.perf_counter()
+    tool.invoke({"query": query})
+    return time.perf_counter() - start
+
+
+def run_threads(tool, workload, concurrency: int):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        latencies = list(executor.map(lambda query: _timed(tool, query), workload))
+    return time.perf_counter() - start, latencies
+
+
+async def _arun(tool, workload, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(query):
+        async with semaphore:
+            start = time.perf_counter()
+            await tool.ainvoke({"query": query})
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(query) for query in workload))
+    return time.perf_counter() - start, latencies
+
+
+def run_async(tool, workload, concurrency: int):
+    return asyncio.run(_arun(tool, workload, concurrency))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--queries", type=int, default=20, help="서로 다른 질의 수")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.2, help="가짜 검색 upstream 지연(초)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    workload = make_workload(args.requests, args.queries)
+    rows = []
+    for mode, runner in [("threads", run_threads), ("asyncio", run_async)]:
+        for cached in (False, True):
+            upstream = FakeSearchResults(latency=args.latency)
+            cache = SearchCache(ttl=600) if cached else None
+            tool = CachedSearchTool(upstream, cache) if cached else upstream
+
+            wall_time, latencies = runner(tool, workload, args.concurrency)
+            latency = summarize_latencies(latencies)
+            stats = cache.stats() if cache else {}
+            rows.append({
+                "mode": mode,
+                "cache": "on" if cached else "off",
+                "requests": len(workload),
+                "upstream_calls": upstream.calls,
+                "dedup_ratio": 1 - upstream.calls / len(workload),
+                "coalesced": stats.get("coalesced", 0),
+                "cache_hits": stats.get("hits", 0),
+                "wall_s": wall_time,
+                "p50_ms": latency["p50"] * 1000,
+                "p95_ms": latency["p95"] * 1000,
+            })
+
+    print_table("검색 캐시 (single-flight + TTL)", rows)
+    write_json(args.json, "search_cache", rows)
+
+
+if __name__ == "__main__":
+    main()
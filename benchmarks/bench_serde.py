@@ -0,0 +1,110 @@
+"""
+체크포인트 직렬화 마이크로벤치마크: 기본 JsonPlusSerializer와 common.binary_serde.BinarySerializer 비교 (API 키 불필요)
+
+    python -m benchmarks.bench_serde --long-turns 100 --repeat 200
+
+myproject 그래프(가짜 모델/검색)로 대화 세 개를 만들고 마지막 체크포인트 하나를 반복해서 직렬화/역직렬화한다.
+- short: 검색 없는 짧은 대화 (--short-turns턴)
+- long: 검색 없는 긴 대화 (--long-turns턴)
+- tool_heavy: 턴마다 검색을 --tool-rounds번 하는 대화 (검색 결과 artifact 포함)
+열:
+- kb: 체크포인트 하나의 직렬화 크기
+- encode_us / decode_us: dumps_typed / loads_typed 한 번
+- last_us: 마지막 메시지 하나를 얻는 시간 (jsonplus는 전체 디코드, binary는 last_message)
+- writes_us: 마지막 턴 writes(노드 출력) 직렬화 + 역직렬화
+"""
+import argparse
+import importlib
+import time
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from benchmarks.report import print_table, write_json
+from common.binary_serde import BinarySerializer
+from common.fakes import FakeChatModel, FakeSearchResults
+
+
+def make_thread(turns: int, search: bool, tool_rounds: int, content_size: int):
+    """가짜 모델/검색으로 대화 하나를 실행하고 마지막 체크포인트와 writes를 돌려준다"""
+    myproject = importlib.import_module("myproject.main")
+    saver = MemorySaver()
+    myproject.setup_graph.cache_clear()
+    graph = myproject.setup_graph(
+        saver,
+        llm=FakeChatModel(tool_rounds=tool_rounds),
+        search_tool=FakeSearchResults(content_size=content_size),
+    )
+    config = {"configurable": {"thread_id": "bench"}}
+    for turn in range(turns):
+        question = f"{turn}번째 최신 뉴스 검색해줘" if search else f"{turn}번째 질문: 파이썬이란?"
+        graph.invoke({"messages": [("human", question)]}, config)
+    saved = saver.get_tuple(config)
+    writes = [value for writes in saver.writes.values() for _, _, value, _ in writes.values()]
+    return saved.checkpoint, [saver.serde.loads_typed(value) for value in writes[-8:]]
+
+
+def timed(function, repeat: int) -> float:
+    """function 한 번의 평균 시간(µs)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) * 1e6 / repeat
+
+
+def measure(name: str, checkpoint, writes, serde, repeat: int) -> dict:
+    encoded = serde.dumps_typed(checkpoint)
+    decoded = serde.loads_typed(encoded)
+    messages = checkpoint["channel_values"]["messages"]
+    # 두 serde 모두 원래 체크포인트를 그대로 되살려야 한다 (tuple/list 차이는 비교하지 않는다)
+    assert decoded["channel_values"]["messages"] == messages
+
+    if isinstance(serde, BinarySerializer):
+        def last():
+            return serde.last_message(encoded)
+    else:
+        def last():
+            return serde.loads_typed(encoded)["channel_values"]["messages"][-1]
+    assert last() == messages[-1]
+
+    def roundtrip_writes():
+        for value in writes:
+            serde.loads_typed(serde.dumps_typed(value))
+
+    return {
+        "thread": name,
+        "serde": type(serde).__name__,
+        "messages": len(messages),
+        "kb": len(encoded[1]) / 1024,
+        "encode_us": timed(lambda: serde.dumps_typed(checkpoint), repeat),
+        "decode_us": timed(lambda: serde.loads_typed(encoded), repeat),
+        "last_us": timed(last, repeat),
+        "writes_us": timed(roundtrip_writes, repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--short-turns", type=int, default=3, help="short 대화의 턴 수")
+    parser.add_argument("--long-turns", type=int, default=100, help="long 대화의 턴 수")
+    parser.add_argument("--tool-turns", type=int, default=10, help="tool_heavy 대화의 턴 수")
+    parser.add_argument("--tool-rounds", type=int, default=3, help="tool_heavy: 턴마다 검색을 부르는 횟수")
+    parser.add_argument("--content-size", type=int, default=1000, help="검색 결과 하나의 본문 길이(글자)")
+    parser.add_argument("--repeat", type=int, default=200, help="측정마다 반복 횟수")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    threads = {
+        "short": make_thread(args.short_turns, False, 1, args.content_size),
+        "long": make_thread(args.long_turns, False, 1, args.content_size),
+        "tool_heavy": make_thread(args.tool_turns, True, args.tool_rounds, args.content_size),
+    }
+    rows = []
+    for name, (checkpoint, writes) in threads.items():
+        for serde in (MemorySaver().serde, BinarySerializer()):
+            rows.append(measure(name, checkpoint, writes, serde, args.repeat))
+    print_table("체크포인트 직렬화 (기본 serde vs binary)", rows)
+    write_json(args.json, "serde", rows)
+
+
+if __name__ == "__main__":
+    main()
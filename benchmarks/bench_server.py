@@ -0,0 +1,196 @@
+"""
+myproject.server 부하 테스트 (API 키 불필요)
+
+    python -m benchmarks.bench_server --clients 64 --threads 500 --turns 2
+    python -m benchmarks.bench_server --url 127.0.0.1:8000     # 이미 떠 있는 서버에 보낼 때
+
+- 기본으로 같은 프로세스 안에 가짜 모델/검색(common.fakes)을 쓰는 서버를 띄운다
+- 클라이언트 --clients개가 keep-alive 연결 하나씩으로 thread_id --threads개의 대화를 나눠 맡고,
+  대화마다 --turns번 질문한다 (같은 대화의 턴은 순서대로)
+- 엔드포인트(messages / stream)별 처리량(req/s)과 지연 시간 p50/p95/p99,
+  stream은 첫 토큰 이벤트까지 걸린 시간(TTFT)도 잰다
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.report import print_table, write_json
+from common.stats import summarize_latencies
+
+QUESTIONS = [
+    "LangGraph 최신 뉴스를 검색해줘",
+    "고마워, 한 줄로 요약해줘",
+    "내일 날씨 알려줘",
+    "안녕?",
+]
+
+
+class HttpClient:
+    """keep-alive 연결 하나로 요청을 차례로 보내는 최소한의 HTTP/1.1 클라이언트"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def _connect(self):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def _read_head(self):
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                return status, headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    async def request(self, method: str, path: str, payload=None, on_chunk=None):
+        """(status, 본문)을 돌려준다. chunked 응답이면 조각마다 on_chunk(bytes)를 부른다"""
+        await self._connect()
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+        )
+        await self.writer.drain()
+
+        status, headers = await self._read_head()
+        if headers.get("transfer-encoding") == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                chunks.append(chunk[:-2])
+                if on_chunk is not None:
+                    on_chunk(chunk[:-2])
+            data = b"".join(chunks)
+        else:
+            data = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection") == "close":
+            await self.close()
+        return status, data
+
+    async def close(self):
+        if self.writer is not None:
+            writer, self.writer = self.writer, None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+async def run_load(host: str, port: int, endpoint: str, clients: int, threads: int, turns: int):
+    """thread_id threads개 × turns 턴을 clients개 연결로 보내고 지연 시간을 모은다"""
+    queue = asyncio.Queue()
+    run_id = f"{endpoint}-{time.time_ns()}"
+    for index in range(threads):
+        queue.put_nowait(f"{run_id}-{index}")
+    latencies, ttfts = [], []
+    errors = 0
+
+    async def client_loop():
+        nonlocal errors
+        client = HttpClient(host, port)
+        try:
+            while not queue.empty():
+                thread_id = queue.get_nowait()
+                for turn in range(turns):
+                    question = QUESTIONS[(hash(thread_id) + turn) % len(QUESTIONS)]
+                    start = time.perf_counter()
+                    first = []
+
+                    def on_chunk(chunk):
+                        if not first and chunk.startswith(b"event: token"):
+                            first.append(time.perf_counter() - start)
+
+                    try:
+                        status, _ = await client.request(
+                            "POST", f"/threads/{thread_id}/{endpoint}", {"message": question}, on_chunk
+                        )
+                    except (ConnectionError, asyncio.IncompleteReadError):
+                        status = 0
+                        await client.close()
+                    if status != 200:
+                        errors += 1
+                        continue
+                    latencies.append(time.perf_counter() - start)
+                    ttfts.extend(first)
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(clients)))
+    wall = time.perf_counter() - start
+
+    latency = summarize_latencies(latencies)
+    row = {
+        "endpoint": endpoint,
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": errors,
+        "req_per_s": len(latencies) / wall if wall else 0.0,
+        "p50_ms": latency["p50"] * 1000,
+        "p95_ms": latency["p95"] * 1000,
+        "p99_ms": latency["p99"] * 1000,
+    }
+    # 첫 토큰 이벤트는 stream 엔드포인트에만 있다
+    ttft = summarize_latencies(ttfts) if ttfts else None
+    row["ttft_p50_ms"] = ttft["p50"] * 1000 if ttft else None
+    row["ttft_p95_ms"] = ttft["p95"] * 1000 if ttft else None
+    return row
+
+
+async def run(args):
+    server = None
+    if args.url:
+        host, _, port = args.url.rpartition(":")
+        port = int(port)
+    else:
+        from myproject.server import ChatServer, build_graph
+
+        graph = build_graph(fake=True, llm_latency=args.llm_latency, tool_latency=args.tool_latency)
+        server = await ChatServer(graph, args.concurrency).start("127.0.0.1", 0)
+        host, port = server.sockets[0].getsockname()[:2]
+
+    rows = []
+    try:
+        for endpoint in args.endpoints.split(","):
+            for clients in [int(value) for value in args.clients.split(",")]:
+                rows.append(await run_load(host, port, endpoint, clients, args.threads, args.turns))
+    finally:
+        if server is not None:
+            # 서버 쪽 연결 처리가 클라이언트 연결 종료를 마저 처리하도록 한 번 양보한다
+            await asyncio.sleep(0.05)
+            server.close()
+            await server.wait_closed()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="이미 떠 있는 서버 host:port (기본: 같은 프로세스에 가짜 모델 서버)")
+    parser.add_argument("--endpoints", default="messages,stream", help="쉼표로 구분한 엔드포인트 목록")
+    parser.add_argument("--clients", default="1,16,64", help="동시 연결 수 목록 (쉼표로 구분)")
+    parser.add_argument("--threads", type=int, default=200, help="대화(thread_id) 수")
+    parser.add_argument("--turns", type=int, default=2, help="대화마다 보낼 질문 수")
+    parser.add_argument("--concurrency", type=int, default=256, help="서버의 동시 실행 턴 수")
+    parser.add_argument("--llm-latency", type=float, default=0.02, help="가짜 모델의 첫 토큰 지연(초)")
+    parser.add_argument("--tool-latency", type=float, default=0.01, help="가짜 검색 지연(초)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rows = asyncio.run(run(args))
+    print_table("HTTP 서버 처리량 / 지연 시간", rows)
+    write_json(args.json, "server", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+메모리 체크포인터 경합 벤치마크: 작업 스레드 1~32개가 동시에 get_state / put을 할 때의 처리량 비교 (API 키 불필요)
+
+    python -m benchmarks.bench_sharded_memory --workers 1,2,4,8,16,32 --ops 200
+    python -m benchmarks.bench_sharded_memory --graph --ops 50     # 그래프 API로 (노드 실행/상태 병합 비용 포함)
+
+작업 스레드마다 자기 대화(thread_id) --threads-per-worker개를 맡아 체크포인터의 get_tuple(get_state가 부르는 것)과
+put을 번갈아 부른다 (--graph: graph.get_state / graph.update_state로, 그래프 실행 비용 포함).
+대화끼리는 겹치지 않으므로 이상적인 체크포인터라면 서로 기다릴 일이 없다.
+- memory: MemorySaver 그대로 (락 없음, 대화별 dict만 건드리므로 이 작업에서는 깨지지 않는다)
+- memory_locked: MemorySaver 전체를 락 하나로 감싼 것 (여러 스레드에서 안전하게 쓰려는 보통의 방법)
+- sharded: common.sharded_memory.ShardedMemorySaver (--shards개 조각, 조각마다 락)
+열:
+- ops_per_s: 모든 작업 스레드를 합친 초당 get + put 수
+- scaling: 같은 체크포인터의 작업 스레드 1개 대비 처리량 배수
+- get_p95_ms / put_p95_ms: 호출 하나의 지연 시간
+
+GIL이 있는 CPython에서는 직렬화/역직렬화가 같은 인터프리터 락을 잡으므로 처리량이 작업 스레드 수에 비례해 늘지는 않는다.
+여기서 보이는 차이는 주로 락을 쥔 채로 직렬화하는지(memory_locked)와 최신 체크포인트를 찾는 비용(--history)에서 온다.
+free-threaded 빌드(python3.13t 등)에서 실행하면 조각별 락의 효과가 그대로 드러난다.
+"""
+import argparse
+import sys
+import threading
+import time
+from typing import Annotated
+
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.base.id import uuid6
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START
+from langgraph.graph.message import add_messages
+from typing_extensions import TypedDict
+
+from benchmarks.report import print_table, write_json
+from common.sharded_memory import ShardedMemorySaver
+from common.stats import summarize_latencies
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+class LockedMemorySaver(MemorySaver):
+    """MemorySaver의 모든 호출을 락 하나로 감싼 비교 대상"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+
+    def get_tuple(self, config):
+        with self.lock:
+            return super().get_tuple(config)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        with self.lock:
+            return iter(list(super().list(config, filter=filter, before=before, limit=limit)))
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self.lock:
+            return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        with self.lock:
+            return super().put_writes(config, writes, task_id, task_path)
+
+
+SAVERS = {
+    "memory": lambda shards: MemorySaver(),
+    "memory_locked": lambda shards: LockedMemorySaver(),
+    "sharded": lambda shards: ShardedMemorySaver(shards=shards),
+}
+
+
+def build_graph(checkpointer):
+    def chatbot(state: State):
+        return {"messages": [AIMessage(content=f"echo: {state['messages'][-1].content}")]}
+
+    graph_builder = StateGraph(State)
+    graph_builder.add_node("chatbot", chatbot)
+    graph_builder.add_edge(START, "chatbot")
+    return graph_builder.compile(checkpointer=checkpointer)
+
+
+def prepare(graph, thread_ids, history: int):
+    """대화마다 history턴을 미리 쌓는다 (체크포인트 수와 메시지 길이가 현실적인 상태에서 측정)"""
+    for thread_id in thread_ids:
+        config = {"configurable": {"thread_id": thread_id}}
+        for turn in range(history):
+            graph.invoke({"messages": [("human", f"질문 {turn}")]}, config)
+
+
+def saver_ops(graph):
+    """체크포인터만: 최신 체크포인트를 읽고 같은 내용을 새 id로 다시 저장한다"""
+    saver = graph.checkpointer
+
+    def get(config):
+        return saver.get_tuple(config)
+
+    def put(config, saved, op):
+        checkpoint = {**saved.checkpoint, "id": str(uuid6(clock_seq=op))}
+        saver.put(saved.config, checkpoint, saved.metadata, {})
+
+    return get, put
+
+
+def graph_ops(graph):
+    def get(config):
+        return graph.get_state(config)
+
+    def put(config, saved, op):
+        graph.update_state(config, {"messages": [AIMessage(content=f"메모 {op}")]})
+
+    return get, put
+
+
+def worker(ops_factory, graph, thread_ids, ops: int, barrier, get_latencies, put_latencies):
+    get, put = ops_factory(graph)
+    gets, puts = [], []
+    barrier.wait()
+    for op in range(ops):
+        config = {"configurable": {"thread_id": thread_ids[op % len(thread_ids)]}}
+        start = time.perf_counter()
+        saved = get(config)
+        middle = time.perf_counter()
+        put(config, saved, op)
+        end = time.perf_counter()
+        gets.append(middle - start)
+        puts.append(end - middle)
+    get_latencies.extend(gets)
+    put_latencies.extend(puts)
+
+
+def run(name: str, workers: int, args) -> dict:
+    graph = build_graph(SAVERS[name](args.shards))
+    assigned = [
+        [f"worker{index}_thread{thread}" for thread in range(args.threads_per_worker)]
+        for index in range(workers)
+    ]
+    for thread_ids in assigned:
+        prepare(graph, thread_ids, args.history)
+
+    get_latencies, put_latencies = [], []
+    barrier = threading.Barrier(workers + 1)
+    ops_factory = graph_ops if args.graph else saver_ops
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(ops_factory, graph, thread_ids, args.ops, barrier, get_latencies, put_latencies),
+        )
+        for thread_ids in assigned
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    gets = summarize_latencies(get_latencies)
+    puts = summarize_latencies(put_latencies)
+    return {
+        "saver": name,
+        "workers": workers,
+        "ops_per_s": 2 * workers * args.ops / elapsed,
+        "get_p95_ms": gets["p95"] * 1000,
+        "put_p95_ms": puts["p95"] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4,8,16,32", help="쉼표로 구분한 작업 스레드 수 목록")
+    parser.add_argument("--savers", default=",".join(SAVERS), help=f"쉼표로 구분한 체크포인터 목록 ({', '.join(SAVERS)})")
+    parser.add_argument("--ops", type=int, default=500, help="작업 스레드 하나가 부르는 get + put 횟수")
+    parser.add_argument("--graph", action="store_true", help="체크포인터 대신 graph.get_state / graph.update_state를 부른다")
+    parser.add_argument("--threads-per-worker", type=int, default=4, help="작업 스레드 하나가 맡는 대화 수")
+    parser.add_argument("--history", type=int, default=20, help="측정 전에 대화마다 미리 쌓아 둘 턴 수")
+    parser.add_argument("--shards", type=int, default=16, help="sharded: 조각 수")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    worker_counts = [int(value) for value in args.workers.split(",")]
+    rows = []
+    for name in args.savers.split(","):
+        baseline = None
+        for workers in worker_counts:
+            row = run(name, workers, args)
+            baseline = baseline or row["ops_per_s"]
+            row["scaling"] = row["ops_per_s"] / baseline
+            rows.append(row)
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print_table(f"메모리 체크포인터 경합 (GIL {'있음' if gil else '없음'})", rows)
+    write_json(args.json, "sharded_memory", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+예제 모듈의 import 시간과 첫 그래프 생성(cold start) 시간 측정
+
+    python -m benchmarks.bench_startup --repeat 5 --json startup.json
+
+모듈마다 새 파이썬 프로세스에서 `python -X importtime -c "import exampleN.main"`을 실행해
+- import_ms: 패키지 import에 걸린 시간 (importtime 출력의 최상위 누적 시간)
+- heavy: 누적 시간이 가장 큰 외부 패키지들
+- setup_ms / setup_again_ms: 가짜 모델로 setup_graph()를 처음/두 번째 호출한 시간 (memoize 확인)
+- process_ms: 프로세스 시작부터 끝까지의 시간
+을 잰다. `python -m exampleN`의 main()은 입력을 기다리거나 API를 호출하므로 실행하지 않는다.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.report import print_table, write_json
+
+MODULES = ["example1", "example2", "example3", "example4", "example5", "myproject"]
+
+# 새 프로세스 안에서 실행할 코드: 패키지 import 후 setup_graph를 두 번 호출한다
+PROBE = """
+import json, sys, time
+import {package}.main
+module = sys.modules["{package}.main"]
+result = {{}}
+if hasattr(module, "setup_graph"):
+    from common.fakes import FakeChatModel, FakeSearchResults
+    import inspect
+    llm, search_tool = FakeChatModel(), FakeSearchResults()
+    kwargs = {{"llm": llm}}
+    parameters = inspect.signature(module.setup_graph).parameters
+    if "search_tool" in parameters:
+        kwargs["search_tool"] = search_tool
+    if "checkpointer" in parameters:
+        # checkpointer=None이면 memoize_graph가 캐시하지 않으므로 같은 체크포인터를 넘긴다
+        from langgraph.checkpoint.memory import MemorySaver
+        kwargs["checkpointer"] = MemorySaver()
+    for name in ("setup_ms", "setup_again_ms"):
+        start = time.perf_counter()
+        module.setup_graph(**kwargs)
+        result[name] = (time.perf_counter() - start) * 1000
+result["lazy"] = "langchain_openai" not in sys.modules and "langchain_community.tools.tavily_search" not in sys.modules
+print("PROBE" + json.dumps(result))
+"""
+
+
+def parse_importtime(stderr: str):
+    """-X importtime 출력을 (모듈 이름, 누적 시간 µs, 들여쓰기 깊이) 목록으로 바꾼다"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # 머리글 줄
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), int(cumulative), depth))
+    return entries
+
+
+def run_once(package: str):
+    env = {**os.environ, "PYTHONWARNINGS": "ignore"}
+    # import 시점에 API 키를 요구하지 않는지도 함께 확인한다
+    env.pop("OPENAI_API_KEY", None)
+    env.pop("TAVILY_API_KEY", None)
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(package=package)],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    process_ms = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"{package} 실행 실패:\n{completed.stderr[-2000:]}")
+
+    entries = parse_importtime(completed.stderr)
+    # __init__이 main을 import하면 "exampleN" 한 줄, 아니면 "exampleN"과 "exampleN.main" 두 줄이 최상위에 나온다
+    package_us = sum(
+        cumulative for name, cumulative, depth in entries
+        if depth == 0 and name.split(".")[0] == package
+    )
+    probe = next(line for line in completed.stdout.splitlines() if line.startswith("PROBE"))
+    return {
+        "import_ms": package_us / 1000,
+        "process_ms": process_ms,
+        "entries": entries,
+        **json.loads(probe[len("PROBE"):]),
+    }
+
+
+def heavy_packages(entries, package: str, top: int):
+    """예제 패키지를 import하는 동안 불러온 외부 패키지 중 누적 시간이 큰 것"""
+    # importtime은 하위 모듈을 먼저 출력하므로 패키지 줄 바로 앞의 최상위 줄까지가 패키지의 import 범위다
+    totals = {}
+    scope = []
+    for name, cumulative, depth in entries:
+        if depth > 0:
+            scope.append((name, cumulative))
+            continue
+        if name.split(".")[0] == package:
+            for child, child_cumulative in scope:
+                root = child.split(".")[0]
+                if root not in (package, "common"):
+                    totals[root] = max(totals.get(root, 0), child_cumulative)
+        scope = []
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return ", ".join(f"{name} {cumulative / 1000:.0f}ms" for name, cumulative in ranked)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules", default=",".join(MODULES), help="쉼표로 구분한 패키지 목록")
+    parser.add_argument("--repeat", type=int, default=3, help="모듈마다 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--top", type=int, default=3, help="출력할 무거운 패키지 수")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rows = []
+    for package in args.modules.split(","):
+        runs = [run_once(package) for _ in range(args.repeat)]
+
+        def median(key):
+            values = [run[key] for run in runs if key in run]
+            return statistics.median(values) if values else None
+
+        rows.append({
+            "module": package,
+            "import_ms": median("import_ms"),
+            "setup_ms": median("setup_ms"),
+            "setup_again_ms": median("setup_again_ms"),
+            "process_ms": median("process_ms"),
+            "lazy": all(run["lazy"] for run in runs),
+            "heavy": heavy_packages(runs[-1]["entries"], package, args.top),
+        })
+
+    print_table("import / cold start 시간 (중앙값)", rows)
+    write_json(args.json, "startup", rows)
+
+
+if __name__ == "__main__":
+    main()
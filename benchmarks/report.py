@@ -0,0 +1,46 @@
+"""
+벤치마크 결과 출력/저장 도우미
+"""
+import json
+import platform
+import sys
+import time
+
+
+def print_table(title: str, rows: list[dict]):
+    """dict 목록을 간단한 표 형태로 출력한다"""
+    print("\n" + "="*50)
+    print(f"📊 {title}")
+    print("="*50)
+    if not rows:
+        return
+    columns = list(rows[0].keys())
+    widths = {
+        column: max(len(column), *(len(_format(row.get(column))) for row in rows))
+        for column in columns
+    }
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    for row in rows:
+        print("  ".join(_format(row.get(column)).ljust(widths[column]) for column in columns))
+
+
+def _format(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.4f}" if value < 1 else f"{value:.2f}"
+    return str(value)
+
+
+def write_json(path: str | None, name: str, results):
+    """커밋 간 비교를 위해 결과를 실행 환경 정보와 함께 JSON으로 저장한다"""
+    if not path:
+        return
+    payload = {
+        "benchmark": name,
+        "timestamp": time.time(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {path}")
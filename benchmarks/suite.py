@@ -0,0 +1,360 @@
+"""
+모든 예제 그래프(setup_graph)를 오프라인 가짜 모델/검색 도구로 돌리는 지연 시간 벤치마크 모음
+
+    python -m benchmarks.suite --json suite.json
+    python -m benchmarks.suite --targets example4,myproject --concurrency 1,8,32 --checkpointer sqlite
+    python -m benchmarks.suite --checkpointer bounded      # 메모리 상한 체크포인터 (spill/reload 비용 포함)
+    python -m benchmarks.suite --serde binary              # 체크포인트 직렬화를 common.binary_serde로
+
+OPENAI/Tavily 키 없이 실행된다 (common.fakes의 FakeChatModel, FakeSearchResults 사용).
+대상마다 다음을 측정한다:
+- 노드별 지연 시간: 그래프 노드 하나가 실행되는 데 걸린 시간 (콜백으로 측정)
+- 그래프 오버헤드: 턴 지연 시간에서 가짜 모델/검색이 일부러 기다린 시간을 뺀 값
+- 체크포인트 비용: put / put_writes / get_tuple에 쓴 시간 (체크포인터가 있는 그래프만)
+- 동시 실행 처리량: 대화 여러 개를 common.batch.run_batch로 동시에 실행했을 때의 처리량
+
+--llm-latency 0 --tool-latency 0으로 실행하면 순수한 프레임워크 오버헤드만 남는다.
+--metrics를 붙이면 common.instrumentation 계측을 켠 상태의 오버헤드를 잴 수 있다.
+
+실제 모델/검색 응답으로 재려면 한 번 기록해 두고 재생한다 (common.cassette, 대상마다 파일 하나):
+
+    python -m benchmarks.suite --record cassettes/      # 실제 API 호출 (OPENAI/Tavily 키 필요)
+    python -m benchmarks.suite --replay cassettes/ --replay-latency zero       # 네트워크 없음
+    python -m benchmarks.suite --replay cassettes/ --replay-latency recorded   # 기록된 지연만큼 기다린다
+
+이때 그래프 오버헤드는 턴 지연 시간에서 cassette가 기다린 시간(기록 중에는 실제 upstream 시간)을 뺀 값이다.
+재생도 기록할 때와 같은 모델 설정이 필요하므로 ChatOpenAI를 만든다 (키는 아무 값이어도 된다).
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langgraph.checkpoint.memory import MemorySaver
+
+from benchmarks.report import print_table, write_json
+from common.batch import run_batch
+from common.binary_serde import make_serde
+from common.bounded_memory import BoundedMemorySaver
+from common.cassette import Cassette, LATENCIES
+from common.delta_checkpoint import DeltaMemorySaver
+from common.fakes import FakeChatModel, FakeSearchResults
+from common.instrumentation import GraphMetrics
+from common.sharded_memory import ShardedMemorySaver
+from common.sqlite_saver import SqliteSaver
+from common.stats import summarize_latencies
+
+# interrupt를 거는 도구(human_assistance)에 돌려줄 사람의 응답
+HUMAN_RESPONSE = {"data": "확인했습니다", "correct": "yes"}
+
+
+@dataclass
+class Target:
+    """벤치마크 대상 그래프 하나"""
+    module: str
+    questions: list
+    search: bool = True  # setup_graph가 search_tool 인자를 받는지
+    checkpointed: bool = False  # setup_graph가 checkpointer 인자를 받는지
+    resume: dict | None = None  # interrupt로 멈추면 이 값으로 재개한다
+    options: dict = field(default_factory=dict)  # setup_graph에 넘길 추가 인자
+
+
+TARGETS = {
+    "example2": Target(
+        module="example2.main",
+        questions=["가장 추운 도시의 날씨는 어때?", "안녕하세요!"],
+        search=False,
+    ),
+    "my_example": Target(
+        module="example2.my_example",
+        questions=[
+            "안녕하세요!",
+            "2024년 가장 인기있는 프로그래밍 언어는 뭐야?",
+            "파이썬이란 무엇인가요?",
+            "2025년 IT 최신 트렌드를 알려줘",
+        ],
+    ),
+    "example3": Target(
+        module="example3.main",
+        questions=["Python에 대해 검색해줘", "오늘 날씨를 알려줘"],
+        # 승인을 기다리는 input() 대신 바로 실행한다
+        options={"approval": None},
+    ),
+    "example4": Target(
+        module="example4.main",
+        questions=[
+            "이 코드가 안전한지 검토해주세요: import os; os.system('rm -rf /')",
+            "LangGraph 최신 뉴스를 검색하고 검토해주세요",
+            "파이썬이란 무엇인가요?",
+        ],
+        checkpointed=True,
+        resume=HUMAN_RESPONSE,
+    ),
+    "example5": Target(
+        module="example5.main",
+        questions=[
+            "LangGraph의 출시일을 찾아주세요. 찾으면 human_assistance 도구로 검증해주세요.",
+            "안녕하세요!",
+        ],
+        checkpointed=True,
+        resume=HUMAN_RESPONSE,
+    ),
+    "myproject": Target(
+        module="myproject.main",
+        questions=["내 이름은 철수야", "내 이름이 뭐였지?", "2025년 IT 최신 트렌드를 알려줘"],
+        checkpointed=True,
+    ),
+}
+
+
+class NodeTimer(BaseCallbackHandler):
+    """그래프 노드 실행 시간을 노드 이름별로 모으는 콜백"""
+    run_inline = True
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = {}
+        self.latencies = defaultdict(list)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        # 노드 안에서 실행되는 하위 runnable은 빼고 노드 자체만 잰다
+        if node is not None and kwargs.get("name") == node:
+            with self.lock:
+                self.started[run_id] = (node, time.perf_counter())
+
+    def _finish(self, run_id):
+        with self.lock:
+            started = self.started.pop(run_id, None)
+            if started is not None:
+                node, start = started
+                self.latencies[node].append(time.perf_counter() - start)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        # interrupt도 오류로 전달되므로 멈추기까지 걸린 시간을 함께 센다
+        self._finish(run_id)
+
+
+def timed_checkpointer(saver):
+    """체크포인터의 put / put_writes / get_tuple 호출 시간을 잰다 (비동기 메서드도 이를 거친다)"""
+    saver.timings = defaultdict(list)
+
+    def wrap(name):
+        method = getattr(saver, name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                saver.timings[name].append(time.perf_counter() - start)
+
+        setattr(saver, name, timed)
+
+    for name in ("put", "put_writes", "get_tuple"):
+        wrap(name)
+    return saver
+
+
+def make_checkpointer(kind: str, directory: str, name: str, serde=None):
+    if kind == "sqlite":
+        return timed_checkpointer(SqliteSaver(os.path.join(directory, f"{name}.sqlite"), serde=serde))
+    if kind == "delta":
+        return timed_checkpointer(DeltaMemorySaver(serde=serde))
+    if kind == "bounded":
+        # 작은 상한으로 spill/reload가 자주 일어나게 해서 그 비용을 잰다
+        return timed_checkpointer(BoundedMemorySaver(max_bytes=256 * 1024, keep_last=2, serde=serde))
+    if kind == "sharded":
+        return timed_checkpointer(ShardedMemorySaver(serde=serde))
+    return timed_checkpointer(MemorySaver(serde=serde))
+
+
+def make_cassette(name: str, args) -> Cassette | None:
+    """--record / --replay 디렉터리에서 대상의 cassette 파일을 연다 (둘 다 없으면 None)"""
+    if not (args.record or args.replay):
+        return None
+    path = os.path.join(args.record or args.replay, f"{name}.cassette.json.gz")
+    return Cassette(path, mode="record" if args.record else "replay", latency=args.replay_latency,
+                    wrap=args.replay_wrap)
+
+
+def build(target: Target, args, checkpointer_kind: str, directory: str, name: str, cassette=None):
+    """가짜 모델/검색 도구로 대상의 setup_graph를 호출한다 (cassette가 있으면 실제 모델/검색을 기록/재생한다)"""
+    setup_graph = importlib.import_module(target.module).setup_graph
+    llm = search_tool = None
+    kwargs = dict(target.options)
+    if cassette is not None:
+        kwargs["cassette"] = cassette
+    else:
+        llm = FakeChatModel(latency=args.llm_latency, token_latency=args.token_latency)
+        search_tool = FakeSearchResults(latency=args.tool_latency)
+        kwargs["llm"] = llm
+        if target.search:
+            kwargs["search_tool"] = search_tool
+    if args.metrics:
+        kwargs["metrics"] = GraphMetrics()
+    checkpointer = None
+    if target.checkpointed:
+        checkpointer = make_checkpointer(checkpointer_kind, directory, name, make_serde(args.serde))
+        kwargs["checkpointer"] = checkpointer
+    return setup_graph(**kwargs), llm, search_tool, checkpointer
+
+
+def make_jobs(target: Target, threads: int, prefix: str):
+    """대화 threads개가 각각 대상의 질문 목록을 순서대로 묻는다"""
+    return [
+        (f"{prefix}_{i}", question)
+        for i in range(threads)
+        for question in target.questions
+    ]
+
+
+def run_target(name: str, target: Target, args, directory: str):
+    node_rows, overhead_rows, throughput_rows = [], [], []
+    cassette = make_cassette(name, args)
+
+    for concurrency in args.concurrency:
+        graph, llm, search_tool, checkpointer = build(
+            target, args, args.checkpointer, directory, f"{name}_{concurrency}", cassette
+        )
+        timer = NodeTimer()
+        jobs = make_jobs(target, args.threads, f"{name}_{concurrency}")
+        results, summary = asyncio.run(run_batch(
+            graph.with_config(callbacks=[timer]),
+            jobs,
+            max_concurrency=concurrency,
+            resume=target.resume,
+        ))
+        if isinstance(checkpointer, (SqliteSaver, BoundedMemorySaver)):
+            checkpointer.close()
+
+        latency = summary["latency"]
+        throughput_rows.append({
+            "target": name,
+            "concurrency": concurrency,
+            "turns": summary["turns"],
+            "errors": summary["errors"],
+            "wall_s": summary["wall_time"],
+            "turns_per_s": summary["throughput"],
+            "p50_ms": latency["p50"] * 1000,
+            "p95_ms": latency["p95"] * 1000,
+        })
+
+        # 노드별 지연 시간과 오버헤드는 동시 실행 영향이 없는 첫 번째(가장 낮은) 동시 실행 수 기준
+        if concurrency != args.concurrency[0]:
+            continue
+
+        for node, latencies in sorted(timer.latencies.items()):
+            stats = summarize_latencies(latencies)
+            node_rows.append({
+                "target": name,
+                "node": node,
+                "calls": stats["count"],
+                "mean_ms": stats["mean"] * 1000,
+                "p50_ms": stats["p50"] * 1000,
+                "p95_ms": stats["p95"] * 1000,
+            })
+
+        turns = summary["turns"] or 1
+        if cassette is not None:
+            # 첫 번째 동시 실행 수가 가장 먼저 실행되므로 cassette 통계는 이 실행만의 값이다
+            stats = cassette.stats()
+            injected, llm_calls, search_calls = stats["waited_seconds"], stats["llm_calls"], stats["tool_calls"]
+        else:
+            injected = llm.injected_seconds + search_tool.injected_seconds
+            llm_calls, search_calls = llm.calls, search_tool.calls
+        timings = checkpointer.timings if checkpointer is not None else {}
+        checkpoint_seconds = sum(sum(values) for values in timings.values())
+        overhead_rows.append({
+            "target": name,
+            "turns": summary["turns"],
+            "llm_calls": llm_calls,
+            "search_calls": search_calls,
+            "turn_ms": summary["serial_time"] / turns * 1000,
+            "injected_ms": injected / turns * 1000,
+            # 도구 호출이 병렬로 실행되면 기다린 시간이 겹치므로 오버헤드가 작게 나올 수 있다
+            "overhead_ms": (summary["serial_time"] - injected) / turns * 1000,
+            "checkpoint_ms": checkpoint_seconds / turns * 1000,
+            "checkpoint_ops": sum(len(values) for values in timings.values()),
+            **{
+                f"{method}_us": sum(values) / len(values) * 1e6 if values else 0.0
+                for method in ("put", "put_writes", "get_tuple")
+                for values in [timings.get(method, [])]
+            },
+        })
+
+    if cassette is not None:
+        cassette.save()
+    return node_rows, overhead_rows, throughput_rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--targets", default=",".join(TARGETS), help="쉼표로 구분한 대상 목록")
+    parser.add_argument("--concurrency", default="1,8,32", help="쉼표로 구분한 동시 실행 수 목록")
+    parser.add_argument("--threads", type=int, default=16, help="동시에 진행할 대화 수")
+    parser.add_argument("--llm-latency", type=float, default=0.02, help="가짜 모델의 첫 토큰 지연(초)")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="가짜 모델의 토큰당 지연(초)")
+    parser.add_argument("--tool-latency", type=float, default=0.01, help="가짜 검색 지연(초)")
+    parser.add_argument("--checkpointer", choices=["memory", "delta", "bounded", "sharded", "sqlite"], default="memory")
+    parser.add_argument("--serde", choices=["jsonplus", "binary"], default="jsonplus", help="체크포인트 직렬화 형식")
+    parser.add_argument("--metrics", action="store_true", help="노드 계측(common.instrumentation)을 켜고 잰다")
+    parser.add_argument("--record", metavar="DIR", help="실제 모델/검색 호출을 대상별 cassette 파일로 이 디렉터리에 기록한다")
+    parser.add_argument("--replay", metavar="DIR", help="이 디렉터리의 cassette 파일로 모델/검색 호출을 재생한다")
+    parser.add_argument("--replay-latency", choices=LATENCIES, default="zero",
+                        help="--replay: 기다리지 않거나(zero) 기록된 upstream 지연만큼 기다린다(recorded)")
+    parser.add_argument("--replay-wrap", action="store_true",
+                        help="--replay: 기록할 때보다 많이 실행하면 기록된 응답을 처음부터 다시 쓴다 (기본: CassetteMiss)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+    if args.record and args.replay:
+        parser.error("--record와 --replay는 함께 쓸 수 없습니다")
+    args.concurrency = sorted(int(value) for value in args.concurrency.split(","))
+
+    names = [name.strip() for name in args.targets.split(",") if name.strip()]
+    unknown = [name for name in names if name not in TARGETS]
+    if unknown:
+        parser.error(f"알 수 없는 대상: {', '.join(unknown)} (가능한 대상: {', '.join(TARGETS)})")
+
+    node_rows, overhead_rows, throughput_rows = [], [], []
+    with tempfile.TemporaryDirectory() as directory:
+        for name in names:
+            nodes, overhead, throughput = run_target(name, TARGETS[name], args, directory)
+            node_rows += nodes
+            overhead_rows += overhead
+            throughput_rows += throughput
+
+    print_table("노드별 지연 시간", node_rows)
+    print_table("턴당 그래프 오버헤드 / 체크포인트 비용", overhead_rows)
+    print_table("동시 실행 처리량", throughput_rows)
+    write_json(args.json, "suite", {
+        "config": {
+            "concurrency": args.concurrency,
+            "threads": args.threads,
+            "llm_latency": args.llm_latency,
+            "token_latency": args.token_latency,
+            "tool_latency": args.tool_latency,
+            "checkpointer": args.checkpointer,
+            "serde": args.serde,
+            "metrics": args.metrics,
+            "cassette": args.record or args.replay,
+            "cassette_mode": "record" if args.record else "replay" if args.replay else None,
+            "replay_latency": args.replay_latency if args.replay else None,
+        },
+        "nodes": node_rows,
+        "overhead": overhead_rows,
+        "throughput": throughput_rows,
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+여러 예제(example2~5, myproject)가 함께 사용하는 공용 유틸리티 모음.
+
+각 모듈은 필요한 시점에 직접 import 해서 사용한다.
+(예: from common.batch import run_batch)
+"""
@@ -0,0 +1,300 @@
+"""
+interrupt로 멈춘 대화를 사람의 승인이 올 때까지 보관하는 승인 대기열
+
+    queue = ApprovalQueue("approvals.sqlite")
+    graph = setup_graph(checkpointer=SqliteSaver("checkpoints.sqlite"))
+
+    await start_turn(graph, queue, thread_id, {"messages": [("human", question)]})  # interrupt면 대기열에 등록
+    queue.pending()                                  # [(thread_id, payload, 대기 시간), ...]
+    queue.submit(thread_id, {"data": "승인"})         # 다른 스레드/프로세스에서도 호출 가능
+    await resume_approved(graph, queue, max_concurrency=32)   # 승인된 대화를 한꺼번에 재개
+
+- 기존 드라이버는 interrupt가 걸리면 input()에서 기다리므로 승인 하나가 프로세스 전체를 멈춘다
+- 여기서는 interrupt로 멈춘 대화의 (thread_id, interrupt 값, 등록 시각)만 SQLite에 기록하고 실행을 끝낸다.
+  기다리는 동안 스레드/코루틴/메모리를 쓰지 않는다 (그래프 상태는 체크포인터에 있다)
+- 승인(submit)은 대기열 파일에 응답을 기록할 뿐이다. resume_approved / serve_approvals가
+  승인된 대화를 가져가 Command(resume=응답)으로 동시에(max_concurrency개까지) 재개한다
+- 재개한 대화가 또 interrupt에 걸리면 새 값으로 다시 대기열에 들어간다
+- 대기열과 체크포인터가 모두 파일이면 프로세스를 재시작해도 기다리던 대화를 이어서 재개할 수 있다
+- claim은 가져간 대화에 임대(lease: 가져간 대기열 owner와 시각)를 기록한다. 재개 도중 프로세스가 끝나
+  임대가 lease_timeout초 넘게 남아 있는 대화만 다른 대기열이 다시 가져간다
+  (대기열을 여는 것만으로는 다른 프로세스가 재개 중인 대화를 건드리지 않는다).
+  lease_timeout은 대화 하나를 재개하는 데 걸리는 가장 긴 시간보다 길게 잡는다
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from langgraph.types import Command
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS parked (
+        thread_id TEXT PRIMARY KEY,
+        payload TEXT NOT NULL,
+        parked_at REAL NOT NULL,
+        status TEXT NOT NULL,
+        response TEXT,
+        approved_at REAL,
+        error TEXT,
+        owner TEXT,
+        claimed_at REAL
+    )
+"""
+_INDEX = "CREATE INDEX IF NOT EXISTS parked_status ON parked (status, parked_at)"
+
+PENDING = "pending"
+APPROVED = "approved"
+RESUMING = "resuming"
+FAILED = "failed"
+
+
+@dataclass
+class ParkedInterrupt:
+    """대기열에서 승인을 기다리는 대화 하나"""
+    thread_id: str
+    payload: list  # interrupt 값 목록 (병렬 도구 호출이면 여러 개)
+    parked_at: float
+    status: str = PENDING
+    error: str | None = None
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.parked_at
+
+
+class ApprovalQueue:
+    """interrupt로 멈춘 thread_id와 사람의 응답을 저장하는 SQLite 대기열"""
+
+    def __init__(self, path: str = "approvals.sqlite", lease_timeout: float = 300.0):
+        self.path = path
+        self.lease_timeout = lease_timeout
+        self.owner = uuid.uuid4().hex  # 이 대기열 객체가 가져간(claim) 대화의 임대 주인
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(_SCHEMA)
+            self.conn.execute(_INDEX)
+            # 임대 열이 없던 예전 대기열 파일
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(parked)")}
+            for column, kind in (("owner", "TEXT"), ("claimed_at", "REAL")):
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE parked ADD COLUMN {column} {kind}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def park(self, thread_id: str, payload: list):
+        """interrupt로 멈춘 대화를 등록한다 (이미 있으면 새 interrupt 값으로 바꾼다)"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO parked (thread_id, payload, parked_at, status) VALUES (?, ?, ?, ?)",
+                (thread_id, json.dumps(payload, ensure_ascii=False, default=str), time.time(), PENDING),
+            )
+
+    def submit(self, thread_id: str, response) -> bool:
+        """사람의 응답을 기록한다 (대기 중인 대화가 아니면 False)"""
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE parked SET status = ?, response = ?, approved_at = ? WHERE thread_id = ? AND status = ?",
+                (APPROVED, json.dumps(response, ensure_ascii=False), time.time(), thread_id, PENDING),
+            )
+            return cursor.rowcount > 0
+
+    def submit_many(self, responses: dict) -> int:
+        """{thread_id: 응답}을 한 트랜잭션으로 기록하고 기록한 수를 돌려준다"""
+        now = time.time()
+        rows = [
+            (APPROVED, json.dumps(response, ensure_ascii=False), now, thread_id, PENDING)
+            for thread_id, response in responses.items()
+        ]
+        with self.lock:
+            self.conn.execute("BEGIN")
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "UPDATE parked SET status = ?, response = ?, approved_at = ? WHERE thread_id = ? AND status = ?",
+                rows,
+            )
+            self.conn.execute("COMMIT")
+            return self.conn.total_changes - before
+
+    def pending(self, limit: int | None = None, status: str = PENDING):
+        """승인을 기다리는 대화 목록 (오래 기다린 순)"""
+        query = "SELECT thread_id, payload, parked_at, status, error FROM parked WHERE status = ? ORDER BY parked_at"
+        params = [status]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [
+            ParkedInterrupt(thread_id, json.loads(payload), parked_at, row_status, error)
+            for thread_id, payload, parked_at, row_status, error in rows
+        ]
+
+    def claim(self, limit: int = 100):
+        """
+        승인된 대화와 임대가 끝난(lease_timeout초 넘게 재개 중인) 대화를 limit개까지 가져가
+        이 대기열의 임대로 재개 중 표시를 하고 [(thread_id, 응답)]을 돌려준다
+        """
+        now = time.time()
+        with self.lock:
+            rows = self.conn.execute(
+                "UPDATE parked SET status = ?, owner = ?, claimed_at = ? WHERE thread_id IN ("
+                "SELECT thread_id FROM parked WHERE status = ? OR (status = ? AND claimed_at < ?) "
+                "ORDER BY approved_at LIMIT ?"
+                ") RETURNING thread_id, response",
+                (RESUMING, self.owner, now, APPROVED, RESUMING, now - self.lease_timeout, limit),
+            ).fetchall()
+        return [(thread_id, json.loads(response)) for thread_id, response in rows]
+
+    def finish(self, thread_id: str) -> bool:
+        """
+        재개가 끝난 대화를 지운다 (다시 interrupt에 걸렸으면 park가 이미 덮어썼다).
+        임대가 끝나 다른 대기열이 다시 가져간 대화는 건드리지 않고 False를 돌려준다
+        """
+        with self.lock:
+            cursor = self.conn.execute(
+                "DELETE FROM parked WHERE thread_id = ? AND status = ? AND owner = ?",
+                (thread_id, RESUMING, self.owner),
+            )
+            return cursor.rowcount > 0
+
+    def fail(self, thread_id: str, error: str) -> bool:
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE parked SET status = ?, error = ? WHERE thread_id = ? AND status = ? AND owner = ?",
+                (FAILED, error, thread_id, RESUMING, self.owner),
+            )
+            return cursor.rowcount > 0
+
+    def counts(self) -> dict:
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM parked GROUP BY status").fetchall()
+        return {PENDING: 0, APPROVED: 0, RESUMING: 0, FAILED: 0, **dict(rows)}
+
+
+def interrupts_of(state) -> list:
+    """그래프 상태에서 아직 응답을 받지 못한 interrupt 값 목록"""
+    return [interrupt.value for task in state.tasks for interrupt in task.interrupts]
+
+
+async def start_turn(graph, queue: ApprovalQueue, thread_id: str, graph_input):
+    """
+    그래프를 실행하고 interrupt에 걸리면 대기열에 등록한다
+    반환값: (이번 실행에서 추가된 메시지 목록, 걸린 interrupt 값 목록 (끝까지 실행했으면 빈 목록))
+    """
+    config = {"configurable": {"thread_id": thread_id}}
+    messages = []
+    async for event in graph.astream(graph_input, config, stream_mode="updates"):
+        for value in event.values():
+            # interrupt 이벤트 등 dict가 아닌 값은 건너뛴다
+            if isinstance(value, dict) and "messages" in value:
+                new = value["messages"]
+                messages.extend(new if isinstance(new, list) else [new])
+    if payload := interrupts_of(await graph.aget_state(config)):
+        queue.park(thread_id, payload)
+    return messages, payload
+
+
+async def resume_approved(graph, queue: ApprovalQueue, max_concurrency: int = 32, limit: int = 1000) -> dict:
+    """승인된 대화를 limit개까지 가져와 max_concurrency개씩 동시에 재개한다"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    summary = {"resumed": 0, "parked_again": 0, "failed": 0}
+
+    async def resume(thread_id, response):
+        async with semaphore:
+            try:
+                _, payload = await start_turn(graph, queue, thread_id, Command(resume=response))
+            except Exception as e:
+                queue.fail(thread_id, str(e))
+                summary["failed"] += 1
+                return
+            # 다시 interrupt에 걸렸으면 park가 새 값으로 대기 상태를 만들어 두었다
+            queue.finish(thread_id)
+            summary["parked_again" if payload else "resumed"] += 1
+
+    claimed = queue.claim(limit)
+    await asyncio.gather(*(resume(thread_id, response) for thread_id, response in claimed))
+    return summary
+
+
+async def serve_approvals(graph, queue: ApprovalQueue, max_concurrency: int = 32, poll_interval: float = 0.5,
+                          stop: asyncio.Event | None = None):
+    """승인이 들어오는 대로 재개하는 백그라운드 작업 (stop이 설정되면 끝난다)"""
+    while stop is None or not stop.is_set():
+        summary = await resume_approved(graph, queue, max_concurrency, limit=max_concurrency * 4)
+        if not any(summary.values()):
+            await asyncio.sleep(poll_interval)
+
+
+def parse_response(text: str):
+    """CLI 응답 문자열: JSON 객체면 그대로, 아니면 {"data": 문자열}"""
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError:
+        return {"data": text}
+    return value if isinstance(value, dict) else {"data": text}
+
+
+def print_pending(queue: ApprovalQueue, limit: int = 20):
+    """승인을 기다리는 대화를 오래 기다린 순으로 출력한다"""
+    items = queue.pending(limit)
+    counts = queue.counts()
+    print("\n" + "="*50)
+    print(f"⏳ 승인 대기: {counts[PENDING]}건 (승인됨 {counts[APPROVED]}, 재개 중 {counts[RESUMING]}, 실패 {counts[FAILED]})")
+    print("="*50)
+    for item in items:
+        print(f"- {item.thread_id} ({item.age:.0f}s 대기): {json.dumps(item.payload, ensure_ascii=False)}")
+
+
+def add_approval_arguments(parser):
+    """승인 대기열 모드 CLI 인자 (example4/example5 공용)"""
+    parser.add_argument("--queue", help="승인 대기열 파일 (주면 input()으로 기다리지 않는다)")
+    parser.add_argument("--sqlite", default="checkpoints.sqlite", help="--queue: 대화 상태를 저장할 SQLite 파일")
+    parser.add_argument("--start", action="store_true", help="--queue: 테스트 질문을 모두 동시에 시작한다")
+    parser.add_argument("--list", action="store_true", help="--queue: 승인을 기다리는 대화를 출력한다")
+    parser.add_argument("--approve", nargs="*", metavar="THREAD_ID", help="--queue: 응답을 기록할 대화 (비우면 전부)")
+    parser.add_argument("--response", default="승인", help="--approve 응답 (JSON 객체 또는 문자열)")
+    parser.add_argument("--resume", action="store_true", help="--queue: 승인된 대화를 한꺼번에 재개한다")
+    parser.add_argument("--concurrency", type=int, default=32, help="--queue: 동시에 실행할 대화 수")
+    parser.add_argument("--lease-timeout", type=float, default=300.0,
+                        help="--queue: 재개 중인 대화를 다른 프로세스가 다시 가져가기까지의 시간(초)")
+
+
+async def run_approval_cli(args, graph, questions, thread_prefix: str = "review"):
+    """--start / --approve / --resume / --list를 순서대로 처리한다"""
+    with ApprovalQueue(args.queue, args.lease_timeout) as queue:
+        if args.start:
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def start(index, question):
+                async with semaphore:
+                    graph_input = {"messages": [("human", question)]}
+                    _, payload = await start_turn(graph, queue, f"{thread_prefix}_{index}", graph_input)
+                    return payload
+
+            payloads = await asyncio.gather(*(start(i, question) for i, question in enumerate(questions)))
+            print(f"🚀 {len(questions)}개 대화 시작, {sum(1 for payload in payloads if payload)}개가 승인 대기 중")
+        if args.approve is not None:
+            thread_ids = args.approve or [item.thread_id for item in queue.pending()]
+            response = parse_response(args.response)
+            count = queue.submit_many({thread_id: response for thread_id in thread_ids})
+            print(f"✅ {count}개 대화에 응답을 기록했습니다: {response}")
+        if args.resume:
+            summary = await resume_approved(graph, queue, args.concurrency)
+            print(f"🔄 재개 완료 {summary['resumed']}, 다시 대기 {summary['parked_again']}, 실패 {summary['failed']}")
+        if args.list or not (args.start or args.approve is not None or args.resume):
+            print_pending(queue)
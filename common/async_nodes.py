@@ -0,0 +1,55 @@
+"""
+같은 setup_graph로 동기/비동기 두 가지 그래프(flavor)를 만드는 도우미
+
+    graph = setup_graph(flavor="async")                  # 노드/도구/라우터가 모두 코루틴
+    await graph.ainvoke({"messages": [...]}, config)     # async 그래프는 ainvoke/astream으로만 실행한다
+
+- sync(기본): 지금까지의 그래프. ainvoke/astream으로 실행하면 동기 노드/도구/라우터는 호출마다
+  실행기 스레드 풀(기본 min(32, CPU+4)개)로 넘어가므로, 동시에 기다릴 수 있는 모델/도구 호출 수가 스레드 수로 제한된다
+- async: chatbot/call_model은 모델의 ainvoke를, 도구는 코루틴(StructuredTool.coroutine)을 쓴다.
+  이벤트 루프 하나에서 스레드를 거치지 않고 실행되므로 동시 대화 수가 스레드 수에 묶이지 않는다
+- 동기 API(invoke/stream)로 async 그래프를 실행하면 노드에서 TypeError가 난다
+"""
+import asyncio
+import inspect
+
+FLAVORS = ("sync", "async")
+
+
+def check_flavor(flavor: str) -> bool:
+    """flavor를 확인하고 async이면 True를 돌려준다"""
+    if flavor not in FLAVORS:
+        raise ValueError(f"flavor는 {', '.join(FLAVORS)} 중 하나여야 합니다: {flavor!r}")
+    return flavor == "async"
+
+
+def inline(func, name: str | None = None):
+    """
+    기다릴 일이 없는 가벼운 동기 함수(라우터, compact 노드 등)를 Runnable로 감싼다.
+    ainvoke에서도 스레드 풀로 넘기지 않고 이벤트 루프에서 바로 실행한다 (invoke는 그대로 동기 실행)
+    """
+    from langgraph.utils.runnable import RunnableCallable
+
+    async def afunc(state):
+        return func(state)
+
+    return RunnableCallable(func, afunc, name=name or getattr(func, "__name__", None), trace=True)
+
+
+def async_only(afunc, name: str | None = None):
+    """코루틴 함수만 있는 노드 (invoke/stream으로 실행하면 TypeError)"""
+    from langgraph.utils.runnable import RunnableCallable
+
+    return RunnableCallable(None, afunc, name=name or afunc.__name__)
+
+
+async def acall(func, *args):
+    """동기 함수면 스레드에서, 코루틴 함수면 그대로 기다린다 (사람 승인 함수처럼 사용자가 넘기는 콜백용)"""
+    if inspect.iscoroutinefunction(func):
+        return await func(*args)
+    return await asyncio.to_thread(func, *args)
+
+
+def add_flavor_arguments(parser, default: str = "sync"):
+    parser.add_argument("--flavor", choices=FLAVORS, default=default,
+                        help="async: 노드/도구/라우터를 코루틴으로 만들어 스레드 풀 없이 실행한다 (ainvoke/astream 전용)")
@@ -0,0 +1,167 @@
+"""
+질문 목록을 asyncio로 동시에 실행하는 배치 실행기
+
+- 서로 다른 thread_id의 대화는 병렬로 실행한다 (세마포어로 동시 실행 수 제한)
+- 같은 thread_id 안의 질문은 입력 순서대로 하나씩 실행한다
+- 결과는 입력 순서대로 정렬하고 처리량/지연 시간 요약을 함께 돌려준다
+- resume을 주면 interrupt로 멈춘 턴을 Command(resume=resume)으로 끝까지 이어서 실행한다
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+from langchain_core.messages import AIMessage
+from langgraph.types import Command
+
+from .resilience import with_deadline
+from .stats import summarize_latencies
+
+
+@dataclass
+class TurnResult:
+    """질문 하나(한 턴)의 실행 결과"""
+    index: int
+    thread_id: str
+    question: str
+    messages: list = field(default_factory=list)
+    latency: float = 0.0
+    error: str | None = None
+
+
+def jobs_from_questions(questions, thread_prefix: str = "batch"):
+    """서로 독립적인 질문마다 별도의 thread_id를 붙인다"""
+    return [(f"{thread_prefix}_{i}", question) for i, question in enumerate(questions)]
+
+
+def jobs_from_conversations(conversations: dict):
+    """{thread_id: [질문, ...]} 형태의 대화 묶음을 (thread_id, 질문) 목록으로 펼친다"""
+    return [
+        (thread_id, question)
+        for thread_id, questions in conversations.items()
+        for question in questions
+    ]
+
+
+# interrupt가 계속 걸려도 한 턴에서 재개를 시도하는 최대 횟수
+MAX_RESUMES = 10
+
+
+async def _run_turn(graph, index, thread_id, question, semaphore, resume=None, turn_timeout=None):
+    result = TurnResult(index=index, thread_id=thread_id, question=question)
+
+    async with semaphore:
+        # 턴 마감 시간은 실행 슬롯을 잡은 뒤부터 잰다
+        config = with_deadline({"configurable": {"thread_id": thread_id}}, turn_timeout)
+        start = time.perf_counter()
+        try:
+            graph_input = {"messages": [("human", question)]}
+            for _ in range(MAX_RESUMES + 1):
+                async for event in graph.astream(graph_input, config, stream_mode="updates"):
+                    for value in event.values():
+                        # interrupt 이벤트 등 dict가 아닌 값은 건너뛴다
+                        if isinstance(value, dict) and "messages" in value:
+                            messages = value["messages"]
+                            if not isinstance(messages, list):
+                                messages = [messages]
+                            result.messages.extend(messages)
+                if resume is None or not (await graph.aget_state(config)).next:
+                    break
+                graph_input = Command(resume=resume)
+        except Exception as e:
+            result.error = str(e)
+        result.latency = time.perf_counter() - start
+
+    return result
+
+
+async def run_batch(graph, jobs, max_concurrency: int = 8, resume=None, turn_timeout=None):
+    """
+    (thread_id, 질문) 목록을 동시에 실행한다
+    - resume: interrupt로 멈추면 이 값으로 재개한다 (체크포인터가 있는 그래프만)
+    - turn_timeout: 턴마다 마감 시간(초)을 config에 넣는다 (common.resilience.with_deadline)
+
+    반환값: (입력 순서대로 정렬된 TurnResult 목록, 요약 dict)
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    # thread_id별로 질문을 모은다 (dict는 삽입 순서를 유지한다)
+    threads = {}
+    for index, (thread_id, question) in enumerate(jobs):
+        threads.setdefault(thread_id, []).append((index, question))
+
+    async def run_thread(thread_id, turns):
+        # 같은 대화 안에서는 순서를 지켜 하나씩 실행한다
+        return [
+            await _run_turn(graph, index, thread_id, question, semaphore, resume, turn_timeout)
+            for index, question in turns
+        ]
+
+    start = time.perf_counter()
+    per_thread = await asyncio.gather(
+        *(run_thread(thread_id, turns) for thread_id, turns in threads.items())
+    )
+    wall_time = time.perf_counter() - start
+
+    results = sorted(
+        (result for results in per_thread for result in results),
+        key=lambda result: result.index,
+    )
+    return results, summarize_batch(results, wall_time)
+
+
+def run_batch_sync(graph, jobs, max_concurrency: int = 8, resume=None, turn_timeout=None):
+    """동기 코드(main 함수 등)에서 run_batch를 호출하기 위한 래퍼"""
+    return asyncio.run(run_batch(graph, jobs, max_concurrency, resume, turn_timeout))
+
+
+def summarize_batch(results, wall_time: float) -> dict:
+    """배치 실행 결과의 처리량과 지연 시간 요약"""
+    latencies = [result.latency for result in results]
+    serial_time = sum(latencies)
+    return {
+        "turns": len(results),
+        "threads": len({result.thread_id for result in results}),
+        "errors": sum(1 for result in results if result.error),
+        "wall_time": wall_time,
+        "serial_time": serial_time,
+        "throughput": len(results) / wall_time if wall_time > 0 else 0.0,
+        "speedup": serial_time / wall_time if wall_time > 0 else 0.0,
+        "latency": summarize_latencies(latencies),
+    }
+
+
+def print_batch_report(results, summary: dict):
+    """배치 결과를 입력 순서대로 출력하고 마지막에 요약을 출력한다"""
+    for result in results:
+        print("\n" + "="*50)
+        print(f"😀 사용자: {result.question}")
+        print(f"🧵 대화 ID: {result.thread_id}")
+        print("="*50)
+
+        if result.error:
+            print(f"\n❌ 오류 발생: {result.error}")
+            continue
+
+        # 도구 결과와 compact 노드의 RemoveMessage는 출력하지 않는다
+        for message in result.messages:
+            if not isinstance(message, AIMessage):
+                continue
+            if message.tool_calls:
+                print("\n🔍 검색 중...")
+                for tool_call in message.tool_calls:
+                    print(f"- 검색어: {tool_call['args'].get('query', '')}")
+            elif message.content:
+                print("\n🤖 AI:", message.content)
+        print(f"\n⏱️ {result.latency:.2f}s")
+
+    latency = summary["latency"]
+    print("\n" + "="*50)
+    print("📊 배치 실행 요약")
+    print("="*50)
+    print(f"- 질문 수: {summary['turns']} (대화 {summary['threads']}개, 오류 {summary['errors']}개)")
+    print(f"- 전체 소요 시간: {summary['wall_time']:.2f}s (순차 실행 시 {summary['serial_time']:.2f}s, {summary['speedup']:.1f}배)")
+    print(f"- 처리량: {summary['throughput']:.2f} 질문/s")
+    print(
+        f"- 지연 시간: p50 {latency['p50']:.2f}s / p95 {latency['p95']:.2f}s"
+        f" / p99 {latency['p99']:.2f}s / max {latency['max']:.2f}s"
+    )
@@ -0,0 +1,362 @@
+"""
+체크포인트를 작은 바이너리(msgpack + 타입 태그)로 직렬화하는 serde
+
+    serde = BinarySerializer()
+    memory = MemorySaver(serde=serde)      # SqliteSaver(path, serde=serde), DeltaMemorySaver(serde=serde) 등
+    graph = setup_graph(checkpointer=memory)
+    ...
+    message = last_message(memory, config)   # 체크포인트 전체가 아니라 마지막 메시지만 디코드한다
+
+- 기본 JsonPlusSerializer는 메시지마다 model_dump()로 기본값까지 모든 필드를 dict로 만들고
+  모듈/클래스 이름 문자열을 붙여 저장한다. 읽을 때는 import_module과 pydantic 검증을 거친다
+- 여기서는 메시지 클래스를 작은 정수 태그로 적고 기본값과 다른 필드만 저장한다.
+  읽을 때는 검증 없이 만든다 (model_construct와 같은 결과, 저장한 값은 이미 검증된 값이다)
+- Send/Command/Interrupt(승인 대기, resume 값)도 태그로 저장한다.
+  그 밖의 객체(set, datetime, UUID 등)는 JsonPlusSerializer 인코딩을 그대로 감싸 저장한다
+- 체크포인트의 메시지 목록(channel_values의 messages, delta 체크포인트의 append)은 본문 뒤의 구역(segment)에 두고
+  끝에 색인을 붙인다. last_message는 색인으로 마지막 메시지 위치를 찾아 그 부분(memoryview)만 디코드한다
+- 타입 이름이 "bmsgpack"이 아닌 값(이전에 기본 serde로 저장한 체크포인트)은 JsonPlusSerializer로 읽는다
+"""
+import copy
+import dataclasses
+import functools
+import struct
+from collections import deque
+
+import msgpack
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    ChatMessage,
+    FunctionMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.types import Command, Interrupt, Send
+from pydantic_core import PydanticUndefined
+
+TYPE = "bmsgpack"
+
+# 태그는 저장 형식의 일부다: 순서를 바꾸지 말고 뒤에만 추가한다
+MESSAGE_CLASSES = (
+    HumanMessage,
+    AIMessage,
+    ToolMessage,
+    SystemMessage,
+    RemoveMessage,
+    AIMessageChunk,
+    ChatMessage,
+    FunctionMessage,
+)
+_MESSAGE_TAGS = {cls: tag for tag, cls in enumerate(MESSAGE_CLASSES)}
+
+EXT_MESSAGE = 1
+EXT_SEGMENT = 2
+EXT_SEND = 3
+EXT_INTERRUPT = 4
+EXT_COMMAND = 5
+EXT_TUPLE = 6
+EXT_JSONPLUS = 127
+
+_TRAILER = struct.Struct("<I")
+_MISSING = object()
+
+
+def _field_defaults(cls) -> dict:
+    """메시지 클래스 필드의 기본값 (기본값이 없는 필드는 빠진다)"""
+    defaults = {}
+    for name, field in cls.model_fields.items():
+        if field.default is not PydanticUndefined:
+            defaults[name] = field.default
+        elif field.default_factory is not None:
+            defaults[name] = field.default_factory()
+    return defaults
+
+
+_DEFAULTS = {cls: _field_defaults(cls) for cls in MESSAGE_CLASSES}
+
+
+def _template(cls):
+    """(그대로 넣을 기본값, 새로 만들어야 하는 기본값의 (이름, factory))"""
+    static, factories = {}, []
+    for name, default in _DEFAULTS[cls].items():
+        if isinstance(default, (list, dict, set)):
+            # pydantic처럼 메시지마다 새 객체를 쓴다
+            factories.append((name, type(default) if not default else functools.partial(copy.deepcopy, default)))
+        else:
+            static[name] = default
+    return static, tuple(factories), {} if cls.model_config.get("extra") == "allow" else None
+
+
+_TEMPLATES = {cls: _template(cls) for cls in MESSAGE_CLASSES}
+
+
+def _construct(cls, fields: dict):
+    """
+    cls.model_construct(**fields)와 같은 메시지를 만든다
+    model_construct는 필드마다 파이썬 루프를 돌아 메시지 하나에 수십 µs가 걸린다
+    """
+    static, factories, extra = _TEMPLATES[cls]
+    values = dict(static)
+    for name, factory in factories:
+        if name not in fields:
+            values[name] = factory()
+    values.update(fields)
+    message = cls.__new__(cls)
+    object.__setattr__(message, "__dict__", values)
+    object.__setattr__(message, "__pydantic_fields_set__", set(fields))
+    object.__setattr__(message, "__pydantic_extra__", extra if extra is None else {})
+    object.__setattr__(message, "__pydantic_private__", None)
+    return message
+
+
+class _Segment:
+    """본문 밖(segment)에 따로 저장할 메시지 목록 표시"""
+    __slots__ = ("messages",)
+
+    def __init__(self, messages: list):
+        self.messages = messages
+
+
+def _is_message_list(value) -> bool:
+    return (
+        isinstance(value, list) and value
+        and all(type(message) in _MESSAGE_TAGS for message in value)
+    )
+
+
+class BinarySerializer:
+    """
+    SerializerProtocol 구현 (dumps_typed/loads_typed, dumps/loads)
+    체크포인터의 serde 인자로 넘긴다
+    """
+
+    def __init__(self, fallback=None):
+        # 태그가 없는 객체와 이전 형식의 값은 이 serde로 처리한다
+        self.fallback = fallback if fallback is not None else JsonPlusSerializer()
+        self.packers = deque(maxlen=32)
+
+    # ---- 인코딩 ----
+
+    def _default(self, obj):
+        cls = type(obj)
+        tag = _MESSAGE_TAGS.get(cls)
+        if tag is not None:
+            defaults = _DEFAULTS[cls]
+            fields = {
+                name: value
+                for name, value in obj.__dict__.items()
+                if name != "type" and defaults.get(name, _MISSING) != value
+            }
+            return msgpack.ExtType(EXT_MESSAGE, self._pack([tag, fields]))
+        if cls is _Segment:
+            raise TypeError("segment는 체크포인트 channel_values 안에서만 쓸 수 있습니다")
+        if cls is Send:
+            return msgpack.ExtType(EXT_SEND, self._pack([obj.node, obj.arg]))
+        if cls is Interrupt:
+            return msgpack.ExtType(EXT_INTERRUPT, self._pack([obj.value, obj.resumable, obj.ns, obj.when]))
+        if cls is Command:
+            fields = {field.name: getattr(obj, field.name) for field in dataclasses.fields(obj)}
+            return msgpack.ExtType(EXT_COMMAND, self._pack(fields))
+        if isinstance(obj, tuple) and not hasattr(obj, "_asdict"):
+            # 체크포인트 안의 tuple(버전 번호, 경로 등)은 tuple로 되돌린다
+            return msgpack.ExtType(EXT_TUPLE, self._pack(list(obj)))
+        type_, data = self.fallback.dumps_typed(obj)
+        return msgpack.ExtType(EXT_JSONPLUS, self._pack([type_, data]))
+
+    def _pack(self, obj) -> bytes:
+        # Packer는 스레드 안전하지 않고 default 안에서 다시 불리므로 꺼내 쓰고 돌려놓는다
+        try:
+            packer = self.packers.popleft()
+        except IndexError:
+            packer = msgpack.Packer(default=self._default, strict_types=True)
+        try:
+            return packer.pack(obj)
+        finally:
+            self.packers.append(packer)
+
+    def _split_segments(self, checkpoint: dict):
+        """channel_values의 메시지 목록을 segment 표시로 바꾼 체크포인트와 segment 목록"""
+        channel_values = checkpoint.get("channel_values")
+        if not isinstance(channel_values, dict):
+            return checkpoint, []
+        segments = []
+        values = {}
+        for channel, value in channel_values.items():
+            if _is_message_list(value):
+                segments.append(([channel], value))
+                value = _Segment(value)
+            elif isinstance(value, dict) and _is_message_list(value.get("append")):
+                # common.delta_checkpoint의 delta: 새로 붙은 메시지의 마지막이 전체 목록의 마지막이다
+                segments.append(([channel, "append"], value["append"]))
+                value = {**value, "append": _Segment(value["append"])}
+            values[channel] = value
+        if not segments:
+            return checkpoint, []
+        return {**checkpoint, "channel_values": values}, segments
+
+    def _encode_checkpoint(self, checkpoint: dict) -> bytes:
+        checkpoint, segments = self._split_segments(checkpoint)
+        if not segments:
+            return self._pack(checkpoint) + _TRAILER.pack(0)
+
+        # 본문에서는 segment 번호만 적는다
+        def default(obj):
+            if type(obj) is _Segment:
+                return msgpack.ExtType(EXT_SEGMENT, msgpack.packb(id_to_index[id(obj)]))
+            return self._default(obj)
+
+        id_to_index = {}
+        for value in checkpoint["channel_values"].values():
+            for segment in (value, value.get("append") if isinstance(value, dict) else None):
+                if type(segment) is _Segment:
+                    id_to_index[id(segment)] = len(id_to_index)
+        parts = [msgpack.packb(checkpoint, default=default, strict_types=True)]
+        offset = len(parts[0])
+        index = []
+        for path, messages in segments:
+            # 메시지마다 msgpack 객체 하나: 마지막 메시지의 시작 위치를 색인에 적는다
+            encoded = [self._pack(message) for message in messages]
+            start = offset
+            last = offset + sum(len(item) for item in encoded[:-1])
+            offset += sum(len(item) for item in encoded)
+            parts += encoded
+            index.append([path, start, last, offset])
+        encoded_index = msgpack.packb(index)
+        parts += [encoded_index, _TRAILER.pack(len(encoded_index))]
+        return b"".join(parts)
+
+    def dumps_typed(self, obj) -> tuple[str, bytes]:
+        if isinstance(obj, (bytes, bytearray)):
+            return self.fallback.dumps_typed(obj)
+        try:
+            if isinstance(obj, dict) and "channel_values" in obj:
+                return TYPE, self._encode_checkpoint(obj)
+            return TYPE, self._pack(obj) + _TRAILER.pack(0)
+        except UnicodeEncodeError:
+            # 짝이 맞지 않는 surrogate 문자 등은 기본 serde(JSON)로 저장한다
+            return self.fallback.dumps_typed(obj)
+
+    # ---- 디코딩 ----
+
+    def _ext_hook(self, code: int, data: bytes):
+        if code == EXT_MESSAGE:
+            tag, fields = self._unpack(data)
+            return _construct(MESSAGE_CLASSES[tag], fields)
+        if code == EXT_SEND:
+            node, arg = self._unpack(data)
+            return Send(node, arg)
+        if code == EXT_INTERRUPT:
+            value, resumable, ns, when = self._unpack(data)
+            return Interrupt(value=value, resumable=resumable, ns=ns, when=when)
+        if code == EXT_COMMAND:
+            return Command(**self._unpack(data))
+        if code == EXT_TUPLE:
+            return tuple(self._unpack(data))
+        if code == EXT_JSONPLUS:
+            type_, payload = self._unpack(data)
+            return self.fallback.loads_typed((type_, payload))
+        return msgpack.ExtType(code, data)
+
+    def _unpack(self, data):
+        return msgpack.unpackb(data, ext_hook=self._ext_hook, strict_map_key=False)
+
+    @staticmethod
+    def _split(data: bytes):
+        """(본문, segment 색인): 끝의 4바이트가 색인 길이다"""
+        view = memoryview(data)
+        index_size = _TRAILER.unpack_from(view, len(view) - _TRAILER.size)[0]
+        end = len(view) - _TRAILER.size - index_size
+        index = msgpack.unpackb(view[end:len(view) - _TRAILER.size]) if index_size else []
+        return view, index
+
+    def _decode_segment(self, view, start: int, end: int) -> list:
+        unpacker = msgpack.Unpacker(ext_hook=self._ext_hook, strict_map_key=False)
+        unpacker.feed(view[start:end])
+        return list(unpacker)
+
+    def loads_typed(self, data: tuple[str, bytes]):
+        type_, payload = data
+        if type_ != TYPE:
+            return self.fallback.loads_typed(data)
+        view, index = self._split(payload)
+        if not index:
+            return msgpack.unpackb(
+                view[:len(view) - _TRAILER.size], ext_hook=self._ext_hook, strict_map_key=False
+            )
+
+        def ext_hook(code, data):
+            if code == EXT_SEGMENT:
+                _, start, _, end = index[msgpack.unpackb(data)]
+                return self._decode_segment(view, start, end)
+            return self._ext_hook(code, data)
+
+        return msgpack.unpackb(view[:index[0][1]], ext_hook=ext_hook, strict_map_key=False)
+
+    def last_message(self, data: tuple[str, bytes], channel: str = "messages"):
+        """
+        직렬화된 체크포인트에서 channel의 마지막 메시지만 디코드한다
+        이 serde로 저장하지 않았거나 알 수 없으면(delta에 새 메시지가 없는 경우 등) _MISSING을 돌려준다
+        """
+        type_, payload = data
+        if type_ != TYPE:
+            return _MISSING
+        view, index = self._split(payload)
+        for path, _, last, end in index:
+            if path[0] == channel:
+                return self._unpack(view[last:end])
+        return _MISSING
+
+    # JSON 형식이 필요한 곳(메타데이터 필터 등)은 기본 serde를 쓴다
+    def dumps(self, obj) -> bytes:
+        return self.fallback.dumps(obj)
+
+    def loads(self, data: bytes):
+        return self.fallback.loads(data)
+
+
+def _serialized_checkpoint(checkpointer, config):
+    """체크포인터에 저장된 직렬화 체크포인트 (type, bytes) (직접 읽을 수 없으면 None)"""
+    from langgraph.checkpoint.base import get_checkpoint_id
+    from langgraph.checkpoint.memory import MemorySaver
+
+    configurable = config["configurable"]
+    thread_id = configurable["thread_id"]
+    checkpoint_ns = configurable.get("checkpoint_ns", "")
+    checkpoint_id = get_checkpoint_id(config)
+    get_serialized = getattr(checkpointer, "get_serialized", None)
+    if get_serialized is not None:
+        # SqliteSaver, ShardedMemorySaver
+        return get_serialized(thread_id, checkpoint_ns, checkpoint_id)
+    if isinstance(checkpointer, MemorySaver):
+        # BoundedMemorySaver가 파일로 내보낸 대화는 storage에 없다 (get_tuple로 다시 읽는다)
+        checkpoints = checkpointer.storage.get(thread_id, {}).get(checkpoint_ns)
+        if not checkpoints:
+            return None
+        saved = checkpoints.get(checkpoint_id or max(checkpoints))
+        return saved[0] if saved is not None else None
+    return None
+
+
+def last_message(checkpointer, config, channel: str = "messages"):
+    """
+    thread의 (config에 checkpoint_id가 있으면 그 체크포인트의) 마지막 메시지
+    체크포인터의 serde가 BinarySerializer면 마지막 메시지만 디코드하고, 아니면 get_tuple로 전체를 읽는다
+    """
+    if isinstance(checkpointer.serde, BinarySerializer):
+        serialized = _serialized_checkpoint(checkpointer, config)
+        if serialized is not None:
+            message = checkpointer.serde.last_message(serialized, channel)
+            if message is not _MISSING:
+                return message
+    saved = checkpointer.get_tuple(config)
+    messages = saved.checkpoint["channel_values"].get(channel) if saved is not None else None
+    return messages[-1] if messages else None
+
+
+def make_serde(name: str | None):
+    """이름으로 serde를 만든다 ("binary"면 BinarySerializer, 아니면 None = 체크포인터 기본값)"""
+    return BinarySerializer() if name == "binary" else None
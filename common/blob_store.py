@@ -0,0 +1,189 @@
+"""
+큰 도구 결과를 메시지 상태 밖의 content-addressed 저장소(SQLite)에 한 번만 저장한다
+
+    blobs = BlobStore(path="blobs.sqlite", threshold=2000)
+    graph = build_chat_graph(State, tools, llm, checkpointer=memory, blobs=blobs)
+    ...
+    state = get_expanded_state(graph, config, blobs)   # 원래 도구 결과로 펼친 상태
+    print_blob_stats(blobs)
+
+- 검색 결과 ToolMessage는 그대로 두면 모든 체크포인트에 복사되고 다음 턴마다 모델에 다시 보내진다
+- tools 노드가 만든 ToolMessage의 본문(content)이 threshold 글자 이상이면 sha256 키로 저장하고,
+  메시지에는 앞부분 미리보기와 참조(response_metadata["blob"])만 남긴다
+  (모델에 보내지 않는 artifact도 크면 같이 저장한다)
+- 같은 내용은 thread가 달라도 한 번만 저장된다 (INSERT OR IGNORE)
+- 모델 호출 직전에 이번 턴(마지막 사람 질문 뒤)의 참조만 원래 내용으로 펼친다
+  이전 턴의 검색 결과는 미리보기로 보내서 턴마다 다시 보내는 토큰도 줄인다 (expand_history=True면 모두 펼친다)
+- path를 주지 않으면 메모리 안의 SQLite를 쓴다 (프로세스가 끝나면 사라진다)
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from langchain_core.messages import ToolMessage
+
+from .loop_budget import current_turn
+
+PREVIEW_CHARS = 200
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore:
+    """sha256 키로 도구 결과 본문을 한 번만 저장하는 SQLite 저장소"""
+
+    def __init__(self, path: str | None = None, threshold: int = 2000, expand_history: bool = False,
+                 preview_chars: int = PREVIEW_CHARS):
+        self.threshold = threshold
+        self.expand_history = expand_history
+        self.preview_chars = preview_chars
+        self.lock = threading.Lock()
+        self.counters = {
+            "offloaded": 0,
+            "deduplicated": 0,
+            "bytes_offloaded": 0,
+            "expanded": 0,
+            "missing": 0,
+        }
+        self.conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        if path:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs (digest TEXT PRIMARY KEY, created REAL, size INTEGER, data BLOB)"
+        )
+        self.conn.commit()
+
+    # ---- 저장/조회 ----
+
+    def put(self, text: str) -> str:
+        """text를 저장하고 sha256 키를 돌려준다 (이미 있으면 저장하지 않는다)"""
+        data = text.encode("utf-8")
+        digest = content_digest(data)
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO blobs (digest, created, size, data) VALUES (?, ?, ?, ?)",
+                (digest, time.time(), len(data), data),
+            )
+            self.conn.commit()
+            if cursor.rowcount:
+                self.counters["bytes_offloaded"] += len(data)
+            else:
+                self.counters["deduplicated"] += 1
+        return digest
+
+    def get(self, digest: str) -> str | None:
+        with self.lock:
+            row = self.conn.execute("SELECT data FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        return row[0].decode("utf-8") if row else None
+
+    # ---- 메시지 ----
+
+    def offload(self, message):
+        """큰 ToolMessage는 본문을 저장하고 미리보기 + 참조만 남긴 메시지를 돌려준다"""
+        if not isinstance(message, ToolMessage) or "blob" in message.response_metadata:
+            return message
+        content = message.content
+        if not isinstance(content, str) or len(content) < self.threshold:
+            return message
+        reference = {"sha256": self.put(content), "chars": len(content)}
+        update = {"content": self._preview(content, reference)}
+        if message.artifact is not None:
+            reference["artifact"] = self.put(json.dumps(message.artifact, ensure_ascii=False, default=str))
+            update["artifact"] = None
+        with self.lock:
+            self.counters["offloaded"] += 1
+        return message.model_copy(update={
+            **update,
+            "response_metadata": {**message.response_metadata, "blob": reference},
+        })
+
+    def _preview(self, content: str, reference: dict) -> str:
+        return (
+            f"{content[:self.preview_chars]}… "
+            f"(도구 결과 {reference['chars']}자 중 앞부분, blob sha256:{reference['sha256'][:12]})"
+        )
+
+    def restore(self, message, artifact: bool = True):
+        """참조를 원래 본문(과 artifact)으로 펼친 메시지 (저장소에 없으면 미리보기를 그대로 둔다)"""
+        reference = message.response_metadata.get("blob") if isinstance(message, ToolMessage) else None
+        if reference is None:
+            return message
+        content = self.get(reference["sha256"])
+        if content is None:
+            with self.lock:
+                self.counters["missing"] += 1
+            return message
+        update = {"content": content}
+        if artifact and "artifact" in reference:
+            raw = self.get(reference["artifact"])
+            update["artifact"] = json.loads(raw) if raw is not None else None
+        with self.lock:
+            self.counters["expanded"] += 1
+        return message.model_copy(update=update)
+
+    def expand(self, messages) -> list:
+        """모델 호출에 보낼 메시지: 이번 턴(또는 expand_history면 전체)의 참조를 펼친다"""
+        messages = list(messages)
+        start = 0 if self.expand_history else len(messages) - len(current_turn(messages))
+        return messages[:start] + [self.restore(message, artifact=False) for message in messages[start:]]
+
+    def expand_state(self, values: dict, key: str = "messages") -> dict:
+        """상태 값의 모든 참조를 펼친다 (get_state 결과를 사람이 볼 때)"""
+        if key not in values:
+            return values
+        return {**values, key: [self.restore(message) for message in values[key]]}
+
+    def _offload_result(self, result):
+        if isinstance(result, dict) and "messages" in result:
+            messages = result["messages"]
+            if isinstance(messages, list):
+                return {**result, "messages": [self.offload(message) for message in messages]}
+            return {**result, "messages": self.offload(messages)}
+        return result
+
+    def wrap_tools(self, tool_node):
+        """tools 노드가 만든 큰 ToolMessage를 저장소로 옮기는 노드로 감싼다"""
+        from langgraph.utils.runnable import RunnableCallable, coerce_to_runnable
+
+        tool_node = coerce_to_runnable(tool_node, name="tools", trace=False)
+
+        def tools(state, config):
+            return self._offload_result(tool_node.invoke(state, config))
+
+        async def atools(state, config):
+            return self._offload_result(await tool_node.ainvoke(state, config))
+
+        return RunnableCallable(tools, atools, name="tools")
+
+    def stats(self) -> dict:
+        with self.lock:
+            stats = dict(self.counters)
+            stats["blobs"], stats["stored_bytes"] = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs"
+            ).fetchone()
+        return stats
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def get_expanded_state(graph, config, blobs: BlobStore):
+    """graph.get_state와 같지만 도구 결과 참조를 원래 내용으로 펼친 StateSnapshot"""
+    state = graph.get_state(config)
+    return state._replace(values=blobs.expand_state(state.values))
+
+
+def print_blob_stats(blobs: BlobStore):
+    """상태 밖으로 옮긴 도구 결과 수와 크기를 출력한다"""
+    stats = blobs.stats()
+    print("\n" + "="*50)
+    print("📦 도구 결과 저장소 통계")
+    print("="*50)
+    print(f"- 옮긴 도구 결과: {stats['offloaded']} (중복 {stats['deduplicated']})")
+    print(f"- 저장된 blob: {stats['blobs']}개, {stats['stored_bytes'] / 1024:.1f}KB")
+    print(f"- 모델 호출/조회 때 펼친 횟수: {stats['expanded']} (저장소에 없음 {stats['missing']})")
@@ -0,0 +1,410 @@
+"""
+메모리 사용량에 상한을 둔 MemorySaver
+
+    memory = BoundedMemorySaver(max_bytes=256 * 2**20, idle_ttl=1800, keep_last=4, spill_path="spill.sqlite")
+    graph = graph_builder.compile(checkpointer=memory)
+    print_memory_stats(memory)
+
+- MemorySaver는 모든 thread_id의 모든 체크포인트를 프로세스가 끝날 때까지 들고 있다
+- thread_id(checkpoint_ns)마다 최근 keep_last개 체크포인트만 메모리에 두고, 이전 체크포인트는 spill 파일로 옮긴다
+- 메모리에 있는 체크포인트/writes의 직렬화 크기 합이 max_bytes를 넘거나 idle_ttl초 동안 쓰이지 않은
+  thread_id는 가장 오래 쓰이지 않은 것부터 통째로 spill 파일로 내보낸다 (LRU)
+- 내보낸 thread_id는 다음 get_state/stream(get_tuple)에서 최근 keep_last개를 다시 메모리로 불러온다
+  (get_state_history(list)와 checkpoint_id를 지정한 조회는 spill 파일까지 함께 본다)
+- spill 파일은 SQLite 파일 하나로, 체크포인트마다 (체크포인트, writes)를 zlib으로 압축해 한 행에 저장한다.
+  spill_path를 주지 않으면 임시 파일을 쓰고 close()할 때 지운다
+- stats()로 상주 바이트, 내보낸/불러온 횟수, 불러오기 지연 시간을 본다.
+  metrics(GraphMetrics)를 주면 같은 값을 /metrics로도 내보낸다
+"""
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict, defaultdict
+
+from langgraph.checkpoint.base import get_checkpoint_id
+from langgraph.checkpoint.memory import MemorySaver
+
+from .instrumentation import StreamingHistogram
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS spilled (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL,
+        checkpoint_id TEXT NOT NULL,
+        data BLOB NOT NULL,
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+    ) WITHOUT ROWID
+"""
+_SELECT_IDS = "SELECT checkpoint_ns, checkpoint_id FROM spilled WHERE thread_id = ?"
+_SELECT_ONE = "SELECT data FROM spilled WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"
+_SELECT_THREAD = "SELECT checkpoint_ns, checkpoint_id, data FROM spilled WHERE thread_id = ?"
+_SELECT_ALL = "SELECT thread_id, checkpoint_ns, checkpoint_id, data FROM spilled"
+_INSERT = "INSERT OR REPLACE INTO spilled (thread_id, checkpoint_ns, checkpoint_id, data) VALUES (?, ?, ?, ?)"
+_DELETE_ONE = "DELETE FROM spilled WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"
+_DELETE_THREAD = "DELETE FROM spilled WHERE thread_id = ?"
+
+# dict/tuple 등 파이썬 객체 자체가 차지하는 대략의 크기 (직렬화된 바이트에 더한다)
+_ENTRY_OVERHEAD = 200
+
+
+def _entry_bytes(saved) -> int:
+    """storage 항목 ((type, 체크포인트), (type, 메타데이터), 부모 id)의 크기"""
+    checkpoint, metadata, _ = saved
+    return len(checkpoint[1]) + len(metadata[1]) + _ENTRY_OVERHEAD
+
+
+def _writes_bytes(writes) -> int:
+    """writes 항목 {(task_id, idx): (task_id, channel, (type, 값), task_path)}의 크기"""
+    if not writes:
+        return 0
+    return sum(len(value[2][1]) + _ENTRY_OVERHEAD for value in writes.values())
+
+
+def _pack(saved, writes) -> bytes:
+    # 값은 이미 serde로 직렬화된 bytes이므로 pickle은 tuple/dict 껍데기만 다룬다
+    return zlib.compress(pickle.dumps((saved, writes), protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _unpack(data: bytes):
+    return pickle.loads(zlib.decompress(data))
+
+
+class BoundedMemorySaver(MemorySaver):
+    """메모리 상한(LRU/TTL)과 spill 파일을 가진 MemorySaver"""
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 2**20,
+        idle_ttl: float | None = None,
+        keep_last: int = 4,
+        spill_path: str | None = None,
+        *,
+        metrics=None,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        # 최신 체크포인트의 pending_sends를 만들려면 부모 체크포인트의 writes가 필요하다
+        if keep_last < 2:
+            raise ValueError("keep_last는 2 이상이어야 합니다")
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.keep_last = keep_last
+        self.lock = threading.RLock()
+
+        # thread_id -> 마지막 사용 시각 (앞쪽이 가장 오래 쓰이지 않은 thread_id)
+        self.recent = OrderedDict()
+        self.thread_bytes = defaultdict(int)
+        # thread_id -> self.writes의 키들 (thread_id를 내보낼 때 writes 전체를 훑지 않기 위해)
+        self.write_keys = defaultdict(set)
+        self.resident_bytes = 0
+        # 메모리에 하나도 남기지 않고 통째로 내보낸 thread_id
+        self.spilled_threads = set()
+
+        self.evictions = 0
+        self.pruned = 0
+        self.reloads = 0
+        self.reload_seconds = StreamingHistogram()
+
+        self.temporary = spill_path is None
+        if self.temporary:
+            fd, spill_path = tempfile.mkstemp(prefix="langgraph-spill-", suffix=".sqlite")
+            os.close(fd)
+        self.spill_path = spill_path
+        self.conn = sqlite3.connect(spill_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(_SCHEMA)
+
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.add_gauge("langgraph_memory_resident_bytes", "Checkpoint bytes held in memory",
+                              lambda: self.resident_bytes)
+            metrics.add_gauge("langgraph_memory_threads", "Threads with checkpoints in memory",
+                              lambda: len(self.recent))
+            metrics.add_gauge("langgraph_memory_evictions_total", "Threads spilled to disk",
+                              lambda: self.evictions, kind="counter")
+            metrics.add_gauge("langgraph_memory_reloads_total", "Threads reloaded from disk",
+                              lambda: self.reloads, kind="counter")
+
+    def __exit__(self, *exc_info):
+        try:
+            return super().__exit__(*exc_info)
+        finally:
+            self.close()
+
+    def close(self):
+        """spill 파일을 닫는다 (임시 파일이면 지운다)"""
+        with self.lock:
+            if self.conn is None:
+                return
+            self.conn.close()
+            self.conn = None
+            if self.temporary:
+                for suffix in ("", "-wal", "-shm"):
+                    if os.path.exists(self.spill_path + suffix):
+                        os.remove(self.spill_path + suffix)
+
+    # ---- 크기 / LRU 관리 ----
+
+    def _add_bytes(self, thread_id, delta: int):
+        self.thread_bytes[thread_id] += delta
+        self.resident_bytes += delta
+
+    def _touch(self, thread_id):
+        self.recent[thread_id] = time.monotonic()
+        self.recent.move_to_end(thread_id)
+
+    def _prune(self, thread_id, checkpoint_ns):
+        """최근 keep_last개보다 오래된 체크포인트를 spill 파일로 옮긴다"""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.keep_last:
+            return
+        rows = []
+        for checkpoint_id in sorted(checkpoints)[:-self.keep_last]:
+            saved = checkpoints.pop(checkpoint_id)
+            key = (thread_id, checkpoint_ns, checkpoint_id)
+            writes = self.writes.pop(key, {})
+            self.write_keys[thread_id].discard(key)
+            self._add_bytes(thread_id, -_entry_bytes(saved) - _writes_bytes(writes))
+            rows.append((thread_id, checkpoint_ns, checkpoint_id, _pack(saved, writes)))
+        self._write_rows(rows)
+        self.pruned += len(rows)
+
+    def _write_rows(self, rows, sql=_INSERT):
+        """rows를 한 트랜잭션으로 기록한다 (실패하면 ROLLBACK해서 파일을 그대로 둔다)"""
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.executemany(sql, rows)
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _spill(self, thread_id):
+        """thread_id의 체크포인트와 writes를 모두 spill 파일로 내보낸다"""
+        start = time.perf_counter()
+        namespaces = self.storage.pop(thread_id, {})
+        keys = self.write_keys.pop(thread_id, set())
+        rows = []
+        for checkpoint_ns, checkpoints in namespaces.items():
+            for checkpoint_id, saved in checkpoints.items():
+                key = (thread_id, checkpoint_ns, checkpoint_id)
+                keys.discard(key)
+                rows.append((thread_id, checkpoint_ns, checkpoint_id, _pack(saved, self.writes.pop(key, {}))))
+        # 체크포인트가 이미 파일에 있는 writes (내보낸 뒤에 도착한 writes)는 파일의 행에 합친다
+        for key in keys:
+            writes = self.writes.pop(key, None)
+            if not writes:
+                continue
+            row = self.conn.execute(_SELECT_ONE, key).fetchone()
+            if row is not None:
+                saved, old_writes = _unpack(row[0])
+                rows.append((*key, _pack(saved, {**old_writes, **writes})))
+        self._write_rows(rows)
+
+        self.resident_bytes -= self.thread_bytes.pop(thread_id, 0)
+        self.recent.pop(thread_id, None)
+        if rows:
+            self.spilled_threads.add(thread_id)
+        self.evictions += 1
+        if self.metrics is not None:
+            self.metrics.record("checkpoint", "spill", time.perf_counter() - start, thread_id=thread_id)
+
+    def _enforce(self, current=None):
+        """idle_ttl이 지났거나 max_bytes를 넘긴 만큼 오래된 thread_id부터 내보낸다 (current는 제외)"""
+        if self.idle_ttl is not None:
+            deadline = time.monotonic() - self.idle_ttl
+            for thread_id, last_used in list(self.recent.items()):
+                if last_used > deadline:
+                    break
+                if thread_id != current:
+                    self._spill(thread_id)
+        while self.resident_bytes > self.max_bytes:
+            victim = next((thread_id for thread_id in self.recent if thread_id != current), None)
+            if victim is None:
+                break
+            self._spill(victim)
+
+    def _reload(self, thread_id):
+        """통째로 내보낸 thread_id의 최근 keep_last개 체크포인트를 메모리로 불러온다"""
+        if thread_id not in self.spilled_threads:
+            return
+        start = time.perf_counter()
+
+        by_ns = defaultdict(list)
+        for checkpoint_ns, checkpoint_id in self.conn.execute(_SELECT_IDS, (thread_id,)):
+            by_ns[checkpoint_ns].append(checkpoint_id)
+        loaded = []
+        for checkpoint_ns, checkpoint_ids in by_ns.items():
+            for checkpoint_id in sorted(checkpoint_ids)[-self.keep_last:]:
+                key = (thread_id, checkpoint_ns, checkpoint_id)
+                loaded.append((key, *_unpack(self.conn.execute(_SELECT_ONE, key).fetchone()[0])))
+        # 파일에서 지운 뒤에 메모리에 올린다 (지우다 실패하면 메모리와 파일이 그대로이므로 다음 조회에서 다시 불러온다)
+        self._write_rows([key for key, _, _ in loaded], _DELETE_ONE)
+
+        for key, saved, writes in loaded:
+            _, checkpoint_ns, checkpoint_id = key
+            # 내보낸 뒤 메모리에 새로 쌓인 체크포인트/writes가 있으면 그쪽이 우선이다
+            checkpoints = self.storage[thread_id][checkpoint_ns]
+            if checkpoint_id not in checkpoints:
+                checkpoints[checkpoint_id] = saved
+                self._add_bytes(thread_id, _entry_bytes(saved))
+            current = self.writes.get(key, {})
+            merged = {**writes, **current}
+            self._add_bytes(thread_id, _writes_bytes(merged) - _writes_bytes(current))
+            self.writes[key] = merged
+            self.write_keys[thread_id].add(key)
+        self.spilled_threads.discard(thread_id)
+        for checkpoint_ns in list(self.storage[thread_id]):
+            self._prune(thread_id, checkpoint_ns)
+
+        duration = time.perf_counter() - start
+        self.reloads += 1
+        self.reload_seconds.add(duration)
+        if self.metrics is not None:
+            self.metrics.record("checkpoint", "reload", duration, thread_id=thread_id)
+
+    def _view(self, thread_id=None):
+        """메모리와 spill 파일의 체크포인트를 함께 담은 임시 MemorySaver (조회 전용)"""
+        view = MemorySaver(serde=self.serde)
+        rows = (
+            self.conn.execute(_SELECT_THREAD, (thread_id,)).fetchall()
+            if thread_id is not None
+            else self.conn.execute(_SELECT_ALL).fetchall()
+        )
+        for row in rows:
+            *head, data = row
+            row_thread_id = thread_id if thread_id is not None else head.pop(0)
+            checkpoint_ns, checkpoint_id = head
+            saved, writes = _unpack(data)
+            view.storage[row_thread_id][checkpoint_ns][checkpoint_id] = saved
+            view.writes[(row_thread_id, checkpoint_ns, checkpoint_id)] = dict(writes)
+
+        thread_ids = [thread_id] if thread_id is not None else list(self.storage)
+        for row_thread_id in thread_ids:
+            for checkpoint_ns, checkpoints in self.storage.get(row_thread_id, {}).items():
+                view.storage[row_thread_id][checkpoint_ns].update(checkpoints)
+            for key in self.write_keys.get(row_thread_id, ()):
+                if key in self.writes:
+                    view.writes[key] = {**view.writes.get(key, {}), **self.writes[key]}
+        return view
+
+    def _forget_if_empty(self, thread_id):
+        # 없는 thread_id를 조회하면 defaultdict가 빈 항목을 만든다
+        namespaces = self.storage.get(thread_id)
+        if namespaces is not None and not any(namespaces.values()):
+            del self.storage[thread_id]
+
+    # ---- BaseCheckpointSaver ----
+
+    def get_tuple(self, config):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self.lock:
+            self._reload(thread_id)
+            checkpoint_id = get_checkpoint_id(config)
+            if checkpoint_id and checkpoint_id not in self.storage.get(thread_id, {}).get(checkpoint_ns, {}):
+                # keep_last보다 오래된 체크포인트: 메모리로 올리지 않고 파일에서 바로 읽는다
+                self._forget_if_empty(thread_id)
+                return self._view(thread_id).get_tuple(config)
+
+            checkpoint_tuple = super().get_tuple(config)
+            if checkpoint_tuple is None:
+                self._forget_if_empty(thread_id)
+                return None
+            # 조회 중에 만들어진 writes 키(빈 dict)도 thread_id와 함께 정리되도록 기록한다
+            self.write_keys[thread_id].add(
+                (thread_id, checkpoint_ns, checkpoint_tuple.config["configurable"]["checkpoint_id"])
+            )
+            if checkpoint_tuple.parent_config:
+                self.write_keys[thread_id].add(
+                    (thread_id, checkpoint_ns, checkpoint_tuple.parent_config["configurable"]["checkpoint_id"])
+                )
+            self._touch(thread_id)
+            self._enforce(current=thread_id)
+            return checkpoint_tuple
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        with self.lock:
+            view = self._view(config["configurable"]["thread_id"] if config else None)
+        yield from view.list(config, filter=filter, before=before, limit=limit)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self.lock:
+            checkpoints = self.storage[thread_id][checkpoint_ns]
+            replaced = checkpoints.get(checkpoint["id"])
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+            self._add_bytes(
+                thread_id,
+                _entry_bytes(checkpoints[checkpoint["id"]]) - (_entry_bytes(replaced) if replaced else 0),
+            )
+            self._touch(thread_id)
+            self._prune(thread_id, checkpoint_ns)
+            self._enforce(current=thread_id)
+        return next_config
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+        with self.lock:
+            before = _writes_bytes(self.writes.get(key))
+            super().put_writes(config, writes, task_id, task_path)
+            self._add_bytes(thread_id, _writes_bytes(self.writes.get(key)) - before)
+            self.write_keys[thread_id].add(key)
+            self._touch(thread_id)
+            self._enforce(current=thread_id)
+
+    def delete_thread(self, thread_id: str):
+        """thread_id의 모든 체크포인트와 writes를 메모리와 spill 파일에서 삭제한다"""
+        with self.lock:
+            self.storage.pop(thread_id, None)
+            for key in self.write_keys.pop(thread_id, ()):
+                self.writes.pop(key, None)
+            self.resident_bytes -= self.thread_bytes.pop(thread_id, 0)
+            self.recent.pop(thread_id, None)
+            self.spilled_threads.discard(thread_id)
+            self.conn.execute(_DELETE_THREAD, (thread_id,))
+
+    def evict_idle(self):
+        """idle_ttl이 지난 thread_id를 지금 내보낸다 (요청이 뜸한 서버에서 주기적으로 호출)"""
+        with self.lock:
+            self._enforce()
+
+    def stats(self) -> dict:
+        with self.lock:
+            spilled_threads, spilled_bytes = self.conn.execute(
+                "SELECT COUNT(DISTINCT thread_id), COALESCE(SUM(LENGTH(data)), 0) FROM spilled"
+            ).fetchone()
+            reload = self.reload_seconds.summary()
+            return {
+                "resident_bytes": self.resident_bytes,
+                "max_bytes": self.max_bytes,
+                "threads_in_memory": len(self.recent),
+                "threads_on_disk": spilled_threads,
+                "spilled_bytes": spilled_bytes,
+                "evictions": self.evictions,
+                "pruned_checkpoints": self.pruned,
+                "reloads": self.reloads,
+                "reload_p50_ms": reload["p50"] * 1000,
+                "reload_p95_ms": reload["p95"] * 1000,
+            }
+
+
+def print_memory_stats(saver: BoundedMemorySaver):
+    """메모리 사용량과 spill 파일 통계를 출력한다"""
+    stats = saver.stats()
+    print("\n" + "="*50)
+    print("🧠 체크포인트 메모리 통계")
+    print("="*50)
+    print(f"- 메모리: {stats['resident_bytes'] / 2**20:.2f}MB / {stats['max_bytes'] / 2**20:.2f}MB "
+          f"(thread {stats['threads_in_memory']}개)")
+    print(f"- spill 파일: {stats['spilled_bytes'] / 2**20:.2f}MB (thread {stats['threads_on_disk']}개)")
+    print(f"- 내보낸 thread: {stats['evictions']}, 옮긴 오래된 체크포인트: {stats['pruned_checkpoints']}")
+    print(f"- 다시 불러온 thread: {stats['reloads']} "
+          f"(p50 {stats['reload_p50_ms']:.2f}ms / p95 {stats['reload_p95_ms']:.2f}ms)")
@@ -0,0 +1,185 @@
+"""
+여러 thread의 상태를 한꺼번에 읽고 고치는 일괄 get_state / update_state
+
+    configs = thread_configs(thread_ids)
+    states = get_states(graph, configs)                       # graph.get_state를 하나씩 부른 결과와 같다
+    update_states(graph, [(config, {"name": "LangGraph"}) for config in configs])
+
+- graph.get_state / update_state는 thread마다 체크포인터를 따로 조회하고 따로 커밋한다.
+  수만 개 thread의 name/birthday를 고치는 작업에서는 이 왕복이 대부분의 시간을 차지한다
+- 여기서는 최신 체크포인트를 한 번에 읽고(체크포인터에 get_tuples가 있으면 쿼리 몇 개로),
+  그래프의 update_state를 그대로 실행해 reducer/as_node 추론을 똑같이 적용한다.
+  새 체크포인트와 writes는 모아 두었다가 마지막에 한 트랜잭션으로 기록한다 (체크포인터에 batch()가 있으면)
+- 미리 읽기는 CHUNK_SIZE개 thread씩 한다 (메모리에 함께 올려 두는 체크포인트 수 제한).
+  batch()가 있는 체크포인터는 묶음마다 열린 트랜잭션 안에 기록하고 마지막에 한 번 커밋한다.
+  batch()가 없는 체크포인터(MemorySaver 등)는 모든 묶음을 적용한 뒤에 기록한다
+- update_states는 하나라도 실패하면 아무것도 기록하지 않는다
+- 같은 thread가 여러 번 나오면 앞의 수정을 반영한 상태에 이어서 적용한다
+- 서브그래프 상태(checkpoint_ns가 있는 config)는 지원하지 않는다
+"""
+import contextlib
+
+from langgraph.checkpoint.base import BaseCheckpointSaver, CheckpointTuple, get_checkpoint_id
+from langgraph.constants import CONFIG_KEY_CHECKPOINTER
+
+# 한 번에 미리 읽어 처리하는 thread 수
+# (DeltaSqliteSaver가 복원해 기억해 두는 목록 수(cache_size=256)보다 묶음의 읽기 + 쓰기가 작아야
+#  새 체크포인트를 delta로 만들 때 부모를 다시 읽지 않는다)
+CHUNK_SIZE = 100
+
+
+def thread_configs(thread_ids):
+    """thread_id 목록 -> config 목록"""
+    return [{"configurable": {"thread_id": thread_id}} for thread_id in thread_ids]
+
+
+def _key(config):
+    configurable = config["configurable"]
+    return configurable["thread_id"], configurable.get("checkpoint_ns", "")
+
+
+class _BulkCheckpointer(BaseCheckpointSaver):
+    """
+    update_state / get_state에 체크포인터 대신 넘기는 보기
+    - 최신 체크포인트는 미리 읽어 둔 것을 돌려준다
+    - put / put_writes는 바로 기록하지 않고 모아 둔다 (commit에서 한 번에 기록)
+    """
+
+    def __init__(self, saver, latest: dict, operations=None):
+        super().__init__(serde=saver.serde)
+        self.saver = saver
+        # (thread_id, checkpoint_ns) -> 최신 CheckpointTuple (없으면 None)
+        self.latest = latest
+        self.operations = operations or []
+
+    def get_tuple(self, config):
+        key = _key(config)
+        if key in self.latest:
+            current = self.latest[key]
+            checkpoint_id = get_checkpoint_id(config)
+            if not checkpoint_id or (current and current.checkpoint["id"] == checkpoint_id):
+                return current
+        return self.saver.get_tuple(config)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id, checkpoint_ns = _key(config)
+        parent_id = config["configurable"].get("checkpoint_id")
+        self.operations.append(("put", (config, checkpoint, metadata, new_versions)))
+        next_config = {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+        # 같은 thread를 다시 고치면 아직 기록하지 않은 이 체크포인트에 이어서 적용한다
+        self.latest[thread_id, checkpoint_ns] = CheckpointTuple(
+            config=next_config,
+            checkpoint=checkpoint,
+            metadata=metadata,
+            parent_config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": parent_id,
+                }
+            }
+            if parent_id
+            else None,
+            pending_writes=[],
+        )
+        return next_config
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        self.operations.append(("put_writes", (config, writes, task_id, task_path)))
+        current = self.latest.get(_key(config))
+        if current and current.checkpoint["id"] == config["configurable"].get("checkpoint_id"):
+            current.pending_writes.extend((task_id, channel, value) for channel, value in writes)
+
+    def get_next_version(self, current, channel):
+        return self.saver.get_next_version(current, channel)
+
+    def commit(self):
+        """모아 둔 put / put_writes를 순서대로 체크포인터에 기록한다"""
+        for method, args in self.operations:
+            getattr(self.saver, method)(*args)
+        self.operations = []
+
+
+def _checkpointer(graph):
+    if not isinstance(graph.checkpointer, BaseCheckpointSaver):
+        raise ValueError("체크포인터가 설정된 그래프가 아닙니다")
+    return graph.checkpointer
+
+
+def _prefetch(saver, configs) -> dict:
+    """checkpoint_id가 없는 config의 최신 체크포인트를 한 번에 읽는다"""
+    for config in configs:
+        if config["configurable"].get("checkpoint_ns"):
+            raise ValueError(f"서브그래프 상태는 일괄 처리할 수 없습니다: {config['configurable']['checkpoint_ns']}")
+    wanted = list({_key(config): config for config in configs if not get_checkpoint_id(config)}.values())
+    get_tuples = getattr(saver, "get_tuples", None)
+    if get_tuples is not None:
+        found = get_tuples(wanted)
+    else:
+        found = [saver.get_tuple(config) for config in wanted]
+    return {_key(config): checkpoint_tuple for config, checkpoint_tuple in zip(wanted, found)}
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _with_checkpointer(config, checkpointer):
+    return {**config, "configurable": {**config["configurable"], CONFIG_KEY_CHECKPOINTER: checkpointer}}
+
+
+def _without_checkpointer(state):
+    """체크포인트가 없는 thread는 get_state가 넘긴 config를 그대로 돌려주므로 보기(view)를 빼낸다"""
+    configurable = state.config.get("configurable", {})
+    if CONFIG_KEY_CHECKPOINTER not in configurable:
+        return state
+    configurable = {key: value for key, value in configurable.items() if key != CONFIG_KEY_CHECKPOINTER}
+    return state._replace(config={**state.config, "configurable": configurable})
+
+
+def get_states(graph, configs) -> list:
+    """configs의 상태(StateSnapshot)를 순서대로 돌려준다 (graph.get_state와 같은 결과)"""
+    saver = _checkpointer(graph)
+    states = []
+    for chunk in _chunks(list(configs), CHUNK_SIZE):
+        view = _BulkCheckpointer(saver, _prefetch(saver, chunk))
+        states += [_without_checkpointer(graph.get_state(_with_checkpointer(config, view))) for config in chunk]
+    return states
+
+
+def update_states(graph, updates, as_node: str | None = None) -> list:
+    """
+    [(config, values), ...]를 graph.update_state(config, values, as_node)처럼 적용하고
+    새 체크포인트들을 한 번에 기록한다. 각 update의 새 config를 순서대로 돌려준다
+    """
+    updates = list(updates)
+    saver = _checkpointer(graph)
+    batch = getattr(saver, "batch", None)
+    next_configs, operations = [], []
+    # batch()가 없을 때 아직 기록하지 않은 새 체크포인트 (뒤 묶음에 같은 thread가 나오면 이어서 적용)
+    unwritten = {}
+    with batch() if batch else contextlib.nullcontext():
+        for chunk in _chunks(updates, CHUNK_SIZE):
+            configs = [config for config, _ in chunk]
+            latest = _prefetch(saver, [config for config in configs if _key(config) not in unwritten])
+            latest.update((_key(config), unwritten[_key(config)]) for config in configs if _key(config) in unwritten)
+            view = _BulkCheckpointer(saver, latest)
+            next_configs += [
+                graph.update_state(_with_checkpointer(config, view), values, as_node)
+                for config, values in chunk
+            ]
+            if batch:
+                view.commit()
+            else:
+                # 트랜잭션이 없으면 전부 적용한 뒤에 기록해야 실패했을 때 아무것도 남지 않는다
+                operations += view.operations
+                unwritten.update(view.latest)
+        _BulkCheckpointer(saver, {}, operations).commit()
+    return next_configs
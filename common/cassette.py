@@ -0,0 +1,316 @@
+"""
+모델/검색 호출을 파일(cassette)에 기록했다가 네트워크 없이 그대로 재생한다
+
+    cassette = Cassette("runs/example4.cassette.json.gz", mode="record")    # 실제 API를 부르며 기록
+    cassette = Cassette("runs/example4.cassette.json.gz", mode="replay", latency="zero")
+    graph = setup_graph(llm=..., search_tool=..., cassette=cassette)
+    ...
+    cassette.save()
+    print_cassette_stats(cassette, wall_seconds)
+
+- 실제 API를 부르는 실행은 매번 결과가 달라지고 대부분의 시간이 네트워크 대기라서 시간 비교가 의미 없다
+- 키는 요청의 정규화 해시다: 모델은 메시지(id 제외) + 바인딩된 도구 + 모델 파라미터(common.llm_cache.cache_key),
+  검색은 도구 이름 + 인자
+- 같은 키가 여러 번 불리면 응답을 모두 기록하고 재생할 때 기록된 순서대로 돌려준다.
+  기록된 응답을 다 쓰면 기록이 없는 것과 같다 (replay는 CassetteMiss, auto는 새로 기록).
+  wrap=True면 처음부터 다시 쓴다 (기록할 때보다 많이 실행하는 벤치마크 등)
+- mode: record(항상 실제로 부르고 새로 기록), replay(기록만 쓰고 없으면 CassetteMiss), auto(있으면 재생, 없으면 기록)
+- latency: zero(기다리지 않는다), recorded(기록된 upstream 지연만큼 기다린다)
+- 통계의 waited_seconds(실제 upstream 또는 재생 지연으로 기다린 시간)를 실행 시간에서 빼면 그래프 쪽 오버헤드가 된다
+- 파일은 gzip으로 압축한 JSON 하나다
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from langchain_core.messages import messages_from_dict, messages_to_dict
+from langchain_core.tools import BaseTool
+from pydantic import ConfigDict
+
+from .llm_cache import cache_key
+
+MODES = ("record", "replay", "auto")
+LATENCIES = ("zero", "recorded")
+
+
+class CassetteMiss(KeyError):
+    """replay 모드에서 기록되지 않은 요청이 들어왔다 (질문/모델/도구가 기록할 때와 다르다)"""
+
+
+class Cassette:
+    """요청 키 -> 기록된 응답 목록(응답, upstream 지연)"""
+
+    def __init__(self, path: str, mode: str = "replay", latency: str = "zero", wrap: bool = False):
+        if mode not in MODES:
+            raise ValueError(f"mode는 {MODES} 중 하나여야 합니다: {mode}")
+        if latency not in LATENCIES:
+            raise ValueError(f"latency는 {LATENCIES} 중 하나여야 합니다: {latency}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.wrap = wrap
+        self.lock = threading.Lock()
+        self.entries = defaultdict(list)
+        if mode != "record" and os.path.exists(path):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                self.entries.update(json.load(f)["entries"])
+        elif mode == "replay":
+            raise FileNotFoundError(f"cassette 파일이 없습니다: {path}")
+        # 키마다 다음에 재생할 응답 위치
+        self.cursors = defaultdict(int)
+        self.dirty = False
+        self.counters = {
+            "replayed": 0,
+            "recorded": 0,
+            "llm_calls": 0,
+            "tool_calls": 0,
+            "upstream_seconds": 0.0,  # 이번 실행에서 쓴 응답들의 (기록된/실제) upstream 지연 합
+            "waited_seconds": 0.0,  # 실제 upstream 호출이나 재생 지연으로 기다린 시간
+        }
+
+    # ---- 기록/재생 ----
+
+    def _count(self, key: str):
+        self.counters["llm_calls" if key.startswith("llm:") else "tool_calls"] += 1
+
+    def _lookup(self, key: str):
+        with self.lock:
+            recorded = self.entries.get(key)
+            if not recorded or self.mode == "record":
+                return None
+            index = self.cursors[key]
+            if index >= len(recorded):
+                if not self.wrap:
+                    return None
+                index %= len(recorded)
+            self.cursors[key] += 1
+            entry = recorded[index]
+            self._count(key)
+            self.counters["replayed"] += 1
+            self.counters["upstream_seconds"] += entry["latency"]
+            if self.latency == "recorded":
+                self.counters["waited_seconds"] += entry["latency"]
+            return entry
+
+    def _miss(self, key: str):
+        if self.mode != "replay":
+            return
+        with self.lock:
+            recorded = len(self.entries.get(key, ()))
+        if recorded:
+            raise CassetteMiss(f"기록된 응답 {recorded}개를 모두 재생했습니다 (wrap=True면 처음부터 다시 쓴다): {key[:80]}")
+        raise CassetteMiss(f"cassette에 기록되지 않은 요청입니다: {key[:80]}")
+
+    def _store(self, key: str, response, latency: float):
+        with self.lock:
+            self.entries[key].append({"response": response, "latency": latency})
+            # auto: 방금 기록한 응답을 다음 호출이 다시 재생하지 않게 한다
+            self.cursors[key] = len(self.entries[key])
+            self.dirty = True
+            self._count(key)
+            self.counters["recorded"] += 1
+            self.counters["upstream_seconds"] += latency
+            self.counters["waited_seconds"] += latency
+
+    def play(self, key: str, call, encode, decode):
+        """기록이 있으면 재생하고, 없으면 call()을 실행해 encode한 결과를 기록한다"""
+        if (entry := self._lookup(key)) is not None:
+            if self.latency == "recorded":
+                time.sleep(entry["latency"])
+            return decode(entry["response"])
+        self._miss(key)
+        start = time.perf_counter()
+        result = call()
+        self._store(key, encode(result), time.perf_counter() - start)
+        return result
+
+    async def aplay(self, key: str, call, encode, decode):
+        if (entry := self._lookup(key)) is not None:
+            if self.latency == "recorded":
+                await asyncio.sleep(entry["latency"])
+            return decode(entry["response"])
+        self._miss(key)
+        start = time.perf_counter()
+        result = await call()
+        self._store(key, encode(result), time.perf_counter() - start)
+        return result
+
+    # ---- 파일 ----
+
+    def save(self):
+        """기록한 응답이 있으면 파일에 쓴다 (임시 파일에 쓴 뒤 바꿔치기)"""
+        with self.lock:
+            if not self.dirty:
+                return
+            payload = {"version": 1, "entries": dict(self.entries)}
+            self.dirty = False
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = self.path + ".tmp"
+        with gzip.open(temporary, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temporary, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.save()
+
+    def stats(self) -> dict:
+        with self.lock:
+            stats = dict(self.counters)
+            stats["requests"] = len(self.entries)
+            stats["responses"] = sum(len(recorded) for recorded in self.entries.values())
+        return stats
+
+
+def _request_hash(payload) -> str:
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class CassetteModel:
+    """
+    모델(또는 bind_tools 결과)의 invoke/ainvoke를 cassette로 기록/재생한다
+    bind_tools/bind 결과도 감싸므로 setup_graph에 llm으로 넘겨도 된다. 그 밖의 속성은 원래 모델로 넘긴다
+    """
+
+    def __init__(self, model, cassette: Cassette):
+        self.model = model
+        self.cassette = cassette
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def bind_tools(self, tools, **kwargs):
+        return CassetteModel(self.model.bind_tools(tools, **kwargs), self.cassette)
+
+    def bind(self, **kwargs):
+        return CassetteModel(self.model.bind(**kwargs), self.cassette)
+
+    def _key(self, messages, kwargs) -> str:
+        key = "llm:" + cache_key(messages, self.model)
+        return key + ":" + _request_hash(kwargs) if kwargs else key
+
+    @staticmethod
+    def _encode(message):
+        return messages_to_dict([message])[0]
+
+    @staticmethod
+    def _decode(data):
+        return messages_from_dict([data])[0]
+
+    def invoke(self, messages, config=None, **kwargs):
+        return self.cassette.play(
+            self._key(messages, kwargs),
+            lambda: self.model.invoke(messages, config, **kwargs),
+            self._encode,
+            self._decode,
+        )
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        return await self.cassette.aplay(
+            self._key(messages, kwargs),
+            lambda: self.model.ainvoke(messages, config, **kwargs),
+            self._encode,
+            self._decode,
+        )
+
+
+class CassetteTool(BaseTool):
+    """검색 도구 호출을 cassette로 기록/재생하는 도구 (ToolNode에 그대로 넣을 수 있다)"""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    tool: BaseTool
+    cassette: Cassette
+
+    def __init__(self, tool: BaseTool, cassette: Cassette, **kwargs):
+        super().__init__(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            response_format=tool.response_format,
+            tool=tool,
+            cassette=cassette,
+            **kwargs,
+        )
+
+    def _key(self, kwargs) -> str:
+        return f"tool:{self.tool.name}:" + _request_hash(kwargs)
+
+    def _tool_call(self, kwargs) -> dict:
+        return {"type": "tool_call", "name": self.tool.name, "args": kwargs, "id": "cassette"}
+
+    def _unpack(self, message):
+        if self.response_format == "content_and_artifact":
+            return message.content, message.artifact
+        return message.content
+
+    @staticmethod
+    def _encode(output):
+        return output if not isinstance(output, tuple) else list(output)
+
+    def _decode(self, data):
+        return tuple(data) if self.response_format == "content_and_artifact" else data
+
+    def _run(self, run_manager=None, **kwargs):
+        return self.cassette.play(
+            self._key(kwargs),
+            lambda: self._unpack(self.tool.invoke(self._tool_call(kwargs))),
+            self._encode,
+            self._decode,
+        )
+
+    async def _arun(self, run_manager=None, **kwargs):
+        async def call():
+            return self._unpack(await self.tool.ainvoke(self._tool_call(kwargs)))
+
+        return await self.cassette.aplay(self._key(kwargs), call, self._encode, self._decode)
+
+
+def with_cassette(model_or_tool, cassette: Cassette | None):
+    """cassette가 주어지면 도구는 CassetteTool로, 모델은 CassetteModel로 감싸고, 없으면 그대로 돌려준다"""
+    if cassette is None:
+        return model_or_tool
+    if isinstance(model_or_tool, BaseTool):
+        return CassetteTool(model_or_tool, cassette)
+    return CassetteModel(model_or_tool, cassette)
+
+
+def add_cassette_arguments(parser):
+    parser.add_argument("--record", metavar="PATH", help="모델/검색 호출을 이 cassette 파일에 기록한다 (실제 API 사용)")
+    parser.add_argument("--replay", metavar="PATH", help="이 cassette 파일의 기록으로 모델/검색 호출을 재생한다 (네트워크 없음)")
+    parser.add_argument("--replay-latency", choices=LATENCIES, default="zero",
+                        help="--replay: 기다리지 않거나(zero) 기록된 upstream 지연만큼 기다린다(recorded)")
+    parser.add_argument("--replay-wrap", action="store_true",
+                        help="--replay: 같은 요청의 기록된 응답을 다 쓰면 처음부터 다시 쓴다 (기본: CassetteMiss)")
+
+
+def make_cassette(args) -> Cassette | None:
+    """--record / --replay 인자로 Cassette를 만든다 (둘 다 없으면 None)"""
+    if args.record:
+        return Cassette(args.record, mode="record")
+    if args.replay:
+        return Cassette(args.replay, mode="replay", latency=args.replay_latency, wrap=args.replay_wrap)
+    return None
+
+
+def print_cassette_stats(cassette: Cassette, wall_seconds: float | None = None):
+    """재생/기록한 호출 수와, 실행 시간 중 upstream 대기와 그래프 오버헤드를 나눠 출력한다"""
+    stats = cassette.stats()
+    print("\n" + "="*50)
+    print(f"📼 cassette 통계 ({cassette.mode}, latency={cassette.latency})")
+    print("="*50)
+    print(f"- 재생: {stats['replayed']}, 기록: {stats['recorded']} (모델 {stats['llm_calls']}회, 검색 {stats['tool_calls']}회)")
+    print(f"- 파일: 요청 {stats['requests']}개, 응답 {stats['responses']}개")
+    print(f"- 기록된 upstream 시간: {stats['upstream_seconds']:.2f}s, 실제로 기다린 시간: {stats['waited_seconds']:.2f}s")
+    if wall_seconds is not None:
+        # 동시에 실행한 호출은 기다린 시간이 겹치므로 순서대로 실행할 때 가장 정확하다
+        print(f"- 실행 시간: {wall_seconds:.2f}s, 그래프 오버헤드: {wall_seconds - stats['waited_seconds']:.2f}s")
@@ -0,0 +1,192 @@
+"""
+토큰 예산 기반 대화 기록 압축(compaction) 노드
+
+add_messages 리듀서 때문에 chatbot에 보내는 메시지는 턴마다 계속 늘어난다.
+chatbot 앞에 compact 노드를 두면:
+
+- 전체 메시지가 max_tokens를 넘을 때만 동작한다
+- 최근 메시지를 keep_tokens 안에서 슬라이딩 윈도우로 남긴다
+- 밀려난 메시지는 state["summary"]의 누적 요약으로 접고 state에서 제거한다
+- 도구 호출(AIMessage.tool_calls)과 그 결과(ToolMessage)는 절대 갈라놓지 않는다
+
+    graph_builder.add_node("compact", make_compaction_node(max_tokens=3000))
+    graph_builder.add_edge(START, "compact")
+    graph_builder.add_edge("compact", "chatbot")
+    graph_builder.add_edge("tools", "compact")
+
+chatbot은 with_summary(state)로 요약을 붙인 메시지를 LLM에 보낸다.
+"""
+import json
+from functools import partial
+
+from langchain_core.messages import (
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+    get_buffer_string,
+)
+
+
+def _text(message) -> str:
+    content = message.content
+    return content if isinstance(content, str) else json.dumps(content, ensure_ascii=False)
+
+
+def approx_tokens(message) -> int:
+    """
+    메시지 하나의 대략적인 토큰 수
+    - 영문/숫자(ASCII)는 4글자당 1토큰, 한글 등은 1글자당 1토큰으로 센다
+    - 역할/구분자 오버헤드로 4토큰을 더한다
+    """
+    text = _text(message)
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        text += tool_call["name"] + json.dumps(tool_call["args"], ensure_ascii=False)
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return 4 + ascii_chars // 4 + (len(text) - ascii_chars)
+
+
+def count_tokens(messages, token_counter=approx_tokens) -> int:
+    return sum(token_counter(message) for message in messages)
+
+
+def find_window_start(messages, keep_tokens: int, token_counter=approx_tokens) -> int:
+    """
+    뒤에서부터 keep_tokens 안에 들어가는 가장 앞의 시작 위치를 찾는다
+
+    ToolMessage 위치에서는 자르지 않으므로 도구 호출과 결과가 항상 같이 남는다.
+    마지막 묶음 하나만으로도 예산을 넘으면 그 묶음은 통째로 남긴다.
+    """
+    total = 0
+    start = len(messages)
+    for i in range(len(messages) - 1, -1, -1):
+        total += token_counter(messages[i])
+        if total > keep_tokens:
+            break
+        if not isinstance(messages[i], ToolMessage):
+            start = i
+
+    if start == len(messages):
+        start = next(
+            (i for i in range(len(messages) - 1, -1, -1)
+             if not isinstance(messages[i], ToolMessage)),
+            0,
+        )
+    return start
+
+
+def extractive_summary(previous: str, messages, max_chars: int = 1500) -> str:
+    """
+    LLM 호출 없이 밀려난 메시지를 한 줄씩 요약해 이전 요약 뒤에 붙인다
+    - 도구 결과는 앞부분만 남긴다
+    - 전체 길이가 max_chars를 넘으면 오래된 줄부터 버린다
+    """
+    lines = [previous] if previous else []
+    for message in messages:
+        text = " ".join(_text(message).split())
+        if isinstance(message, ToolMessage):
+            lines.append(f"도구 결과({message.name or '도구'}): {text[:120]}")
+        elif getattr(message, "tool_calls", None) and not text:
+            names = ", ".join(tool_call["name"] for tool_call in message.tool_calls)
+            lines.append(f"AI: 도구 호출 ({names})")
+        else:
+            role = "사용자" if isinstance(message, HumanMessage) else "AI"
+            lines.append(f"{role}: {text[:200]}")
+
+    summary = "\n".join(lines)
+    if len(summary) > max_chars:
+        summary = summary[-max_chars:]
+        # 잘린 첫 줄은 버린다
+        summary = summary.split("\n", 1)[-1]
+    return summary
+
+
+def llm_summarizer(llm, max_words: int = 150):
+    """작은 LLM으로 누적 요약을 갱신하는 summarizer를 만든다"""
+    def summarize(previous: str, messages) -> str:
+        prompt = (
+            f"다음은 지금까지의 대화 요약이다:\n{previous or '(없음)'}\n\n"
+            f"아래 대화를 반영해서 요약을 {max_words}단어 이내로 갱신해라. "
+            "사용자의 이름, 선호, 사실 정보는 반드시 남겨라.\n\n"
+            f"{get_buffer_string(messages)}"
+        )
+        return llm.invoke([HumanMessage(content=prompt)]).content
+    return summarize
+
+
+def make_compaction_node(
+    max_tokens: int = 3000,
+    keep_tokens: int | None = None,
+    summarizer=None,
+    token_counter=approx_tokens,
+):
+    """
+    chatbot 앞에 둘 compact 노드 함수를 만든다
+
+    max_tokens: 이 값을 넘으면 압축한다
+    keep_tokens: 압축 후 남길 최근 메시지의 토큰 수 (기본: max_tokens의 절반)
+    summarizer: (이전 요약, 밀려난 메시지) -> 새 요약
+                (기본: max_tokens의 1/4 글자 이내의 extractive_summary)
+
+    요약도 프롬프트에 들어가므로 예산 계산에 포함한다:
+    - 최근 메시지 창은 keep_tokens에서 지금 요약의 토큰 수를 뺀 만큼만 남긴다
+    - 새 요약이 길어져 max_tokens를 넘으면 창을 더 좁혀 다시 요약하고,
+      그래도 넘으면 요약의 오래된 줄부터 버린다
+      (마지막 도구 호출 묶음 하나만으로 max_tokens를 넘으면 그 묶음만 남으므로 예산을 지킬 수 없다)
+    """
+    keep_tokens = keep_tokens if keep_tokens is not None else max_tokens // 2
+    if summarizer is None:
+        summarizer = partial(extractive_summary, max_chars=max_tokens // 4)
+
+    def compact(state):
+        if count_tokens(with_summary(state), token_counter) <= max_tokens:
+            return {}
+
+        messages = state["messages"]
+        previous = state.get("summary", "")
+        start = find_window_start(messages, keep_tokens - _summary_tokens(previous, token_counter), token_counter)
+        if start == 0:
+            # 메시지는 그대로 두고 요약만 줄인다
+            summary = _fit_summary(previous, max_tokens - count_tokens(messages, token_counter), token_counter)
+            return {"summary": summary} if summary != previous else {}
+
+        summary = summarizer(previous, messages[:start])
+        budget = max_tokens - _summary_tokens(summary, token_counter)
+        if count_tokens(messages[start:], token_counter) > budget:
+            narrower = find_window_start(messages, budget, token_counter)
+            if narrower > start:
+                start = narrower
+                summary = summarizer(previous, messages[:start])
+            summary = _fit_summary(summary, max_tokens - count_tokens(messages[start:], token_counter), token_counter)
+
+        return {
+            "summary": summary,
+            "messages": [RemoveMessage(id=message.id) for message in messages[:start]],
+        }
+
+    return compact
+
+
+def _summary_message(summary: str) -> SystemMessage:
+    return SystemMessage(content=f"지금까지의 대화 요약:\n{summary}")
+
+
+def _summary_tokens(summary: str, token_counter=approx_tokens) -> int:
+    """요약이 프롬프트에 더하는 토큰 수 (요약이 없으면 0)"""
+    return token_counter(_summary_message(summary)) if summary else 0
+
+
+def _fit_summary(summary: str, budget: int, token_counter=approx_tokens) -> str:
+    """요약이 budget 토큰 안에 들어가도록 오래된(앞쪽) 줄부터 버린다"""
+    lines = summary.split("\n") if summary else []
+    while lines and _summary_tokens("\n".join(lines), token_counter) > budget:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def with_summary(state) -> list:
+    """LLM에 보낼 메시지 목록: 누적 요약이 있으면 SystemMessage로 맨 앞에 붙인다"""
+    summary = state.get("summary")
+    if not summary:
+        return state["messages"]
+    return [_summary_message(summary), *state["messages"]]
@@ -0,0 +1,162 @@
+"""
+메시지 기록을 부모 체크포인트와의 차이(delta)로 저장하는 체크포인터
+
+    memory = DeltaMemorySaver(snapshot_every=16)           # MemorySaver 대체
+    memory = DeltaSqliteSaver("checkpoints.sqlite")         # SqliteSaver 대체
+    graph = setup_graph(checkpointer=memory)
+
+- add_messages 채널은 super-step마다 전체 메시지 목록을 다시 저장하므로
+  n개 메시지 대화의 체크포인트 기록은 모두 O(n²) 바이트가 된다
+- 여기서는 messages 채널을 부모 체크포인트와 비교해
+  {"base": 부모 id, "keep": 그대로인 앞부분 길이, "append": 추가/교체된 메시지}만 저장한다
+- 부모에서 delta가 snapshot_every번 이어지면 전체 목록(snapshot)을 저장해 복원 비용을 제한한다
+- 전체 목록은 읽을 때(get_state / stream 시작 / get_state_history) 만든다.
+  최근에 복원한 목록은 기억해 두어 get_state_history처럼 이어서 읽을 때 다시 거슬러 올라가지 않는다
+- 복원한 목록의 메시지 객체는 체크포인트끼리 공유한다 (읽은 메시지를 직접 수정하지 않는다)
+"""
+import threading
+from collections import OrderedDict
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from .bounded_memory import BoundedMemorySaver
+from .sqlite_saver import SqliteSaver
+
+_DELTA = "__delta__"
+
+
+def _is_delta(value) -> bool:
+    return isinstance(value, dict) and value.get(_DELTA) == 1
+
+
+def _shared_prefix(old: list, new: list) -> int:
+    """new가 old와 앞에서부터 몇 개의 메시지를 그대로 공유하는지"""
+    limit = min(len(old), len(new))
+    for index in range(limit):
+        # 같은 실행 안에서는 같은 객체이고, 다시 읽은 목록은 내용으로 비교한다
+        if old[index] is not new[index] and old[index] != new[index]:
+            return index
+    return limit
+
+
+class DeltaCheckpointMixin:
+    """put/get_tuple/list에서 메시지 채널을 delta로 바꾸고 되돌리는 믹스인 (체크포인터 클래스 앞에 둔다)"""
+
+    def __init__(self, *args, snapshot_every: int = 16, delta_channels=("messages",), cache_size: int = 256,
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.snapshot_every = snapshot_every
+        self.delta_channels = tuple(delta_channels)
+        self.cache_size = cache_size
+        self.delta_lock = threading.RLock()
+        # (thread_id, checkpoint_ns, checkpoint_id, channel) -> (전체 목록, 마지막 snapshot으로부터의 delta 수)
+        self.decoded = OrderedDict()
+
+    def _remember(self, key, messages: list, depth: int):
+        self.decoded[key] = (messages, depth)
+        self.decoded.move_to_end(key)
+        while len(self.decoded) > self.cache_size:
+            self.decoded.popitem(last=False)
+
+    def _resolve(self, thread_id, checkpoint_ns, checkpoint_id, channel):
+        """checkpoint_id 시점의 channel 전체 목록과 delta 깊이 (없으면 None)"""
+        key = (thread_id, checkpoint_ns, checkpoint_id, channel)
+        if (cached := self.decoded.get(key)) is not None:
+            self.decoded.move_to_end(key)
+            return cached
+        config = {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+            }
+        }
+        saved = super().get_tuple(config)
+        if saved is None or channel not in saved.checkpoint["channel_values"]:
+            return None
+        return self._decode_value(thread_id, checkpoint_ns, checkpoint_id, channel,
+                                  saved.checkpoint["channel_values"][channel])
+
+    def _decode_value(self, thread_id, checkpoint_ns, checkpoint_id, channel, value):
+        if not _is_delta(value):
+            resolved = (value, 0) if isinstance(value, list) else None
+        else:
+            base = self._resolve(thread_id, checkpoint_ns, value["base"], channel)
+            if base is None:
+                raise ValueError(f"delta의 기준 체크포인트가 없습니다: {value['base']}")
+            base_messages, base_depth = base
+            resolved = (base_messages[:value["keep"]] + value["append"], base_depth + 1)
+        if resolved is not None:
+            self._remember((thread_id, checkpoint_ns, checkpoint_id, channel), *resolved)
+        return resolved
+
+    def _decode(self, checkpoint_tuple):
+        if checkpoint_tuple is None:
+            return None
+        channel_values = checkpoint_tuple.checkpoint["channel_values"]
+        if not any(_is_delta(channel_values.get(channel)) for channel in self.delta_channels):
+            return checkpoint_tuple
+        configurable = checkpoint_tuple.config["configurable"]
+        values = dict(channel_values)
+        with self.delta_lock:
+            for channel in self.delta_channels:
+                if _is_delta(values.get(channel)):
+                    messages, _ = self._decode_value(
+                        configurable["thread_id"],
+                        configurable.get("checkpoint_ns", ""),
+                        configurable["checkpoint_id"],
+                        channel,
+                        values[channel],
+                    )
+                    # 호출한 쪽이 목록을 바꿔도 기억해 둔 목록은 그대로 두도록 복사한다
+                    values[channel] = list(messages)
+        return checkpoint_tuple._replace(checkpoint={**checkpoint_tuple.checkpoint, "channel_values": values})
+
+    def _encode(self, config, checkpoint):
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        parent_id = configurable.get("checkpoint_id")
+        channel_values = checkpoint["channel_values"]
+        values = dict(channel_values)
+        with self.delta_lock:
+            for channel in self.delta_channels:
+                messages = channel_values.get(channel)
+                if not isinstance(messages, list):
+                    continue
+                parent = self._resolve(thread_id, checkpoint_ns, parent_id, channel) if parent_id else None
+                depth = 0
+                if parent is not None:
+                    parent_messages, parent_depth = parent
+                    keep = _shared_prefix(parent_messages, messages)
+                    # 압축(RemoveMessage) 등으로 앞부분이 거의 바뀌었으면 delta보다 snapshot이 작다
+                    if parent_depth + 1 < self.snapshot_every and keep * 2 >= len(messages):
+                        values[channel] = {_DELTA: 1, "base": parent_id, "keep": keep, "append": messages[keep:]}
+                        depth = parent_depth + 1
+                self._remember((thread_id, checkpoint_ns, checkpoint["id"], channel), list(messages), depth)
+        return {**checkpoint, "channel_values": values}
+
+    def get_tuple(self, config):
+        return self._decode(super().get_tuple(config))
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        for checkpoint_tuple in super().list(config, filter=filter, before=before, limit=limit):
+            yield self._decode(checkpoint_tuple)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        return super().put(config, self._encode(config, checkpoint), metadata, new_versions)
+
+
+class DeltaMemorySaver(DeltaCheckpointMixin, MemorySaver):
+    """메시지를 delta로 저장하는 MemorySaver"""
+
+
+class DeltaBoundedMemorySaver(DeltaCheckpointMixin, BoundedMemorySaver):
+    """메시지를 delta로 저장하는 BoundedMemorySaver (메모리 상한 + spill 파일)"""
+
+
+class DeltaSqliteSaver(DeltaCheckpointMixin, SqliteSaver):
+    """메시지를 delta로 저장하는 SqliteSaver"""
+
+    def get_tuples(self, configs):
+        return [self._decode(checkpoint_tuple) for checkpoint_tuple in super().get_tuples(configs)]
@@ -0,0 +1,177 @@
+"""
+stream_mode="values" 대신 바뀐 부분만 내보내는 스트림과, 그것으로 전체 상태를 다시 만드는 재구성기
+
+    for delta in stream_deltas(graph, {"messages": [("human", question)]}, config):
+        for message in delta.messages:
+            message.pretty_print()
+
+    state = StateReconstructor()
+    for delta in stream_deltas(graph, graph_input, config):
+        state.apply(delta)            # 원격이면 state.apply(StateDelta.from_json(line))
+    state.values                      # 필요할 때만 전체 값을 만든다
+
+- values 모드는 단계마다 전체 메시지 목록을 내보내서 대화가 길어지면 단계당 O(n), 대화 전체로 O(n²)이 된다
+- StateDelta에는 새로 붙거나 바뀐 메시지(messages), 지워진 메시지 id(removed),
+  바뀐 그 밖의 키(values, 예: example5의 name/birthday)와 순번(seq)만 담는다
+- 차이는 그래프 안에서 values 이벤트끼리 비교해 구한다 (단계 사이에 메시지 객체가 그대로 유지되므로
+  앞부분이 같은 객체면 뒤에 붙은 메시지만 보고, 아니면 id로 비교한다)
+- base를 주지 않으면 첫 이벤트는 전체 상태(reset=True)다. 이미 가진 상태를 base로 주면 첫 이벤트부터 차이만 보낸다
+  (예: base=graph.get_state(config).values 또는 StateReconstructor.stream(...))
+"""
+import json
+from dataclasses import dataclass, field
+
+from langchain_core.messages import message_to_dict, messages_from_dict
+
+
+class DeltaGapError(ValueError):
+    """재구성기가 받은 delta의 순번이 이어지지 않는다 (전체 상태를 다시 받아야 한다)"""
+
+
+@dataclass
+class StateDelta:
+    """values 이벤트 하나와 그 앞 이벤트의 차이"""
+    seq: int
+    messages: list = field(default_factory=list)  # 새로 붙었거나 내용이 바뀐 메시지 (순서대로)
+    removed: list = field(default_factory=list)  # 지워진 메시지 id
+    values: dict = field(default_factory=dict)  # 메시지가 아닌 키 중 바뀐 값
+    reset: bool = False  # True면 앞의 상태를 버리고 이 delta만으로 전체 상태를 만든다
+    key: str = "messages"  # 메시지 목록이 들어 있는 상태 키
+
+    def to_json(self) -> str:
+        """전송용 JSON 한 줄 (메시지 외의 값은 JSON으로 바꿀 수 있어야 한다)"""
+        return json.dumps({
+            "seq": self.seq,
+            "key": self.key,
+            "reset": self.reset,
+            "messages": [message_to_dict(message) for message in self.messages],
+            "removed": self.removed,
+            "values": self.values,
+        }, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> "StateDelta":
+        data = json.loads(text)
+        return cls(
+            seq=data["seq"],
+            messages=messages_from_dict(data["messages"]),
+            removed=data["removed"],
+            values=data["values"],
+            reset=data["reset"],
+            key=data["key"],
+        )
+
+
+def diff_messages(previous: list, current: list) -> tuple[list, list]:
+    """(새로 붙었거나 바뀐 메시지, 지워진 메시지 id)"""
+    count = len(previous)
+    # 흔한 경우: 앞부분은 같은 객체 그대로이고 뒤에 메시지가 붙었다 (포인터 비교만 한다)
+    if len(current) >= count and all(old is new for old, new in zip(previous, current)):
+        return current[count:], []
+    # 압축(RemoveMessage)이나 같은 id 교체가 있었거나, 체크포인트에서 다시 읽은 객체다
+    by_id = {message.id: message for message in previous}
+    changed = []
+    for message in current:
+        old = by_id.get(message.id)
+        if old is None or (old is not message and old != message):
+            changed.append(message)
+    current_ids = {message.id for message in current}
+    return changed, [message_id for message_id in by_id if message_id not in current_ids]
+
+
+class _Differ:
+    """values 이벤트를 차례로 받아 StateDelta로 바꾼다"""
+
+    def __init__(self, base, key: str, seq: int):
+        self.previous = dict(base) if base is not None else None
+        self.key = key
+        self.seq = seq
+
+    def __call__(self, current: dict) -> StateDelta:
+        self.seq += 1
+        previous, self.previous = self.previous, current
+        if previous is None:
+            return StateDelta(
+                seq=self.seq,
+                messages=list(current.get(self.key, [])),
+                values={name: value for name, value in current.items() if name != self.key},
+                reset=True,
+                key=self.key,
+            )
+        messages, removed = diff_messages(previous.get(self.key, []), current.get(self.key, []))
+        values = {
+            name: value for name, value in current.items()
+            if name != self.key and (name not in previous or (previous[name] is not value and previous[name] != value))
+        }
+        return StateDelta(seq=self.seq, messages=messages, removed=removed, values=values, key=self.key)
+
+
+def stream_deltas(graph, graph_input, config=None, *, base=None, seq: int = 0, key: str = "messages", **kwargs):
+    """graph.stream(stream_mode="values")와 같지만 이벤트마다 StateDelta를 내보낸다 (seq는 seq+1부터)"""
+    differ = _Differ(base, key, seq)
+    for values in graph.stream(graph_input, config, stream_mode="values", **kwargs):
+        yield differ(values)
+
+
+async def astream_deltas(graph, graph_input, config=None, *, base=None, seq: int = 0, key: str = "messages",
+                         **kwargs):
+    """stream_deltas의 비동기 버전 (graph.astream)"""
+    differ = _Differ(base, key, seq)
+    async for values in graph.astream(graph_input, config, stream_mode="values", **kwargs):
+        yield differ(values)
+
+
+class StateReconstructor:
+    """StateDelta를 차례로 적용해 전체 상태를 다시 만든다 (적용은 delta 크기에 비례, 전체 값은 필요할 때 만든다)"""
+
+    def __init__(self, values: dict | None = None, key: str = "messages"):
+        self.key = key
+        self.seq = 0
+        self.loaded = values is not None  # base로 쓸 상태가 있는지
+        self._messages = {}  # id -> 메시지 (삽입 순서 = 대화 순서)
+        self._values = {}
+        if values is not None:
+            self._load(values)
+
+    def _load(self, values: dict):
+        self._messages = {message.id: message for message in values.get(self.key, [])}
+        self._values = {name: value for name, value in values.items() if name != self.key}
+
+    def apply(self, delta: StateDelta) -> "StateReconstructor":
+        if delta.reset:
+            self._load({delta.key: delta.messages, **delta.values})
+        else:
+            if delta.seq != self.seq + 1:
+                raise DeltaGapError(f"delta 순번이 이어지지 않습니다: {self.seq} 다음에 {delta.seq}")
+            for message_id in delta.removed:
+                self._messages.pop(message_id, None)
+            for message in delta.messages:
+                # 이미 있는 id는 그 자리에서 바꾸고, 새 id는 끝에 붙인다 (add_messages와 같은 순서)
+                self._messages[message.id] = message
+            self._values.update(delta.values)
+        self.seq = delta.seq
+        self.loaded = True
+        return self
+
+    @property
+    def messages(self) -> list:
+        return list(self._messages.values())
+
+    @property
+    def values(self) -> dict:
+        """values 모드의 마지막 이벤트와 같은 전체 상태"""
+        return {self.key: self.messages, **self._values}
+
+    def stream(self, graph, graph_input, config=None, **kwargs):
+        """지금 상태를 base로 stream_deltas를 실행하면서 delta를 적용한다 (같은 thread의 다음 턴에 쓴다)"""
+        base = self.values if self.loaded else None
+        for delta in stream_deltas(graph, graph_input, config, base=base, seq=self.seq, key=self.key, **kwargs):
+            self.apply(delta)
+            yield delta
+
+    async def astream(self, graph, graph_input, config=None, **kwargs):
+        base = self.values if self.loaded else None
+        async for delta in astream_deltas(graph, graph_input, config, base=base, seq=self.seq, key=self.key,
+                                          **kwargs):
+            self.apply(delta)
+            yield delta
@@ -0,0 +1,272 @@
+"""
+예제들이 함께 쓰는 그래프 팩토리
+
+    @memoize_graph
+    def setup_graph(checkpointer=None, *, llm=None, search_tool=None, ...):
+        llm = llm or chat_openai(model="gpt-4o-mini", temperature=0.7, streaming=True)
+        search_tool = search_tool or tavily_search(max_results=2)
+        return build_chat_graph(State, [search_tool], llm, checkpointer=checkpointer, ...)
+
+- 무거운 모듈(langchain_openai, langchain_community의 Tavily 도구, dotenv)은
+  모델/도구를 처음 만들 때 import한다. 모듈을 import하는 것만으로는 불러오지 않는다
+- chat_openai / tavily_search는 같은 인자로 다시 부르면 만들어 둔 객체를 돌려준다 (연결 풀 재사용)
+- build_chat_graph는 chatbot ↔ tools 구조의 그래프를 만든다 (압축/캐시/계측/fast-path 선택 기능 포함)
+- memoize_graph는 setup_graph의 인자(모델, 도구, 체크포인터 등)가 같으면
+  컴파일해 둔 그래프를 다시 돌려준다 (최근 maxsize개까지 유지).
+  새 그래프가 필요하면 setup_graph.cache_clear()를 호출한다
+"""
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+_env_lock = threading.Lock()
+_env_loaded = False
+
+
+def load_env():
+    """.env 파일을 한 번만 읽는다 (API 키가 필요한 객체를 만들기 직전에 호출)"""
+    global _env_loaded
+    with _env_lock:
+        if not _env_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _env_loaded = True
+
+
+@functools.lru_cache(maxsize=None)
+def _chat_openai(options: tuple):
+    load_env()
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(**dict(options))
+
+
+def chat_openai(**options):
+    """ChatOpenAI를 만든다 (같은 설정이면 만들어 둔 클라이언트를 재사용한다)"""
+    return _chat_openai(tuple(sorted(options.items())))
+
+
+@functools.lru_cache(maxsize=None)
+def tavily_search(max_results: int = 2):
+    """TavilySearchResults를 만든다 (같은 설정이면 만들어 둔 도구를 재사용한다)"""
+    load_env()
+    from langchain_community.tools.tavily_search import TavilySearchResults
+    return TavilySearchResults(max_results=max_results)
+
+
+def build_chat_graph(
+    state_schema,
+    tools,
+    llm,
+    *,
+    tool_node=None,
+    router=None,
+    checkpointer=None,
+    max_history_tokens=None,
+    llm_cache=None,
+    metrics=None,
+    max_tool_concurrency=None,
+    fast_path=None,
+    prefetch=None,
+    resilience=None,
+    budget=None,
+    blobs=None,
+    cassette=None,
+    flavor="sync",
+):
+    """
+    chatbot → (router) → tools → chatbot 구조의 그래프를 만들어 컴파일한다
+    예제의 setup_graph는 아래 선택 기능을 같은 이름의 키워드 인자로 받아 그대로 넘긴다 (옵션 설명은 여기에만 둔다)
+    - tool_node: tools 노드로 쓸 함수/Runnable (기본: ToolNode(tools))
+    - router: chatbot 다음 조건부 엣지 함수 (기본: tools_condition)
+    - max_history_tokens: 주면 chatbot 앞에 대화 기록 압축(compact) 노드를 둔다
+    - llm_cache: 주면 같은 프롬프트는 모델을 다시 호출하지 않는다
+    - metrics: 주면 노드별 실행 시간/토큰 수/상태 크기를 기록한다
+    - max_tool_concurrency: 동시에 실행할 도구 작업 수 제한
+    - fast_path: FastPathRouter를 주면 chatbot 앞에 fast_path 노드를 두어 간단한 질문은 직접 답한다
+    - prefetch: SearchPrefetcher를 주면 검색이 필요해 보이는 질문은 모델 호출과 동시에 검색을 시작한다
+      (검색 도구도 common.prefetch.with_prefetch로 감싸야 한다)
+    - search_cache: setup_graph만 받는 옵션. SearchCache를 주면 같은 검색어는 한 번만 검색한다
+      (setup_graph가 검색 도구를 common.search_cache.with_search_cache로 감싸서 tools로 넘긴다)
+    - resilience: ResiliencePolicy를 주면 모델 호출에 hedge/턴 마감 시간/서킷 브레이커를 적용한다
+      (검색 도구는 common.resilience.with_resilience로 따로 감싼다)
+    - budget: LoopBudget을 주면 턴마다 도구 반복 횟수/도구 시간/토큰 수를 제한하고,
+      예산을 넘으면 finalize 노드에서 도구 없이 답한다
+    - blobs: BlobStore를 주면 큰 도구 결과는 상태 밖에 한 번만 저장하고 메시지에는 참조만 남긴다
+      (모델 호출 직전에 이번 턴의 참조만 펼친다)
+    - cassette: Cassette를 주면 모델 호출을 파일에 기록하거나 기록된 응답으로 재생한다
+      (검색 도구는 common.cassette.with_cassette로 따로 감싼다)
+    - flavor: "async"면 chatbot은 ainvoke만 쓰는 코루틴 노드로, 라우터/compact는 이벤트 루프에서 바로 실행한다
+      (ainvoke/astream 전용. 도구도 코루틴으로 정의한 것을 넘긴다, common.async_nodes)
+    """
+    from langgraph.graph import StateGraph, START, END
+    from langgraph.prebuilt import ToolNode, tools_condition
+    from langgraph.utils.runnable import RunnableCallable
+
+    from .async_nodes import async_only, check_flavor, inline
+    from .cassette import with_cassette
+    from .compaction import make_compaction_node, with_summary
+    from .fast_path import fast_path_condition
+    from .instrumentation import instrument_graph
+    from .llm_cache import with_cache
+    from .loop_budget import add_budget_nodes
+    from .resilience import with_resilience
+
+    is_async = check_flavor(flavor)
+    # cassette는 upstream 자리에 들어가므로 가장 안쪽에 둔다
+    llm = with_cassette(llm, cassette)
+    # 캐시가 맞으면 upstream을 부르지 않으므로 캐시를 바깥에 둔다
+    llm_with_tools = with_cache(with_resilience(llm.bind_tools(tools), resilience), llm_cache)
+
+    def prompt(state):
+        messages = with_summary(state)
+        return blobs.expand(messages) if blobs is not None else messages
+
+    def chatbot(state, config):
+        handle = prefetch.start(state, config) if prefetch is not None else None
+        message = None
+        start = time.perf_counter()
+        try:
+            message = llm_with_tools.invoke(prompt(state))
+        finally:
+            # 모델이 비슷한 검색을 요청했으면 prefetch 결과를 넘기고, 아니면 취소한다
+            if prefetch is not None:
+                prefetch.resolve(handle, message)
+        if fast_path is not None:
+            fast_path.record_full_call(time.perf_counter() - start)
+        return {"messages": [message]}
+
+    # ainvoke/astream으로 실행할 때는 스레드 풀을 거치지 않고 모델의 비동기 API를 쓴다
+    async def achatbot(state, config):
+        handle = prefetch.astart(state, config) if prefetch is not None else None
+        message = None
+        start = time.perf_counter()
+        try:
+            message = await llm_with_tools.ainvoke(prompt(state))
+        finally:
+            if prefetch is not None:
+                prefetch.resolve(handle, message)
+        if fast_path is not None:
+            fast_path.record_full_call(time.perf_counter() - start)
+        return {"messages": [message]}
+
+    graph_builder = StateGraph(state_schema)
+    # async flavor: 동기 구현을 두지 않는다 (invoke로 실행하면 바로 알 수 있게)
+    chatbot_node = async_only(achatbot, name="chatbot") if is_async else RunnableCallable(chatbot, achatbot, name="chatbot")
+    graph_builder.add_node("chatbot", chatbot_node)
+    tool_node = tool_node if tool_node is not None else ToolNode(tools=tools)
+    if blobs is not None:
+        # 도구 결과 저장소 (선택): 큰 도구 결과는 체크포인트에 복사되지 않도록 참조로 바꾼다
+        tool_node = blobs.wrap_tools(tool_node)
+    if budget is not None:
+        # 턴 예산 (선택): 예산을 넘은 뒤의 도구 호출은 finalize 노드가 도구 없이 마무리한다
+        add_budget_nodes(
+            graph_builder, budget, with_cache(with_resilience(llm, resilience), llm_cache), tool_node, prompt
+        )
+        router = budget.router(router if router is not None else tools_condition)
+        graph_builder.add_conditional_edges("chatbot", inline(router) if is_async else router, ["tools", "finalize", END])
+    else:
+        graph_builder.add_node("tools", tool_node)
+        if router is None and not is_async:
+            graph_builder.add_conditional_edges("chatbot", tools_condition)
+        else:
+            router = router if router is not None else tools_condition
+            graph_builder.add_conditional_edges("chatbot", inline(router) if is_async else router, ["tools", END])
+
+    # fast-path (선택): 간단한 질문은 chatbot을 거치지 않고 답하고 끝낸다
+    entry = "chatbot"
+    if fast_path is not None:
+        graph_builder.add_node("fast_path", fast_path.node())
+        graph_builder.add_conditional_edges(
+            "fast_path", inline(fast_path_condition) if is_async else fast_path_condition, ["chatbot", END]
+        )
+        entry = "fast_path"
+
+    # 대화 기록 압축 (선택): chatbot 앞에서 오래된 메시지를 요약으로 접는다
+    if max_history_tokens:
+        compact = make_compaction_node(max_history_tokens)
+        graph_builder.add_node("compact", inline(compact, name="compact") if is_async else compact)
+        graph_builder.add_edge("compact", entry)
+        entry = "compact"
+
+    graph_builder.add_edge("tools", entry)
+    graph_builder.add_edge(START, entry)
+
+    graph = instrument_graph(graph_builder.compile(checkpointer=checkpointer), metrics)
+    if max_tool_concurrency:
+        graph = graph.with_config(max_concurrency=max_tool_concurrency)
+    return graph
+
+
+# 사용자에게 보여 줄 답변을 만드는 노드 (스트리밍 출력에서 이 노드의 메시지만 내보낸다)
+ANSWER_NODES = ("chatbot", "fast_path", "finalize")
+
+
+class _Identity:
+    """해시할 수 없는 객체(모델, 체크포인터 등)를 객체 자체(is)로 비교하는 키"""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __hash__(self):
+        return id(self.value)
+
+    def __eq__(self, other):
+        return isinstance(other, _Identity) and other.value is self.value
+
+
+def _freeze(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    # 객체를 키에 붙잡아 두므로 id가 다른 객체에 재사용될 일이 없다
+    return _Identity(value)
+
+
+def memoize_graph(setup_graph=None, *, maxsize: int = 32):
+    """
+    setup_graph 인자가 같으면 컴파일된 그래프를 다시 만들지 않는다 (@memoize_graph, @memoize_graph(maxsize=N))
+    checkpointer 인자가 None이면 setup_graph가 그래프마다 새 MemorySaver를 만들므로 캐시하지 않는다
+    (캐시하면 서로 다른 호출자가 같은 메모리를 나눠 써서 대화가 섞인다)
+    """
+    if setup_graph is None:
+        return functools.partial(memoize_graph, maxsize=maxsize)
+
+    signature = inspect.signature(setup_graph)
+    has_checkpointer = "checkpointer" in signature.parameters
+    graphs = OrderedDict()
+    lock = threading.Lock()
+
+    @functools.wraps(setup_graph)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        if has_checkpointer and bound.arguments["checkpointer"] is None:
+            return setup_graph(*args, **kwargs)
+        key = _freeze(dict(bound.arguments))
+        with lock:
+            graph = graphs.get(key)
+            if graph is not None:
+                graphs.move_to_end(key)
+                return graph
+
+        graph = setup_graph(*args, **kwargs)
+        with lock:
+            graph = graphs.setdefault(key, graph)
+            graphs.move_to_end(key)
+            while len(graphs) > maxsize:
+                graphs.popitem(last=False)
+        return graph
+
+    def cache_clear():
+        with lock:
+            graphs.clear()
+
+    wrapper.cache_clear = cache_clear
+    wrapper.cache_size = lambda: len(graphs)
+    return wrapper
@@ -0,0 +1,344 @@
+"""
+네트워크 없이 그래프를 실행하기 위한 가짜(fake) 구현 모음
+
+- FakeChatModel: ChatOpenAI 대신 쓰는 결정적 채팅 모델 (bind_tools, 스트리밍 지원)
+- FakeSearchResults: TavilySearchResults와 같은 이름/스키마/응답 형식을 가진 로컬 검색 도구
+
+둘 다 latency 인자로 외부 API 지연을 흉내 낼 수 있다.
+slow_rate/slow_latency/fail_rate를 주면 일부 호출을 느리게 하거나 실패시킨다 (seed로 재현 가능).
+
+    llm = FakeChatModel(latency=0.3, token_latency=0.01)
+    graph = setup_graph(llm=llm, search_tool=FakeSearchResults(latency=0.2))
+    slow_llm = FakeChatModel(latency=0.3, slow_rate=0.05, slow_latency=3.0, seed=1)   # 5%는 3초 더 걸린다
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel, Field, PrivateAttr
+
+# (도구 이름에 들어 있는 문자열, 질문에 이 단어가 있으면 그 도구를 호출한다)
+DEFAULT_TOOL_RULES = [
+    ("search", ("검색", "찾아", "최신", "트렌드", "뉴스", "결과", "인기", "출시")),
+    ("weather", ("날씨", "기온")),
+    ("cities", ("시원한", "추운")),
+    ("human", ("검토", "확인", "승인", "검증")),
+]
+
+
+class UpstreamFaults(BaseModel):
+    """느린 응답/오류를 일정 확률로 흉내 내는 설정 (FakeChatModel, FakeSearchResults 공용)"""
+    slow_rate: float = 0.0  # 이 확률로 slow_latency초 더 기다린다
+    slow_latency: float = 0.0
+    fail_rate: float = 0.0  # 이 확률로 ConnectionError를 낸다
+    seed: int | None = None
+
+    _rng: random.Random | None = PrivateAttr(default=None)
+    _fault_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def _fault(self) -> float:
+        """이번 호출에 더할 지연(초), 실패할 차례면 ConnectionError"""
+        if not (self.slow_rate or self.fail_rate):
+            return 0.0
+        with self._fault_lock:
+            if self._rng is None:
+                self._rng = random.Random(self.seed)
+            failed, slow = self._rng.random() < self.fail_rate, self._rng.random() < self.slow_rate
+        if failed:
+            raise ConnectionError("fake upstream error")
+        return self.slow_latency if slow else 0.0
+
+
+def _text(message) -> str:
+    content = message.content
+    return content if isinstance(content, str) else json.dumps(content, ensure_ascii=False)
+
+
+def _turn(messages) -> tuple[str, int]:
+    """마지막 사람 질문과 그 뒤에 도구를 호출한 AIMessage 수"""
+    rounds = 0
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            return _text(message), rounds
+        rounds += isinstance(message, AIMessage) and bool(message.tool_calls)
+    return "", rounds
+
+
+def _repeat(text: str, size: int) -> str:
+    """text를 반복해서 size 글자로 맞춘다"""
+    return (text * (size // max(len(text), 1) + 1))[:size]
+
+
+def _fill_args(schema: dict, text: str) -> dict:
+    """도구 인자 스키마의 필수 인자를 질문 내용으로 채운다"""
+    parameters = schema.get("parameters", {})
+    properties = parameters.get("properties", {})
+    args = {}
+    for name in parameters.get("required", list(properties)):
+        kind = properties.get(name, {}).get("type", "string")
+        args[name] = text if kind == "string" else 0 if kind in ("integer", "number") else None
+    return args
+
+
+class FakeChatModel(UpstreamFaults, BaseChatModel):
+    """
+    ChatOpenAI 대신 쓰는 결정적 채팅 모델
+
+    - responses를 주면 그 순서대로(끝나면 처음부터) 응답한다 (매번 id 없는 복사본을 돌려준다)
+    - 주지 않으면 규칙 기반으로 응답한다:
+      * 마지막 메시지가 사람 질문이고 tool_rules의 단어가 있으면 바인딩된 도구를 호출한다
+        (여러 규칙이 맞으면 도구 호출 여러 개를 한 번에 낸다)
+      * 마지막 메시지가 도구 결과면 그 결과를 인용해 최종 답변을 한다
+        (tool_rounds를 2 이상으로 주면 이번 턴의 도구 호출이 그 횟수가 될 때까지 같은 도구를 다시 부른다)
+      * 그 밖에는 질문을 인용한 짧은 답변을 한다
+    - latency: 첫 토큰까지의 지연(초), token_latency: 토큰 하나당 지연(초)
+    - slow_rate/slow_latency/fail_rate: 일부 호출을 느리게 하거나 실패시킨다 (UpstreamFaults)
+    """
+    model_name: str = "fake-chat"
+    temperature: float = 0.0
+    latency: float = 0.0
+    token_latency: float = 0.0
+    responses: list | None = None
+    tool_rounds: int = 1
+    tool_rules: list = Field(default_factory=lambda: list(DEFAULT_TOOL_RULES))
+
+    _calls: int = PrivateAttr(default=0)
+    _slept: float = PrivateAttr(default=0.0)
+    _ids = PrivateAttr(default_factory=itertools.count)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model_name": self.model_name, "temperature": self.temperature}
+
+    @property
+    def calls(self) -> int:
+        """지금까지 모델을 호출한 횟수"""
+        return self._calls
+
+    @property
+    def injected_seconds(self) -> float:
+        """지금까지 일부러 기다린(흉내 낸 upstream) 시간의 합"""
+        return self._slept
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        if tool_choice is not None:
+            kwargs["tool_choice"] = tool_choice
+        return self.bind(tools=formatted, **kwargs)
+
+    def _next_id(self) -> str:
+        with self._lock:
+            return f"call_fake_{next(self._ids):06d}"
+
+    def _tool_calls(self, text: str, tools) -> list:
+        tool_calls = []
+        for tool in tools:
+            function = tool.get("function", tool)
+            for fragment, keywords in self.tool_rules:
+                if fragment in function["name"] and any(k in text for k in keywords):
+                    tool_calls.append({
+                        "name": function["name"],
+                        "args": _fill_args(function, text),
+                        "id": self._next_id(),
+                    })
+                    break
+        return tool_calls
+
+    def _respond(self, messages, tools) -> AIMessage:
+        with self._lock:
+            index = self._calls
+            self._calls += 1
+
+        if self.responses:
+            response = self.responses[index % len(self.responses)]
+            if not isinstance(response, AIMessage):
+                return AIMessage(content=str(response))
+            # 같은 객체(같은 id)를 돌려주면 add_messages가 두 번째 응답을 첫 번째 자리에 덮어쓰므로 복사한다
+            return response.model_copy(update={"id": None})
+
+        last = messages[-1]
+        if isinstance(last, ToolMessage) and tools:
+            question, rounds = _turn(messages)
+            if rounds < self.tool_rounds:
+                tool_calls = self._tool_calls(question, tools)
+                if tool_calls:
+                    return AIMessage(content="", tool_calls=tool_calls)
+        if isinstance(last, ToolMessage):
+            results = []
+            for message in reversed(messages):
+                if not isinstance(message, ToolMessage):
+                    break
+                results.append(_text(message)[:80])
+            return AIMessage(content="도구 결과를 바탕으로 답변드립니다. " + " / ".join(reversed(results)))
+
+        text = _text(last)
+        if isinstance(last, HumanMessage) and tools:
+            tool_calls = self._tool_calls(text, tools)
+            if tool_calls:
+                return AIMessage(content="", tool_calls=tool_calls)
+
+        return AIMessage(content=f"'{text[:40]}'에 대한 답변입니다. 이것은 오프라인 테스트용 가짜 모델의 응답입니다.")
+
+    def _tokens(self, message: AIMessage):
+        # 공백을 포함해서 자른 토큰 (이어 붙이면 원래 문장이 된다)
+        return [token for token in message.content.replace(" ", " \0").split("\0") if token]
+
+    def _wait(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+            with self._lock:
+                self._slept += seconds
+
+    async def _await(self, seconds: float):
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+            with self._lock:
+                self._slept += seconds
+
+    def _chunks(self, message: AIMessage):
+        for token in self._tokens(message):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        for index, tool_call in enumerate(message.tool_calls):
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[{
+                    "name": tool_call["name"],
+                    "args": json.dumps(tool_call["args"], ensure_ascii=False),
+                    "id": tool_call["id"],
+                    "index": index,
+                }],
+            ))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self._respond(messages, kwargs.get("tools"))
+        self._wait(self.latency + self._fault() + self.token_latency * len(self._tokens(message)))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self._respond(messages, kwargs.get("tools"))
+        await self._await(self.latency + self._fault() + self.token_latency * len(self._tokens(message)))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self._respond(messages, kwargs.get("tools"))
+        self._wait(self.latency + self._fault())
+        for chunk in self._chunks(message):
+            self._wait(self.token_latency)
+            if run_manager and chunk.message.content:
+                run_manager.on_llm_new_token(chunk.message.content, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self._respond(messages, kwargs.get("tools"))
+        await self._await(self.latency + self._fault())
+        for chunk in self._chunks(message):
+            await self._await(self.token_latency)
+            if run_manager and chunk.message.content:
+                await run_manager.on_llm_new_token(chunk.message.content, chunk=chunk)
+            yield chunk
+
+
+class SearchInput(BaseModel):
+    query: str = Field(description="search query to look up")
+
+
+class FakeSearchResults(UpstreamFaults, BaseTool):
+    """
+    TavilySearchResults 대신 쓰는 결정적(deterministic) 검색 도구
+    - 같은 질의에는 항상 같은 결과를 돌려준다
+    - latency 초만큼 기다려 외부 API 지연을 흉내 낸다 (slow_rate/fail_rate: UpstreamFaults)
+    - calls로 실제(upstream) 호출 횟수를 센다
+    - swallow_errors: 주입한 오류를 내지 않고 TavilySearchResults처럼 (repr(e), {})를 돌려준다 (swallowed로 센다)
+    """
+    name: str = "tavily_search_results_json"
+    description: str = (
+        "A search engine optimized for comprehensive, accurate, and trusted results. "
+        "Useful for when you need to answer questions about current events. "
+        "Input should be a search query."
+    )
+    args_schema: type[BaseModel] = SearchInput
+    response_format: str = "content_and_artifact"
+
+    max_results: int = 2
+    latency: float = 0.0
+    content_size: int = 300  # 결과 하나의 본문 길이(글자)
+    swallow_errors: bool = False
+
+    _calls: int = PrivateAttr(default=0)
+    _swallowed: int = PrivateAttr(default=0)
+    _slow_seconds: float = PrivateAttr(default=0.0)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    @property
+    def swallowed(self) -> int:
+        """swallow_errors로 오류 대신 (repr(e), {})를 돌려준 횟수"""
+        return self._swallowed
+
+    @property
+    def injected_seconds(self) -> float:
+        """지금까지 일부러 기다린(흉내 낸 upstream) 시간의 합"""
+        return self._calls * self.latency + self._slow_seconds
+
+    def _swallow(self, error: Exception):
+        # TavilySearchResults._run은 예외를 삼키고 (repr(e), {})를 돌려준다
+        with self._lock:
+            self._swallowed += 1
+        return repr(error), {}
+
+    def _delay(self) -> float:
+        extra = self._fault()
+        if extra:
+            with self._lock:
+                self._slow_seconds += extra
+        return self.latency + extra
+
+    def _results(self, query: str):
+        with self._lock:
+            self._calls += 1
+        digest = hashlib.sha1(query.encode("utf-8")).hexdigest()
+        results = [
+            {
+                "url": f"https://example.com/{digest[:8]}/{i}",
+                "content": _repeat(f"{query}에 대한 검색 결과 {i}. ", self.content_size),
+            }
+            for i in range(self.max_results)
+        ]
+        return results, {"query": query, "results": results}
+
+    def _run(self, query: str, run_manager=None):
+        try:
+            if delay := self._delay():
+                time.sleep(delay)
+        except ConnectionError as e:
+            if not self.swallow_errors:
+                raise
+            return self._swallow(e)
+        return self._results(query)
+
+    async def _arun(self, query: str, run_manager=None):
+        try:
+            if delay := self._delay():
+                await asyncio.sleep(delay)
+        except ConnectionError as e:
+            if not self.swallow_errors:
+                raise
+            return self._swallow(e)
+        return self._results(query)
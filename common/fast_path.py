@@ -0,0 +1,227 @@
+"""
+간단한 질문은 도구가 바인딩된 모델을 거치지 않고 답하는 fast-path 라우터
+
+    fast_path = FastPathRouter(small_llm=chat_openai(model="gpt-4o-mini", temperature=0))
+    graph = build_chat_graph(State, tools, llm, fast_path=fast_path)   # chatbot 앞에 fast_path 노드
+    ...
+    print_fast_path_stats(fast_path)
+
+- "안녕하세요!", "1 + 1은 뭐야?" 같은 질문도 llm_with_tools로 보내면 검색 도구 스키마가
+  매번 프롬프트에 붙고, 모델이 쓸데없이 검색을 하기도 한다
+- fast_path 노드는 사람의 새 질문만 보고 싸게 분류한다 (위에서부터 먼저 맞는 것)
+  1. faq: 인사/FAQ 표에 있는 질문 (공백/문장부호/대소문자 무시) → 표의 답변
+  2. arithmetic: 사칙연산 식만 묻는 질문 → AST로 직접 계산 (eval 사용하지 않음)
+  3. small_model: small_llm이 있고 최신 정보/검색이 필요해 보이지 않는 질문 → 도구 없는 작은 모델
+  4. full: 그 밖의 질문 → 기존 chatbot(도구가 바인딩된 모델)
+- 답한 경우 그래프는 바로 끝나고, 아니면 chatbot으로 넘어간다 (도구 결과는 그대로 chatbot으로)
+- stats()로 경로별 턴 수, fast-path 비율, 절약한 모델 시간(추정)을 확인한다
+"""
+import ast
+import operator
+import re
+import threading
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END
+
+from .compaction import with_summary
+
+DEFAULT_FAQ = {
+    "안녕": "안녕하세요! 무엇을 도와드릴까요?",
+    "안녕하세요": "안녕하세요! 무엇을 도와드릴까요?",
+    "hello": "Hello! How can I help you?",
+    "hi": "Hi! How can I help you?",
+    "고마워": "천만에요! 더 궁금한 점이 있으면 물어보세요.",
+    "고마워요": "천만에요! 더 궁금한 점이 있으면 물어보세요.",
+    "감사합니다": "천만에요! 더 궁금한 점이 있으면 물어보세요.",
+    "thanks": "You're welcome!",
+    "잘가": "안녕히 가세요!",
+    "안녕히계세요": "안녕히 가세요!",
+}
+
+# 이런 단어가 있으면 최신 정보나 검색이 필요할 수 있으므로 도구가 있는 모델로 보낸다
+TOOL_HINTS = (
+    "검색", "찾아", "최신", "최근", "요즘", "오늘", "어제", "내일", "현재", "지금", "이번", "올해", "작년",
+    "뉴스", "결과", "순위", "인기", "트렌드", "출시", "발표", "일정", "경기", "가격", "주가", "환율",
+    "날씨", "기온", "latest", "today", "news", "current", "price", "weather",
+)
+_YEAR = re.compile(r"(19|20)\d\d")
+
+_PUNCTUATION = re.compile(r"[\s!?.,~…]+")
+_WORD_OPERATORS = {"더하기": "+", "빼기": "-", "곱하기": "*", "나누기": "/", "×": "*", "÷": "/", "^": "**"}
+_EXPRESSION = re.compile(r"[-+*/%().\d\s]*\d[-+*/%().\d\s]*")
+# 식을 빼고 남은 부분이 이 정도일 때만 계산 질문으로 본다 ("1 + 1은 뭐야?" → "은뭐야")
+_ARITHMETIC_REST = re.compile(
+    r"^(은|는|이|가|을|를)?(뭐야|뭐예요|뭐에요|뭔가요|무엇인가요|얼마야|얼마예요|얼마에요|얼마인가요|얼마|"
+    r"계산해줘|계산해주세요|계산|=)?$"
+)
+_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+
+def normalize_question(text: str) -> str:
+    """공백/문장부호를 빼고 대소문자를 무시한다 (FAQ 표의 키)"""
+    return _PUNCTUATION.sub("", text).casefold()
+
+
+def _evaluate(node):
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _OPERATORS:
+        return _OPERATORS[type(node.op)](_evaluate(node.operand))
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+        left, right = _evaluate(node.left), _evaluate(node.right)
+        # 큰 거듭제곱은 계산 시간/메모리를 많이 쓰므로 모델에 맡긴다
+        if isinstance(node.op, ast.Pow) and (abs(right) > 64 or abs(left) > 1e6):
+            raise ValueError("too large")
+        return _OPERATORS[type(node.op)](left, right)
+    raise ValueError("unsupported expression")
+
+
+def evaluate_arithmetic(text: str) -> str | None:
+    """사칙연산 식만 묻는 질문이면 "식 = 값"을, 아니면 None을 돌려준다"""
+    for word, symbol in _WORD_OPERATORS.items():
+        text = text.replace(word, symbol)
+    text = text.strip().rstrip("?!.")
+    candidates = [match for match in _EXPRESSION.finditer(text) if re.search(r"\d\s*[-+*/%]", match.group())]
+    if len(candidates) != 1:
+        return None
+    match = candidates[0]
+    expression = match.group().strip()
+    rest = _PUNCTUATION.sub("", text[:match.start()] + text[match.end():])
+    if not _ARITHMETIC_REST.match(rest):
+        return None
+    try:
+        value = _evaluate(ast.parse(expression, mode="eval").body)
+    except (SyntaxError, ValueError, ZeroDivisionError, OverflowError, RecursionError):
+        return None
+    if isinstance(value, float):
+        value = int(value) if value.is_integer() and abs(value) < 1e15 else round(value, 10)
+    return f"{expression} = {value}"
+
+
+def needs_tools(text: str) -> bool:
+    """최신 정보/검색이 필요해 보이는 질문인지 (가벼운 규칙 기반 분류기)"""
+    lowered = text.casefold()
+    return bool(_YEAR.search(text)) or any(hint in lowered for hint in TOOL_HINTS)
+
+
+def fast_path_condition(state) -> str:
+    """fast_path 노드 다음 엣지: 답을 했으면 끝, 아니면 chatbot"""
+    return END if isinstance(state["messages"][-1], AIMessage) else "chatbot"
+
+
+class FastPathRouter:
+    """chatbot 앞에서 간단한 질문을 분류해 직접/작은 모델로 답하는 라우터"""
+
+    ROUTES = ("faq", "arithmetic", "small_model", "full")
+
+    def __init__(self, faq: dict | None = None, small_llm=None, arithmetic: bool = True,
+                 max_small_chars: int = 200):
+        # faq: 기본 인사 표에 더할 {질문: 답변}
+        self.faq = {normalize_question(question): answer for question, answer in {**DEFAULT_FAQ, **(faq or {})}.items()}
+        self.small_llm = small_llm
+        self.arithmetic = arithmetic
+        self.max_small_chars = max_small_chars
+        self.lock = threading.Lock()
+        self.counters = {
+            "turns": 0,
+            **{route: 0 for route in self.ROUTES},
+            "local_seconds": 0.0,  # fast-path로 답한 턴의 분류 + 답변 시간
+            "full_calls": 0,
+            "full_seconds": 0.0,  # 도구가 바인딩된 모델 호출 시간 (chatbot 노드가 기록)
+        }
+
+    def classify(self, text: str) -> tuple[str, str | None]:
+        """(경로, 바로 쓸 수 있는 답변 또는 None)"""
+        if (answer := self.faq.get(normalize_question(text))) is not None:
+            return "faq", answer
+        if self.arithmetic and (answer := evaluate_arithmetic(text)) is not None:
+            return "arithmetic", answer
+        if self.small_llm is not None and len(text) <= self.max_small_chars and not needs_tools(text):
+            return "small_model", None
+        return "full", None
+
+    def _question(self, state) -> str | None:
+        last = state["messages"][-1] if state["messages"] else None
+        if not isinstance(last, HumanMessage) or not isinstance(last.content, str):
+            return None
+        return last.content
+
+    def _record(self, route: str, seconds: float):
+        with self.lock:
+            self.counters["turns"] += 1
+            self.counters[route] += 1
+            if route != "full":
+                self.counters["local_seconds"] += seconds
+
+    def record_full_call(self, seconds: float):
+        """도구가 바인딩된 모델 호출 시간을 기록한다 (절약 시간 추정용)"""
+        with self.lock:
+            self.counters["full_calls"] += 1
+            self.counters["full_seconds"] += seconds
+
+    def route(self, state):
+        question = self._question(state)
+        if question is None:
+            return None
+        start = time.perf_counter()
+        route, answer = self.classify(question)
+        if route == "small_model":
+            message = self.small_llm.invoke(with_summary(state))
+        elif answer is not None:
+            message = AIMessage(content=answer)
+        self._record(route, time.perf_counter() - start)
+        return None if route == "full" else {"messages": [message]}
+
+    async def aroute(self, state):
+        question = self._question(state)
+        if question is None:
+            return None
+        start = time.perf_counter()
+        route, answer = self.classify(question)
+        if route == "small_model":
+            message = await self.small_llm.ainvoke(with_summary(state))
+        elif answer is not None:
+            message = AIMessage(content=answer)
+        self._record(route, time.perf_counter() - start)
+        return None if route == "full" else {"messages": [message]}
+
+    def node(self):
+        """그래프에 넣을 fast_path 노드 (invoke/ainvoke 모두 지원)"""
+        from langgraph.utils.runnable import RunnableCallable
+        return RunnableCallable(self.route, self.aroute, name="fast_path")
+
+    def stats(self) -> dict:
+        with self.lock:
+            counters = dict(self.counters)
+        turns, handled = counters["turns"], counters["turns"] - counters["full"]
+        average = counters["full_seconds"] / counters["full_calls"] if counters["full_calls"] else 0.0
+        return {
+            **counters,
+            "routed_fraction": handled / turns if turns else 0.0,
+            # fast-path로 피한 모델 호출 수 × 평균 모델 호출 시간 - fast-path에서 쓴 시간
+            "saved_seconds": max(handled * average - counters["local_seconds"], 0.0),
+        }
+
+
+def print_fast_path_stats(router: FastPathRouter):
+    """fast-path 경로별 턴 수와 절약한 모델 시간을 출력한다"""
+    stats = router.stats()
+    print("\n" + "="*50)
+    print("⚡ fast-path 라우터 통계")
+    print("="*50)
+    print(f"- 턴: {stats['turns']} (FAQ {stats['faq']}, 계산 {stats['arithmetic']}, "
+          f"작은 모델 {stats['small_model']}, 도구 모델 {stats['full']})")
+    print(f"- fast-path 비율: {stats['routed_fraction']:.1%}")
+    print(f"- 절약한 모델 시간(추정): {stats['saved_seconds']:.2f}s")
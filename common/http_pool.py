@@ -0,0 +1,78 @@
+"""
+LLM/검색 백엔드가 함께 쓰는 HTTP 연결 풀
+
+    pool = HttpPool(max_connections=200)
+    llm = pooled_chat_openai(pool, model="gpt-4o-mini", streaming=True)
+    search_tool = pooled_tavily_search(pool, max_results=2)
+    ...
+    await pool.aclose()
+
+- ChatOpenAI는 기본으로 인스턴스마다 자기 httpx 클라이언트를 만들고,
+  Tavily 래퍼는 요청마다 새 연결(requests.post / aiohttp.ClientSession)을 연다
+- 서버처럼 요청이 많은 곳에서는 httpx 클라이언트 하나(동기/비동기 각각)를 공유해
+  keep-alive 연결을 재사용하고 전체 연결 수를 제한한다
+- 비동기 클라이언트의 연결은 처음 사용한 이벤트 루프에 묶이므로 루프 하나(서버) 안에서만 쓴다
+"""
+
+
+class HttpPool:
+    """공유 httpx 클라이언트 (동기/비동기)"""
+
+    def __init__(self, max_connections: int = 200, max_keepalive: int = 50, timeout: float = 60.0):
+        import httpx
+
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self.client = httpx.Client(limits=limits, timeout=timeout)
+        self.async_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+
+    async def aclose(self):
+        await self.async_client.aclose()
+        self.client.close()
+
+
+def pooled_chat_openai(pool: HttpPool, **options):
+    """pool의 연결을 쓰는 ChatOpenAI"""
+    from .factory import chat_openai
+    return chat_openai(http_client=pool.client, http_async_client=pool.async_client, **options)
+
+
+def pooled_tavily_search(pool: HttpPool, max_results: int = 2):
+    """pool의 연결을 쓰는 TavilySearchResults"""
+    from langchain_community.tools.tavily_search import TavilySearchResults
+    from langchain_community.utilities.tavily_search import TAVILY_API_URL, TavilySearchAPIWrapper
+    from pydantic import ConfigDict
+
+    from .factory import load_env
+
+    class PooledTavilySearchAPIWrapper(TavilySearchAPIWrapper):
+        """raw_results / raw_results_async가 공유 httpx 클라이언트로 요청한다"""
+        model_config = ConfigDict(extra="forbid", arbitrary_types_allowed=True)
+
+        def _params(self, query, *args, **kwargs):
+            # TavilySearchResults는 인자를 위치 인자로 넘긴다 (원래 raw_results와 같은 순서)
+            names = [
+                "max_results", "search_depth", "include_domains", "exclude_domains",
+                "include_answer", "include_raw_content", "include_images",
+            ]
+            return {
+                "api_key": self.tavily_api_key.get_secret_value(),
+                "query": query,
+                **dict(zip(names, args)),
+                **kwargs,
+            }
+
+        def raw_results(self, query, *args, **kwargs):
+            response = pool.client.post(f"{TAVILY_API_URL}/search", json=self._params(query, *args, **kwargs))
+            response.raise_for_status()
+            return response.json()
+
+        async def raw_results_async(self, query, *args, **kwargs):
+            response = await pool.async_client.post(
+                f"{TAVILY_API_URL}/search", json=self._params(query, *args, **kwargs)
+            )
+            if response.status_code != 200:
+                raise Exception(f"Error {response.status_code}: {response.reason_phrase}")
+            return response.json()
+
+    load_env()
+    return TavilySearchResults(max_results=max_results, api_wrapper=PooledTavilySearchAPIWrapper())
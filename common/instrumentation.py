@@ -0,0 +1,423 @@
+"""
+컴파일된 그래프의 노드별 실행 시간/토큰 수/상태 크기 계측 (선택 기능)
+
+    metrics = GraphMetrics(jsonl_path="metrics.jsonl")
+    graph = setup_graph(metrics=metrics)     # setup_graph 안에서 instrument_graph(graph, metrics)
+    serve_metrics(metrics, port=9464)        # http://127.0.0.1:9464/metrics (Prometheus 텍스트 형식)
+    print_metrics(metrics)
+
+- 노드 실행 한 번마다 실행 시간, LLM 입력/출력 토큰 수, 노드 입력 상태 크기(직렬화 바이트)를 기록한다
+- tools_condition/should_continue 같은 라우팅 함수와 체크포인터 호출(put/put_writes/get_tuple)도 따로 잰다
+- 노드별, thread_id별로 p50/p95/p99를 구할 수 있는 스트리밍 히스토그램을 유지한다
+  (값을 모두 저장하지 않고 로그 간격 버킷에 개수만 센다)
+- thread_id별 히스토그램(과 Prometheus thread_id 레이블)은 최근에 기록된 max_threads개만 유지한다 (LRU).
+  대화 수만큼 시계열이 늘어나지 않게 하려는 것이다. max_threads=0이면 thread_id별 집계를 하지 않는다
+- 기록은 JSONL 파일로 남기고, 집계는 Prometheus 텍스트 형식으로 내보낸다
+- metrics=None이면 그래프를 전혀 바꾸지 않으므로 꺼져 있을 때 오버헤드가 없다
+"""
+import json
+import math
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from .compaction import count_tokens
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class StreamingHistogram:
+    """
+    로그 간격 버킷 히스토그램 (상대 오차 약 9% 이내로 분위수를 추정한다)
+    - 버킷 경계: lowest * growth^i
+    - 버킷은 값이 들어온 것만 dict로 유지한다
+    """
+
+    def __init__(self, lowest: float = 1e-6, growth: float = 2 ** 0.125):
+        self.lowest = lowest
+        self.log_growth = math.log(growth)
+        self.buckets = defaultdict(int)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        index = 0 if value <= self.lowest else math.ceil(math.log(value / self.lowest) / self.log_growth)
+        self.buckets[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """q 분위수 추정값 (해당 버킷의 상한, 단 관측한 최댓값을 넘지 않는다)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.lowest * math.exp(index * self.log_growth), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            **{f"p{round(q * 100)}": self.quantile(q) for q in QUANTILES},
+            "max": self.max,
+        }
+
+
+class GraphMetrics:
+    """노드 실행 기록을 모아 히스토그램으로 집계하고 JSONL/Prometheus로 내보낸다"""
+
+    def __init__(self, jsonl_path: str | None = None, state_size: bool = True, max_threads: int = 100):
+        self.lock = threading.Lock()
+        self.state_size = state_size
+        self.max_threads = max_threads
+        self.serde = JsonPlusSerializer()
+        # kind별(node/route/checkpoint) 이름 -> 히스토그램
+        self.durations = defaultdict(lambda: defaultdict(StreamingHistogram))
+        # thread_id -> 노드 실행 시간 히스토그램 (최근에 기록된 max_threads개, 오래된 것부터 버린다)
+        self.threads = OrderedDict()
+        self.evicted_threads = 0
+        self.state_bytes = defaultdict(StreamingHistogram)
+        self.tokens = defaultdict(lambda: {"in": 0, "out": 0})
+        self.errors = defaultdict(int)
+        # 이름 -> (설명, 형식, 현재 값을 돌려주는 함수): 다른 모듈이 내보내는 값 (예: 체크포인터 메모리 사용량)
+        self.gauges = {}
+        self.jsonl = open(jsonl_path, "a", encoding="utf-8") if jsonl_path else None
+        self.handler = MetricsCallbackHandler(self)
+
+    def measure_state(self, state) -> int:
+        """노드 입력 상태를 체크포인트와 같은 방식으로 직렬화했을 때의 크기(바이트)"""
+        if not self.state_size:
+            return 0
+        try:
+            return len(self.serde.dumps_typed(state)[1])
+        except Exception:
+            return 0
+
+    def record(self, kind: str, name: str, duration: float, thread_id: str | None = None,
+               tokens_in: int = 0, tokens_out: int = 0, state_bytes: int = 0, error: str | None = None):
+        thread_id = thread_id or "-"
+        with self.lock:
+            self.durations[kind][name].add(duration)
+            if kind == "node":
+                if self.max_threads > 0:
+                    self._thread_histogram(thread_id).add(duration)
+                self.tokens[name]["in"] += tokens_in
+                self.tokens[name]["out"] += tokens_out
+                if state_bytes:
+                    self.state_bytes[name].add(state_bytes)
+            if error:
+                self.errors[(kind, name)] += 1
+            if self.jsonl is not None:
+                self.jsonl.write(json.dumps({
+                    "ts": time.time(),
+                    "kind": kind,
+                    "name": name,
+                    "thread_id": thread_id,
+                    "duration": duration,
+                    "tokens_in": tokens_in,
+                    "tokens_out": tokens_out,
+                    "state_bytes": state_bytes,
+                    "error": error,
+                }, ensure_ascii=False) + "\n")
+                self.jsonl.flush()
+
+    def _thread_histogram(self, thread_id: str) -> StreamingHistogram:
+        """lock 안에서: thread_id의 히스토그램 (max_threads를 넘으면 가장 오래 기록이 없던 thread를 버린다)"""
+        histogram = self.threads.get(thread_id)
+        if histogram is not None:
+            self.threads.move_to_end(thread_id)
+            return histogram
+        histogram = self.threads[thread_id] = StreamingHistogram()
+        while len(self.threads) > self.max_threads:
+            self.threads.popitem(last=False)
+            self.evicted_threads += 1
+        return histogram
+
+    def add_gauge(self, metric: str, help_text: str, read, kind: str = "gauge"):
+        """/metrics에 read()의 현재 값을 함께 내보낸다 (kind: gauge 또는 counter)"""
+        with self.lock:
+            self.gauges[metric] = (help_text, kind, read)
+
+    def snapshot(self) -> dict:
+        """집계 결과를 dict로 돌려준다"""
+        with self.lock:
+            return {
+                kind: {name: histogram.summary() for name, histogram in histograms.items()}
+                for kind, histograms in self.durations.items()
+            } | {
+                "threads": {thread_id: histogram.summary() for thread_id, histogram in self.threads.items()},
+                "state_bytes": {name: histogram.summary() for name, histogram in self.state_bytes.items()},
+                "tokens": {name: dict(tokens) for name, tokens in self.tokens.items()},
+            }
+
+    def prometheus_text(self) -> str:
+        """Prometheus 텍스트 형식(summary/counter)으로 집계를 내보낸다"""
+        lines = []
+
+        def summary(metric, help_text, label, histograms):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} summary")
+            for key, histogram in sorted(histograms.items()):
+                labels = f'{label}="{_escape(key)}"'
+                for q in QUANTILES:
+                    lines.append(f'{metric}{{{labels},quantile="{q}"}} {histogram.quantile(q):.9g}')
+                lines.append(f"{metric}_sum{{{labels}}} {histogram.sum:.9g}")
+                lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+
+        with self.lock:
+            summary("langgraph_node_duration_seconds", "Node execution time", "node",
+                    self.durations.get("node", {}))
+            summary("langgraph_route_duration_seconds", "Conditional edge (router) execution time", "route",
+                    self.durations.get("route", {}))
+            summary("langgraph_checkpoint_duration_seconds", "Checkpointer call time", "method",
+                    self.durations.get("checkpoint", {}))
+            if self.max_threads > 0:
+                summary("langgraph_thread_node_duration_seconds",
+                        f"Node execution time per thread (last {self.max_threads} active threads)", "thread_id",
+                        self.threads)
+                lines.append("# HELP langgraph_thread_series_evicted_total Per-thread series dropped by the LRU cap")
+                lines.append("# TYPE langgraph_thread_series_evicted_total counter")
+                lines.append(f"langgraph_thread_series_evicted_total {self.evicted_threads}")
+            summary("langgraph_node_state_bytes", "Serialized node input state size", "node",
+                    self.state_bytes)
+
+            lines.append("# HELP langgraph_node_tokens_total LLM tokens per node")
+            lines.append("# TYPE langgraph_node_tokens_total counter")
+            for name, tokens in sorted(self.tokens.items()):
+                for direction in ("in", "out"):
+                    lines.append(
+                        f'langgraph_node_tokens_total{{node="{_escape(name)}",direction="{direction}"}} {tokens[direction]}'
+                    )
+
+            lines.append("# HELP langgraph_errors_total Failed or interrupted invocations")
+            lines.append("# TYPE langgraph_errors_total counter")
+            for (kind, name), count in sorted(self.errors.items()):
+                lines.append(f'langgraph_errors_total{{kind="{kind}",name="{_escape(name)}"}} {count}')
+
+            for metric, (help_text, kind, read) in sorted(self.gauges.items()):
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} {kind}")
+                lines.append(f"{metric} {read()}")
+
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        if self.jsonl is not None:
+            self.jsonl.close()
+            self.jsonl = None
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _is_node_run(tags) -> bool:
+    return any(tag.startswith("graph:step:") for tag in tags or ())
+
+
+def _is_route_run(tags) -> bool:
+    # 노드 뒤에 붙는 writer 중 ChannelWrite(숨김)가 아닌 것이 조건부 엣지 함수다
+    tags = tags or ()
+    return "langsmith:hidden" not in tags and any(tag.startswith("seq:step:") for tag in tags)
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """그래프 실행 콜백에서 노드/라우팅 실행 시간과 LLM 토큰 수를 모은다"""
+    run_inline = True
+
+    def __init__(self, metrics: GraphMetrics):
+        self.metrics = metrics
+        self.lock = threading.Lock()
+        # run_id -> 진행 중인 노드/라우팅 실행 정보
+        self.runs = {}
+        # 노드 안에서 시작한 하위 실행 run_id -> 부모 run_id (LLM 토큰을 노드에 합산하기 위해)
+        self.parents = {}
+        # LLM run_id -> 입력 토큰 추정값
+        self.prompts = {}
+
+    def _node_of(self, run_id):
+        """run_id에서 부모를 따라 올라가 속한 노드 실행을 찾는다"""
+        while run_id is not None:
+            run = self.runs.get(run_id)
+            if run is not None and run["kind"] == "node":
+                return run
+            run_id = self.parents.get(run_id)
+        return None
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node")
+        name = kwargs.get("name") or node
+        with self.lock:
+            if node is not None and name == node and _is_node_run(tags) and not node.startswith("__"):
+                kind = "node"
+            elif parent_run_id in self.runs and self.runs[parent_run_id]["kind"] == "node" and _is_route_run(tags):
+                kind = "route"
+            else:
+                if parent_run_id is not None and self._node_of(parent_run_id) is not None:
+                    self.parents[run_id] = parent_run_id
+                return
+            self.runs[run_id] = {
+                "kind": kind,
+                "name": name,
+                "thread_id": metadata.get("thread_id"),
+                "start": time.perf_counter(),
+                "tokens_in": 0,
+                "tokens_out": 0,
+            }
+        if kind == "node":
+            self.runs[run_id]["state_bytes"] = self.metrics.measure_state(inputs)
+
+    def _finish(self, run_id, error=None):
+        with self.lock:
+            self.parents.pop(run_id, None)
+            run = self.runs.pop(run_id, None)
+        if run is None:
+            return
+        self.metrics.record(
+            run["kind"],
+            run["name"],
+            time.perf_counter() - run["start"],
+            thread_id=run["thread_id"],
+            tokens_in=run["tokens_in"],
+            tokens_out=run["tokens_out"],
+            state_bytes=run.get("state_bytes", 0),
+            error=error,
+        )
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        # interrupt(GraphInterrupt)도 여기로 들어온다
+        self._finish(run_id, error=type(error).__name__)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        with self.lock:
+            if parent_run_id is None or self._node_of(parent_run_id) is None:
+                return
+            self.parents[run_id] = parent_run_id
+            self.prompts[run_id] = sum(count_tokens(batch) for batch in messages)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self.lock:
+            prompt_tokens = self.prompts.pop(run_id, 0)
+            node = self._node_of(run_id)
+            self.parents.pop(run_id, None)
+            if node is None:
+                return
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    usage = getattr(message, "usage_metadata", None)
+                    if usage:
+                        node["tokens_in"] += usage.get("input_tokens", 0)
+                        node["tokens_out"] += usage.get("output_tokens", 0)
+                    else:
+                        # 사용량을 알려주지 않는 모델은 추정값을 쓴다
+                        node["tokens_in"] += prompt_tokens
+                        node["tokens_out"] += count_tokens([message]) if message is not None else 0
+                        prompt_tokens = 0
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self.lock:
+            self.prompts.pop(run_id, None)
+            self.parents.pop(run_id, None)
+
+
+def instrument_checkpointer(saver: BaseCheckpointSaver, metrics: GraphMetrics):
+    """
+    체크포인터의 put / put_writes / get_tuple 호출 시간을 기록한다 (비동기 메서드도 이를 거친다)
+    그래프 여러 개가 같은 체크포인터를 쓰면 두 번째부터는 이미 감싼 것을 그대로 둔다 (호출이 두 번 기록되지 않게)
+    """
+    if getattr(saver, "_instrumented_by", None) is not None:
+        return saver
+
+    def wrap(method_name):
+        method = getattr(saver, method_name)
+
+        def timed(config, *args, **kwargs):
+            start = time.perf_counter()
+            error = None
+            try:
+                return method(config, *args, **kwargs)
+            except Exception as e:
+                error = type(e).__name__
+                raise
+            finally:
+                metrics.record(
+                    "checkpoint",
+                    method_name,
+                    time.perf_counter() - start,
+                    thread_id=config.get("configurable", {}).get("thread_id"),
+                    error=error,
+                )
+
+        setattr(saver, method_name, timed)
+
+    for method_name in ("put", "put_writes", "get_tuple"):
+        wrap(method_name)
+    saver._instrumented_by = metrics
+    return saver
+
+
+def instrument_graph(graph, metrics: GraphMetrics | None):
+    """metrics가 주어지면 콜백과 체크포인터 계측을 붙인 그래프를, 없으면 그래프를 그대로 돌려준다"""
+    if metrics is None:
+        return graph
+    if isinstance(graph.checkpointer, BaseCheckpointSaver):
+        instrument_checkpointer(graph.checkpointer, metrics)
+    return graph.with_config(callbacks=[metrics.handler])
+
+
+def serve_metrics(metrics: GraphMetrics, port: int = 9464, host: str = "127.0.0.1"):
+    """/metrics 경로로 Prometheus 텍스트를 내보내는 HTTP 서버를 백그라운드 스레드로 띄운다"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def print_metrics(metrics: GraphMetrics):
+    """노드/라우팅/체크포인트 실행 시간 분위수를 출력한다"""
+    snapshot = metrics.snapshot()
+    print("\n" + "="*50)
+    print("⏱️ 노드별 실행 시간")
+    print("="*50)
+    for kind, title in [("node", "노드"), ("route", "라우팅"), ("checkpoint", "체크포인트")]:
+        for name, stats in sorted(snapshot.get(kind, {}).items()):
+            line = (
+                f"- [{title}] {name}: {stats['count']}회, p50 {stats['p50'] * 1000:.1f}ms"
+                f" / p95 {stats['p95'] * 1000:.1f}ms / p99 {stats['p99'] * 1000:.1f}ms"
+            )
+            if kind == "node":
+                tokens = snapshot["tokens"].get(name, {"in": 0, "out": 0})
+                line += f", 토큰 {tokens['in']}→{tokens['out']}"
+            print(line)
@@ -0,0 +1,263 @@
+"""
+llm_with_tools.invoke 앞에 두는 로컬 LLM 응답 캐시
+
+같은 질문 목록을 반복 실행하는 테스트 스위트에서 모델 왕복 시간을 줄인다.
+
+    cache = LLMCache(maxsize=1024, path="llm_cache.sqlite", ttl=24 * 3600)
+    llm_with_tools = CachedModel(llm.bind_tools(tools), cache)
+
+- 캐시 키: 메시지 목록(id 제외) + 바인딩된 도구 스키마 + 모델 파라미터의 정규화 해시
+- 1단계: 메모리 LRU, 2단계: SQLite 파일 (TTL 적용)
+- temperature가 0이 아닌 모델은 allow_nonzero_temperature=True일 때만 캐시한다
+- cache.stats()로 hit/miss 수와 절약한 모델 시간을 확인한다
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from langchain_core.messages import convert_to_messages, messages_from_dict, messages_to_dict
+
+
+def _canonical_message(message) -> dict:
+    # id, tool_call_id처럼 실행마다 달라지는 값은 키에서 뺀다
+    return {
+        "type": message.type,
+        "content": message.content,
+        "name": getattr(message, "name", None),
+        "tool_calls": [
+            {"name": tool_call["name"], "args": tool_call["args"]}
+            for tool_call in getattr(message, "tool_calls", None) or []
+        ],
+    }
+
+
+def _unwrap(model):
+    """RunnableBinding(bind_tools 결과)에서 (실제 모델, 바인딩 kwargs)를 꺼낸다"""
+    kwargs = {}
+    while hasattr(model, "bound") and hasattr(model, "kwargs"):
+        kwargs = {**model.kwargs, **kwargs}
+        model = model.bound
+    return model, kwargs
+
+
+def model_params(model) -> dict:
+    """캐시 키에 들어갈 모델 파라미터 (모델 이름, temperature 등)"""
+    base, _ = _unwrap(model)
+    params = getattr(base, "_identifying_params", None)
+    return dict(params) if params else {"class": type(base).__name__}
+
+
+def cache_key(messages, model) -> str:
+    _, bound_kwargs = _unwrap(model)
+    payload = {
+        "messages": [_canonical_message(m) for m in convert_to_messages(messages)],
+        "tools": bound_kwargs.get("tools"),
+        "tool_choice": bound_kwargs.get("tool_choice"),
+        "params": model_params(model),
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """메모리 LRU + 디스크(SQLite, TTL) 2단계 응답 캐시"""
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        path: str | None = None,
+        ttl: float | None = None,
+        allow_nonzero_temperature: bool = False,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.allow_nonzero_temperature = allow_nonzero_temperature
+        self.lock = threading.Lock()
+        # key -> (저장 시각, 직렬화된 메시지, 원래 모델 지연 시간)
+        self.memory = OrderedDict()
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "saved_seconds": 0.0,
+        }
+
+        self.conn = None
+        if path:
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, created REAL, value TEXT, latency REAL)"
+            )
+            self.conn.commit()
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def get(self, key: str):
+        """(메시지, 원래 지연 시간) 또는 None"""
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry and not self._expired(entry[0]):
+                self.memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                self.counters["saved_seconds"] += entry[2]
+                return messages_from_dict([entry[1]])[0], entry[2]
+            if entry:
+                del self.memory[key]
+
+            if self.conn is not None:
+                row = self.conn.execute(
+                    "SELECT created, value, latency FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row and not self._expired(row[0]):
+                    created, value, latency = row[0], json.loads(row[1]), row[2]
+                    self._remember(key, (created, value, latency))
+                    self.counters["disk_hits"] += 1
+                    self.counters["saved_seconds"] += latency
+                    return messages_from_dict([value])[0], latency
+                if row:
+                    self.conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self.conn.commit()
+
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, key: str, message, latency: float):
+        value = messages_to_dict([message])[0]
+        created = time.time()
+        with self.lock:
+            self._remember(key, (created, value, latency))
+            if self.conn is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, created, value, latency) VALUES (?, ?, ?, ?)",
+                    (key, created, json.dumps(value, ensure_ascii=False), latency),
+                )
+                self.conn.commit()
+
+    def _remember(self, key, entry):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    def record_bypass(self):
+        with self.lock:
+            self.counters["bypassed"] += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            lookups = hits + self.counters["misses"]
+            return {
+                **self.counters,
+                "hits": hits,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self.memory),
+            }
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+            if self.conn is not None:
+                self.conn.execute("DELETE FROM llm_cache")
+                self.conn.commit()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+def _fresh_copy(message):
+    """
+    캐시된 응답을 새 메시지로 복사한다
+    - id를 비워서 add_messages가 이전 메시지를 덮어쓰지 않게 한다
+    - tool_call id를 새로 만들어 대화 안에서 중복되지 않게 한다
+    """
+    tool_calls = getattr(message, "tool_calls", None) or []
+    if not tool_calls:
+        return message.model_copy(update={"id": None})
+
+    id_map = {tool_call["id"]: f"call_{uuid.uuid4().hex[:24]}" for tool_call in tool_calls}
+    additional_kwargs = dict(message.additional_kwargs)
+    if "tool_calls" in additional_kwargs:
+        additional_kwargs["tool_calls"] = [
+            {**raw, "id": id_map.get(raw.get("id"), raw.get("id"))}
+            for raw in additional_kwargs["tool_calls"]
+        ]
+    return message.model_copy(update={
+        "id": None,
+        "tool_calls": [{**tool_call, "id": id_map[tool_call["id"]]} for tool_call in tool_calls],
+        "additional_kwargs": additional_kwargs,
+    })
+
+
+class CachedModel:
+    """
+    llm_with_tools를 감싸 invoke/ainvoke 결과를 LLMCache에 저장한다
+    그 밖의 속성/메서드는 원래 모델로 넘긴다
+    """
+
+    def __init__(self, model, cache: LLMCache):
+        self.model = model
+        self.cache = cache
+        base, _ = _unwrap(model)
+        temperature = getattr(base, "temperature", None)
+        # temperature가 0이 아니면 같은 입력에도 응답이 달라야 하므로 기본적으로 캐시하지 않는다
+        self.cacheable = (
+            cache.allow_nonzero_temperature or temperature is None or temperature == 0
+        )
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def invoke(self, messages, config=None, **kwargs):
+        if not self.cacheable or kwargs:
+            self.cache.record_bypass()
+            return self.model.invoke(messages, config, **kwargs)
+
+        key = cache_key(messages, self.model)
+        if (cached := self.cache.get(key)) is not None:
+            return _fresh_copy(cached[0])
+
+        start = time.perf_counter()
+        response = self.model.invoke(messages, config)
+        self.cache.put(key, response, time.perf_counter() - start)
+        return response
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        if not self.cacheable or kwargs:
+            self.cache.record_bypass()
+            return await self.model.ainvoke(messages, config, **kwargs)
+
+        key = cache_key(messages, self.model)
+        if (cached := self.cache.get(key)) is not None:
+            return _fresh_copy(cached[0])
+
+        start = time.perf_counter()
+        response = await self.model.ainvoke(messages, config)
+        self.cache.put(key, response, time.perf_counter() - start)
+        return response
+
+
+def with_cache(model, cache: LLMCache | None):
+    """cache가 주어지면 CachedModel로 감싸고, 없으면 모델을 그대로 돌려준다"""
+    return CachedModel(model, cache) if cache is not None else model
+
+
+def print_cache_stats(cache: LLMCache):
+    """캐시 적중률과 절약한 모델 시간을 출력한다"""
+    stats = cache.stats()
+    print("\n" + "="*50)
+    print("💾 LLM 캐시 통계")
+    print("="*50)
+    print(f"- 적중: {stats['hits']} (메모리 {stats['memory_hits']}, 디스크 {stats['disk_hits']})")
+    print(f"- 미적중: {stats['misses']}, 캐시 우회: {stats['bypassed']}")
+    print(f"- 적중률: {stats['hit_rate']:.1%}")
+    print(f"- 절약한 모델 시간: {stats['saved_seconds']:.2f}s")
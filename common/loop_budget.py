@@ -0,0 +1,227 @@
+"""
+chatbot ↔ tools 루프의 턴별 예산 (반복 횟수, 도구 실행 시간, 토큰 수)
+
+    budget = LoopBudget(max_iterations=4, max_tool_seconds=20, max_tokens=8000)
+    graph = build_chat_graph(State, tools, llm, budget=budget)
+    ...
+    print_budget_stats(budget)
+
+- 모델이 계속 도구를 부르면 tools → chatbot 엣지 때문에 recursion limit까지 돌면서
+  지연 시간과 API 사용량을 쓴다
+- 예산은 마지막 사람 질문 뒤의 메시지(이번 턴)만 보고 계산하므로 상태 스키마를 바꾸지 않는다
+  - 반복 횟수: 도구를 호출한 AIMessage 수
+  - 도구 실행 시간: tools 노드가 ToolMessage.response_metadata["tool_seconds"]에 남긴 시간의 합
+  - 토큰 수: AIMessage의 usage_metadata (없으면 approx_tokens로 추정한 프롬프트 + 응답)
+- 예산을 다 쓴 뒤 모델이 또 도구를 부르면 tools 대신 finalize 노드로 가서,
+  실행하지 않은 도구 호출에 "예산 초과" 결과를 채우고 도구 없는 모델로 지금까지의 정보로 답한다
+- 비동기 실행에서는 남은 도구 시간이 지나면 실행 중인 도구 작업을 취소한다
+  (동기 실행에서는 스레드에서 도는 도구를 멈출 수 없으므로 시간만 기록한다)
+"""
+import asyncio
+import threading
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langgraph.graph import END
+from langgraph.types import Send
+
+from .compaction import approx_tokens, with_summary
+
+# route_tool_calls의 Send 입력에 남은 도구 시간을 실어 보내는 키 (Send 입력에는 전체 대화가 없다)
+TOOL_BUDGET_KEY = "tool_budget_seconds"
+
+FINAL_INSTRUCTION = (
+    "이번 질문에 쓸 수 있는 도구 호출 예산을 모두 썼습니다. 도구를 더 호출하지 말고 "
+    "지금까지 얻은 정보만으로 답하세요. 부족한 부분이 있으면 그렇다고 알려 주세요."
+)
+
+
+def current_turn(messages) -> list:
+    """마지막 사람 질문 뒤의 메시지 (이번 턴에 추가된 메시지)"""
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], HumanMessage):
+            return messages[index + 1:]
+    return list(messages)
+
+
+def _pending_tool_calls(state) -> list:
+    messages = state["messages"] if isinstance(state, dict) else state
+    last = messages[-1] if messages else None
+    return (getattr(last, "tool_calls", None) or []) if isinstance(last, AIMessage) else []
+
+
+class LoopBudget:
+    """턴 하나에서 chatbot ↔ tools 루프가 쓸 수 있는 반복 횟수/도구 시간/토큰 수"""
+
+    REASONS = ("iterations", "tool_seconds", "tokens")
+
+    def __init__(self, max_iterations: int | None = 5, max_tool_seconds: float | None = None,
+                 max_tokens: int | None = None, token_counter=approx_tokens):
+        # None인 항목은 제한하지 않는다
+        self.max_iterations = max_iterations
+        self.max_tool_seconds = max_tool_seconds
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter
+        self.lock = threading.Lock()
+        self.counters = {
+            "finalized": 0,
+            **{reason: 0 for reason in self.REASONS},
+            "tool_timeouts": 0,
+        }
+
+    def usage(self, messages) -> dict:
+        """이번 턴에 쓴 반복 횟수, 도구 실행 시간(초), 토큰 수"""
+        turn = current_turn(messages)
+        offset = len(messages) - len(turn)
+        prompt_tokens = sum(self.token_counter(message) for message in messages[:offset])
+        iterations, tool_seconds, tokens = 0, 0.0, 0
+        for message in turn:
+            size = self.token_counter(message)
+            if isinstance(message, AIMessage):
+                iterations += bool(message.tool_calls)
+                usage = message.usage_metadata or {}
+                tokens += usage.get("total_tokens") or prompt_tokens + size
+            elif isinstance(message, ToolMessage):
+                tool_seconds += message.response_metadata.get("tool_seconds", 0.0)
+            prompt_tokens += size
+        return {"iterations": iterations, "tool_seconds": tool_seconds, "tokens": tokens}
+
+    def exhausted(self, messages) -> str | None:
+        """예산을 넘었으면 그 이유 (iterations / tool_seconds / tokens), 아니면 None"""
+        usage = self.usage(messages)
+        if self.max_iterations is not None and usage["iterations"] > self.max_iterations:
+            return "iterations"
+        if self.max_tool_seconds is not None and usage["tool_seconds"] >= self.max_tool_seconds:
+            return "tool_seconds"
+        if self.max_tokens is not None and usage["tokens"] >= self.max_tokens:
+            return "tokens"
+        return None
+
+    def router(self, router, tools_node: str = "tools"):
+        """
+        chatbot 다음 조건부 엣지를 감싼다
+        - 예산을 넘은 뒤의 도구 호출은 finalize로 보낸다
+        - route_tool_calls가 돌려준 Send에는 남은 도구 시간을 실어 보낸다
+        """
+        def route(state):
+            messages = state["messages"]
+            if _pending_tool_calls(messages) and (reason := self.exhausted(messages)) is not None:
+                with self.lock:
+                    self.counters["finalized"] += 1
+                    self.counters[reason] += 1
+                return "finalize"
+            destination = router(state)
+            if self.max_tool_seconds is None or not isinstance(destination, list):
+                return destination
+            remaining = self.max_tool_seconds - self.usage(messages)["tool_seconds"]
+            return [
+                Send(send.node, {**send.arg, TOOL_BUDGET_KEY: remaining})
+                if send.node == tools_node and isinstance(send.arg, dict) else send
+                for send in destination
+            ]
+        return route
+
+    def _remaining_tool_seconds(self, state) -> float | None:
+        if self.max_tool_seconds is None:
+            return None
+        if TOOL_BUDGET_KEY in state:
+            return state[TOOL_BUDGET_KEY]
+        return self.max_tool_seconds - self.usage(state["messages"])["tool_seconds"]
+
+    @staticmethod
+    def _stamp(result, seconds: float):
+        """tools 노드가 만든 ToolMessage에 실행 시간을 나눠 남긴다"""
+        messages = result.get("messages", []) if isinstance(result, dict) else []
+        tool_messages = [message for message in messages if isinstance(message, ToolMessage)]
+        for message in tool_messages:
+            message.response_metadata["tool_seconds"] = seconds / len(tool_messages)
+        return result
+
+    def _timed_out(self, state, seconds: float) -> dict:
+        with self.lock:
+            self.counters["tool_timeouts"] += 1
+        return {"messages": [
+            ToolMessage(
+                content=f"도구 실행 시간 예산({self.max_tool_seconds:g}초)을 넘어 중단했습니다.",
+                tool_call_id=tool_call["id"],
+                name=tool_call["name"],
+                status="error",
+                response_metadata={"tool_seconds": seconds / max(len(_pending_tool_calls(state)), 1)},
+            )
+            for tool_call in _pending_tool_calls(state)
+        ]}
+
+    def wrap_tools(self, tool_node):
+        """tools 노드를 감싸 실행 시간을 기록하고, 비동기 실행에서는 남은 도구 시간이 지나면 취소한다"""
+        from langgraph.utils.runnable import RunnableCallable, coerce_to_runnable
+
+        # example3의 approved_tools처럼 함수로 된 tools 노드도 받는다
+        tool_node = coerce_to_runnable(tool_node, name="tools", trace=False)
+
+        def tools(state, config):
+            start = time.perf_counter()
+            result = tool_node.invoke(state, config)
+            return self._stamp(result, time.perf_counter() - start)
+
+        async def atools(state, config):
+            start = time.perf_counter()
+            remaining = self._remaining_tool_seconds(state)
+            try:
+                result = await asyncio.wait_for(
+                    tool_node.ainvoke(state, config), None if remaining is None else max(remaining, 0.0)
+                )
+            except asyncio.TimeoutError:
+                return self._timed_out(state, time.perf_counter() - start)
+            return self._stamp(result, time.perf_counter() - start)
+
+        return RunnableCallable(tools, atools, name="tools")
+
+    def finalize_node(self, llm, prompt=with_summary):
+        """예산을 다 쓴 턴을 도구 없는 모델의 답변으로 마무리하는 노드 (prompt: 상태 → 모델에 보낼 메시지)"""
+        from langgraph.utils.runnable import RunnableCallable
+
+        def skipped(state) -> list:
+            # 실행하지 않은 도구 호출에도 결과를 채워야 다음 모델 호출이 유효하다
+            return [
+                ToolMessage(
+                    content="도구 호출 예산을 모두 써서 실행하지 않았습니다.",
+                    tool_call_id=tool_call["id"],
+                    name=tool_call["name"],
+                    status="error",
+                )
+                for tool_call in _pending_tool_calls(state)
+            ]
+
+        def finalize(state):
+            results = skipped(state)
+            message = llm.invoke([SystemMessage(content=FINAL_INSTRUCTION), *prompt(state), *results])
+            return {"messages": [*results, message]}
+
+        async def afinalize(state):
+            results = skipped(state)
+            message = await llm.ainvoke([SystemMessage(content=FINAL_INSTRUCTION), *prompt(state), *results])
+            return {"messages": [*results, message]}
+
+        return RunnableCallable(finalize, afinalize, name="finalize")
+
+    def stats(self) -> dict:
+        with self.lock:
+            return dict(self.counters)
+
+
+def add_budget_nodes(graph_builder, budget: LoopBudget, llm, tool_node, prompt=with_summary):
+    """graph_builder에 예산이 적용된 tools 노드와 finalize 노드를 추가한다 (finalize → END)"""
+    graph_builder.add_node("tools", budget.wrap_tools(tool_node))
+    graph_builder.add_node("finalize", budget.finalize_node(llm, prompt))
+    graph_builder.add_edge("finalize", END)
+
+
+def print_budget_stats(budget: LoopBudget):
+    """예산 때문에 일찍 마무리한 턴 수를 출력한다"""
+    stats = budget.stats()
+    print("\n" + "="*50)
+    print("🧮 턴 예산 통계")
+    print("="*50)
+    print(f"- 예산 초과로 마무리한 턴: {stats['finalized']} (반복 {stats['iterations']}, "
+          f"도구 시간 {stats['tool_seconds']}, 토큰 {stats['tokens']})")
+    print(f"- 도구 시간 초과로 취소한 도구 실행: {stats['tool_timeouts']}")
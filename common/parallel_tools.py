@@ -0,0 +1,39 @@
+"""
+AIMessage 하나에 담긴 여러 도구 호출을 병렬로 실행하는 라우터
+
+tools_condition 대신 route_tool_calls를 쓰면 도구 호출 하나마다 Send로
+"tools" 노드 작업을 하나씩 만든다:
+
+    graph_builder.add_conditional_edges("chatbot", route_tool_calls, ["tools", END])
+
+- 같은 super-step 안의 작업이므로 동시에 실행된다
+  (동기 도구는 그래프 실행기 스레드 풀, 비동기 도구는 asyncio 작업)
+- 결과 ToolMessage는 tool_call 순서대로 messages에 추가된다
+- human_assistance처럼 interrupt를 거는 도구는 자기 작업만 멈춘다.
+  먼저 끝난 다른 도구의 결과는 체크포인트에 저장되어 재개할 때 다시 실행되지 않는다
+- 동시에 실행할 작업 수는 graph.with_config(max_concurrency=N)으로 제한한다
+"""
+from langchain_core.messages import AIMessage
+from langgraph.graph import END
+from langgraph.types import Send
+
+
+def route_tool_calls(state, tools_node: str = "tools", messages_key: str = "messages"):
+    """마지막 AIMessage의 도구 호출마다 Send를 하나씩 돌려준다 (없으면 END)"""
+    messages = state if isinstance(state, list) else state.get(messages_key, [])
+    if not messages:
+        return END
+
+    tool_calls = getattr(messages[-1], "tool_calls", None)
+    if not tool_calls:
+        return END
+
+    sends = []
+    for tool_call in tool_calls:
+        # ToolNode는 마지막 AIMessage의 tool_calls만 실행하므로 호출 하나만 담아 보낸다
+        request = [AIMessage(content="", tool_calls=[tool_call])]
+        sends.append(Send(
+            tools_node,
+            request if isinstance(state, list) else {**state, messages_key: request},
+        ))
+    return sends
@@ -0,0 +1,309 @@
+"""
+첫 LLM 호출과 동시에 검색을 미리 시작하는 추측(speculative) 검색 prefetch
+
+    prefetcher = SearchPrefetcher()
+    tool = with_prefetch(with_search_cache(search_tool, search_cache), prefetcher)
+    graph = build_chat_graph(State, [tool], llm, prefetch=prefetcher)
+    ...
+    print_prefetch_stats(prefetcher)
+
+- "2025년 IT 최신 트렌드를 알려줘" 같은 질문은 chatbot(LLM) → tools(검색) → chatbot(LLM)이
+  차례로 실행되어 검색 시간이 그대로 턴 지연에 더해진다
+- chatbot은 사람의 새 질문이 검색이 필요해 보이면(common.fast_path.needs_tools)
+  질문 원문으로 검색을 시작해 두고 LLM을 호출한다
+- LLM이 낸 검색 도구 호출의 query가 질문 원문과 비슷하면(글자 bigram 포함률 >= min_similarity)
+  그 query로 prefetch 결과를 등록하고, 검색 도구(PrefetchedSearchTool)는 검색 대신 그 결과를 쓴다
+- 등록 key는 실행 config의 (thread_id, checkpoint_ns, 정규화한 query)이다.
+  같은 질문이라도 다른 대화(테넌트)가 시작한 prefetch는 가져가지 않는다
+- 가져간 prefetch가 그사이 취소됐으면 원래 검색 도구를 호출한다
+- 도구 호출이 없거나 비슷한 query가 없으면 prefetch를 취소한다
+  (동기 실행에서 이미 시작된 검색은 끝까지 실행되지만 결과는 버린다)
+- 같은 대화에서 chatbot이 다시 불리면 앞 단계의 tools 노드는 끝났으므로 가져가지 않은 prefetch를 취소한다.
+  대화가 다시 오지 않아도 max_age가 지난 prefetch는 다른 대화의 chatbot이 불릴 때 취소된다
+- 동기 실행의 검색은 chatbot 노드의 contextvar(콜백, config)를 복사해 작업 스레드에서 실행한다
+- stats()로 적중률과 절약한 검색 시간을 확인한다
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from langgraph.constants import NS_SEP
+from pydantic import ConfigDict
+
+from .fast_path import needs_tools
+from .search_cache import normalize_query
+
+
+def _bigrams(text: str) -> set:
+    compact = "".join(normalize_query(text).split())
+    return {compact[i:i + 2] for i in range(len(compact) - 1)} or ({compact} if compact else set())
+
+
+def query_similarity(query: str, text: str) -> float:
+    """검색 query의 글자 bigram 중 질문 원문에도 있는 비율 (0~1)"""
+    wanted = _bigrams(query)
+    return len(wanted & _bigrams(text)) / len(wanted) if wanted else 0.0
+
+
+def run_scope(config) -> tuple:
+    """실행 config의 (thread_id, 그래프 checkpoint_ns): prefetch를 시작한 대화만 결과를 가져가게 한다"""
+    configurable = (config or {}).get("configurable", {})
+    # 노드 안의 checkpoint_ns는 "노드:task_id"로 끝나므로 (chatbot과 tools가 다르다) 그래프 namespace만 남긴다
+    checkpoint_ns = configurable.get("checkpoint_ns", "").rpartition(NS_SEP)[0]
+    return configurable.get("thread_id"), checkpoint_ns
+
+
+@dataclass
+class _Prefetch:
+    """진행 중이거나 끝난 prefetch 하나"""
+    text: str
+    task: Future | asyncio.Task
+    scope: tuple = (None, "")
+    started: float = field(default_factory=time.perf_counter)
+    finished: float | None = None
+    registered: float | None = None
+
+
+class SearchPrefetcher:
+    """질문 원문으로 검색을 미리 시작하고, 비슷한 도구 호출에 결과를 넘겨준다"""
+
+    def __init__(self, predict=needs_tools, min_similarity: float = 0.6, max_age: float = 60.0,
+                 max_workers: int = 8):
+        # predict(질문) -> 검색이 필요할 것 같은지
+        self.predict = predict
+        self.min_similarity = min_similarity
+        self.max_age = max_age
+        self.max_workers = max_workers
+        self.tool = None  # with_prefetch가 연결한다
+        self.executor = None
+        self.lock = threading.Lock()
+        # (thread_id, checkpoint_ns, 정규화한 query) -> 도구가 가져갈 prefetch 목록
+        self.ready = {}
+        self.counters = {
+            "turns": 0,
+            "started": 0,
+            "hits": 0,
+            "misses": 0,
+            "cancelled": 0,
+            "errors": 0,
+            "saved_seconds": 0.0,
+        }
+
+    def _question(self, state) -> str | None:
+        messages = state["messages"]
+        last = messages[-1] if messages else None
+        if not isinstance(last, HumanMessage) or not isinstance(last.content, str):
+            return None
+        with self.lock:
+            self.counters["turns"] += 1
+        if self.tool is None or not self.predict(last.content):
+            return None
+        return last.content
+
+    def _tool_call(self, query: str) -> dict:
+        return {"type": "tool_call", "name": self.tool.name, "args": {"query": query}, "id": "prefetch"}
+
+    def _track(self, prefetch: _Prefetch) -> _Prefetch:
+        def done(_):
+            prefetch.finished = time.perf_counter()
+        prefetch.task.add_done_callback(done)
+        with self.lock:
+            self.counters["started"] += 1
+        return prefetch
+
+    def start(self, state, config=None) -> _Prefetch | None:
+        """동기 실행: 검색이 필요해 보이면 스레드 풀에서 검색을 시작한다 (config: chatbot 노드의 실행 config)"""
+        self.release(config)
+        if (question := self._question(state)) is None:
+            return None
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="prefetch")
+        # 노드의 config(콜백, configurable)가 들어 있는 contextvar를 작업 스레드로 넘긴다
+        task = self.executor.submit(contextvars.copy_context().run, self.tool.invoke, self._tool_call(question))
+        return self._track(_Prefetch(question, task, run_scope(config)))
+
+    def astart(self, state, config=None) -> _Prefetch | None:
+        """비동기 실행: 검색이 필요해 보이면 이벤트 루프에서 검색 작업을 시작한다"""
+        self.release(config)
+        if (question := self._question(state)) is None:
+            return None
+        task = asyncio.ensure_future(self.tool.ainvoke(self._tool_call(question)))
+        return self._track(_Prefetch(question, task, run_scope(config)))
+
+    def resolve(self, prefetch: _Prefetch | None, message):
+        """LLM 응답의 검색 도구 호출 중 가장 비슷한 query에 prefetch를 넘기고, 없으면 취소한다"""
+        if prefetch is None:
+            return
+        best, best_score = None, self.min_similarity
+        for tool_call in getattr(message, "tool_calls", None) or []:
+            query = tool_call["args"].get("query") if tool_call["name"] == self.tool.name else None
+            if isinstance(query, str) and (score := query_similarity(query, prefetch.text)) >= best_score:
+                best, best_score = query, score
+        if best is None:
+            self._cancel(prefetch)
+            return
+        prefetch.registered = time.perf_counter()
+        with self.lock:
+            self.ready.setdefault((*prefetch.scope, normalize_query(best)), []).append(prefetch)
+
+    def _cancel(self, prefetch: _Prefetch):
+        prefetch.task.cancel()
+        with self.lock:
+            self.counters["cancelled"] += 1
+
+    def release(self, config=None):
+        """
+        config의 대화에서 도구가 가져가지 않은 prefetch를 취소한다 (max_age가 지난 다른 대화의 prefetch도)
+        chatbot이 다시 불렸으면 앞 단계의 tools 노드는 이미 끝났으므로 남은 prefetch는 쓰일 일이 없다
+        """
+        scope = run_scope(config)
+        with self.lock:
+            released = [
+                prefetch
+                for key in [key for key in self.ready if key[:2] == scope]
+                for prefetch in self.ready.pop(key)
+            ]
+        for prefetch in released:
+            self._cancel(prefetch)
+        self._expire()
+
+    def _expire(self):
+        """max_age가 지나도 도구가 가져가지 않은 prefetch를 취소한다"""
+        deadline = time.perf_counter() - self.max_age
+        expired = []
+        with self.lock:
+            for key in list(self.ready):
+                kept = [prefetch for prefetch in self.ready[key] if prefetch.registered >= deadline]
+                expired += [prefetch for prefetch in self.ready[key] if prefetch.registered < deadline]
+                if kept:
+                    self.ready[key] = kept
+                else:
+                    del self.ready[key]
+        for prefetch in expired:
+            self._cancel(prefetch)
+
+    def claim(self, query, config=None) -> _Prefetch | None:
+        """같은 대화(config)에서 query로 등록된 prefetch를 가져간다 (없으면 miss로 센다)"""
+        key = (*run_scope(config), normalize_query(query)) if isinstance(query, str) else None
+        with self.lock:
+            waiting = self.ready.get(key)
+            if waiting:
+                prefetch = waiting.pop(0)
+                if not waiting:
+                    del self.ready[key]
+                return prefetch
+            self.counters["misses"] += 1
+        return None
+
+    def record_hit(self, prefetch: _Prefetch, claimed: float):
+        with self.lock:
+            self.counters["hits"] += 1
+            # 도구가 결과를 찾기 전에 이미 진행된 검색 시간
+            self.counters["saved_seconds"] += min(prefetch.finished or claimed, claimed) - prefetch.started
+
+    def record_error(self):
+        with self.lock:
+            self.counters["errors"] += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            counters = dict(self.counters)
+        searches = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": counters["hits"] / searches if searches else 0.0,
+            "waste_rate": counters["cancelled"] / counters["started"] if counters["started"] else 0.0,
+        }
+
+
+class PrefetchedSearchTool(BaseTool):
+    """prefetch된 결과가 있으면 그것을 쓰고, 없으면 원래 검색 도구를 호출하는 도구"""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    tool: BaseTool
+    prefetcher: SearchPrefetcher
+
+    def __init__(self, tool: BaseTool, prefetcher: SearchPrefetcher, **kwargs):
+        super().__init__(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            response_format=tool.response_format,
+            tool=tool,
+            prefetcher=prefetcher,
+            **kwargs,
+        )
+
+    def _tool_call(self, kwargs) -> dict:
+        return {"type": "tool_call", "name": self.tool.name, "args": kwargs, "id": "prefetch"}
+
+    def _unpack(self, message):
+        if self.response_format == "content_and_artifact":
+            return message.content, message.artifact
+        return message.content
+
+    def _run(self, run_manager=None, config: RunnableConfig = None, **kwargs):
+        prefetch = self.prefetcher.claim(kwargs.get("query"), config)
+        if prefetch is not None:
+            claimed = time.perf_counter()
+            try:
+                if isinstance(prefetch.task, Future):
+                    message = prefetch.task.result()
+                    self.prefetcher.record_hit(prefetch, claimed)
+                    return self._unpack(message)
+                # 비동기 실행에서 시작한 prefetch는 이 스레드에서 기다릴 수 없다
+                self.prefetcher._cancel(prefetch)
+            except Exception:
+                # concurrent.futures.CancelledError(취소된 prefetch)도 여기서 원래 검색으로 넘어간다
+                self.prefetcher.record_error()
+        return self._unpack(self.tool.invoke(self._tool_call(kwargs)))
+
+    async def _arun(self, run_manager=None, config: RunnableConfig = None, **kwargs):
+        prefetch = self.prefetcher.claim(kwargs.get("query"), config)
+        if prefetch is not None:
+            claimed = time.perf_counter()
+            task = prefetch.task
+            waiter = asyncio.wrap_future(task) if isinstance(task, Future) else task
+            try:
+                # asyncio.wait는 기다리는 작업이 취소돼도 CancelledError를 내지 않는다
+                # (이 도구 호출 자체가 취소됐을 때만 낸다)
+                await asyncio.wait({waiter})
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+            if waiter.cancelled():
+                self.prefetcher.record_error()
+            else:
+                try:
+                    message = waiter.result()
+                    self.prefetcher.record_hit(prefetch, claimed)
+                    return self._unpack(message)
+                except Exception:
+                    self.prefetcher.record_error()
+        return self._unpack(await self.tool.ainvoke(self._tool_call(kwargs)))
+
+
+def with_prefetch(tool: BaseTool, prefetcher: SearchPrefetcher | None) -> BaseTool:
+    """prefetcher가 주어지면 검색 도구를 연결하고 PrefetchedSearchTool로 감싼다 (없으면 그대로)"""
+    if prefetcher is None:
+        return tool
+    prefetcher.tool = tool
+    return PrefetchedSearchTool(tool, prefetcher)
+
+
+def print_prefetch_stats(prefetcher: SearchPrefetcher):
+    """검색 prefetch 적중률과 절약한 검색 시간을 출력한다"""
+    stats = prefetcher.stats()
+    print("\n" + "="*50)
+    print("🚀 검색 prefetch 통계")
+    print("="*50)
+    print(f"- 턴: {stats['turns']}, prefetch 시작: {stats['started']} (취소 {stats['cancelled']}, 오류 {stats['errors']})")
+    print(f"- 검색 호출: 적중 {stats['hits']}, 미적중 {stats['misses']}, 적중률 {stats['hit_rate']:.1%}")
+    print(f"- 절약한 검색 시간: {stats['saved_seconds']:.2f}s")
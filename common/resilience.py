@@ -0,0 +1,448 @@
+"""
+모델/검색 호출의 꼬리 지연(tail latency)을 줄이는 hedged 요청, 턴 마감 시간, 서킷 브레이커
+
+    policy = ResiliencePolicy(hedge_quantile=0.95, failure_threshold=5)
+    tool = with_resilience(search_tool, policy)
+    graph = build_chat_graph(State, [tool], llm, resilience=policy)
+    graph.invoke(inputs, with_deadline(config, 20))   # 이번 턴 전체(chatbot ↔ tools)를 20초 안에
+    ...
+    print_resilience_stats(policy)
+    policy.close()                                    # hedge 작업 스레드 정리 (with ResiliencePolicy() as policy: 도 된다)
+
+- hedged 요청: 호출이 최근 성공 지연의 p95(hedge_quantile)보다 오래 걸리면 같은 요청을 한 번 더 보내고
+  먼저 끝난 응답을 쓴다. 전체 호출 중 hedge 비율은 hedge_budget을 넘지 않는다
+  (느린 응답 하나가 턴 전체를 붙잡지 않게 하고, upstream이 전부 느릴 때 요청을 두 배로 늘리지 않는다)
+- 턴 마감 시간: with_deadline이 config["configurable"]["turn_deadline"]에 마감 시각을 넣으면
+  LangGraph가 같은 config를 모든 노드/도구에 넘기므로 chatbot ↔ tools 루프의 모든 호출이 같은 마감을 따른다.
+  남은 시간이 없으면 DeadlineExceeded를 낸다
+- 서킷 브레이커: failure_window초 안에 failure_threshold번 실패하면 reset_timeout초 동안
+  upstream을 호출하지 않고 바로 CircuitOpenError를 낸다. 그 뒤 한 번 시험 호출해서 성공하면 다시 닫는다
+- 백엔드(모델, 도구 이름)마다 지연 기록/브레이커를 따로 둔다
+
+동기 실행에서 진 요청(먼저 끝난 쪽이 아닌 요청)은 멈출 수 없어서 백그라운드에서 끝까지 실행된다.
+hedge 요청은 콜백 없이 실행되므로 토큰 스트림/계측에는 첫 요청만 나타난다.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from langchain_core.runnables import ensure_config
+from langchain_core.tools import BaseTool
+from pydantic import ConfigDict
+
+DEADLINE_KEY = "turn_deadline"
+
+
+class DeadlineExceeded(TimeoutError):
+    """턴 마감 시간이 지났다"""
+
+
+class CircuitOpenError(RuntimeError):
+    """서킷 브레이커가 열려 있어서 upstream을 호출하지 않았다"""
+
+
+def with_deadline(config: dict | None, seconds: float | None) -> dict:
+    """config에 지금부터 seconds초 뒤의 턴 마감 시각을 넣은 사본을 돌려준다 (seconds가 없으면 그대로)"""
+    config = dict(config or {})
+    if seconds:
+        config["configurable"] = {**config.get("configurable", {}), DEADLINE_KEY: time.time() + seconds}
+    return config
+
+
+def remaining_time(config: dict | None = None) -> float | None:
+    """지금 실행 중인 턴의 남은 시간(초), 마감 시간이 없으면 None"""
+    deadline = ensure_config(config).get("configurable", {}).get(DEADLINE_KEY)
+    return None if deadline is None else deadline - time.time()
+
+
+class CircuitBreaker:
+    """closed → (실패 폭주) → open → (reset_timeout 후) half_open → 시험 호출 결과에 따라 closed/open"""
+
+    def __init__(self, failure_threshold: int = 5, failure_window: float = 30.0, reset_timeout: float = 15.0):
+        self.failure_threshold = failure_threshold
+        self.failure_window = failure_window
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.failures = deque()  # 최근 실패 시각
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.trial = False  # half_open에서 시험 호출이 진행 중인지
+        self.opened = 0
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state, self.trial = "half_open", False
+            if self.state == "half_open":
+                if self.trial:
+                    return False
+                self.trial = True
+            return self.state != "open"
+
+    def release(self):
+        """결과 없이 끝난(취소된) 시험 호출을 돌려놓는다"""
+        with self.lock:
+            self.trial = False
+
+    def record(self, success: bool):
+        now = time.monotonic()
+        with self.lock:
+            if success:
+                if self.state == "half_open":
+                    self.state = "closed"
+                    self.failures.clear()
+                return
+            self.failures.append(now)
+            while self.failures and now - self.failures[0] > self.failure_window:
+                self.failures.popleft()
+            if self.state == "half_open" or len(self.failures) >= self.failure_threshold:
+                self.state, self.opened_at = "open", now
+                self.opened += 1
+                self.failures.clear()
+
+
+class BackendGuard:
+    """백엔드 하나(모델 또는 도구)의 지연 기록, hedge, 마감 시간, 서킷 브레이커"""
+
+    def __init__(self, name: str, policy: "ResiliencePolicy"):
+        self.name = name
+        self.policy = policy
+        self.breaker = CircuitBreaker(policy.failure_threshold, policy.failure_window, policy.reset_timeout)
+        self.latencies = deque(maxlen=policy.window)
+        self.lock = threading.Lock()
+        self.executor = None
+        self.counters = {
+            "calls": 0,
+            "errors": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "deadline_exceeded": 0,
+            "rejected": 0,
+        }
+
+    def _count(self, name: str):
+        with self.lock:
+            self.counters[name] += 1
+
+    def current_delay(self) -> float:
+        """최근 성공 지연의 hedge_quantile 분위수 (기록이 적으면 initial_hedge_delay)"""
+        policy = self.policy
+        with self.lock:
+            samples = sorted(self.latencies)
+        if len(samples) < policy.min_samples:
+            return policy.initial_hedge_delay
+        return max(samples[min(int(len(samples) * policy.hedge_quantile), len(samples) - 1)], policy.min_hedge_delay)
+
+    def hedge_delay(self) -> float | None:
+        """이번 호출에서 hedge 요청을 보내기까지 기다릴 시간 (hedge를 쓰지 않거나 예산을 다 쓰면 None)"""
+        policy = self.policy
+        with self.lock:
+            over_budget = self.counters["hedged"] >= policy.hedge_budget * self.counters["calls"] + 1
+        return None if not policy.hedge or over_budget else self.current_delay()
+
+    def _attempt(self, fn, hedge: bool):
+        start = time.perf_counter()
+        result = fn(hedge)
+        with self.lock:
+            self.latencies.append(time.perf_counter() - start)
+        return result
+
+    async def _aattempt(self, fn, hedge: bool):
+        start = time.perf_counter()
+        result = await fn(hedge)
+        with self.lock:
+            self.latencies.append(time.perf_counter() - start)
+        return result
+
+    def _begin(self, config) -> float | None:
+        """호출 전 확인: 브레이커와 마감 시간. 마감 시각(time.monotonic 기준)을 돌려준다"""
+        remaining = remaining_time(config)
+        self._count("calls")
+        if remaining is not None and remaining <= 0:
+            self._count("deadline_exceeded")
+            raise DeadlineExceeded(f"{self.name}: 턴 마감 시간이 지났습니다")
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(f"{self.name}: 서킷 브레이커가 열려 있습니다")
+        return None if remaining is None else time.monotonic() + remaining
+
+    def _finish(self, error: Exception | None):
+        self.breaker.record(error is None)
+        if error is not None:
+            self._count("errors")
+
+    @staticmethod
+    def _timeout(deadline, next_hedge):
+        now = time.monotonic()
+        waits = [moment - now for moment in (deadline, next_hedge) if moment is not None]
+        return max(min(waits), 0.0) if waits else None
+
+    def call(self, fn, config=None):
+        """fn(hedge: bool)을 hedge/마감 시간/브레이커를 적용해 실행한다"""
+        deadline = self._begin(config)
+        delay = self.hedge_delay()
+        try:
+            if delay is None and deadline is None:
+                result = self._attempt(fn, False)
+            else:
+                result = self._race(fn, deadline, delay)
+        except Exception as e:
+            self._finish(e)
+            raise
+        self._finish(None)
+        return result
+
+    def _race(self, fn, deadline, delay):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(self.policy.max_workers, thread_name_prefix=f"hedge-{self.name}")
+
+        def submit(hedge):
+            # 노드의 config(콜백, configurable)가 들어 있는 contextvar를 작업 스레드로 넘긴다
+            return self.executor.submit(contextvars.copy_context().run, self._attempt, fn, hedge)
+
+        primary = submit(False)
+        pending, hedges = {primary}, set()
+        next_hedge = None if delay is None else time.monotonic() + delay
+        error = None
+        while pending:
+            done, pending = wait(pending, self._timeout(deadline, next_hedge), FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future in hedges:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+            if not pending:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                self._count("deadline_exceeded")
+                raise DeadlineExceeded(f"{self.name}: 턴 마감 시간 안에 응답이 없습니다")
+            if next_hedge is not None and time.monotonic() >= next_hedge:
+                hedges.add(hedge := submit(True))
+                pending.add(hedge)
+                next_hedge = None
+                self._count("hedged")
+        raise error
+
+    async def acall(self, fn, config=None):
+        """비동기 버전: 진 요청과 마감 시간이 지난 요청은 취소한다"""
+        deadline = self._begin(config)
+        delay = self.hedge_delay()
+        try:
+            if delay is None and deadline is None:
+                result = await self._aattempt(fn, False)
+            else:
+                result = await self._arace(fn, deadline, delay)
+        except asyncio.CancelledError:
+            # 턴이 취소됐다: upstream의 성공/실패가 아니므로 브레이커에 기록하지 않는다
+            self.breaker.release()
+            raise
+        except Exception as e:
+            self._finish(e)
+            raise
+        self._finish(None)
+        return result
+
+    async def _arace(self, fn, deadline, delay):
+        pending = {asyncio.ensure_future(self._aattempt(fn, False))}
+        hedges = set()
+        next_hedge = None if delay is None else time.monotonic() + delay
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=self._timeout(deadline, next_hedge),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task in hedges:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._count("deadline_exceeded")
+                    raise DeadlineExceeded(f"{self.name}: 턴 마감 시간 안에 응답이 없습니다")
+                if next_hedge is not None and time.monotonic() >= next_hedge:
+                    hedges.add(hedge := asyncio.ensure_future(self._aattempt(fn, True)))
+                    pending.add(hedge)
+                    next_hedge = None
+                    self._count("hedged")
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        with self.lock:
+            counters = dict(self.counters)
+        return {
+            **counters,
+            "state": self.breaker.state,
+            "opened": self.breaker.opened,
+            "hedge_delay": self.current_delay(),
+        }
+
+    def close(self):
+        """hedge 작업 스레드를 정리한다 (기다리지 않고, 아직 시작하지 않은 요청은 취소한다)"""
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ResiliencePolicy:
+    """hedge/서킷 브레이커 설정과 백엔드별 BackendGuard 모음"""
+
+    def __init__(
+        self,
+        hedge: bool = True,
+        hedge_quantile: float = 0.95,
+        initial_hedge_delay: float = 2.0,
+        min_hedge_delay: float = 0.05,
+        hedge_budget: float = 0.1,
+        window: int = 200,
+        min_samples: int = 20,
+        failure_threshold: int = 5,
+        failure_window: float = 30.0,
+        reset_timeout: float = 15.0,
+        max_workers: int = 32,
+    ):
+        # initial_hedge_delay: 지연 기록이 min_samples개 모이기 전에 쓰는 hedge 지연
+        # hedge_budget: 전체 호출 중 hedge 요청을 보낼 수 있는 비율
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.initial_hedge_delay = initial_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.hedge_budget = hedge_budget
+        self.window = window
+        self.min_samples = min_samples
+        self.failure_threshold = failure_threshold
+        self.failure_window = failure_window
+        self.reset_timeout = reset_timeout
+        self.max_workers = max_workers
+        self.lock = threading.Lock()
+        self.guards = {}
+
+    def guard(self, name: str) -> BackendGuard:
+        with self.lock:
+            if name not in self.guards:
+                self.guards[name] = BackendGuard(name, self)
+            return self.guards[name]
+
+    def stats(self) -> dict:
+        with self.lock:
+            guards = dict(self.guards)
+        return {name: guard.stats() for name, guard in guards.items()}
+
+    def close(self):
+        """백엔드마다 만든 hedge 작업 스레드를 정리한다 (이후 호출이 오면 새로 만든다)"""
+        with self.lock:
+            guards = list(self.guards.values())
+        for guard in guards:
+            guard.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _backend_name(model) -> str:
+    while hasattr(model, "bound"):
+        model = model.bound
+    return getattr(model, "model_name", None) or getattr(model, "model", None) or type(model).__name__
+
+
+class ResilientModel:
+    """
+    모델(llm_with_tools)을 감싸 invoke/ainvoke에 hedge/마감 시간/서킷 브레이커를 적용한다
+    그 밖의 속성/메서드는 원래 모델로 넘긴다
+    """
+
+    def __init__(self, model, guard: BackendGuard):
+        self.model = model
+        self.guard = guard
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    @staticmethod
+    def _config(config, hedge: bool):
+        # hedge 요청은 콜백 없이 보낸다 (토큰 스트림에 같은 답이 두 번 나오지 않게)
+        return {**(config or {}), "callbacks": []} if hedge else config
+
+    def invoke(self, input, config=None, **kwargs):
+        return self.guard.call(lambda hedge: self.model.invoke(input, self._config(config, hedge), **kwargs), config)
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        return await self.guard.acall(
+            lambda hedge: self.model.ainvoke(input, self._config(config, hedge), **kwargs), config
+        )
+
+
+class ResilientTool(BaseTool):
+    """검색 도구를 BackendGuard로 감싼 도구 (ToolNode에 그대로 넣을 수 있다)"""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    tool: BaseTool
+    guard: BackendGuard
+
+    def __init__(self, tool: BaseTool, guard: BackendGuard, **kwargs):
+        super().__init__(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            response_format=tool.response_format,
+            tool=tool,
+            guard=guard,
+            **kwargs,
+        )
+
+    def _tool_call(self, kwargs) -> dict:
+        return {"type": "tool_call", "name": self.tool.name, "args": kwargs, "id": "resilience"}
+
+    def _unpack(self, message):
+        if message.status == "error":
+            raise RuntimeError(message.content)
+        if self.response_format == "content_and_artifact":
+            # Tavily는 오류가 나면 예외 대신 (repr(e), {})를 돌려주므로 빈 artifact도 실패로 센다
+            # (SearchCache._cacheable과 같은 규칙)
+            if not message.artifact:
+                raise RuntimeError(message.content)
+            return message.content, message.artifact
+        return message.content
+
+    def _run(self, run_manager=None, **kwargs):
+        return self.guard.call(lambda hedge: self._unpack(self.tool.invoke(self._tool_call(kwargs))))
+
+    async def _arun(self, run_manager=None, **kwargs):
+        async def attempt(hedge):
+            return self._unpack(await self.tool.ainvoke(self._tool_call(kwargs)))
+        return await self.guard.acall(attempt)
+
+
+def with_resilience(target, policy: ResiliencePolicy | None):
+    """policy가 주어지면 도구는 ResilientTool로, 모델은 ResilientModel로 감싼다 (없으면 그대로)"""
+    if policy is None:
+        return target
+    if isinstance(target, BaseTool):
+        return ResilientTool(target, policy.guard(target.name))
+    return ResilientModel(target, policy.guard(_backend_name(target)))
+
+
+def print_resilience_stats(policy: ResiliencePolicy):
+    """백엔드별 hedge/마감 시간/서킷 브레이커 통계를 출력한다"""
+    print("\n" + "="*50)
+    print("🛡️ hedge / 서킷 브레이커 통계")
+    print("="*50)
+    for name, stats in policy.stats().items():
+        print(f"- {name}: 호출 {stats['calls']}, 오류 {stats['errors']}, 브레이커 {stats['state']} "
+              f"(열린 횟수 {stats['opened']}, 거절 {stats['rejected']})")
+        print(f"  hedge {stats['hedged']} (이긴 횟수 {stats['hedge_wins']}, 지연 {stats['hedge_delay']:.2f}s), "
+              f"마감 초과 {stats['deadline_exceeded']}")
@@ -0,0 +1,237 @@
+"""
+검색 도구(TavilySearchResults 등)를 감싸는 single-flight TTL 캐시
+
+    search_cache = SearchCache(ttl=600)
+    tool = CachedSearchTool(TavilySearchResults(max_results=2), search_cache)
+    graph_builder.add_node("tools", ToolNode(tools=[tool]))
+
+- 질의를 정규화(공백 정리, 대소문자 무시)해서 키로 사용한다
+- 결과는 TTL 동안 캐시한다 (오류 결과는 캐시하지 않는다)
+- 같은 질의가 동시에 들어오면 upstream 요청은 하나만 보내고
+  나머지 호출은 그 결과를 기다린다 (스레드/asyncio 호출 모두 지원)
+- 요청을 보낸 호출(leader)이 취소되면 기다리던 호출 중 하나가 다시 요청한다
+  (취소는 그 호출에만 해당하고, 기다리던 다른 호출에 전달되지 않는다)
+- 이름/설명/인자 스키마는 원래 도구와 같아서 bind_tools 결과도 달라지지 않는다
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from langchain_core.tools import BaseTool
+from pydantic import ConfigDict
+
+
+# leader가 취소되어 결과 없이 끝났다는 표시 (기다리던 호출은 다시 _join한다)
+_RETRY = object()
+
+
+def normalize_query(text: str) -> str:
+    """앞뒤/중복 공백을 정리하고 대소문자를 무시한다"""
+    return " ".join(text.split()).casefold()
+
+
+class SearchCache:
+    """질의 결과 TTL 캐시 + 진행 중인 요청 합치기(single-flight)"""
+
+    def __init__(self, ttl: float = 600, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        # key -> (만료 시각, 결과)
+        self.entries = OrderedDict()
+        # key -> 진행 중인 upstream 요청의 Future
+        self.inflight = {}
+        self.counters = {
+            "calls": 0,
+            "hits": 0,
+            "coalesced": 0,
+            "upstream": 0,
+            "cancelled": 0,
+            "upstream_seconds": 0.0,
+        }
+
+    def _join(self, key, retry: bool = False):
+        """(캐시된 결과, 기다릴 Future, 직접 요청해야 하는지)"""
+        with self.lock:
+            if not retry:
+                self.counters["calls"] += 1
+            entry = self.entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.counters["hits"] += 1
+                return entry[1], None, False
+            if entry:
+                del self.entries[key]
+
+            if key in self.inflight:
+                self.counters["coalesced"] += 1
+                return None, self.inflight[key], False
+
+            future = Future()
+            self.inflight[key] = future
+            self.counters["upstream"] += 1
+            return None, future, True
+
+    def _finish(self, key, future, result=None, error=None, latency=0.0, cacheable=True):
+        with self.lock:
+            self.inflight.pop(key, None)
+            self.counters["upstream_seconds"] += latency
+            if error is None and cacheable:
+                self.entries[key] = (time.monotonic() + self.ttl, result)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _abandon(self, key, future):
+        """leader가 취소됨: 진행 중 표시를 지우고, 기다리던 호출은 (오류 없이) 다시 시도하게 한다"""
+        with self.lock:
+            if self.inflight.get(key) is future:
+                del self.inflight[key]
+            self.counters["cancelled"] += 1
+        future.set_result(_RETRY)
+
+    def call(self, key, fetch, cacheable=lambda result: True):
+        """동기 호출: 캐시 → 진행 중 요청 대기 → 직접 fetch() 순서로 결과를 얻는다"""
+        retry = False
+        while True:
+            cached, future, leader = self._join(key, retry)
+            if future is None:
+                return cached
+            if not leader:
+                result = future.result()
+                if result is _RETRY:
+                    retry = True
+                    continue
+                return result
+
+            start = time.perf_counter()
+            try:
+                result = fetch()
+            except BaseException as e:
+                self._finish(key, future, error=e, latency=time.perf_counter() - start)
+                raise
+            self._finish(key, future, result, latency=time.perf_counter() - start, cacheable=cacheable(result))
+            return result
+
+    async def acall(self, key, afetch, cacheable=lambda result: True):
+        """비동기 호출: 다른 스레드/코루틴이 보낸 같은 요청도 함께 기다린다"""
+        retry = False
+        while True:
+            cached, future, leader = self._join(key, retry)
+            if future is None:
+                return cached
+            if not leader:
+                # shield: 기다리던 호출이 취소되어도 공유 Future는 취소하지 않는다
+                # (wrap_future만 쓰면 취소가 Future로 전달되어 다른 호출까지 CancelledError가 난다)
+                result = await asyncio.shield(asyncio.wrap_future(future))
+                if result is _RETRY:
+                    retry = True
+                    continue
+                return result
+
+            start = time.perf_counter()
+            try:
+                result = await afetch()
+            except asyncio.CancelledError:
+                # 취소는 이 호출에만 해당한다: 기다리던 호출 중 하나가 leader가 되어 다시 요청한다
+                self._abandon(key, future)
+                raise
+            except BaseException as e:
+                self._finish(key, future, error=e, latency=time.perf_counter() - start)
+                raise
+            self._finish(key, future, result, latency=time.perf_counter() - start, cacheable=cacheable(result))
+            return result
+
+    def stats(self) -> dict:
+        with self.lock:
+            counters = dict(self.counters)
+        calls, upstream = counters["calls"], counters["upstream"]
+        average = counters["upstream_seconds"] / upstream if upstream else 0.0
+        return {
+            **counters,
+            "dedup_ratio": 1 - upstream / calls if calls else 0.0,
+            # 캐시/합치기로 피한 요청 수 × 평균 upstream 지연 시간
+            "saved_seconds": (counters["hits"] + counters["coalesced"]) * average,
+        }
+
+
+class CachedSearchTool(BaseTool):
+    """검색 도구를 SearchCache로 감싼 도구 (ToolNode에 그대로 넣을 수 있다)"""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    tool: BaseTool
+    cache: SearchCache
+
+    def __init__(self, tool: BaseTool, cache: SearchCache, **kwargs):
+        super().__init__(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            response_format=tool.response_format,
+            tool=tool,
+            cache=cache,
+            **kwargs,
+        )
+
+    def _key(self, kwargs) -> str:
+        normalized = {
+            name: normalize_query(value) if isinstance(value, str) else value
+            for name, value in kwargs.items()
+        }
+        return self.tool.name + ":" + json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+
+    def _tool_call(self, kwargs) -> dict:
+        return {"type": "tool_call", "name": self.tool.name, "args": kwargs, "id": "search_cache"}
+
+    def _unpack(self, message):
+        if self.response_format == "content_and_artifact":
+            return message.content, message.artifact
+        return message.content
+
+    def _cacheable(self, message) -> bool:
+        if message.status == "error":
+            return False
+        # Tavily는 오류가 나면 (repr(e), {})를 돌려주므로 빈 artifact는 캐시하지 않는다
+        if self.response_format == "content_and_artifact":
+            return bool(message.artifact)
+        return True
+
+    def _run(self, run_manager=None, **kwargs):
+        message = self.cache.call(
+            self._key(kwargs),
+            lambda: self.tool.invoke(self._tool_call(kwargs)),
+            self._cacheable,
+        )
+        return self._unpack(message)
+
+    async def _arun(self, run_manager=None, **kwargs):
+        message = await self.cache.acall(
+            self._key(kwargs),
+            lambda: self.tool.ainvoke(self._tool_call(kwargs)),
+            self._cacheable,
+        )
+        return self._unpack(message)
+
+
+def with_search_cache(tool: BaseTool, cache: SearchCache | None) -> BaseTool:
+    """cache가 주어지면 CachedSearchTool로 감싸고, 없으면 도구를 그대로 돌려준다"""
+    return CachedSearchTool(tool, cache) if cache is not None else tool
+
+
+def print_search_stats(cache: SearchCache):
+    """검색 캐시의 중복 제거율과 절약한 검색 시간을 출력한다"""
+    stats = cache.stats()
+    print("\n" + "="*50)
+    print("🔍 검색 캐시 통계")
+    print("="*50)
+    print(f"- 호출: {stats['calls']} (캐시 적중 {stats['hits']}, 합쳐진 요청 {stats['coalesced']})")
+    print(f"- 실제 검색 요청: {stats['upstream']}, 중복 제거율: {stats['dedup_ratio']:.1%}")
+    print(f"- 절약한 검색 시간(추정): {stats['saved_seconds']:.2f}s")
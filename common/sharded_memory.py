@@ -0,0 +1,241 @@
+"""
+thread_id 해시로 저장소를 나누고 조각(shard)마다 락을 두는 메모리 체크포인터
+
+    memory = ShardedMemorySaver(shards=16)          # MemorySaver 대체
+    graph = setup_graph(checkpointer=memory)
+
+- MemorySaver는 모든 대화가 storage/writes dict 하나를 같이 쓴다.
+  락이 없어서 스레드 여러 개가 동시에 쓰면 list() 같은 순회가 "dictionary changed size" 오류를 낼 수 있고,
+  락 하나로 감싸면 서로 상관없는 대화도 그 락에서 기다린다
+- 여기서는 thread_id마다 정해진 shard 하나만 건드리므로 다른 대화끼리는 같은 락을 잡지 않는다
+- 직렬화/역직렬화는 락 밖에서 한다. 락 안에서는 dict 조회/삽입만 한다
+- thread(checkpoint_ns)마다 최신 checkpoint_id를 기억해 두어 get_state가 체크포인트 수와 상관없이 바로 찾는다
+  (MemorySaver는 매번 그 thread의 모든 checkpoint_id 중 최댓값을 찾는다)
+- 비동기 메서드는 MemorySaver처럼 같은 스레드에서 바로 실행한다 (메모리 조회라 이벤트 루프를 오래 막지 않는다)
+"""
+import random
+import threading
+
+from langgraph.checkpoint.base import WRITES_IDX_MAP, BaseCheckpointSaver, CheckpointTuple, get_checkpoint_id
+from langgraph.constants import TASKS
+
+
+class _Shard:
+    __slots__ = ("lock", "storage", "latest", "writes")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # thread_id -> checkpoint_ns -> checkpoint_id -> ((type, 체크포인트), (type, 메타데이터), 부모 id)
+        self.storage = {}
+        # (thread_id, checkpoint_ns) -> 최신 checkpoint_id
+        self.latest = {}
+        # (thread_id, checkpoint_ns, checkpoint_id) -> (task_id, idx) -> (task_id, channel, (type, 값), task_path)
+        self.writes = {}
+
+
+def _sends(parent_writes) -> list:
+    """부모 체크포인트의 TASKS writes를 MemorySaver와 같은 순서로 (task_path, task_id, idx)"""
+    return sorted(
+        ((*write, key[1]) for key, write in parent_writes.items() if write[1] == TASKS),
+        key=lambda write: (write[3], write[0], write[4]),
+    )
+
+
+class ShardedMemorySaver(BaseCheckpointSaver[str]):
+    """thread_id 해시로 나눈 shard마다 락을 두는 MemorySaver 대체 체크포인터"""
+
+    def __init__(self, shards: int = 16, *, serde=None):
+        super().__init__(serde=serde)
+        if shards < 1:
+            raise ValueError("shards는 1 이상이어야 합니다")
+        self.shards = [_Shard() for _ in range(shards)]
+
+    def _shard(self, thread_id) -> _Shard:
+        return self.shards[hash(thread_id) % len(self.shards)]
+
+    # ---- 읽기 ----
+
+    def _snapshot(self, shard: _Shard, thread_id, checkpoint_ns: str, checkpoint_id: str, saved):
+        """락 안에서: 체크포인트 하나를 만드는 데 필요한 직렬화 값들 (writes와 부모의 sends)"""
+        _, _, parent_checkpoint_id = saved
+        writes = list(shard.writes.get((thread_id, checkpoint_ns, checkpoint_id), {}).values())
+        sends = (
+            _sends(shard.writes.get((thread_id, checkpoint_ns, parent_checkpoint_id), {}))
+            if parent_checkpoint_id else []
+        )
+        return thread_id, checkpoint_ns, checkpoint_id, saved, writes, sends
+
+    def _load_tuple(self, snapshot, metadata=None) -> CheckpointTuple:
+        """락 밖에서: 직렬화 값을 CheckpointTuple로 만든다"""
+        thread_id, checkpoint_ns, checkpoint_id, saved, writes, sends = snapshot
+        checkpoint, serialized_metadata, parent_checkpoint_id = saved
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **self.serde.loads_typed(checkpoint),
+                "pending_sends": [self.serde.loads_typed(send[2]) for send in sends],
+            },
+            metadata=metadata if metadata is not None else self.serde.loads_typed(serialized_metadata),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed(value)) for task_id, channel, value, _ in writes
+            ],
+            parent_config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": parent_checkpoint_id,
+                }
+            }
+            if parent_checkpoint_id
+            else None,
+        )
+
+    def get_serialized(self, thread_id: str, checkpoint_ns: str = "", checkpoint_id: str | None = None):
+        """저장된 체크포인트를 디코드하지 않고 (type, bytes)로 돌려준다 (없으면 None)"""
+        shard = self._shard(thread_id)
+        with shard.lock:
+            checkpoint_id = checkpoint_id or shard.latest.get((thread_id, checkpoint_ns))
+            saved = shard.storage.get(thread_id, {}).get(checkpoint_ns, {}).get(checkpoint_id)
+        return saved[0] if saved is not None else None
+
+    def get_tuple(self, config):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        shard = self._shard(thread_id)
+        with shard.lock:
+            checkpoint_id = get_checkpoint_id(config) or shard.latest.get((thread_id, checkpoint_ns))
+            saved = shard.storage.get(thread_id, {}).get(checkpoint_ns, {}).get(checkpoint_id)
+            if saved is None:
+                return None
+            snapshot = self._snapshot(shard, thread_id, checkpoint_ns, checkpoint_id, saved)
+        return self._load_tuple(snapshot)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        if config:
+            thread_id = config["configurable"]["thread_id"]
+            shards = [self._shard(thread_id)]
+        else:
+            thread_id = None
+            shards = self.shards
+        config_checkpoint_ns = config["configurable"].get("checkpoint_ns") if config else None
+        config_checkpoint_id = get_checkpoint_id(config) if config else None
+        before_checkpoint_id = get_checkpoint_id(before) if before else None
+
+        for shard in shards:
+            # 락 안에서는 후보 목록만 복사한다 (다른 스레드가 그동안 새 체크포인트를 추가해도 된다)
+            with shard.lock:
+                thread_ids = [thread_id] if thread_id is not None else list(shard.storage)
+                candidates = []
+                for candidate_thread_id in thread_ids:
+                    for checkpoint_ns, checkpoints in shard.storage.get(candidate_thread_id, {}).items():
+                        if config_checkpoint_ns is not None and checkpoint_ns != config_checkpoint_ns:
+                            continue
+                        for checkpoint_id, saved in sorted(checkpoints.items(), reverse=True):
+                            if config_checkpoint_id and checkpoint_id != config_checkpoint_id:
+                                continue
+                            if before_checkpoint_id and checkpoint_id >= before_checkpoint_id:
+                                continue
+                            candidates.append((candidate_thread_id, checkpoint_ns, checkpoint_id, saved))
+
+            for candidate_thread_id, checkpoint_ns, checkpoint_id, saved in candidates:
+                metadata = self.serde.loads_typed(saved[1])
+                if filter and not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+                if limit is not None:
+                    if limit <= 0:
+                        return
+                    limit -= 1
+                with shard.lock:
+                    snapshot = self._snapshot(shard, candidate_thread_id, checkpoint_ns, checkpoint_id, saved)
+                yield self._load_tuple(snapshot, metadata)
+
+    # ---- 쓰기 ----
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        checkpoint_id = checkpoint["id"]
+        stored = checkpoint.copy()
+        stored.pop("pending_sends", None)
+        saved = (
+            self.serde.dumps_typed(stored),
+            self.serde.dumps_typed(metadata),
+            config["configurable"].get("checkpoint_id"),  # 부모
+        )
+        shard = self._shard(thread_id)
+        with shard.lock:
+            shard.storage.setdefault(thread_id, {}).setdefault(checkpoint_ns, {})[checkpoint_id] = saved
+            key = (thread_id, checkpoint_ns)
+            if checkpoint_id > shard.latest.get(key, ""):
+                shard.latest[key] = checkpoint_id
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+            }
+        }
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        outer_key = (thread_id, checkpoint_ns, config["configurable"]["checkpoint_id"])
+        rows = [
+            ((task_id, WRITES_IDX_MAP.get(channel, index)), (task_id, channel, self.serde.dumps_typed(value), task_path))
+            for index, (channel, value) in enumerate(writes)
+        ]
+        shard = self._shard(thread_id)
+        with shard.lock:
+            existing = shard.writes.setdefault(outer_key, {})
+            for inner_key, row in rows:
+                # 일반 writes는 처음 것만 남기고, 오류/인터럽트(음수 idx)는 새 값으로 바꾼다
+                if inner_key[1] >= 0 and inner_key in existing:
+                    continue
+                existing[inner_key] = row
+
+    def delete_thread(self, thread_id: str):
+        """thread_id의 모든 체크포인트와 writes를 삭제한다"""
+        shard = self._shard(thread_id)
+        with shard.lock:
+            for checkpoint_ns in shard.storage.pop(thread_id, {}):
+                shard.latest.pop((thread_id, checkpoint_ns), None)
+            for key in [key for key in shard.writes if key[0] == thread_id]:
+                del shard.writes[key]
+
+    def stats(self) -> dict:
+        """shard별 thread 수 (해시가 고르게 나뉘는지 확인)"""
+        threads = []
+        for shard in self.shards:
+            with shard.lock:
+                threads.append(len(shard.storage))
+        return {"shards": len(self.shards), "threads": sum(threads), "max_shard_threads": max(threads)}
+
+    # 비동기 버전: 메모리 조회라 같은 스레드에서 바로 실행한다 (MemorySaver와 같다)
+    async def aget_tuple(self, config):
+        return self.get_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for checkpoint_tuple in self.list(config, filter=filter, before=before, limit=limit):
+            yield checkpoint_tuple
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return self.put_writes(config, writes, task_id, task_path)
+
+    def get_next_version(self, current, channel):
+        # MemorySaver와 같은 문자열 버전 형식을 사용한다
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
@@ -0,0 +1,438 @@
+"""
+SQLite(WAL 모드) 파일에 체크포인트를 저장하는 체크포인터
+
+MemorySaver를 그대로 대체할 수 있다:
+
+    memory = SqliteSaver("checkpoints.sqlite")
+    graph = graph_builder.compile(checkpointer=memory)
+
+- 프로세스를 재시작해도 thread_id별 대화 기록이 유지된다
+- WAL 모드로 읽기와 쓰기가 서로를 막지 않는다
+- put_writes는 받은 writes를 바로 한 트랜잭션으로 기록한다 (프로세스가 다음 체크포인트 전에 끝나도
+  끝난 task의 결과가 남아 재개할 때 다시 실행하지 않는다. WAL + synchronous=NORMAL이라 커밋마다 fsync하지 않는다)
+- (thread_id, checkpoint_ns, checkpoint_id) 기본 키 인덱스로 최신 체크포인트를 바로 찾는다
+- 여러 thread를 한꺼번에 다룰 때는 get_tuples(최신 체크포인트 일괄 조회)와
+  batch()(안에서 호출한 put/put_writes를 한 트랜잭션으로 커밋)를 쓴다 (common.bulk_state)
+"""
+import asyncio
+import random
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    CheckpointTuple,
+    get_checkpoint_id,
+)
+from langgraph.constants import TASKS
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS checkpoints (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        checkpoint_id TEXT NOT NULL,
+        parent_checkpoint_id TEXT,
+        type TEXT,
+        checkpoint BLOB,
+        metadata_type TEXT,
+        metadata BLOB,
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS writes (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        checkpoint_id TEXT NOT NULL,
+        task_id TEXT NOT NULL,
+        idx INTEGER NOT NULL,
+        channel TEXT NOT NULL,
+        type TEXT,
+        value BLOB,
+        task_path TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+    ) WITHOUT ROWID
+    """,
+]
+
+# 모든 SQL은 상수 문자열로 두어 sqlite3의 prepared statement 캐시를 재사용한다
+_SELECT_LATEST = (
+    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+    "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+    "ORDER BY checkpoint_id DESC LIMIT 1"
+)
+_SELECT_BY_ID = (
+    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+    "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"
+)
+_SELECT_WRITES = (
+    "SELECT task_id, channel, type, value FROM writes "
+    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+    "ORDER BY task_id, idx"
+)
+_SELECT_SENDS = (
+    "SELECT type, value FROM writes "
+    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? AND channel = ? "
+    "ORDER BY task_path, task_id, idx"
+)
+_INSERT_CHECKPOINT = (
+    "INSERT OR REPLACE INTO checkpoints "
+    "(thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# 일반 writes는 이미 있으면 무시하고, 특수 writes(오류/인터럽트 등)는 덮어쓴다
+_INSERT_WRITE = (
+    "INSERT OR IGNORE INTO writes "
+    "(thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value, task_path) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_REPLACE_WRITE = (
+    "INSERT OR REPLACE INTO writes "
+    "(thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value, task_path) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# get_tuples가 쿼리 하나로 읽는 thread 수 (SQLite 바인딩 변수 수 제한 안쪽)
+_BATCH_SIZE = 500
+
+
+class SqliteSaver(BaseCheckpointSaver[str]):
+    """SQLite 파일 기반의 영구 체크포인터"""
+
+    def __init__(self, path: str = "checkpoints.sqlite", *, serde=None):
+        super().__init__(serde=serde)
+        self.path = path
+        # isolation_level=None: 트랜잭션 경계를 직접 관리한다
+        self.conn = sqlite3.connect(
+            path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=64,
+        )
+        self.lock = threading.RLock()
+        # 열려 있는 트랜잭션 깊이 (batch() 안에서는 put이 따로 커밋하지 않는다)
+        self.transaction_depth = 0
+
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                self.conn.execute(statement)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN ~ COMMIT (이미 열린 트랜잭션 안이면 그 트랜잭션에 합친다)"""
+        with self.lock:
+            if self.transaction_depth:
+                self.transaction_depth += 1
+                try:
+                    yield
+                finally:
+                    self.transaction_depth -= 1
+                return
+            self.conn.execute("BEGIN")
+            self.transaction_depth = 1
+            try:
+                yield
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            finally:
+                self.transaction_depth = 0
+
+    @contextmanager
+    def batch(self):
+        """
+        with saver.batch(): 안의 put/put_writes를 한 트랜잭션으로 커밋한다
+        (예외가 나면 전부 취소된다. 그동안 다른 스레드의 저장은 기다린다)
+        """
+        with self._transaction():
+            yield
+
+    def _load_tuple(self, thread_id, checkpoint_ns, row, writes=None, sends=None):
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata_type, metadata = row
+
+        # get_tuples는 writes/sends를 여러 체크포인트 몫으로 미리 읽어 넘긴다
+        if writes is None:
+            writes = self.conn.execute(
+                _SELECT_WRITES, (thread_id, checkpoint_ns, checkpoint_id)
+            ).fetchall()
+        if sends is None and parent_checkpoint_id:
+            sends = self.conn.execute(
+                _SELECT_SENDS, (thread_id, checkpoint_ns, parent_checkpoint_id, TASKS)
+            ).fetchall()
+        sends = sends or []
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **self.serde.loads_typed((type_, checkpoint)),
+                "pending_sends": [self.serde.loads_typed(send) for send in sends],
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, value)))
+                for task_id, channel, value_type, value in writes
+            ],
+            parent_config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": parent_checkpoint_id,
+                }
+            }
+            if parent_checkpoint_id
+            else None,
+        )
+
+    def get_tuple(self, config):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self.lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self.conn.execute(
+                    _SELECT_BY_ID, (thread_id, checkpoint_ns, checkpoint_id)
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    _SELECT_LATEST, (thread_id, checkpoint_ns)
+                ).fetchone()
+            if row is None:
+                return None
+            return self._load_tuple(thread_id, checkpoint_ns, row)
+
+    def get_serialized(self, thread_id: str, checkpoint_ns: str = "", checkpoint_id: str | None = None):
+        """저장된 체크포인트를 디코드하지 않고 (type, bytes)로 돌려준다 (없으면 None)"""
+        with self.lock:
+            if checkpoint_id:
+                row = self.conn.execute(_SELECT_BY_ID, (thread_id, checkpoint_ns, checkpoint_id)).fetchone()
+            else:
+                row = self.conn.execute(_SELECT_LATEST, (thread_id, checkpoint_ns)).fetchone()
+        return (row[2], row[3]) if row is not None else None
+
+    def get_tuples(self, configs):
+        """
+        여러 thread의 최신 체크포인트를 한 번에 읽는다 (get_tuple을 configs 순서대로 부른 결과와 같다)
+        - checkpoint_id가 있는 config는 get_tuple로 하나씩 읽는다
+        - 체크포인트/writes/sends를 thread 묶음마다 쿼리 하나씩으로 읽는다
+        """
+        results = [None] * len(configs)
+        latest = {}
+        for index, config in enumerate(configs):
+            configurable = config["configurable"]
+            if get_checkpoint_id(config):
+                results[index] = self.get_tuple(config)
+            else:
+                key = (configurable["thread_id"], configurable.get("checkpoint_ns", ""))
+                latest.setdefault(key, []).append(index)
+
+        keys = list(latest)
+        with self.lock:
+            for start in range(0, len(keys), _BATCH_SIZE):
+                chunk = keys[start:start + _BATCH_SIZE]
+                for key, checkpoint_tuple in self._load_latest(chunk).items():
+                    for index in latest[key]:
+                        results[index] = checkpoint_tuple
+        return results
+
+    def _load_latest(self, keys):
+        """(thread_id, checkpoint_ns) 묶음의 최신 체크포인트 -> {key: CheckpointTuple}"""
+        values = ", ".join(["(?, ?)"] * len(keys))
+        params = [value for key in keys for value in key]
+        rows = self.conn.execute(
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+            "type, checkpoint, metadata_type, metadata FROM checkpoints AS c "
+            f"WHERE (thread_id, checkpoint_ns) IN (VALUES {values}) AND checkpoint_id = ("
+            "SELECT MAX(checkpoint_id) FROM checkpoints "
+            "WHERE thread_id = c.thread_id AND checkpoint_ns = c.checkpoint_ns)",
+            params,
+        ).fetchall()
+        if not rows:
+            return {}
+
+        # 최신 체크포인트의 writes와 부모 체크포인트의 sends
+        ids = ", ".join(["(?, ?, ?)"] * len(rows))
+        writes, sends = {}, {}
+        for thread_id, checkpoint_ns, checkpoint_id, task_id, channel, type_, value in self.conn.execute(
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, task_id, channel, type, value FROM writes "
+            f"WHERE (thread_id, checkpoint_ns, checkpoint_id) IN (VALUES {ids}) "
+            "ORDER BY thread_id, checkpoint_ns, checkpoint_id, task_id, idx",
+            [value for row in rows for value in row[:3]],
+        ):
+            writes.setdefault((thread_id, checkpoint_ns, checkpoint_id), []).append(
+                (task_id, channel, type_, value)
+            )
+        parents = [row for row in rows if row[3]]
+        if parents:
+            parent_ids = ", ".join(["(?, ?, ?)"] * len(parents))
+            for thread_id, checkpoint_ns, checkpoint_id, type_, value in self.conn.execute(
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, type, value FROM writes "
+                f"WHERE (thread_id, checkpoint_ns, checkpoint_id) IN (VALUES {parent_ids}) AND channel = ? "
+                "ORDER BY thread_id, checkpoint_ns, checkpoint_id, task_path, task_id, idx",
+                [value for row in parents for value in (row[0], row[1], row[3])] + [TASKS],
+            ):
+                sends.setdefault((thread_id, checkpoint_ns, checkpoint_id), []).append((type_, value))
+
+        return {
+            (thread_id, checkpoint_ns): self._load_tuple(
+                thread_id,
+                checkpoint_ns,
+                row,
+                writes=writes.get((thread_id, checkpoint_ns, row[0]), []),
+                sends=sends.get((thread_id, checkpoint_ns, row[1]), []),
+            )
+            for thread_id, checkpoint_ns, *row in rows
+        }
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        where, params = [], []
+        if config:
+            where.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                where.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                where.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_checkpoint_id := get_checkpoint_id(before)):
+            where.append("checkpoint_id < ?")
+            params.append(before_checkpoint_id)
+
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+            "type, checkpoint, metadata_type, metadata FROM checkpoints"
+        )
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY checkpoint_id DESC"
+        # 메타데이터 필터는 역직렬화 후에 적용하므로 그때는 SQL LIMIT을 쓰지 않는다
+        if limit is not None and not filter:
+            query += f" LIMIT {int(limit)}"
+
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+            results = []
+            for thread_id, checkpoint_ns, *row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                checkpoint_tuple = self._load_tuple(thread_id, checkpoint_ns, row)
+                if filter and not all(
+                    checkpoint_tuple.metadata.get(key) == value
+                    for key, value in filter.items()
+                ):
+                    continue
+                results.append(checkpoint_tuple)
+        yield from results
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        c = checkpoint.copy()
+        c.pop("pending_sends", None)
+        type_, serialized = self.serde.dumps_typed(c)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(metadata)
+
+        with self._transaction():
+            self.conn.execute(
+                _INSERT_CHECKPOINT,
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),  # 부모 체크포인트
+                    type_,
+                    serialized,
+                    metadata_type,
+                    serialized_metadata,
+                ),
+            )
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        inserts, replaces = [], []
+        for idx, (channel, value) in enumerate(writes):
+            type_, serialized = self.serde.dumps_typed(value)
+            # 오류/인터럽트 등 특수 writes는 덮어쓴다
+            (replaces if channel in WRITES_IDX_MAP else inserts).append((
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                task_id,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                type_,
+                serialized,
+                task_path,
+            ))
+
+        # task 하나의 writes는 한 트랜잭션으로 기록한다 (INSERT가 실패하면 전부 취소되고 예외가 그대로 올라간다)
+        with self._transaction():
+            if inserts:
+                self.conn.executemany(_INSERT_WRITE, inserts)
+            if replaces:
+                self.conn.executemany(_REPLACE_WRITE, replaces)
+
+    def delete_thread(self, thread_id: str):
+        """thread_id의 모든 체크포인트와 writes를 삭제한다"""
+        with self._transaction():
+            self.conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            self.conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+
+    # 비동기 버전: SQLite 호출이 이벤트 루프를 막지 않도록 스레드에서 실행한다
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        results = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint_tuple in results:
+            yield checkpoint_tuple
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    def get_next_version(self, current, channel):
+        # MemorySaver와 같은 문자열 버전 형식을 사용한다
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
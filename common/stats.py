@@ -0,0 +1,28 @@
+"""
+지연 시간(latency) 통계 계산 도우미
+"""
+import math
+
+
+def percentile(values, q: float) -> float:
+    """정렬된 값 목록에서 q(0~100) 백분위 값을 nearest-rank 방식으로 계산한다"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize_latencies(latencies) -> dict:
+    """지연 시간 목록(초)을 p50/p95/p99/max/mean 요약으로 변환한다"""
+    latencies = list(latencies)
+    if not latencies:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "count": len(latencies),
+        "mean": sum(latencies) / len(latencies),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies),
+    }
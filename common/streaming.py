@@ -0,0 +1,160 @@
+"""
+LLM 토큰을 도착하는 대로 출력하는 스트리밍 출력과 첫 토큰 지연(TTFT) 측정
+
+    stats = stream_tokens(graph, {"messages": [("human", question)]}, config)
+    print_turn_stats(stats)
+
+- graph.stream(stream_mode=["messages", "updates"])로 메시지 조각(AIMessageChunk)을 받아 바로 출력한다
+- 도구 호출 인자 조각(tool_call_chunks)은 출력하지 않고, 노드가 끝난 뒤 완성된 도구 호출만 출력한다
+- 캐시 적중 등으로 스트리밍되지 않은 응답은 노드가 끝날 때 한 번에 출력한다
+- nodes를 주면 그 노드의 LLM 출력만 내보낸다 (예: compact 노드의 요약 LLM 출력 제외)
+- 턴마다 첫 토큰까지 걸린 시간(TTFT), 출력 토큰 수, 초당 토큰 수를 StreamStats로 돌려준다
+"""
+import sys
+import time
+from dataclasses import dataclass
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from .stats import summarize_latencies
+
+
+@dataclass
+class StreamStats:
+    """한 턴의 스트리밍 지연 시간 기록"""
+    duration: float = 0.0
+    ttft: float | None = None  # 첫 토큰까지 걸린 시간 (응답 내용이 없으면 None)
+    tokens: int = 0  # 출력한 내용 조각 수 (스트리밍 모델에서는 대략 토큰 수)
+    generation: float = 0.0  # 첫 토큰부터 마지막 토큰까지 걸린 시간
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.tokens / self.generation if self.generation > 0 else 0.0
+
+
+class _TurnPrinter:
+    """스트림 이벤트를 받아 토큰을 출력하고 시간을 잰다"""
+
+    def __init__(self, out, prefix: str, show_tools: bool, nodes):
+        self.out = out
+        self.prefix = prefix
+        self.show_tools = show_tools
+        self.nodes = nodes
+        self.start = time.perf_counter()
+        self.stats = StreamStats()
+        self.first = None
+        self.last = None
+        self.open_line = False
+        # 조각으로 출력한 메시지 id (노드가 끝난 뒤 같은 내용을 다시 출력하지 않기 위해)
+        self.streamed = set()
+
+    def _emit(self, text: str, count: int = 1):
+        now = time.perf_counter()
+        if self.first is None:
+            self.first = now
+            self.stats.ttft = now - self.start
+        self.last = now
+        self.stats.tokens += count
+        if not self.open_line:
+            self.out.write("\n" + self.prefix)
+            self.open_line = True
+        self.out.write(text)
+        self.out.flush()
+
+    def _end_line(self):
+        if self.open_line:
+            self.out.write("\n")
+            self.open_line = False
+
+    def on_message(self, message, metadata):
+        if self.nodes is not None and metadata.get("langgraph_node") not in self.nodes:
+            return
+        if isinstance(message, AIMessageChunk):
+            # 도구 호출 인자 조각은 모아 두기만 한다 (완성된 호출은 updates에서 출력)
+            if isinstance(message.content, str) and message.content:
+                self.streamed.add(message.id)
+                self._emit(message.content)
+        elif isinstance(message, AIMessage) and message.id not in self.streamed:
+            # 스트리밍되지 않은 응답 (캐시 적중, streaming을 지원하지 않는 모델 등)
+            if isinstance(message.content, str) and message.content:
+                self._emit(message.content)
+            self._end_line()
+
+    def on_update(self, update):
+        self._end_line()
+        if not self.show_tools:
+            return
+        for value in update.values():
+            # interrupt 이벤트 등 dict가 아닌 값은 건너뛴다
+            if not isinstance(value, dict) or "messages" not in value:
+                continue
+            messages = value["messages"]
+            for message in messages if isinstance(messages, list) else [messages]:
+                if getattr(message, "tool_calls", None):
+                    self.out.write("\n🔍 도구 호출 중...\n")
+                    for tool_call in message.tool_calls:
+                        self.out.write(f"- {tool_call['name']}: {tool_call['args']}\n")
+                    self.out.flush()
+
+    def finish(self) -> StreamStats:
+        self._end_line()
+        self.stats.duration = time.perf_counter() - self.start
+        if self.first is not None:
+            self.stats.generation = self.last - self.first
+        return self.stats
+
+
+def _dispatch(printer, mode, payload):
+    if mode == "messages":
+        message, metadata = payload
+        printer.on_message(message, metadata)
+    elif mode == "updates":
+        printer.on_update(payload)
+
+
+def stream_tokens(graph, graph_input, config=None, out=None, prefix: str = "🤖 AI: ",
+                  show_tools: bool = True, nodes=None) -> StreamStats:
+    """그래프를 실행하며 LLM 토큰을 도착하는 대로 출력하고 StreamStats를 돌려준다"""
+    printer = _TurnPrinter(out or sys.stdout, prefix, show_tools, nodes)
+    for mode, payload in graph.stream(graph_input, config, stream_mode=["messages", "updates"]):
+        _dispatch(printer, mode, payload)
+    return printer.finish()
+
+
+async def astream_tokens(graph, graph_input, config=None, out=None, prefix: str = "🤖 AI: ",
+                         show_tools: bool = True, nodes=None) -> StreamStats:
+    """stream_tokens의 비동기 버전"""
+    printer = _TurnPrinter(out or sys.stdout, prefix, show_tools, nodes)
+    async for mode, payload in graph.astream(graph_input, config, stream_mode=["messages", "updates"]):
+        _dispatch(printer, mode, payload)
+    return printer.finish()
+
+
+def print_turn_stats(stats: StreamStats):
+    """한 턴의 TTFT와 초당 토큰 수를 한 줄로 출력한다"""
+    ttft = f"{stats.ttft:.2f}s" if stats.ttft is not None else "-"
+    print(f"⏱️ 첫 토큰 {ttft}, {stats.tokens}토큰, {stats.tokens_per_second:.1f} 토큰/s, 전체 {stats.duration:.2f}s")
+
+
+def summarize_stream_stats(stats_list) -> dict:
+    """여러 턴의 TTFT 분포와 평균 초당 토큰 수"""
+    stats_list = list(stats_list)
+    ttfts = [stats.ttft for stats in stats_list if stats.ttft is not None]
+    rates = [stats.tokens_per_second for stats in stats_list if stats.tokens_per_second > 0]
+    return {
+        "turns": len(stats_list),
+        "ttft": summarize_latencies(ttfts),
+        "tokens_per_second": sum(rates) / len(rates) if rates else 0.0,
+    }
+
+
+def print_stream_summary(stats_list):
+    """여러 턴의 TTFT p50/p95와 평균 초당 토큰 수를 출력한다"""
+    summary = summarize_stream_stats(stats_list)
+    ttft = summary["ttft"]
+    print("\n" + "="*50)
+    print("⚡ 스트리밍 지연 시간")
+    print("="*50)
+    print(f"- 턴 수: {summary['turns']}")
+    print(f"- 첫 토큰까지(TTFT): p50 {ttft['p50']:.2f}s / p95 {ttft['p95']:.2f}s / max {ttft['max']:.2f}s")
+    print(f"- 평균 생성 속도: {summary['tokens_per_second']:.1f} 토큰/s")
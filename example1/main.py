@@ -4,9 +4,12 @@ from typing_extensions import TypedDict
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langgraph.graph import MessagesState
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
 
+from common.factory import chat_openai
+from common.resilience import ResiliencePolicy, with_resilience
+from common.streaming import print_stream_summary, print_turn_stats, stream_tokens
+
 def example1():
     class State(MessagesState):
         """
@@ -28,10 +31,13 @@ def example1():
         """
         counter: int
 
-    llm = ChatOpenAI(
+    # 오류가 몰리면 잠시 호출을 멈춘다 (timeout은 요청 하나의 상한)
+    # o1-mini는 추론 시간이 길고 들쭉날쭉해서 hedge(같은 요청을 한 번 더 보내기)는 비용만 늘리므로 끈다
+    policy = ResiliencePolicy(hedge=False)
+    llm = with_resilience(chat_openai(
             model="o1-mini",
             timeout=10,
-        )
+        ), policy)
 
     def chatbot(state: State) -> State:
         state["counter"] =  state.get("counter", 0) + 1
@@ -45,10 +51,14 @@ def example1():
     }
 
 
+    # 턴마다 첫 토큰까지 걸린 시간(TTFT)과 초당 토큰 수
+    turn_stats = []
+
     def stream_graph_updates(user_input: str):
-        for event in graph.stream({"messages": [("user", user_input)]}):
-            for value in event.values():
-                print("Assistant:", value["messages"][-1].content)
+        # 노드가 끝날 때까지 기다리지 않고 토큰이 도착하는 대로 출력한다
+        stats = stream_tokens(graph, {"messages": [("user", user_input)]}, prefix="Assistant: ")
+        turn_stats.append(stats)
+        print_turn_stats(stats)
 
     """
     LangGraph의 기본 구조 예제:
@@ -84,6 +94,9 @@ def example1():
     while True:
         user_input = input("User: ")
         if user_input.lower() in ["quit", "exit", "q"]:
+            if turn_stats:
+                print_stream_summary(turn_stats)
+            policy.close()
             print("Goodbye!")
             break
 
@@ -1,12 +1,18 @@
 from typing import Annotated, Literal
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
-from langgraph.prebuilt import ToolNode
 from typing_extensions import TypedDict
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 
+from common.async_nodes import async_only, check_flavor, inline
+from common.cassette import with_cassette
+from common.delta_stream import stream_deltas
+from common.factory import chat_openai, memoize_graph
+from common.instrumentation import instrument_graph
+from common.loop_budget import LoopBudget, add_budget_nodes
+from common.resilience import ResiliencePolicy, with_resilience
+
 # State 타입 정의
 class MessagesState(TypedDict):
     messages: Annotated[list, add_messages]
@@ -24,18 +30,20 @@ def get_coolest_cities() -> str:
     """가장 시원한 도시 목록을 반환합니다"""
     return "서울, 고성"
 
-# 도구 목록 생성
-tools = [get_weather, get_coolest_cities]
-
-# ToolNode 생성
-tool_node = ToolNode(tools=tools)
+# 비동기 버전: 이름/설명/인자가 같은 코루틴 도구 (astream에서 스레드 풀을 거치지 않는다)
+@tool("get_weather")
+async def aget_weather(location: str) -> str:
+    """특정 지역의 날씨 정보를 반환합니다"""
+    return get_weather.func(location)
 
-llm = ChatOpenAI(
-    model="gpt-4",
-    timeout=10,
-)
-model_with_tools = llm.bind_tools(tools)
+@tool("get_coolest_cities")
+async def aget_coolest_cities() -> str:
+    """가장 시원한 도시 목록을 반환합니다"""
+    return get_coolest_cities.func()
 
+# 도구 목록 생성
+tools = [get_weather, get_coolest_cities]
+async_tools = [aget_weather, aget_coolest_cities]
 
 def should_continue(state: MessagesState) -> Literal["tools", END]:
     messages = state["messages"]
@@ -44,42 +52,79 @@ def should_continue(state: MessagesState) -> Literal["tools", END]:
         return "tools"
     return END
 
-def call_model(state: MessagesState):
-    messages = state["messages"]
-    response = model_with_tools.invoke(messages)
-    return {"messages": [response]}
+@memoize_graph
+def setup_graph(*, llm=None, metrics=None, resilience=None, budget=None, cassette=None, flavor="sync"):
+    # 무거운 import는 그래프를 처음 만들 때 한다
+    from langgraph.prebuilt import ToolNode
+
+    # flavor="async"면 노드/도구/라우터를 코루틴으로 만든다 (ainvoke/astream 전용, common.async_nodes)
+    is_async = check_flavor(flavor)
+    flavor_tools = async_tools if is_async else tools
+
+    # ToolNode 생성
+    tool_node = ToolNode(tools=flavor_tools)
+
+    # 모델을 넘기면 그것을 사용한다 (예: common.fakes의 오프라인 가짜 구현)
+    if llm is None:
+        llm = chat_openai(
+            model="gpt-4",
+            timeout=10,
+        )
+    # cassette (선택): 모델 호출을 파일에 기록하거나 기록된 응답으로 재생한다 (도구는 로컬 함수라 그대로 실행한다)
+    llm = with_cassette(llm, cassette)
+    # resilience (선택): 응답이 p95보다 늦으면 hedge 요청을 보내고, 오류가 몰리면 서킷 브레이커를 연다
+    # (timeout은 요청 하나의 상한)
+    model_with_tools = with_resilience(llm.bind_tools(flavor_tools), resilience)
+
+    def call_model(state: MessagesState):
+        messages = state["messages"]
+        response = model_with_tools.invoke(messages)
+        return {"messages": [response]}
+
+    async def acall_model(state: MessagesState):
+        messages = state["messages"]
+        response = await model_with_tools.ainvoke(messages)
+        return {"messages": [response]}
 
-def example2():
     # 워크플로우 생성
     workflow = StateGraph(MessagesState)
 
     # 노드 추가
-    workflow.add_node("agent", call_model)
-    workflow.add_node("tools", tool_node)
+    workflow.add_node("agent", async_only(acall_model, name="agent") if is_async else call_model)
+    route, destinations = should_continue, {"tools": "tools", END: END}
+    if budget is None:
+        workflow.add_node("tools", tool_node)
+    else:
+        # budget (선택): 턴별 반복 횟수/도구 시간/토큰 수를 넘으면 tools 대신 finalize로 가서
+        # 도구 없는 모델이 지금까지의 정보로 답한다
+        add_budget_nodes(workflow, budget, with_resilience(llm, resilience), tool_node)
+        route, destinations = budget.router(should_continue), {**destinations, "finalize": "finalize"}
 
     # 엣지 추가
     workflow.add_edge(START, "agent")
 
-    # 조건부 엣지 추가
+    # 조건부 엣지 추가 (async: 라우터를 스레드 풀에 넘기지 않고 바로 실행한다)
     workflow.add_conditional_edges(
         "agent",
-        should_continue,
-        {
-            "tools": "tools",
-            END: END
-        }
+        inline(route) if is_async else route,
+        destinations
     )
 
     # 도구 노드에서 에이전트로 돌아가는 엣지
     workflow.add_edge("tools", "agent")
 
-    # 그래프 컴파일
-    graph = workflow.compile()
+    # 그래프 컴파일 (metrics를 넘기면 노드별 실행 시간을 기록한다)
+    return instrument_graph(workflow.compile(), metrics)
+
+def example2():
+    graph = setup_graph(resilience=ResiliencePolicy(), budget=LoopBudget(max_iterations=5))
 
-    for chunk in graph.stream({
+    # 단계마다 전체 메시지 목록 대신 새로 붙은 메시지만 받는다 (common.delta_stream)
+    for delta in stream_deltas(graph, {
         "messages": [("human", "가장 추운 도시의 날씨는 어때?")]
-    }, stream_mode="values"):
-        chunk['messages'][-1].pretty_print()
+    }):
+        for message in delta.messages:
+            message.pretty_print()
 
 def main():
     example2()
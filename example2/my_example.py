@@ -1,55 +1,66 @@
-import os
-from dotenv import load_dotenv
+import argparse
+import time
 from typing import Annotated
 from typing_extensions import TypedDict
-from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langchain_openai import ChatOpenAI
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langgraph.prebuilt import ToolNode, tools_condition
 
-load_dotenv()
+from common.factory import ANSWER_NODES, build_chat_graph, chat_openai, memoize_graph, tavily_search
+from common.fast_path import FastPathRouter, print_fast_path_stats
+from common.instrumentation import GraphMetrics, print_metrics, serve_metrics
+from common.batch import jobs_from_questions, print_batch_report, run_batch_sync
+from common.cassette import add_cassette_arguments, make_cassette, print_cassette_stats, with_cassette
+from common.llm_cache import LLMCache, print_cache_stats
+from common.loop_budget import LoopBudget, print_budget_stats
+from common.resilience import ResiliencePolicy, print_resilience_stats, with_deadline, with_resilience
+from common.search_cache import SearchCache, print_search_stats, with_search_cache
+from common.streaming import print_stream_summary, print_turn_stats, stream_tokens
 
 class State(TypedDict):
     messages: Annotated[list, add_messages]
 
-def setup_graph():
-    # 그래프 설정
-    graph_builder = StateGraph(State)
-
-    # AI 모델과 도구 설정
-    tool = TavilySearchResults(max_results=2)
-    tools = [tool]
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0.7,
-        streaming=True
-    )
-    llm_with_tools = llm.bind_tools(tools)
-
-    # 챗봇 노드 함수
-    def chatbot(state: State):
-        return {"messages": [llm_with_tools.invoke(state["messages"])]}
+@memoize_graph
+def setup_graph(*, llm_cache=None, search_cache=None, llm=None, search_tool=None, metrics=None, fast_path=None,
+                resilience=None, budget=None, cassette=None, flavor="sync"):
+    # 같은 설정으로 다시 부르면 컴파일해 둔 그래프를 재사용한다 (common.factory.memoize_graph)
+    # 선택 기능 옵션은 모두 키워드로 넘긴다 (각 옵션의 뜻은 common.factory.build_chat_graph 참고)
+    # 모델/검색 도구를 넘기면 그것을 사용한다 (예: common.fakes의 오프라인 가짜 구현)
+    if search_tool is None:
+        search_tool = tavily_search(max_results=2)
+    if llm is None:
+        llm = chat_openai(
+            model="gpt-4o-mini",
+            temperature=0.7,
+            streaming=True
+        )
 
-    # 그래프 구성
-    graph_builder.add_node("chatbot", chatbot)
-    graph_builder.add_node("tools", ToolNode(tools=[tool]))
-    graph_builder.add_conditional_edges("chatbot", tools_condition)
-    graph_builder.add_edge("tools", "chatbot")
-    graph_builder.add_edge(START, "chatbot")
+    # 검색 도구 감싸기: cassette(upstream 자리라 가장 안쪽) → resilience → 검색 캐시
+    search_tool = with_cassette(search_tool, cassette)
+    tool = with_search_cache(with_resilience(search_tool, resilience), search_cache)
 
-    return graph_builder.compile()
+    # chatbot ↔ tools 그래프 구성
+    return build_chat_graph(
+        State, [tool], llm, llm_cache=llm_cache, metrics=metrics, fast_path=fast_path, resilience=resilience,
+        budget=budget, cassette=cassette, flavor=flavor,
+    )
 
-def test_chatbot(graph, question: str):
+def test_chatbot(graph, question: str, stream: bool = False, turn_timeout: float | None = None):
     """
     챗봇 테스트 함수
+    stream=True면 토큰을 도착하는 대로 출력하고 StreamStats(TTFT, 토큰/s)를 돌려준다
+    turn_timeout을 주면 이번 턴 전체(chatbot ↔ tools)를 그 시간(초) 안에 끝내야 한다
     """
+    config = with_deadline(None, turn_timeout)
     print("\n" + "="*50)
     print(f"😀 사용자: {question}")
     print("="*50)
 
     try:
-        for event in graph.stream({"messages": [("human", question)]}):
+        if stream:
+            stats = stream_tokens(graph, {"messages": [("human", question)]}, config, nodes=ANSWER_NODES)
+            print_turn_stats(stats)
+            return stats
+
+        for event in graph.stream({"messages": [("human", question)]}, config):
             for value in event.values():
                 if "messages" in value:
                     message = value["messages"][-1]
@@ -66,26 +77,135 @@ def test_chatbot(graph, question: str):
     except Exception as e:
         print(f"\n❌ 오류 발생: {str(e)}")
 
-def main():
-    # 테스트할 질문들
-    test_questions = [
-        "안녕하세요!",
-        "2024년 가장 인기있는 프로그래밍 언어는 뭐야?",
-        "1 + 1은 뭐야?",
-        "파이썬이란 무엇인가요?",
-        "어제 있었던 월드컵 결과 알려줘",
-        "2025년 IT 최신 트렌드를 알려줘"
-    ]
+# 테스트할 질문들
+test_questions = [
+    "안녕하세요!",
+    "2024년 가장 인기있는 프로그래밍 언어는 뭐야?",
+    "1 + 1은 뭐야?",
+    "파이썬이란 무엇인가요?",
+    "어제 있었던 월드컵 결과 알려줘",
+    "2025년 IT 최신 트렌드를 알려줘"
+]
 
+def main(*, llm_cache=None, metrics=None, stream=False, fast_path=None, resilience=None, turn_timeout=None, budget=None,
+         cassette=None):
     # 그래프 초기화
     print("🔄 챗봇 초기화 중...")
-    graph = setup_graph()
+    graph = setup_graph(
+        llm_cache=llm_cache, metrics=metrics, fast_path=fast_path, resilience=resilience, budget=budget, cassette=cassette
+    )
     print("✅ 챗봇 준비 완료!\n")
 
     # 각 질문 테스트
+    turn_stats = []
+    start = time.perf_counter()
     for question in test_questions:
-        test_chatbot(graph, question)
+        turn_stats.append(test_chatbot(graph, question, stream, turn_timeout))
         print("\n" + "-"*50)  # 질문 구분선
+    wall_seconds = time.perf_counter() - start
+
+    if stream:
+        print_stream_summary(stats for stats in turn_stats if stats is not None)
+
+    if llm_cache is not None:
+        print_cache_stats(llm_cache)
+    if fast_path is not None:
+        print_fast_path_stats(fast_path)
+    if resilience is not None:
+        print_resilience_stats(resilience)
+    if budget is not None:
+        print_budget_stats(budget)
+    if cassette is not None:
+        cassette.save()
+        print_cassette_stats(cassette, wall_seconds)
+    if metrics is not None:
+        print_metrics(metrics)
+
+def main_batch(max_concurrency: int = 8, *, llm_cache=None, search_cache=None, metrics=None, fast_path=None,
+               resilience=None, turn_timeout=None, budget=None, cassette=None):
+    """
+    질문들을 asyncio로 동시에 실행하는 배치 모드
+    - 질문마다 별도의 thread_id를 사용한다 (서로 상태를 공유하지 않음)
+    """
+    print("🔄 챗봇 초기화 중...")
+    graph = setup_graph(
+        llm_cache=llm_cache, search_cache=search_cache, metrics=metrics, fast_path=fast_path, resilience=resilience, budget=budget,
+        cassette=cassette,
+    )
+    print(f"✅ 챗봇 준비 완료! (동시 실행: {max_concurrency})\n")
+
+    jobs = jobs_from_questions(test_questions, thread_prefix="question")
+    results, summary = run_batch_sync(graph, jobs, max_concurrency, turn_timeout=turn_timeout)
+    print_batch_report(results, summary)
+    if llm_cache is not None:
+        print_cache_stats(llm_cache)
+    if search_cache is not None:
+        print_search_stats(search_cache)
+    if fast_path is not None:
+        print_fast_path_stats(fast_path)
+    if resilience is not None:
+        print_resilience_stats(resilience)
+    if budget is not None:
+        print_budget_stats(budget)
+    if cassette is not None:
+        # 동시에 실행한 호출은 기다린 시간이 겹치므로 실행 시간과 빼지 않는다
+        cassette.save()
+        print_cassette_stats(cassette)
+    if metrics is not None:
+        print_metrics(metrics)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", action="store_true", help="질문을 동시에 실행한다")
+    parser.add_argument("--concurrency", type=int, default=8, help="배치 모드 동시 실행 수")
+    parser.add_argument("--cache", help="LLM 응답 캐시 파일 (SQLite)")
+    parser.add_argument("--cache-ttl", type=float, default=24 * 3600, help="캐시 유효 시간(초)")
+    parser.add_argument("--cache-any-temperature", action="store_true", help="temperature가 0이 아니어도 캐시한다")
+    parser.add_argument("--search-ttl", type=float, help="배치 모드에서 검색 결과를 캐시할 시간(초)")
+    parser.add_argument("--stream", action="store_true", help="토큰을 도착하는 대로 출력하고 TTFT를 잰다")
+    parser.add_argument("--metrics", action="store_true", help="노드별 실행 시간을 계측해 마지막에 출력한다")
+    parser.add_argument("--metrics-jsonl", help="노드 실행 기록을 남길 JSONL 파일 (--metrics 포함)")
+    parser.add_argument("--metrics-port", type=int, help="Prometheus 텍스트(/metrics)를 내보낼 포트 (--metrics 포함)")
+    parser.add_argument("--fast-path", action="store_true", help="인사/계산 같은 간단한 질문은 도구 모델 없이 답한다")
+    parser.add_argument("--small-model", help="--fast-path: 검색이 필요 없어 보이는 질문에 쓸 도구 없는 모델 (예: gpt-4o-mini)")
+    parser.add_argument("--hedge", action="store_true", help="느린 모델/검색 호출은 p95 지연 뒤에 같은 요청을 한 번 더 보낸다 (서킷 브레이커 포함)")
+    parser.add_argument("--turn-timeout", type=float, help="턴 하나(chatbot ↔ tools 전체)의 마감 시간(초)")
+    parser.add_argument("--max-iterations", type=int, help="턴 하나에서 도구를 호출할 수 있는 최대 횟수 (넘으면 도구 없이 답한다)")
+    parser.add_argument("--max-tool-seconds", type=float, help="턴 하나에서 도구 실행에 쓸 수 있는 최대 시간(초)")
+    parser.add_argument("--max-turn-tokens", type=int, help="턴 하나에서 모델 호출에 쓸 수 있는 최대 토큰 수")
+    add_cassette_arguments(parser)
+    args = parser.parse_args()
+
+    llm_cache = LLMCache(
+        path=args.cache,
+        ttl=args.cache_ttl,
+        allow_nonzero_temperature=args.cache_any_temperature,
+    ) if args.cache else None
+    search_cache = SearchCache(ttl=args.search_ttl) if args.search_ttl else None
+    metrics = GraphMetrics(jsonl_path=args.metrics_jsonl) if (
+        args.metrics or args.metrics_jsonl or args.metrics_port
+    ) else None
+    if args.metrics_port:
+        serve_metrics(metrics, args.metrics_port)
+    fast_path = FastPathRouter(
+        small_llm=chat_openai(model=args.small_model, temperature=0.7, streaming=True) if args.small_model else None,
+    ) if args.fast_path or args.small_model else None
+    resilience = ResiliencePolicy(hedge=args.hedge) if args.hedge or args.turn_timeout else None
+    budget = LoopBudget(
+        max_iterations=args.max_iterations,
+        max_tool_seconds=args.max_tool_seconds,
+        max_tokens=args.max_turn_tokens,
+    ) if args.max_iterations or args.max_tool_seconds or args.max_turn_tokens else None
+    cassette = make_cassette(args)
+    if args.batch:
+        main_batch(
+            args.concurrency, llm_cache=llm_cache, search_cache=search_cache, metrics=metrics, fast_path=fast_path,
+            resilience=resilience, turn_timeout=args.turn_timeout, budget=budget, cassette=cassette,
+        )
+    else:
+        main(
+            llm_cache=llm_cache, metrics=metrics, stream=args.stream, fast_path=fast_path, resilience=resilience,
+            turn_timeout=args.turn_timeout, budget=budget, cassette=cassette,
+        )
+    if resilience is not None:
+        resilience.close()
\ No newline at end of file
@@ -1,51 +1,78 @@
-from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode, tools_condition
-from langchain_openai import ChatOpenAI
-from langchain_community.tools.tavily_search import TavilySearchResults
 from typing import Annotated
 from typing_extensions import TypedDict
 
+from common.async_nodes import acall, async_only, check_flavor
+from common.factory import build_chat_graph, chat_openai, memoize_graph, tavily_search
+from common.cassette import with_cassette
+from common.prefetch import with_prefetch
+from common.resilience import with_resilience
+from common.search_cache import with_search_cache
+
 class State(TypedDict):
     messages: Annotated[list, add_messages]
+    summary: str  # compact 노드가 접어 둔 이전 대화 요약
+
+# human-in-the-loop: 도구를 실행하기 전에 사람의 승인을 받는다
+def require_human_approval(*args, **kwargs):
+    print("\n⚠️ Human Approval Required")
+    input("Press Enter to continue...")
 
-def setup_graph():
-    # 그래프 빌더 생성
-    graph_builder = StateGraph(State)
+@memoize_graph
+def setup_graph(*, max_history_tokens=None, search_cache=None, llm=None, search_tool=None,
+                approval=require_human_approval, metrics=None, prefetch=None, resilience=None, budget=None, blobs=None,
+                cassette=None, flavor="sync"):
+    # 선택 기능 옵션은 모두 키워드로 넘긴다 (각 옵션의 뜻은 common.factory.build_chat_graph 참고)
+    # 무거운 import는 그래프를 처음 만들 때 한다
+    from langgraph.prebuilt import ToolNode
 
     # 도구 설정
-    tool = TavilySearchResults(max_results=2)
+    # 모델/검색 도구를 넘기면 그것을 사용한다 (예: common.fakes의 오프라인 가짜 구현)
+    if search_tool is None:
+        search_tool = tavily_search(max_results=2)
+    # 검색 도구 감싸기: cassette(upstream 자리라 가장 안쪽) → resilience → 검색 캐시 → prefetch
+    # (prefetch 검색은 승인 전에 시작되지만 결과는 승인 후 tools 노드에서만 쓰인다)
+    search_tool = with_resilience(with_cassette(search_tool, cassette), resilience)
+    tool = with_prefetch(with_search_cache(search_tool, search_cache), prefetch)
     tools = [tool]
 
     # LLM 설정
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0.7,
-        streaming=True
-    )
-    llm_with_tools = llm.bind_tools(tools)
+    if llm is None:
+        llm = chat_openai(
+            model="gpt-4o-mini",
+            temperature=0.7,
+            streaming=True
+        )
 
-    # 챗봇 노드 정의
-    def chatbot(state: State):
-        return {"messages": [llm_with_tools.invoke(state["messages"])]}
-
-    # 노드 추가
-    graph_builder.add_node("chatbot", chatbot)
     tool_node = ToolNode(tools=tools)
 
-    # human-in-the-loop 적용
-    def require_human_approval(*args, **kwargs):
-        print("\n⚠️ Human Approval Required")
-        input("Press Enter to continue...")
+    # human-in-the-loop 적용: 승인 함수가 끝나야 도구를 실행한다 (approval=None이면 바로 실행)
+    def approved_tools(state: State):
+        if approval is not None:
+            approval(state)
+        return tool_node.invoke(state)
 
-    graph_builder.add_node("tools", tool_node, interrupt_before=require_human_approval)
-    graph_builder.add_conditional_edges("chatbot", tools_condition)
-    graph_builder.add_edge("tools", "chatbot")
-    graph_builder.add_edge(START, "chatbot")
-    graph_builder.add_edge("chatbot", END)
+    # flavor="async": 승인 함수는 코루틴이면 기다리고, 동기 함수(input 등)면 스레드에서 실행해 이벤트 루프를 막지 않는다
+    async def aapproved_tools(state: State):
+        if approval is not None:
+            await acall(approval, state)
+        return await tool_node.ainvoke(state)
 
-    # 그래프 컴파일
-    return graph_builder.compile()
+    # 그래프 구성/컴파일
+    return build_chat_graph(
+        State,
+        tools,
+        llm,
+        tool_node=async_only(aapproved_tools, name="tools") if check_flavor(flavor) else approved_tools,
+        max_history_tokens=max_history_tokens,
+        metrics=metrics,
+        prefetch=prefetch,
+        resilience=resilience,
+        budget=budget,
+        blobs=blobs,
+        cassette=cassette,
+        flavor=flavor,
+    )
 
 def main():
     graph = setup_graph()
@@ -1,21 +1,25 @@
-import os
-from dotenv import load_dotenv
+import argparse
+import asyncio
 from typing import Annotated
 from typing_extensions import TypedDict
-from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langchain_openai import ChatOpenAI
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langgraph.prebuilt import ToolNode, tools_condition
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.types import Command, interrupt
 from langchain_core.tools import tool
 
-load_dotenv()
+from common.approvals import add_approval_arguments, run_approval_cli
+from common.async_nodes import check_flavor
+from common.cassette import with_cassette
+from common.delta_stream import stream_deltas
+from common.factory import build_chat_graph, chat_openai, memoize_graph, tavily_search
+from common.parallel_tools import route_tool_calls
+from common.resilience import with_resilience
+from common.search_cache import with_search_cache
 
 # 상태 정의
 class State(TypedDict):
    messages: Annotated[list, add_messages]
+   summary: str  # compact 노드가 접어 둔 이전 대화 요약
 
 # 사람 도움 요청 도구
 @tool
@@ -24,45 +28,55 @@ def human_assistance(query: str) -> str:
    human_response = interrupt({"query": query})
    return human_response["data"]
 
-def setup_graph():
-   # 메모리 설정
-   memory = MemorySaver()
+# 비동기 버전 (flavor="async"): ToolNode가 스레드 풀 없이 이벤트 루프에서 실행한다
+@tool("human_assistance")
+async def ahuman_assistance(query: str) -> str:
+   """사람의 도움을 요청합니다."""
+   return human_assistance.func(query)
 
-   # 그래프 설정
-   graph_builder = StateGraph(State)
+@memoize_graph
+def setup_graph(checkpointer=None, *, max_history_tokens=None, search_cache=None, max_tool_concurrency=None, llm=None,
+                search_tool=None, metrics=None, resilience=None, budget=None, blobs=None, cassette=None, flavor="sync"):
+   # checkpointer를 넘기고 같은 설정으로 다시 부르면 컴파일해 둔 그래프를 재사용한다 (common.factory.memoize_graph)
+   # 선택 기능 옵션은 모두 키워드로 넘긴다 (각 옵션의 뜻은 common.factory.build_chat_graph 참고)
+   # 메모리 설정 (SqliteSaver 등 다른 체크포인터를 넘기면 그것을 사용)
+   memory = checkpointer if checkpointer is not None else MemorySaver()
 
    # 도구 설정
-   search_tool = TavilySearchResults(max_results=2)
-   tools = [search_tool, human_assistance]
+   # 모델/검색 도구를 넘기면 그것을 사용한다 (예: common.fakes의 오프라인 가짜 구현)
+   if search_tool is None:
+      search_tool = tavily_search(max_results=2)
+   # 검색 도구 감싸기: cassette(upstream 자리라 가장 안쪽) → resilience → 검색 캐시
+   # (human_assistance는 interrupt를 쓰므로 감싸지 않는다)
+   search_tool = with_search_cache(with_resilience(with_cassette(search_tool, cassette), resilience), search_cache)
+   # flavor="async"면 human_assistance도 코루틴 버전을 쓴다 (interrupt는 이벤트 루프에서 그대로 동작한다)
+   tools = [search_tool, ahuman_assistance if check_flavor(flavor) else human_assistance]
 
    # AI 모델 설정
-   llm = ChatOpenAI(
-       model="gpt-4",
-       temperature=0.7,
-       streaming=True
-   )
-   llm_with_tools = llm.bind_tools(tools)
-
-   # 챗봇 노드
-   def chatbot(state: State):
-       message = llm_with_tools.invoke(state["messages"])
-       # 도구 호출이 여러 번 반복되는 것을 방지
-       assert len(message.tool_calls) <= 1
-       return {"messages": [message]}
-
-   # 노드 추가
-   graph_builder.add_node("chatbot", chatbot)
-   graph_builder.add_node("tools", ToolNode(tools=tools))
-
-   # 엣지 추가
-   graph_builder.add_conditional_edges(
-       "chatbot",
-       tools_condition,
+   if llm is None:
+      llm = chat_openai(
+         model="gpt-4",
+         temperature=0.7,
+         streaming=True
+      )
+
+   # 그래프 구성/컴파일
+   # - route_tool_calls: 도구 호출마다 tools 작업을 하나씩 만들어 동시에 실행한다
+   return build_chat_graph(
+      State,
+      tools,
+      llm,
+      router=route_tool_calls,
+      checkpointer=memory,
+      max_history_tokens=max_history_tokens,
+      metrics=metrics,
+      max_tool_concurrency=max_tool_concurrency,
+      resilience=resilience,
+      budget=budget,
+      blobs=blobs,
+      cassette=cassette,
+      flavor=flavor,
    )
-   graph_builder.add_edge("tools", "chatbot")
-   graph_builder.add_edge(START, "chatbot")
-
-   return graph_builder.compile(checkpointer=memory)
 
 def test_chatbot(graph, question: str, thread_id: str = "default"):
    """챗봇 테스트 함수"""
@@ -73,15 +87,16 @@ def test_chatbot(graph, question: str, thread_id: str = "default"):
    config = {"configurable": {"thread_id": thread_id}}
 
    try:
-       events = graph.stream(
+       # 이번 턴에 새로 붙은 메시지만 받는다 (stream_mode="values"처럼 단계마다 전체 기록을 받지 않는다)
+       deltas = stream_deltas(
+           graph,
            {"messages": [{"role": "user", "content": question}]},
            config,
-           stream_mode="values"
+           base=graph.get_state(config).values,
        )
 
-       for event in events:
-           if "messages" in event:
-               message = event["messages"][-1]
+       for delta in deltas:
+           for message in delta.messages:
                if hasattr(message, "content"):
                    print(f"\n🤖 AI: {message.content}")
 
@@ -99,33 +114,52 @@ def test_chatbot(graph, question: str, thread_id: str = "default"):
 
            # 사람의 응답으로 재개
            human_command = Command(resume={"data": response})
-           events = graph.stream(human_command, config, stream_mode="values")
+           deltas = stream_deltas(graph, human_command, config, base=state.values)
 
-           for event in events:
-               if "messages" in event:
-                   message = event["messages"][-1]
+           for delta in deltas:
+               for message in delta.messages:
                    if hasattr(message, "content"):
                        print(f"\n🤖 AI: {message.content}")
 
    except Exception as e:
        print(f"\n❌ 오류 발생: {str(e)}")
 
+# 테스트 시나리오
+test_cases = [
+   "이 코드가 안전한지 검토해주세요: import os; os.system('rm -rf /')",
+   "중요한 데이터베이스를 삭제하려고 하는데 확인해주세요",
+   "이 거래를 승인해도 될까요? 금액: $10,000",
+]
+
 def main():
    print("🔄 챗봇 초기화 중...")
    graph = setup_graph()
    print("✅ 챗봇 준비 완료!\n")
 
-   # 테스트 시나리오
-   test_cases = [
-       "이 코드가 안전한지 검토해주세요: import os; os.system('rm -rf /')",
-       "중요한 데이터베이스를 삭제하려고 하는데 확인해주세요",
-       "이 거래를 승인해도 될까요? 금액: $10,000",
-   ]
-
    thread_id = "test_conversation"
    for question in test_cases:
        test_chatbot(graph, question, thread_id)
        print("\n" + "-"*50)
 
+def main_queued(args):
+   """
+   승인 대기열 모드: interrupt에 걸린 대화는 대기열에 등록하고 바로 다음 대화로 넘어간다
+   - 사람의 응답은 --approve로 (다른 프로세스에서도) 기록하고, --resume이 한꺼번에 재개한다
+   - 대화 상태는 SQLite 파일에 있으므로 명령 사이에 프로세스가 바뀌어도 된다
+   """
+   from common.sqlite_saver import SqliteSaver
+
+   with SqliteSaver(args.sqlite) as checkpointer:
+      # 대기열 모드는 astream으로만 실행하므로 노드/도구가 코루틴인 그래프를 쓴다
+      graph = setup_graph(checkpointer, flavor="async")
+      asyncio.run(run_approval_cli(args, graph, test_cases))
+
 if __name__ == "__main__":
-   main()
\ No newline at end of file
+   parser = argparse.ArgumentParser()
+   add_approval_arguments(parser)
+   args = parser.parse_args()
+
+   if args.queue:
+      main_queued(args)
+   else:
+      main()
\ No newline at end of file
@@ -1,24 +1,28 @@
 # examples/example5/main.py
 
-import os
-from dotenv import load_dotenv
+import argparse
+import asyncio
 from typing import Annotated
 from typing_extensions import TypedDict
-from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langchain_openai import ChatOpenAI
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langgraph.prebuilt import ToolNode, tools_condition
 from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.messages import ToolMessage
 from langchain_core.tools import InjectedToolCallId, tool
 from langgraph.types import Command, interrupt
 
-load_dotenv()
+from common.approvals import add_approval_arguments, run_approval_cli
+from common.async_nodes import check_flavor
+from common.cassette import with_cassette
+from common.delta_stream import stream_deltas
+from common.factory import build_chat_graph, chat_openai, memoize_graph, tavily_search
+from common.parallel_tools import route_tool_calls
+from common.resilience import with_resilience
+from common.search_cache import with_search_cache
 
 # State 정의
 class State(TypedDict):
     messages: Annotated[list, add_messages]
+    summary: str  # compact 노드가 접어 둔 이전 대화 요약
     name: str
     birthday: str
 
@@ -52,36 +56,58 @@ def human_assistance(
     }
     return Command(update=state_update)
 
-def setup_graph():
-    # 그래프 설정
-    memory = MemorySaver()
-    graph_builder = StateGraph(State)
+# 비동기 버전 (flavor="async"): ToolNode가 스레드 풀 없이 이벤트 루프에서 실행한다
+@tool("human_assistance")
+async def ahuman_assistance(
+    name: str,
+    birthday: str,
+    tool_call_id: Annotated[str, InjectedToolCallId]
+) -> str:
+    """사람에게 정보 검증을 요청합니다."""
+    return human_assistance.func(name, birthday, tool_call_id)
+
+@memoize_graph
+def setup_graph(checkpointer=None, *, max_history_tokens=None, search_cache=None, max_tool_concurrency=None, llm=None,
+                search_tool=None, metrics=None, resilience=None, budget=None, blobs=None, cassette=None, flavor="sync"):
+    # checkpointer를 넘기고 같은 설정으로 다시 부르면 컴파일해 둔 그래프를 재사용한다 (common.factory.memoize_graph)
+    # 선택 기능 옵션은 모두 키워드로 넘긴다 (각 옵션의 뜻은 common.factory.build_chat_graph 참고)
+    # 메모리 설정 (SqliteSaver 등 다른 체크포인터를 넘기면 그것을 사용)
+    memory = checkpointer if checkpointer is not None else MemorySaver()
 
     # 도구 설정
-    search_tool = TavilySearchResults(max_results=2)
-    tools = [search_tool, human_assistance]
+    # 모델/검색 도구를 넘기면 그것을 사용한다 (예: common.fakes의 오프라인 가짜 구현)
+    if search_tool is None:
+        search_tool = tavily_search(max_results=2)
+    # 검색 도구 감싸기: cassette(upstream 자리라 가장 안쪽) → resilience → 검색 캐시
+    # (human_assistance는 interrupt를 쓰므로 감싸지 않는다)
+    search_tool = with_search_cache(with_resilience(with_cassette(search_tool, cassette), resilience), search_cache)
+    # flavor="async"면 human_assistance도 코루틴 버전을 쓴다 (interrupt는 이벤트 루프에서 그대로 동작한다)
+    tools = [search_tool, ahuman_assistance if check_flavor(flavor) else human_assistance]
 
     # AI 모델 설정
-    llm = ChatOpenAI(
-        model="gpt-4",
-        temperature=0.7,
-    )
-    llm_with_tools = llm.bind_tools(tools)
-
-    # 챗봇 노드
-    def chatbot(state: State):
-        message = llm_with_tools.invoke(state["messages"])
-        assert len(message.tool_calls) <= 1
-        return {"messages": [message]}
-
-    # 그래프 구성
-    graph_builder.add_node("chatbot", chatbot)
-    graph_builder.add_node("tools", ToolNode(tools=tools))
-    graph_builder.add_conditional_edges("chatbot", tools_condition)
-    graph_builder.add_edge("tools", "chatbot")
-    graph_builder.add_edge(START, "chatbot")
+    if llm is None:
+        llm = chat_openai(
+            model="gpt-4",
+            temperature=0.7,
+        )
 
-    return graph_builder.compile(checkpointer=memory)
+    # 그래프 구성/컴파일
+    # - route_tool_calls: 도구 호출마다 tools 작업을 하나씩 만들어 동시에 실행한다
+    return build_chat_graph(
+        State,
+        tools,
+        llm,
+        router=route_tool_calls,
+        checkpointer=memory,
+        max_history_tokens=max_history_tokens,
+        metrics=metrics,
+        max_tool_concurrency=max_tool_concurrency,
+        resilience=resilience,
+        budget=budget,
+        blobs=blobs,
+        cassette=cassette,
+        flavor=flavor,
+    )
 
 def test_information_lookup():
     graph = setup_graph()
@@ -96,16 +122,17 @@ def test_information_lookup():
 
     try:
         # 초기 검색 실행
-        events = graph.stream(
+        # 새로 붙은 메시지와 바뀐 값(name/birthday)만 받는다 (stream_mode="values"처럼 단계마다 전체 상태를 받지 않는다)
+        deltas = stream_deltas(
+            graph,
             {"messages": [{"role": "user", "content": user_input}]},
             config,
-            stream_mode="values"
+            base=graph.get_state(config).values,
         )
 
         print("\n검색 중...")
-        for event in events:
-            if "messages" in event:
-                message = event["messages"][-1]
+        for delta in deltas:
+            for message in delta.messages:
                 if hasattr(message, "content"):
                     print(f"\n🤖 AI: {message.content}")
 
@@ -119,12 +146,14 @@ def test_information_lookup():
         )
 
         # 검증 정보로 계속 진행
-        events = graph.stream(human_command, config, stream_mode="values")
-        for event in events:
-            if "messages" in event:
-                message = event["messages"][-1]
+        deltas = stream_deltas(graph, human_command, config, base=graph.get_state(config).values)
+        for delta in deltas:
+            for message in delta.messages:
                 if hasattr(message, "content"):
                     print(f"\n🤖 AI: {message.content}")
+            for key, value in delta.values.items():
+                if key in ("name", "birthday"):
+                    print(f"\n📝 {key} = {value}")
 
         # 최종 상태 확인
         state = graph.get_state(config)
@@ -148,5 +177,31 @@ def main():
     test_information_lookup()
     print("\n✅ 테스트 완료!")
 
+# 승인 대기열 모드에서 동시에 시작할 검색 요청
+lookup_questions = [
+    f"{name}의 출시일을 찾아주세요. 찾으면 human_assistance 도구로 검증해주세요."
+    for name in ["LangGraph", "LangChain", "LangSmith", "FastAPI", "Pydantic"]
+]
+
+def main_queued(args):
+    """
+    승인 대기열 모드: 검증 요청(interrupt)에 걸린 대화는 대기열에 등록하고 기다리지 않는다
+    - 응답 예: --approve --response '{"correct": "y"}'
+              --approve lookup_0 --response '{"name": "LangGraph", "birthday": "Jan 17, 2024"}'
+    """
+    from common.sqlite_saver import SqliteSaver
+
+    with SqliteSaver(args.sqlite) as checkpointer:
+        # 대기열 모드는 astream으로만 실행하므로 노드/도구가 코루틴인 그래프를 쓴다
+        graph = setup_graph(checkpointer, flavor="async")
+        asyncio.run(run_approval_cli(args, graph, lookup_questions, thread_prefix="lookup"))
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    add_approval_arguments(parser)
+    args = parser.parse_args()
+
+    if args.queue:
+        main_queued(args)
+    else:
+        main()
\ No newline at end of file
@@ -1,51 +1,80 @@
-import os
-from dotenv import load_dotenv
+import argparse
+import time
 from typing import Annotated
 from typing_extensions import TypedDict
-from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langchain_openai import ChatOpenAI
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langgraph.prebuilt import ToolNode, tools_condition
 from langgraph.checkpoint.memory import MemorySaver  # 메모리 기능 추가
-load_dotenv()
+
+from common.async_nodes import add_flavor_arguments
+from common.batch import jobs_from_conversations, print_batch_report, run_batch_sync
+from common.binary_serde import make_serde
+from common.blob_store import BlobStore, print_blob_stats
+from common.cassette import add_cassette_arguments, make_cassette, print_cassette_stats, with_cassette
+from common.bounded_memory import BoundedMemorySaver, print_memory_stats
+from common.delta_checkpoint import DeltaBoundedMemorySaver, DeltaMemorySaver, DeltaSqliteSaver
+from common.factory import ANSWER_NODES, build_chat_graph, chat_openai, memoize_graph, tavily_search
+from common.sqlite_saver import SqliteSaver
+from common.instrumentation import GraphMetrics, print_metrics, serve_metrics
+from common.llm_cache import LLMCache, print_cache_stats
+from common.loop_budget import LoopBudget, print_budget_stats
+from common.prefetch import SearchPrefetcher, print_prefetch_stats, with_prefetch
+from common.resilience import ResiliencePolicy, print_resilience_stats, with_deadline, with_resilience
+from common.search_cache import SearchCache, print_search_stats, with_search_cache
+from common.sharded_memory import ShardedMemorySaver
+from common.streaming import print_stream_summary, print_turn_stats, stream_tokens
 
 class State(TypedDict):
     messages: Annotated[list, add_messages]
+    summary: str  # compact 노드가 접어 둔 이전 대화 요약
 
 
+# 챗봇 모델 설정 (myproject.server도 같은 설정으로 연결 풀을 쓰는 모델을 만든다)
+MODEL_OPTIONS = {"model": "gpt-4o-mini", "temperature": 0.7, "streaming": True}
 
 
-def setup_graph():
-    # 메모리 설정
-    memory = MemorySaver()
-
-    # 나머지 설정은 동일
-    graph_builder = StateGraph(State)
-    tool = TavilySearchResults(max_results=2)
-    tools = [tool]
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0.7,
-        streaming=True
-    )
-    llm_with_tools = llm.bind_tools(tools)
+@memoize_graph
+def setup_graph(checkpointer=None, *, max_history_tokens=None, llm_cache=None, search_cache=None, llm=None,
+                search_tool=None, metrics=None, prefetch=None, resilience=None, budget=None, blobs=None, cassette=None,
+                flavor="sync"):
+    # checkpointer를 넘기고 같은 설정으로 다시 부르면 컴파일해 둔 그래프를 재사용한다 (common.factory.memoize_graph)
+    # 선택 기능 옵션은 모두 키워드로 넘긴다 (각 옵션의 뜻은 common.factory.build_chat_graph 참고)
+    # 메모리 설정 (SqliteSaver 등 다른 체크포인터를 넘기면 그것을 사용)
+    memory = checkpointer if checkpointer is not None else MemorySaver()
 
-    def chatbot(state: State):
-        return {"messages": [llm_with_tools.invoke(state["messages"])]}
+    # 모델/검색 도구를 넘기면 그것을 사용한다 (예: common.fakes의 오프라인 가짜 구현)
+    if search_tool is None:
+        search_tool = tavily_search(max_results=2)
+    if llm is None:
+        llm = chat_openai(**MODEL_OPTIONS)
 
-    graph_builder.add_node("chatbot", chatbot)
-    graph_builder.add_node("tools", ToolNode(tools=[tool]))
-    graph_builder.add_conditional_edges("chatbot", tools_condition)
-    graph_builder.add_edge("tools", "chatbot")
-    graph_builder.add_edge(START, "chatbot")
+    # 검색 도구 감싸기: cassette(upstream 자리라 가장 안쪽) → resilience → 검색 캐시 → prefetch
+    search_tool = with_cassette(search_tool, cassette)
+    tool = with_search_cache(with_resilience(search_tool, resilience), search_cache)
+    tool = with_prefetch(tool, prefetch)
 
-    # 메모리 추가하여 컴파일
-    return graph_builder.compile(checkpointer=memory)
+    # chatbot ↔ tools 그래프를 메모리와 함께 컴파일
+    return build_chat_graph(
+        State,
+        [tool],
+        llm,
+        checkpointer=memory,
+        max_history_tokens=max_history_tokens,
+        llm_cache=llm_cache,
+        metrics=metrics,
+        prefetch=prefetch,
+        resilience=resilience,
+        budget=budget,
+        blobs=blobs,
+        cassette=cassette,
+        flavor=flavor,
+    )
 
-def test_chatbot(graph, question: str, thread_id: str = "default"):
+def test_chatbot(graph, question: str, thread_id: str = "default", stream: bool = False,
+                 turn_timeout: float | None = None):
     """
     챗봇 테스트 함수 - thread_id로 대화 구분
+    stream=True면 토큰을 도착하는 대로 출력하고 StreamStats(TTFT, 토큰/s)를 돌려준다
+    turn_timeout을 주면 이번 턴 전체(chatbot ↔ tools)를 그 시간(초) 안에 끝내야 한다
     """
     print("\n" + "="*50)
     print(f"😀 사용자: {question}")
@@ -54,7 +83,12 @@ def test_chatbot(graph, question: str, thread_id: str = "default"):
 
     try:
         # thread_id를 포함한 설정 추가
-        config = {"configurable": {"thread_id": thread_id}}
+        config = with_deadline({"configurable": {"thread_id": thread_id}}, turn_timeout)
+        if stream:
+            stats = stream_tokens(graph, {"messages": [("human", question)]}, config, nodes=ANSWER_NODES)
+            print_turn_stats(stats)
+            return stats
+
         for event in graph.stream(
             {"messages": [("human", question)]},
             config  # 설정 추가
@@ -71,37 +105,222 @@ def test_chatbot(graph, question: str, thread_id: str = "default"):
     except Exception as e:
         print(f"\n❌ 오류 발생: {str(e)}")
 
-def main():
-    graph = setup_graph()
+# 스크립트로 실행할 대화 목록 (thread_id: 질문 목록)
+conversations = {
+    "conversation_1": [
+        "내 이름은 철수야",
+        "내 이름이 뭐였지?",
+        "나는 학생이야",
+        "내가 뭐라고 했었지?"
+    ],
+    "conversation_2": [
+        "안녕! 내 이름은 영희야",
+        "내 이름이 뭐였지?",
+        "나는 선생님이야",
+        "내가 뭐라고 했었지?"
+    ],
+}
+
+def main(checkpointer=None, *, llm_cache=None, metrics=None, stream=False, prefetch=None, resilience=None,
+         turn_timeout=None, budget=None, blobs=None, cassette=None):
+    graph = setup_graph(
+        checkpointer, llm_cache=llm_cache, metrics=metrics, prefetch=prefetch, resilience=resilience, budget=budget,
+        blobs=blobs, cassette=cassette,
+    )
     print("✅ 챗봇 준비 완료!\n")
+    turn_stats = []
+    start = time.perf_counter()
 
     # 첫 번째 대화 (thread_id: conversation_1)
     print("\n🗣️ 첫 번째 대화 시작")
     thread_1 = "conversation_1"
-    questions_1 = [
-        "내 이름은 철수야",
-        "내 이름이 뭐였지?",
-        "나는 학생이야",
-        "내가 뭐라고 했었지?"
-    ]
+    questions_1 = conversations[thread_1]
 
     for question in questions_1:
-        test_chatbot(graph, question, thread_1)
+        turn_stats.append(test_chatbot(graph, question, thread_1, stream, turn_timeout))
         print("\n" + "-"*50)
 
     # 두 번째 대화 (thread_id: conversation_2)
     print("\n🗣️ 두 번째 대화 시작")
     thread_2 = "conversation_2"
-    questions_2 = [
-        "안녕! 내 이름은 영희야",
-        "내 이름이 뭐였지?",
-        "나는 선생님이야",
-        "내가 뭐라고 했었지?"
-    ]
+    questions_2 = conversations[thread_2]
 
     for question in questions_2:
-        test_chatbot(graph, question, thread_2)
+        turn_stats.append(test_chatbot(graph, question, thread_2, stream, turn_timeout))
         print("\n" + "-"*50)
+    wall_seconds = time.perf_counter() - start
+
+    if stream:
+        print_stream_summary(stats for stats in turn_stats if stats is not None)
+    if llm_cache is not None:
+        print_cache_stats(llm_cache)
+    if prefetch is not None:
+        print_prefetch_stats(prefetch)
+    if resilience is not None:
+        print_resilience_stats(resilience)
+    if budget is not None:
+        print_budget_stats(budget)
+    if blobs is not None:
+        print_blob_stats(blobs)
+    if cassette is not None:
+        cassette.save()
+        print_cassette_stats(cassette, wall_seconds)
+    if metrics is not None:
+        print_metrics(metrics)
+
+def main_batch(max_concurrency: int = 8, checkpointer=None, *, llm_cache=None, search_cache=None, metrics=None,
+               prefetch=None, resilience=None, turn_timeout=None, budget=None, blobs=None, cassette=None,
+               flavor="sync"):
+    """
+    대화들을 asyncio로 동시에 실행하는 배치 모드
+    - 서로 다른 대화는 병렬로, 같은 대화 안의 질문은 순서대로 실행한다
+    - flavor="async"면 노드/라우터가 코루틴인 그래프로 실행한다 (스레드 풀을 거치지 않는다)
+    """
+    graph = setup_graph(
+        checkpointer, llm_cache=llm_cache, search_cache=search_cache, metrics=metrics, prefetch=prefetch,
+        resilience=resilience, budget=budget, blobs=blobs, cassette=cassette, flavor=flavor,
+    )
+    print(f"✅ 챗봇 준비 완료! (동시 실행: {max_concurrency})\n")
+
+    jobs = jobs_from_conversations(conversations)
+    results, summary = run_batch_sync(graph, jobs, max_concurrency, turn_timeout=turn_timeout)
+    print_batch_report(results, summary)
+    if llm_cache is not None:
+        print_cache_stats(llm_cache)
+    if search_cache is not None:
+        print_search_stats(search_cache)
+    if prefetch is not None:
+        print_prefetch_stats(prefetch)
+    if resilience is not None:
+        print_resilience_stats(resilience)
+    if budget is not None:
+        print_budget_stats(budget)
+    if blobs is not None:
+        print_blob_stats(blobs)
+    if cassette is not None:
+        # 동시에 실행한 호출은 기다린 시간이 겹치므로 실행 시간과 빼지 않는다
+        cassette.save()
+        print_cassette_stats(cassette)
+    if metrics is not None:
+        print_metrics(metrics)
+
+def make_checkpointer(args, metrics=None):
+    """--sqlite / --memory-budget / --delta / --shards / --serde 인자로 체크포인터를 고른다 (None이면 setup_graph의 MemorySaver)"""
+    serde = make_serde(args.serde)
+    if args.sqlite:
+        return (DeltaSqliteSaver if args.delta else SqliteSaver)(args.sqlite, serde=serde)
+    if args.memory_budget:
+        return (DeltaBoundedMemorySaver if args.delta else BoundedMemorySaver)(
+            max_bytes=int(args.memory_budget * 2**20),
+            idle_ttl=args.idle_ttl,
+            spill_path=args.spill,
+            metrics=metrics,
+            serde=serde,
+        )
+    if args.delta:
+        return DeltaMemorySaver(serde=serde)
+    if args.shards:
+        return ShardedMemorySaver(shards=args.shards, serde=serde)
+    return MemorySaver(serde=serde) if serde is not None else None
+
+def add_checkpointer_arguments(parser):
+    parser.add_argument("--sqlite", help="대화 기록을 저장할 SQLite 파일 (기본: 메모리)")
+    parser.add_argument("--memory-budget", type=float, help="메모리 체크포인트 상한(MB), 넘으면 오래된 대화를 파일로 내보낸다")
+    parser.add_argument("--idle-ttl", type=float, help="--memory-budget: 이 시간(초) 동안 쓰이지 않은 대화도 내보낸다")
+    parser.add_argument("--spill", help="--memory-budget: 내보낸 대화를 저장할 파일 (기본: 임시 파일)")
+    parser.add_argument("--delta", action="store_true", help="메시지 기록을 부모 체크포인트와의 차이로 저장한다")
+    parser.add_argument("--shards", type=int, help="메모리 체크포인트를 thread_id 해시로 이 개수만큼 나누고 조각마다 락을 둔다 (여러 스레드에서 동시에 쓸 때)")
+    parser.add_argument("--serde", choices=["jsonplus", "binary"], default="jsonplus",
+                        help="체크포인트 직렬화 형식 (binary: 메시지 타입 태그를 쓰는 작은 msgpack, common.binary_serde)")
+
+def make_resilience(args):
+    """--hedge / --turn-timeout 인자로 ResiliencePolicy를 만든다 (둘 다 없으면 None)"""
+    if not (args.hedge or args.turn_timeout):
+        return None
+    return ResiliencePolicy(hedge=args.hedge)
+
+def add_resilience_arguments(parser):
+    parser.add_argument("--hedge", action="store_true", help="느린 모델/검색 호출은 p95 지연 뒤에 같은 요청을 한 번 더 보낸다 (서킷 브레이커 포함)")
+    parser.add_argument("--turn-timeout", type=float, help="턴 하나(chatbot ↔ tools 전체)의 마감 시간(초)")
+
+def make_budget(args):
+    """--max-iterations / --max-tool-seconds / --max-turn-tokens 인자로 LoopBudget을 만든다 (모두 없으면 None)"""
+    if not (args.max_iterations or args.max_tool_seconds or args.max_turn_tokens):
+        return None
+    return LoopBudget(
+        max_iterations=args.max_iterations,
+        max_tool_seconds=args.max_tool_seconds,
+        max_tokens=args.max_turn_tokens,
+    )
+
+def add_budget_arguments(parser):
+    parser.add_argument("--max-iterations", type=int, help="턴 하나에서 도구를 호출할 수 있는 최대 횟수 (넘으면 도구 없이 답한다)")
+    parser.add_argument("--max-tool-seconds", type=float, help="턴 하나에서 도구 실행에 쓸 수 있는 최대 시간(초)")
+    parser.add_argument("--max-turn-tokens", type=int, help="턴 하나에서 모델 호출에 쓸 수 있는 최대 토큰 수")
+
+def make_blob_store(args):
+    """--blob-store / --blob-threshold 인자로 BlobStore를 만든다 (없으면 None)"""
+    if not (args.blob_store or args.blob_threshold):
+        return None
+    return BlobStore(path=args.blob_store, threshold=args.blob_threshold or 2000)
+
+def add_blob_arguments(parser):
+    parser.add_argument("--blob-store", help="큰 검색 결과를 상태 밖에 저장할 SQLite 파일 (같은 내용은 한 번만 저장)")
+    parser.add_argument("--blob-threshold", type=int, help="이 글자 수 이상인 도구 결과를 저장소로 옮긴다 (기본 2000, 파일 없이 주면 메모리)")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", action="store_true", help="대화를 동시에 실행한다")
+    parser.add_argument("--concurrency", type=int, default=8, help="배치 모드 동시 실행 수")
+    add_flavor_arguments(parser)
+    add_checkpointer_arguments(parser)
+    parser.add_argument("--cache", help="LLM 응답 캐시 파일 (SQLite)")
+    parser.add_argument("--cache-ttl", type=float, default=24 * 3600, help="캐시 유효 시간(초)")
+    parser.add_argument("--cache-any-temperature", action="store_true", help="temperature가 0이 아니어도 캐시한다")
+    parser.add_argument("--search-ttl", type=float, help="배치 모드에서 검색 결과를 캐시할 시간(초)")
+    parser.add_argument("--stream", action="store_true", help="토큰을 도착하는 대로 출력하고 TTFT를 잰다")
+    parser.add_argument("--metrics", action="store_true", help="노드별 실행 시간을 계측해 마지막에 출력한다")
+    parser.add_argument("--metrics-jsonl", help="노드 실행 기록을 남길 JSONL 파일 (--metrics 포함)")
+    parser.add_argument("--metrics-port", type=int, help="Prometheus 텍스트(/metrics)를 내보낼 포트 (--metrics 포함)")
+    parser.add_argument("--prefetch", action="store_true", help="검색이 필요해 보이는 질문은 모델 호출과 동시에 검색을 시작한다")
+    add_resilience_arguments(parser)
+    add_budget_arguments(parser)
+    add_blob_arguments(parser)
+    add_cassette_arguments(parser)
+    args = parser.parse_args()
+    if args.flavor == "async" and not args.batch:
+        parser.error("--flavor async는 --batch와 함께 사용합니다 (대화형 모드는 동기 API로 실행한다)")
+
+    llm_cache = LLMCache(
+        path=args.cache,
+        ttl=args.cache_ttl,
+        allow_nonzero_temperature=args.cache_any_temperature,
+    ) if args.cache else None
+    search_cache = SearchCache(ttl=args.search_ttl) if args.search_ttl else None
+    metrics = GraphMetrics(jsonl_path=args.metrics_jsonl) if (
+        args.metrics or args.metrics_jsonl or args.metrics_port
+    ) else None
+    checkpointer = make_checkpointer(args, metrics)
+    prefetch = SearchPrefetcher() if args.prefetch else None
+    resilience = make_resilience(args)
+    budget = make_budget(args)
+    blobs = make_blob_store(args)
+    cassette = make_cassette(args)
+    if args.metrics_port:
+        serve_metrics(metrics, args.metrics_port)
+    if args.batch:
+        main_batch(
+            args.concurrency, checkpointer, llm_cache=llm_cache, search_cache=search_cache, metrics=metrics,
+            prefetch=prefetch, resilience=resilience, turn_timeout=args.turn_timeout, budget=budget, blobs=blobs,
+            cassette=cassette, flavor=args.flavor,
+        )
+    else:
+        main(
+            checkpointer, llm_cache=llm_cache, metrics=metrics, stream=args.stream, prefetch=prefetch,
+            resilience=resilience, turn_timeout=args.turn_timeout, budget=budget, blobs=blobs, cassette=cassette,
+        )
+    if resilience is not None:
+        resilience.close()
+    if isinstance(checkpointer, BoundedMemorySaver):
+        print_memory_stats(checkpointer)
+        checkpointer.close()
\ No newline at end of file
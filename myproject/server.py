@@ -0,0 +1,463 @@
+"""
+myproject 챗봇 HTTP 서버 (asyncio, 표준 라이브러리만 사용)
+
+    python -m myproject.server --port 8000                 # OpenAI/Tavily
+    python -m myproject.server --port 8000 --fake          # 오프라인 가짜 모델 (부하 테스트용)
+
+엔드포인트
+- POST /threads/{thread_id}/messages  {"message": "..."}  → 이번 턴의 응답 (JSON)
+- POST /threads/{thread_id}/stream    {"message": "..."}  → 토큰 스트림 (text/event-stream)
+    event: token      data: {"text": "..."}
+    event: tool_call  data: {"name": "...", "args": {...}}
+    event: done       data: {"reply": "...", "latency_ms": ..., "ttft_ms": ...}
+- GET  /threads/{thread_id}/state     → 저장된 대화 상태
+- GET  /health, GET /metrics (--metrics를 켰을 때 Prometheus 텍스트)
+
+- 컴파일된 그래프 하나를 모든 요청이 공유한다
+- 같은 thread_id의 요청은 도착 순서대로 하나씩, 다른 thread_id는 동시에 실행한다
+  (전체 동시 실행 수는 --concurrency로 제한)
+- LLM/검색 요청은 공유 HTTP 연결 풀(common.http_pool)을 쓴다
+- --hedge / --turn-timeout: 느린 upstream 호출은 hedge 요청을 보내고, 턴 마감 시간을 넘기면 504,
+  서킷 브레이커가 열려 있으면 503으로 답한다 (common.resilience)
+- --max-iterations / --max-tool-seconds / --max-turn-tokens: 턴 예산을 넘으면 도구 없이 답한다 (common.loop_budget)
+- --blob-store: 큰 검색 결과는 상태 밖 저장소에 한 번만 저장한다 (common.blob_store)
+- 응답을 보내기 전에 클라이언트가 연결을 끊으면 실행 중인 턴(모델/도구 호출)을 취소한다
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import time
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from common.async_nodes import add_flavor_arguments
+from common.bounded_memory import BoundedMemorySaver
+from common.factory import ANSWER_NODES
+from common.instrumentation import GraphMetrics
+from common.prefetch import SearchPrefetcher
+from common.resilience import CircuitOpenError, DeadlineExceeded, with_deadline
+from myproject.main import (
+    MODEL_OPTIONS,
+    add_blob_arguments,
+    add_budget_arguments,
+    add_checkpointer_arguments,
+    add_resilience_arguments,
+    make_blob_store,
+    make_budget,
+    make_checkpointer,
+    make_resilience,
+    setup_graph,
+)
+
+MAX_BODY = 1 << 20  # 요청 본문 최대 크기(바이트)
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ThreadLocks:
+    """thread_id별 asyncio.Lock (기다리는 요청이 없어지면 지워서 thread_id가 많아도 쌓이지 않는다)"""
+
+    def __init__(self):
+        # thread_id -> [lock, 사용 중이거나 기다리는 요청 수]
+        self.locks = {}
+
+    @contextlib.asynccontextmanager
+    async def hold(self, thread_id: str):
+        entry = self.locks.get(thread_id)
+        if entry is None:
+            entry = self.locks[thread_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self.locks[thread_id]
+
+
+def message_to_json(message) -> dict:
+    data = {"type": message.type, "content": message.content}
+    if getattr(message, "tool_calls", None):
+        data["tool_calls"] = [{"name": call["name"], "args": call["args"]} for call in message.tool_calls]
+    return data
+
+
+class ChatServer:
+    """컴파일된 그래프 하나를 HTTP로 내보내는 서버"""
+
+    def __init__(self, graph, max_concurrency: int = 256, metrics: GraphMetrics | None = None,
+                 turn_timeout: float | None = None):
+        self.graph = graph
+        self.metrics = metrics
+        self.turn_timeout = turn_timeout
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.locks = ThreadLocks()
+        self.counters = {"requests": 0, "errors": 0, "cancelled": 0, "active_turns": 0}
+
+    @contextlib.asynccontextmanager
+    async def _turn(self, thread_id: str):
+        # 같은 대화의 순서를 먼저 기다린 뒤 전체 동시 실행 슬롯을 잡는다
+        async with self.locks.hold(thread_id), self.semaphore:
+            self.counters["active_turns"] += 1
+            try:
+                # 턴 마감 시간은 실행 슬롯을 잡은 뒤부터 잰다
+                yield with_deadline({"configurable": {"thread_id": thread_id}}, self.turn_timeout)
+            finally:
+                self.counters["active_turns"] -= 1
+
+    async def send_message(self, thread_id: str, text: str) -> dict:
+        start = time.perf_counter()
+        messages = []
+        async with self._turn(thread_id) as config:
+            async for event in self.graph.astream(
+                {"messages": [("human", text)]}, config, stream_mode="updates"
+            ):
+                for value in event.values():
+                    if isinstance(value, dict) and "messages" in value:
+                        new = value["messages"]
+                        messages.extend(new if isinstance(new, list) else [new])
+        replies = [message for message in messages if isinstance(message, AIMessage) and message.content]
+        return {
+            "thread_id": thread_id,
+            "reply": replies[-1].content if replies else "",
+            "messages": [message_to_json(message) for message in messages],
+            "latency_ms": (time.perf_counter() - start) * 1000,
+        }
+
+    async def stream_message(self, thread_id: str, text: str, send_event):
+        start = time.perf_counter()
+        ttft = None
+        reply = ""
+        streamed = set()  # 조각으로 보낸 메시지 id (노드가 끝난 뒤 같은 내용을 다시 보내지 않기 위해)
+        async with self._turn(thread_id) as config:
+            async for mode, payload in self.graph.astream(
+                {"messages": [("human", text)]}, config, stream_mode=["messages", "updates"]
+            ):
+                if mode == "messages":
+                    message, metadata = payload
+                    if metadata.get("langgraph_node") not in ANSWER_NODES:
+                        continue
+                    if isinstance(message, AIMessageChunk):
+                        streamed.add(message.id)
+                    elif not isinstance(message, AIMessage) or message.id in streamed:
+                        continue
+                    # 도구 호출 인자 조각은 보내지 않는다 (완성된 호출은 updates에서 보낸다)
+                    if isinstance(message.content, str) and message.content:
+                        if ttft is None:
+                            ttft = time.perf_counter() - start
+                        await send_event("token", {"text": message.content})
+                    continue
+                for value in payload.values():
+                    if not isinstance(value, dict) or "messages" not in value:
+                        continue
+                    new = value["messages"]
+                    for message in new if isinstance(new, list) else [new]:
+                        if isinstance(message, AIMessage) and isinstance(message.content, str) and message.content:
+                            reply = message.content
+                        for call in getattr(message, "tool_calls", None) or []:
+                            await send_event("tool_call", {"name": call["name"], "args": call["args"]})
+        await send_event("done", {
+            "reply": reply,
+            "latency_ms": (time.perf_counter() - start) * 1000,
+            "ttft_ms": ttft * 1000 if ttft is not None else None,
+        })
+
+    async def get_state(self, thread_id: str) -> dict:
+        state = await self.graph.aget_state({"configurable": {"thread_id": thread_id}})
+        values = state.values or {}
+        return {
+            "thread_id": thread_id,
+            "messages": [message_to_json(message) for message in values.get("messages", [])],
+            "summary": values.get("summary", ""),
+            "next": list(state.next),
+        }
+
+    # ---- HTTP ----
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(400, "잘못된 요청 줄")
+        headers = {}
+        while True:
+            header = await reader.readline()
+            if header in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = header.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY:
+            raise HttpError(413, "요청 본문이 너무 큽니다")
+        body = await reader.readexactly(length) if length else b""
+        keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+        return method, target.split("?")[0], body, keep_alive
+
+    @staticmethod
+    def _head(status: int, headers: dict) -> bytes:
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send(self, writer, status: int, body: bytes, content_type: str, keep_alive: bool):
+        writer.write(self._head(status, {
+            "Content-Type": content_type,
+            "Content-Length": len(body),
+            "Connection": "keep-alive" if keep_alive else "close",
+        }) + body)
+        await writer.drain()
+
+    async def _send_json(self, writer, status: int, payload, keep_alive: bool):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        await self._send(writer, status, body, "application/json; charset=utf-8", keep_alive)
+
+    async def _send_stream(self, writer, thread_id: str, text: str, keep_alive: bool):
+        writer.write(self._head(200, {
+            "Content-Type": "text/event-stream; charset=utf-8",
+            "Cache-Control": "no-cache",
+            "Transfer-Encoding": "chunked",
+            "Connection": "keep-alive" if keep_alive else "close",
+        }))
+
+        async def send_event(name, data):
+            chunk = f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+            writer.write(f"{len(chunk):x}\r\n".encode("latin-1") + chunk + b"\r\n")
+            await writer.drain()
+
+        try:
+            await self.stream_message(thread_id, text, send_event)
+        except Exception as e:
+            self.counters["errors"] += 1
+            await send_event("error", {"error": str(e)})
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    def _message_of(body: bytes) -> str:
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            raise HttpError(400, "본문이 JSON이 아닙니다")
+        message = payload.get("message") if isinstance(payload, dict) else None
+        if not isinstance(message, str) or not message.strip():
+            raise HttpError(400, '"message" 문자열이 필요합니다')
+        return message
+
+    async def _dispatch(self, writer, method: str, path: str, body: bytes, keep_alive: bool):
+        parts = [part for part in path.split("/") if part]
+        if parts == ["health"]:
+            return await self._send_json(writer, 200, {"status": "ok", **self.counters}, keep_alive)
+        if parts == ["metrics"] and self.metrics is not None:
+            body = self.metrics.prometheus_text().encode("utf-8")
+            return await self._send(writer, 200, body, "text/plain; version=0.0.4; charset=utf-8", keep_alive)
+        if len(parts) != 3 or parts[0] != "threads":
+            raise HttpError(404, f"알 수 없는 경로: {path}")
+
+        thread_id, action = parts[1], parts[2]
+        allowed = {"messages": "POST", "stream": "POST", "state": "GET"}
+        if action not in allowed:
+            raise HttpError(404, f"알 수 없는 경로: {path}")
+        if method != allowed[action]:
+            raise HttpError(405, f"{action}은(는) {allowed[action]}만 지원합니다")
+
+        if action == "state":
+            return await self._send_json(writer, 200, await self.get_state(thread_id), keep_alive)
+        text = self._message_of(body)
+        if action == "stream":
+            return await self._send_stream(writer, thread_id, text, keep_alive)
+        return await self._send_json(writer, 200, await self.send_message(thread_id, text), keep_alive)
+
+    @staticmethod
+    async def _until_disconnected(reader, writer, interval: float = 0.1):
+        """클라이언트가 연결을 끊을 때까지 기다린다 (요청을 처리하는 동안에는 읽지 않으므로 EOF/transport 상태를 본다)"""
+        while not (reader.at_eof() or writer.transport.is_closing()):
+            await asyncio.sleep(interval)
+
+    async def _dispatch_until_disconnected(self, reader, writer, method: str, path: str, body: bytes,
+                                           keep_alive: bool):
+        """요청을 처리하다가 클라이언트가 연결을 끊으면 처리 작업을 취소한다"""
+        task = asyncio.ensure_future(self._dispatch(writer, method, path, body, keep_alive))
+        watcher = asyncio.ensure_future(self._until_disconnected(reader, writer))
+        try:
+            await asyncio.wait((task, watcher), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            watcher.cancel()
+            if not task.done():
+                # 응답을 받을 곳이 없으므로 실행 중인 모델/도구 호출까지 취소한다
+                self.counters["cancelled"] += 1
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        if task.cancelled():
+            raise ConnectionResetError("클라이언트가 연결을 끊었습니다")
+        return task.result()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HttpError as e:
+                    await self._send_json(writer, e.status, {"error": e.message}, False)
+                    break
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+                self.counters["requests"] += 1
+                try:
+                    await self._dispatch_until_disconnected(reader, writer, method, path, body, keep_alive)
+                except HttpError as e:
+                    await self._send_json(writer, e.status, {"error": e.message}, keep_alive)
+                except ConnectionError:
+                    raise
+                except (DeadlineExceeded, CircuitOpenError) as e:
+                    # 턴 마감 초과는 504, 서킷 브레이커가 열려 있으면 503
+                    self.counters["errors"] += 1
+                    status = 504 if isinstance(e, DeadlineExceeded) else 503
+                    await self._send_json(writer, status, {"error": str(e)}, keep_alive)
+                except Exception as e:
+                    self.counters["errors"] += 1
+                    await self._send_json(writer, 500, {"error": str(e)}, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000):
+        """서버를 시작하고 asyncio.Server를 돌려준다 (port=0이면 빈 포트를 쓴다)"""
+        return await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+
+
+def build_graph(fake: bool = False, *, llm_latency: float = 0.3, tool_latency: float = 0.2, checkpointer=None,
+                max_history_tokens=None, metrics=None, pool=None, prefetch=None, resilience=None,
+                budget=None, blobs=None, flavor="async"):
+    """서버가 공유할 그래프 하나를 만든다 (fake=True면 오프라인 가짜 모델/검색)"""
+    if fake:
+        from common.fakes import FakeChatModel, FakeSearchResults
+        llm = FakeChatModel(latency=llm_latency, token_latency=0.005)
+        search_tool = FakeSearchResults(latency=tool_latency)
+    else:
+        from common.http_pool import pooled_chat_openai, pooled_tavily_search
+        llm = pooled_chat_openai(pool, **MODEL_OPTIONS)
+        search_tool = pooled_tavily_search(pool, max_results=2)
+    return setup_graph(
+        checkpointer,
+        max_history_tokens=max_history_tokens,
+        llm=llm,
+        search_tool=search_tool,
+        metrics=metrics,
+        prefetch=prefetch,
+        resilience=resilience,
+        budget=budget,
+        blobs=blobs,
+        flavor=flavor,
+    )
+
+
+async def evict_idle_periodically(checkpointer: BoundedMemorySaver, interval: float):
+    """요청이 없어도 idle_ttl이 지난 대화를 내보내도록 주기적으로 정리한다"""
+    while True:
+        await asyncio.sleep(interval)
+        checkpointer.evict_idle()
+
+
+async def serve(args):
+    pool = None
+    if not args.fake:
+        from common.http_pool import HttpPool
+        pool = HttpPool(max_connections=args.max_connections)
+    metrics = GraphMetrics(max_threads=args.metrics_threads) if args.metrics else None
+    # 오래 떠 있는 서버에서는 --memory-budget으로 대화가 쌓여도 메모리가 상한을 넘지 않게 한다
+    checkpointer = make_checkpointer(args, metrics)
+    prefetch = SearchPrefetcher() if args.prefetch else None
+    resilience = make_resilience(args)
+    graph = build_graph(
+        args.fake,
+        llm_latency=args.llm_latency,
+        tool_latency=args.tool_latency,
+        checkpointer=checkpointer,
+        max_history_tokens=args.max_history_tokens,
+        metrics=metrics,
+        pool=pool,
+        prefetch=prefetch,
+        resilience=resilience,
+        budget=make_budget(args),
+        blobs=make_blob_store(args),
+        flavor=args.flavor,
+    )
+
+    chat_server = ChatServer(graph, args.concurrency, metrics, args.turn_timeout)
+    server = await chat_server.start(args.host, args.port)
+    print(f"✅ 챗봇 서버 시작: http://{args.host}:{args.port} ({'가짜 모델' if args.fake else MODEL_OPTIONS['model']})")
+    sweeper = None
+    if isinstance(checkpointer, BoundedMemorySaver) and args.idle_ttl:
+        sweeper = asyncio.create_task(evict_idle_periodically(checkpointer, max(1.0, args.idle_ttl / 2)))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if sweeper is not None:
+            sweeper.cancel()
+        if pool is not None:
+            await pool.aclose()
+        if resilience is not None:
+            resilience.close()
+        if hasattr(checkpointer, "close"):
+            checkpointer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--concurrency", type=int, default=256, help="동시에 실행할 턴 수")
+    parser.add_argument("--max-connections", type=int, default=200, help="LLM/검색 HTTP 연결 풀 크기")
+    add_checkpointer_arguments(parser)
+    # 서버는 astream/aget_state로만 실행하므로 기본으로 노드/라우터가 코루틴인 그래프를 쓴다
+    add_flavor_arguments(parser, default="async")
+    parser.add_argument("--max-history-tokens", type=int, help="대화 기록 압축 기준 토큰 수")
+    parser.add_argument("--metrics", action="store_true", help="/metrics로 노드별 실행 시간을 내보낸다")
+    parser.add_argument("--metrics-threads", type=int, default=100,
+                        help="--metrics: thread_id별 시계열을 유지할 최근 대화 수 (0이면 thread_id 레이블을 내보내지 않는다)")
+    parser.add_argument("--fake", action="store_true", help="오프라인 가짜 모델/검색을 사용한다")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="--fake 모델의 첫 토큰 지연(초)")
+    parser.add_argument("--tool-latency", type=float, default=0.2, help="--fake 검색 지연(초)")
+    parser.add_argument("--prefetch", action="store_true", help="검색이 필요해 보이는 질문은 모델 호출과 동시에 검색을 시작한다")
+    add_resilience_arguments(parser)
+    add_budget_arguments(parser)
+    add_blob_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("\n👋 서버 종료")
+
+
+if __name__ == "__main__":
+    main()
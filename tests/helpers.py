@@ -0,0 +1,79 @@
+"""
+테스트 공용 도우미: common.fakes의 가짜 모델/검색으로 예제 그래프를 만들고 실행 결과를 비교 가능한 값으로 바꾼다
+(네트워크/API 키가 필요 없다)
+"""
+import importlib
+import json
+
+from langgraph.types import Command
+
+from common.fakes import FakeChatModel, FakeSearchResults
+
+# 체크포인터/flavor 비교에 쓰는 대화: 일반 질문 → 검색 → 사람 검토(interrupt) → 재개 → 일반 질문
+SCRIPT = [
+    {"messages": [("human", "안녕하세요, 저는 민수예요")]},
+    {"messages": [("human", "LangGraph 최신 뉴스 검색해줘")]},
+    {"messages": [("human", "제 정보를 검토해줘")]},
+    Command(resume={"correct": "yes", "data": "승인"}),  # example5는 correct, example4는 data를 읽는다
+    {"messages": [("human", "고마워요")]},
+]
+
+
+def example(name: str):
+    """exampleN.main / myproject.main 모듈 (패키지 __init__이 main 함수를 내보내므로 import_module로 가져온다)"""
+    return importlib.import_module(f"{name}.main")
+
+
+def fakes(**search_options):
+    return FakeChatModel(), FakeSearchResults(**search_options)
+
+
+def config(thread_id: str = "test") -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def transcript(messages) -> list:
+    """메시지 id/tool_call id처럼 실행마다 달라지는 값을 뺀 (종류, 내용, 도구 호출) 목록"""
+    rows = []
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+        tool_calls = [(call["name"], call["args"]) for call in getattr(message, "tool_calls", None) or []]
+        rows.append((message.type, content, tool_calls))
+    return rows
+
+
+def observe(state) -> dict:
+    """get_state 결과 중 체크포인터가 바뀌어도 같아야 하는 값"""
+    values = state.values
+    return {
+        "messages": transcript(values.get("messages", [])),
+        "summary": values.get("summary"),
+        "name": values.get("name"),
+        "next": state.next,
+        "interrupts": [interrupt.value for task in state.tasks for interrupt in task.interrupts],
+    }
+
+
+def run_script(graph, thread_id: str = "test", script=SCRIPT) -> list:
+    """SCRIPT를 invoke로 실행하고 단계마다 observe(get_state) 결과를 모은다"""
+    observed = []
+    for step in script:
+        graph.invoke(step, config(thread_id))
+        observed.append(observe(graph.get_state(config(thread_id))))
+    return observed
+
+
+async def arun_script(graph, thread_id: str = "test", script=SCRIPT) -> list:
+    observed = []
+    for step in script:
+        await graph.ainvoke(step, config(thread_id))
+        observed.append(observe(await graph.aget_state(config(thread_id))))
+    return observed
+
+
+def history(graph, thread_id: str = "test") -> list:
+    """get_state_history의 (step, source, next) 목록 (최신 체크포인트부터)"""
+    return [
+        (state.metadata["step"], state.metadata["source"], state.next)
+        for state in graph.get_state_history(config(thread_id))
+    ]
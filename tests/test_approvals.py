@@ -0,0 +1,125 @@
+"""
+승인 대기열(common.approvals)의 상태 전이와 임대(lease), start_turn/resume_approved로 example4를 재개하는 흐름
+"""
+import asyncio
+import sqlite3
+import time
+
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+
+from common.approvals import APPROVED, FAILED, PENDING, RESUMING, ApprovalQueue, resume_approved, start_turn
+from tests.helpers import config, example, fakes
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "approvals.sqlite")
+
+
+@pytest.fixture
+def queue(path):
+    with ApprovalQueue(path) as queue:
+        yield queue
+
+
+def statuses(queue) -> dict:
+    return {status: count for status, count in queue.counts().items() if count}
+
+
+def test_park_submit_claim_finish(queue):
+    queue.park("a", [{"query": "확인"}])
+    assert [(item.thread_id, item.payload) for item in queue.pending()] == [("a", [{"query": "확인"}])]
+    assert not queue.submit("missing", {"data": "승인"})
+    assert queue.submit("a", {"data": "승인"})
+    # 이미 승인한 대화에 다시 응답하지 않는다
+    assert not queue.submit("a", {"data": "거절"})
+    assert statuses(queue) == {APPROVED: 1}
+
+    assert queue.claim() == [("a", {"data": "승인"})]
+    assert statuses(queue) == {RESUMING: 1}
+    assert queue.claim() == []
+    assert queue.finish("a")
+    assert statuses(queue) == {}
+    assert not queue.finish("a")
+
+
+def test_fail_and_park_again(queue):
+    for thread_id in ("a", "b"):
+        queue.park(thread_id, ["확인"])
+    assert queue.submit_many({"a": {"data": "승인"}, "b": {"data": "승인"}, "missing": {}}) == 2
+    assert sorted(thread_id for thread_id, _ in queue.claim()) == ["a", "b"]
+
+    assert queue.fail("a", "boom")
+    assert [(item.thread_id, item.error) for item in queue.pending(status=FAILED)] == [("a", "boom")]
+    # 재개한 대화가 다시 interrupt에 걸리면 새 값으로 대기 상태가 된다
+    queue.park("b", ["다시 확인"])
+    assert not queue.finish("b")
+    assert [item.payload for item in queue.pending()] == [["다시 확인"]]
+    assert statuses(queue) == {PENDING: 1, FAILED: 1}
+
+
+def test_other_queue_does_not_take_live_lease(queue, path):
+    queue.park("a", ["확인"])
+    queue.submit("a", {"data": "승인"})
+    assert queue.claim()
+    with ApprovalQueue(path) as other:
+        # 여는 것만으로 재개 중인 대화를 되돌리지 않는다
+        assert statuses(other) == {RESUMING: 1}
+        assert other.claim() == []
+        assert not other.finish("a") and not other.fail("a", "boom")
+    assert queue.finish("a")
+
+
+def test_expired_lease_is_reclaimed(queue, path):
+    queue.park("a", ["확인"])
+    queue.submit("a", {"data": "승인"})
+    assert queue.claim()
+    with ApprovalQueue(path, lease_timeout=0.01) as other:
+        time.sleep(0.02)
+        assert other.claim() == [("a", {"data": "승인"})]
+        # 임대를 잃은 대기열은 결과를 기록하지 못한다
+        assert not queue.finish("a") and not queue.fail("a", "late")
+        assert other.finish("a")
+    assert statuses(queue) == {}
+
+
+def test_migrates_queue_without_lease_columns(path):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE parked (thread_id TEXT PRIMARY KEY, payload TEXT NOT NULL, parked_at REAL NOT NULL, "
+        "status TEXT NOT NULL, response TEXT, approved_at REAL, error TEXT)"
+    )
+    conn.execute("INSERT INTO parked VALUES ('a', '[]', 0, 'approved', '{\"data\": \"승인\"}', 0, NULL)")
+    conn.commit()
+    conn.close()
+    with ApprovalQueue(path) as queue:
+        assert queue.claim() == [("a", {"data": "승인"})]
+        assert queue.finish("a")
+
+
+def test_start_turn_and_resume_approved(queue):
+    llm, search_tool = fakes()
+    graph = example("example4").setup_graph(MemorySaver(), llm=llm, search_tool=search_tool)
+    questions = {f"review_{index}": f"{index}번 정보를 검토해줘" for index in range(5)}
+
+    async def run():
+        started = await asyncio.gather(*(
+            start_turn(graph, queue, thread_id, {"messages": [("human", question)]})
+            for thread_id, question in questions.items()
+        ))
+        assert all(payload for _, payload in started)
+        assert statuses(queue) == {PENDING: 5}
+        queue.submit_many({thread_id: {"data": "승인"} for thread_id in list(questions)[:3]})
+        return await resume_approved(graph, queue, max_concurrency=2)
+
+    assert asyncio.run(run()) == {"resumed": 3, "parked_again": 0, "failed": 0}
+    assert statuses(queue) == {PENDING: 2}
+    for index, thread_id in enumerate(questions):
+        state = graph.get_state(config(thread_id))
+        if index < 3:
+            assert state.next == ()
+            tool_results = [message.content for message in state.values["messages"] if message.type == "tool"]
+            assert tool_results == ["승인"]
+        else:
+            assert state.next == ("tools",)
@@ -0,0 +1,73 @@
+"""
+flavor="async" 그래프가 같은 입력에 sync 그래프와 같은 대화를 만드는지 확인한다 (common.async_nodes)
+"""
+import asyncio
+
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+
+from tests.helpers import arun_script, config, example, fakes, run_script, transcript
+
+
+def build(target: str, flavor: str):
+    llm, search_tool = fakes()
+    if target == "example2":
+        return example(target).setup_graph(llm=llm, flavor=flavor)
+    return example(target).setup_graph(MemorySaver(), llm=llm, search_tool=search_tool, flavor=flavor)
+
+
+@pytest.mark.parametrize("target, question", [
+    ("example2", "서울 날씨 어때?"),
+    ("example2", "시원한 도시 알려줘"),
+    ("myproject", "최신 뉴스 검색해줘"),
+    ("myproject", "안녕하세요"),
+])
+def test_single_turn_matches_sync(target, question):
+    graph_input = {"messages": [("human", question)]}
+    expected = build(target, "sync").invoke(graph_input, config())
+    actual = asyncio.run(build(target, "async").ainvoke(graph_input, config()))
+    assert transcript(actual["messages"]) == transcript(expected["messages"])
+    assert len(expected["messages"]) > 1
+
+
+@pytest.mark.parametrize("target", ["example4", "example5"])
+def test_interrupt_and_resume_match_sync(target):
+    expected = run_script(build(target, "sync"))
+    actual = asyncio.run(arun_script(build(target, "async")))
+    assert actual == expected
+    assert expected[2]["next"] == ("tools",) and expected[2]["interrupts"]
+    # 재개한 도구가 오류 없이 응답을 돌려받았다
+    tool_results = [content for kind, content, _ in expected[3]["messages"] if kind == "tool"]
+    assert tool_results[-1] in ("승인", "확인 완료")
+
+
+def test_sync_graph_also_runs_with_ainvoke():
+    graph_input = {"messages": [("human", "최신 뉴스 검색해줘")]}
+    expected = build("myproject", "sync").invoke(graph_input, config())
+    actual = asyncio.run(build("myproject", "sync").ainvoke(graph_input, config()))
+    assert transcript(actual["messages"]) == transcript(expected["messages"])
+
+
+def test_async_graph_rejects_sync_invoke():
+    with pytest.raises(TypeError):
+        build("myproject", "async").invoke({"messages": [("human", "최신 뉴스 검색해줘")]}, config())
+
+
+def test_unknown_flavor():
+    with pytest.raises(ValueError):
+        build("myproject", "threads")
+
+
+def test_concurrent_conversations_stay_separate():
+    graph = build("myproject", "async")
+    questions = [f"{index}번 최신 뉴스 검색해줘" for index in range(20)]
+
+    async def run_all():
+        return await asyncio.gather(*(
+            graph.ainvoke({"messages": [("human", question)]}, config(f"thread{index}"))
+            for index, question in enumerate(questions)
+        ))
+
+    for question, result in zip(questions, asyncio.run(run_all())):
+        assert result["messages"][0].content == question
+        assert question in result["messages"][-1].content
@@ -0,0 +1,30 @@
+"""
+배치 실행기(common.batch): 같은 대화는 순서대로 실행하고, 보고서에는 AI 답변과 검색어만 출력한다
+"""
+from langchain_core.messages import RemoveMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from common.batch import jobs_from_conversations, print_batch_report, run_batch_sync
+from tests.helpers import example, fakes
+
+QUESTIONS = ["LangGraph 최신 뉴스 검색해줘", "고마워요", "2025년 IT 트렌드 검색해줘", "정리해줘"]
+
+
+def test_report_skips_removed_and_tool_messages(capsys):
+    llm, search_tool = fakes()
+    # 압축이 일어나도록 작게 잡는다
+    graph = example("example5").setup_graph(MemorySaver(), llm=llm, search_tool=search_tool,
+                                            max_history_tokens=300)
+    results, summary = run_batch_sync(graph, jobs_from_conversations({"a": QUESTIONS, "b": QUESTIONS[:2]}))
+    assert [result.question for result in results] == [*QUESTIONS, *QUESTIONS[:2]]
+    assert summary["errors"] == 0 and summary["threads"] == 2
+    messages = [message for result in results for message in result.messages]
+    assert any(isinstance(message, RemoveMessage) for message in messages), "압축이 일어나야 한다"
+    assert any(isinstance(message, ToolMessage) for message in messages)
+
+    print_batch_report(results, summary)
+    lines = capsys.readouterr().out.splitlines()
+    answers = [line for line in lines if line.startswith("🤖 AI:")]
+    assert len(answers) == len(results)
+    assert all(answer.removeprefix("🤖 AI:").strip() for answer in answers)
+    assert sum(line == "🔍 검색 중..." for line in lines) == 3
@@ -0,0 +1,85 @@
+"""
+큰 도구 결과 저장소(common.blob_store): sha256 중복 제거, 상태의 미리보기, 이번 턴만 펼치기
+"""
+import hashlib
+
+from langchain_core.messages import ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+from pydantic import Field
+
+from common.blob_store import BlobStore, get_expanded_state
+from common.fakes import FakeChatModel, FakeSearchResults
+from tests.helpers import config, example
+
+QUESTION = "LangGraph 최신 뉴스 검색해줘"
+
+
+class RecordingModel(FakeChatModel):
+    """모델에 보낸 프롬프트를 기록한다"""
+    prompts: list = Field(default_factory=list)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.prompts.append(messages)
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+
+def build(blobs=None, llm=None):
+    # 결과 하나가 1000자이므로 본문이 threshold를 넘는다
+    search_tool = FakeSearchResults(content_size=1000)
+    return example("myproject").setup_graph(MemorySaver(), llm=llm or FakeChatModel(), search_tool=search_tool,
+                                            blobs=blobs)
+
+
+def tool_messages(messages) -> list:
+    return [message for message in messages if isinstance(message, ToolMessage)]
+
+
+def test_put_deduplicates_by_sha256():
+    blobs = BlobStore()
+    text = "검색 결과" * 100
+    digest = blobs.put(text)
+    assert digest == hashlib.sha256(text.encode("utf-8")).hexdigest()
+    assert blobs.put(text) == digest and blobs.get(digest) == text
+    stats = blobs.stats()
+    assert (stats["blobs"], stats["deduplicated"]) == (1, 1)
+    # threshold보다 작은 결과는 그대로 둔다
+    small = ToolMessage(content="짧은 결과", tool_call_id="1")
+    assert BlobStore(threshold=2000).offload(small) is small
+
+
+def test_state_keeps_preview_and_reference():
+    blobs = BlobStore(threshold=500)
+    graph = build(blobs)
+    full = tool_messages(build().invoke({"messages": [("human", QUESTION)]}, config())["messages"])[0]
+    for thread_id in ("first", "second"):
+        graph.invoke({"messages": [("human", QUESTION)]}, config(thread_id))
+
+    stored = tool_messages(graph.get_state(config("first")).values["messages"])[0]
+    reference = stored.response_metadata["blob"]
+    assert reference["sha256"] == hashlib.sha256(full.content.encode("utf-8")).hexdigest()
+    assert stored.content.startswith(full.content[:200]) and len(stored.content) < len(full.content)
+    assert stored.artifact is None
+    # 두 thread의 같은 결과(본문, artifact)는 한 번씩만 저장된다
+    stats = blobs.stats()
+    assert (stats["offloaded"], stats["blobs"], stats["deduplicated"]) == (2, 2, 2)
+
+    expanded = tool_messages(get_expanded_state(graph, config("first"), blobs).values["messages"])[0]
+    assert (expanded.content, expanded.artifact) == (full.content, full.artifact)
+
+
+def test_model_sees_only_current_turn_expanded():
+    llm = RecordingModel()
+    blobs = BlobStore(threshold=500)
+    graph = build(blobs, llm)
+    graph.invoke({"messages": [("human", QUESTION)]}, config())
+    full = blobs.restore(tool_messages(graph.get_state(config()).values["messages"])[0]).content
+    # 도구 결과 다음 호출: 이번 턴의 결과는 원래 내용으로 보낸다
+    assert tool_messages(llm.prompts[-1])[0].content == full
+
+    graph.invoke({"messages": [("human", "고마워요")]}, config())
+    previous = tool_messages(llm.prompts[-1])[0]
+    assert previous.content != full and "blob sha256:" in previous.content
+
+    # expand_history면 이전 턴의 결과도 펼친다
+    blobs.expand_history = True
+    assert tool_messages(blobs.expand(llm.prompts[-1]))[0].content == full
@@ -0,0 +1,92 @@
+"""
+일괄 get_states / update_states(common.bulk_state)와 SqliteSaver.get_tuples가
+thread마다 get_state / update_state / get_tuple을 부른 결과와 같은지 확인한다 (CHUNK_SIZE를 넘는 thread 수)
+"""
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+
+from common.bulk_state import CHUNK_SIZE, get_states, thread_configs, update_states
+from common.delta_checkpoint import DeltaSqliteSaver
+from common.sqlite_saver import SqliteSaver
+from tests.helpers import example, fakes, observe
+
+# 묶음 경계를 넘고, 10개마다 한 thread는 interrupt에 걸린 채로 둔다
+THREAD_IDS = [f"thread{index}" for index in range(CHUNK_SIZE + 10)]
+
+SAVERS = {
+    "memory": lambda path: MemorySaver(),
+    "sqlite": lambda path: SqliteSaver(path),
+    "delta_sqlite": lambda path: DeltaSqliteSaver(path),
+}
+
+
+def build(saver):
+    llm, search_tool = fakes()
+    graph = example("example5").setup_graph(saver, llm=llm, search_tool=search_tool)
+    for index, config in enumerate(thread_configs(THREAD_IDS)):
+        question = "제 정보를 검토해줘" if index % 10 == 0 else f"{index}번 질문입니다"
+        graph.invoke({"messages": [("human", question)]}, config)
+    return graph
+
+
+@pytest.fixture(params=list(SAVERS))
+def make_graph(request, tmp_path):
+    """THREAD_IDS의 대화를 실행한 그래프를 만든다 (부를 때마다 새 체크포인터)"""
+    savers = []
+
+    def make():
+        savers.append(SAVERS[request.param](str(tmp_path / f"checkpoints{len(savers)}.sqlite")))
+        return build(savers[-1])
+
+    yield make
+    for saver in savers:
+        if hasattr(saver, "close"):
+            saver.close()
+
+
+def test_get_states_matches_get_state(make_graph):
+    graph = make_graph()
+    # 같은 thread가 두 번 나오거나 체크포인트가 없는 thread도 get_state와 같다
+    configs = thread_configs([*THREAD_IDS, THREAD_IDS[0], "missing"])
+    assert get_states(graph, configs) == [graph.get_state(config) for config in configs]
+    assert graph.get_state(configs[0]).next == ("tools",)
+
+
+def test_sqlite_get_tuples_matches_get_tuple(make_graph):
+    graph = make_graph()
+    saver = graph.checkpointer
+    if not hasattr(saver, "get_tuples"):
+        pytest.skip("get_tuples가 없는 체크포인터")
+    configs = thread_configs([*THREAD_IDS, "missing"])
+    # checkpoint_id가 있는 config는 get_tuple로 읽는다
+    configs.append(graph.get_state(configs[1]).parent_config)
+    assert saver.get_tuples(configs) == [saver.get_tuple(config) for config in configs]
+
+
+def test_update_states_matches_update_state(make_graph):
+    expected, actual = make_graph(), make_graph()
+    updates = [(config, {"name": f"이름{index}"}) for index, config in enumerate(thread_configs(THREAD_IDS))]
+    # 같은 thread가 다른 묶음에 다시 나오면 앞의 수정에 이어서 적용한다
+    updates.append((thread_configs(THREAD_IDS[:1])[0], {"birthday": "2000-01-01"}))
+    for config, values in updates:
+        expected.update_state(config, values)
+    next_configs = update_states(actual, updates)
+
+    assert len(next_configs) == len(updates)
+    for config in thread_configs(THREAD_IDS):
+        want, got = expected.get_state(config), actual.get_state(config)
+        assert observe(got) == observe(want)
+        assert got.metadata == want.metadata
+        assert len(list(actual.get_state_history(config))) == len(list(expected.get_state_history(config)))
+    assert actual.get_state(next_configs[-1]).values["birthday"] == "2000-01-01"
+
+
+def test_update_states_writes_nothing_on_failure(make_graph):
+    graph = make_graph()
+    configs = thread_configs(THREAD_IDS)
+    before = [observe(state) for state in get_states(graph, configs)]
+    updates = [(config, {"name": "바뀐 이름"}) for config in configs]
+    updates.append(({"configurable": {"thread_id": "x", "checkpoint_ns": "sub"}}, {"name": "서브그래프"}))
+    with pytest.raises(ValueError):
+        update_states(graph, updates)
+    assert [observe(state) for state in get_states(graph, configs)] == before
@@ -0,0 +1,107 @@
+"""
+녹화/재생 카세트(common.cassette): record로 기록한 실행을 upstream 없이 replay/auto로 똑같이 재생한다
+"""
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+
+from common.cassette import Cassette, CassetteMiss
+from common.fakes import FakeChatModel, FakeSearchResults
+from tests.helpers import config, example, transcript
+
+QUESTIONS = ["LangGraph 최신 뉴스 검색해줘", "고마워요"]
+
+
+def run(cassette, questions=QUESTIONS, llm=None, search_tool=None, thread_id="test"):
+    """질문들을 한 thread에서 차례로 실행하고 (대화, 모델, 검색 도구)를 돌려준다"""
+    llm = llm or FakeChatModel()
+    search_tool = search_tool or FakeSearchResults()
+    graph = example("myproject").setup_graph(MemorySaver(), llm=llm, search_tool=search_tool, cassette=cassette)
+    for question in questions:
+        result = graph.invoke({"messages": [("human", question)]}, config(thread_id))
+    return transcript(result["messages"]), llm, search_tool
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    path = str(tmp_path / "run.cassette.json.gz")
+    with Cassette(path, mode="record") as cassette:
+        messages, llm, search_tool = run(cassette)
+    assert (llm.calls, search_tool.calls) == (3, 1)
+    assert cassette.stats()["recorded"] == 4
+    return path, messages
+
+
+def unreachable():
+    """재생 중에 불리면 실패하는 upstream"""
+    return FakeChatModel(fail_rate=1.0), FakeSearchResults(fail_rate=1.0)
+
+
+def test_replay_reproduces_run_without_upstream(recorded):
+    path, messages = recorded
+    cassette = Cassette(path, mode="replay")
+    replayed, llm, search_tool = run(cassette, QUESTIONS, *unreachable())
+    assert replayed == messages
+    assert (llm.calls, search_tool.calls) == (0, 0)
+    stats = cassette.stats()
+    assert (stats["replayed"], stats["recorded"], stats["llm_calls"], stats["tool_calls"]) == (4, 0, 3, 1)
+
+
+def test_replay_miss(recorded):
+    path, _ = recorded
+    with pytest.raises(CassetteMiss):
+        run(Cassette(path, mode="replay"), ["처음 보는 질문을 검색해줘"], *unreachable())
+    with pytest.raises(FileNotFoundError):
+        Cassette(path + ".missing", mode="replay")
+
+
+def test_auto_records_only_new_requests(recorded):
+    path, messages = recorded
+    with Cassette(path, mode="auto") as cassette:
+        replayed, llm, _ = run(cassette, [*QUESTIONS, "안녕하세요"])
+    assert replayed[:len(messages)] == messages
+    assert llm.calls == 1 and cassette.stats()["recorded"] == 1
+
+    # 새로 기록한 응답까지 재생된다
+    replayed, llm, _ = run(Cassette(path, mode="replay"), [*QUESTIONS, "안녕하세요"], *unreachable())
+    assert llm.calls == 0 and replayed[-1][1].startswith("'안녕하세요'")
+
+
+def test_recorded_latency(tmp_path):
+    path = str(tmp_path / "slow.cassette.json.gz")
+    with Cassette(path, mode="record") as cassette:
+        run(cassette, QUESTIONS[:1], FakeChatModel(latency=0.05))
+    zero = Cassette(path, mode="replay")
+    run(zero, QUESTIONS[:1], *unreachable())
+    waited = Cassette(path, mode="replay", latency="recorded")
+    run(waited, QUESTIONS[:1], *unreachable())
+    assert zero.stats()["waited_seconds"] == 0
+    assert waited.stats()["waited_seconds"] >= 0.1
+    with pytest.raises(ValueError):
+        Cassette(path, mode="rewind")
+
+
+def test_replay_past_recorded_responses(recorded):
+    path, messages = recorded
+    # 다른 thread에서 같은 대화를 다시 하면 같은 요청이 기록된 횟수보다 많이 온다
+    cassette = Cassette(path, mode="replay")
+    assert run(cassette, QUESTIONS, *unreachable(), thread_id="first")[0] == messages
+    with pytest.raises(CassetteMiss, match="모두 재생했습니다"):
+        run(cassette, QUESTIONS, *unreachable(), thread_id="second")
+
+    # wrap=True면 기록된 응답을 처음부터 다시 쓴다
+    cassette = Cassette(path, mode="replay", wrap=True)
+    for thread_id in ("first", "second"):
+        _, llm, _ = run(cassette, QUESTIONS, *unreachable(), thread_id=thread_id)
+        assert llm.calls == 0
+    assert cassette.stats()["replayed"] == 8
+
+
+def test_auto_records_calls_past_recorded_responses(recorded):
+    path, messages = recorded
+    with Cassette(path, mode="auto") as cassette:
+        for thread_id in ("first", "second"):
+            replayed, llm, search_tool = run(cassette, thread_id=thread_id)
+            assert replayed == messages
+    # 두 번째 thread의 호출은 기록을 다 쓴 뒤라 새로 부르고 기록한다 (방금 기록한 응답을 다시 쓰지 않는다)
+    assert (llm.calls, search_tool.calls) == (3, 1)
+    assert cassette.stats()["recorded"] == 4 and cassette.stats()["responses"] == 8
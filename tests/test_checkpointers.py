@@ -0,0 +1,190 @@
+"""
+체크포인터 대체 구현이 MemorySaver와 같은 그래프 동작을 하는지 확인한다
+(example5: 검색, 사람 검토 interrupt/resume, compact 노드의 대화 압축)
+"""
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+
+from common.binary_serde import BinarySerializer, last_message
+from common.bounded_memory import BoundedMemorySaver
+from common.delta_checkpoint import DeltaBoundedMemorySaver, DeltaMemorySaver, DeltaSqliteSaver
+from common.sharded_memory import ShardedMemorySaver
+from common.sqlite_saver import SqliteSaver
+from tests.helpers import SCRIPT, config, example, fakes, history, run_script
+
+# 압축이 여러 번 일어나도록 작게 잡는다
+MAX_HISTORY_TOKENS = 300
+
+SAVERS = {
+    "sharded": lambda tmp_path: ShardedMemorySaver(shards=4),
+    "sharded_binary": lambda tmp_path: ShardedMemorySaver(shards=4, serde=BinarySerializer()),
+    "memory_binary": lambda tmp_path: MemorySaver(serde=BinarySerializer()),
+    "sqlite": lambda tmp_path: SqliteSaver(str(tmp_path / "checkpoints.sqlite")),
+    "sqlite_binary": lambda tmp_path: SqliteSaver(str(tmp_path / "checkpoints.sqlite"), serde=BinarySerializer()),
+    "delta_memory": lambda tmp_path: DeltaMemorySaver(snapshot_every=2),
+    "delta_sqlite": lambda tmp_path: DeltaSqliteSaver(str(tmp_path / "checkpoints.sqlite"), snapshot_every=2),
+    # max_bytes=1: 체크포인트를 쓸 때마다 다른 thread를 spill 파일로 내보낸다
+    "bounded": lambda tmp_path: BoundedMemorySaver(max_bytes=1, keep_last=2,
+                                                   spill_path=str(tmp_path / "spill.sqlite")),
+    "delta_bounded": lambda tmp_path: DeltaBoundedMemorySaver(max_bytes=1, keep_last=2, snapshot_every=2,
+                                                              spill_path=str(tmp_path / "spill.sqlite")),
+}
+
+
+def build(saver):
+    llm, search_tool = fakes()
+    return example("example5").setup_graph(saver, llm=llm, search_tool=search_tool,
+                                           max_history_tokens=MAX_HISTORY_TOKENS)
+
+
+@pytest.fixture(scope="module")
+def reference():
+    """MemorySaver로 실행한 결과 (단계별 상태, 체크포인트 기록)"""
+    graph = build(MemorySaver())
+    return run_script(graph), history(graph)
+
+
+@pytest.fixture(params=list(SAVERS))
+def saver(request, tmp_path):
+    saver = SAVERS[request.param](tmp_path)
+    yield saver
+    if hasattr(saver, "close"):
+        saver.close()
+
+
+def test_reference_covers_interrupt_and_compaction(reference):
+    observed, _ = reference
+    interrupted = observed[2]
+    assert interrupted["next"] == ("tools",)
+    assert interrupted["interrupts"][0]["question"] == "이 정보가 맞나요?"
+    assert observed[3]["next"] == () and observed[3]["name"] == "제 정보를 검토해줘"
+    assert observed[-1]["summary"], "compact 노드가 요약을 만들지 않았습니다"
+
+
+def test_matches_memory_saver(saver, reference):
+    graph = build(saver)
+    observed, checkpoints = reference
+    assert run_script(graph) == observed
+    assert history(graph) == checkpoints
+
+
+def test_threads_are_isolated(saver, reference):
+    graph = build(saver)
+    run_script(graph, "first", SCRIPT[:3])
+    graph.invoke(SCRIPT[0], config("second"))
+    # 다른 thread를 실행해도 첫 thread는 interrupt에서 그대로 재개된다
+    assert graph.get_state(config("first")).next == ("tools",)
+    assert len(graph.get_state(config("second")).values["messages"]) == 2
+    for step in SCRIPT[3:]:
+        graph.invoke(step, config("first"))
+    assert graph.get_state(config("first")).values["messages"][-1].content == (
+        reference[0][-1]["messages"][-1][1]
+    )
+
+
+@pytest.mark.parametrize("name", ["sqlite", "delta_sqlite", "sqlite_binary"])
+def test_sqlite_resumes_after_reopen(name, tmp_path, reference):
+    """interrupt에서 프로세스가 끝나도 같은 파일을 다시 열어 재개할 수 있다"""
+    saver = SAVERS[name](tmp_path)
+    run_script(build(saver), script=SCRIPT[:3])
+    saver.close()
+
+    with SAVERS[name](tmp_path) as reopened:
+        graph = build(reopened)
+        assert graph.get_state(config()).next == ("tools",)
+        observed = run_script(graph, script=SCRIPT[3:])
+    assert observed == reference[0][3:]
+
+
+
+@pytest.mark.parametrize("name", ["memory_binary", "sharded_binary", "sqlite_binary"])
+def test_last_message_matches_state(name, tmp_path):
+    saver = SAVERS[name](tmp_path)
+    graph = build(saver)
+    run_script(graph, script=SCRIPT[:2])
+    assert last_message(saver, config()) == graph.get_state(config()).values["messages"][-1]
+
+
+def test_sharded_threads_in_parallel(reference):
+    """여러 thread를 동시에 실행해도 thread마다 MemorySaver와 같은 기록이 남는다"""
+    saver = ShardedMemorySaver(shards=4)
+    graph = build(saver)
+    thread_ids = [f"thread-{index}" for index in range(8)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        observed = list(executor.map(lambda thread_id: run_script(graph, thread_id), thread_ids))
+    assert all(result == reference[0] for result in observed)
+    assert saver.stats()["threads"] == len(thread_ids)
+    saver.delete_thread(thread_ids[0])
+    assert graph.get_state(config(thread_ids[0])).values == {}
+    assert saver.stats()["threads"] == len(thread_ids) - 1
+
+
+def test_bounded_spills_and_reloads_threads(tmp_path, reference):
+    saver = SAVERS["bounded"](tmp_path)
+    graph = build(saver)
+    for step in SCRIPT:
+        for thread_id in ("first", "second"):
+            graph.invoke(step, config(thread_id))
+    stats = saver.stats()
+    assert stats["evictions"] and stats["reloads"] and stats["pruned_checkpoints"]
+    assert stats["threads_in_memory"] == 1 and stats["threads_on_disk"] == 2
+    for thread_id in ("first", "second"):
+        messages = graph.get_state(config(thread_id)).values["messages"]
+        assert messages[-1].content == reference[0][-1]["messages"][-1][1]
+    saver.close()
+
+
+class FailingDeletes:
+    """spill 파일 연결을 감싸 DELETE를 한 번 실패시킨다 (디스크 오류 흉내)"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.failures = 1
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def executemany(self, sql, rows):
+        if sql.startswith("DELETE") and self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("disk I/O error")
+        return self.conn.executemany(sql, rows)
+
+
+def test_bounded_reload_can_be_retried(tmp_path, reference):
+    saver = SAVERS["bounded"](tmp_path)
+    graph = build(saver)
+    for step in SCRIPT[:2]:
+        for thread_id in ("first", "second"):
+            graph.invoke(step, config(thread_id))
+    assert "first" in saver.spilled_threads
+
+    saver.conn = FailingDeletes(saver.conn)
+    with pytest.raises(sqlite3.OperationalError):
+        graph.get_state(config("first"))
+    # 트랜잭션을 되돌렸고, 다음 조회에서 다시 불러온다
+    assert not saver.conn.in_transaction and "first" in saver.spilled_threads
+    for step in SCRIPT[2:]:
+        graph.invoke(step, config("first"))
+    assert graph.get_state(config("first")).values["messages"][-1].content == (
+        reference[0][-1]["messages"][-1][1]
+    )
+    saver.close()
+
+
+def test_delta_checkpoints_are_smaller():
+    def stored_bytes(saver):
+        return sum(
+            len(saved[0][1])
+            for namespaces in saver.storage.values()
+            for checkpoints in namespaces.values()
+            for saved in checkpoints.values()
+        )
+
+    plain, delta = MemorySaver(), DeltaMemorySaver()
+    for saver in (plain, delta):
+        run_script(build(saver))
+    assert stored_bytes(delta) < stored_bytes(plain)
@@ -0,0 +1,45 @@
+"""
+대화 압축(common.compaction): 요약을 포함한 프롬프트가 max_tokens 안에 들어가는지 확인한다
+"""
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.graph.message import add_messages
+
+from common.compaction import count_tokens, make_compaction_node, with_summary
+
+# bench_compaction의 fake_search와 같은 약 850토큰짜리 검색 결과
+SEARCH_RESULT = " 검색 결과: " + "LangGraph is a library for building stateful agents. " * 60
+
+
+def conversation(max_tokens: int, turns: int = 40) -> tuple[list, dict]:
+    """모델을 부를 때마다 compact 노드를 먼저 거친 프롬프트의 토큰 수를 돌려준다"""
+    compact = make_compaction_node(max_tokens)
+    state = {"messages": [], "summary": ""}
+    prompts = []
+
+    def call_model(*messages):
+        update = compact(state)
+        state["messages"] = add_messages(state["messages"], update.get("messages", []))
+        state["summary"] = update.get("summary", state["summary"])
+        prompts.append(count_tokens(with_summary(state)))
+        state["messages"] = add_messages(state["messages"], list(messages))
+
+    for turn in range(turns):
+        question = f"{turn}번째 질문: 최신 소식을 검색해줘" if turn % 4 == 3 else f"{turn}번째 질문입니다"
+        state["messages"] = add_messages(state["messages"], [HumanMessage(content=question)])
+        if turn % 4 == 3:
+            call_id = f"call-{turn}"
+            call_model(AIMessage(content="", tool_calls=[{"name": "search", "args": {"query": question},
+                                                          "id": call_id}]))
+            state["messages"] = add_messages(state["messages"], [
+                ToolMessage(content=question + SEARCH_RESULT, name="search", tool_call_id=call_id),
+            ])
+        call_model(AIMessage(content="네, 알겠습니다. " * 10))
+    return prompts, state
+
+
+@pytest.mark.parametrize("max_tokens", [1000, 1500, 3000])
+def test_prompt_with_summary_stays_within_budget(max_tokens):
+    prompts, state = conversation(max_tokens)
+    assert state["summary"], "압축이 일어나야 한다"
+    assert max(prompts) <= max_tokens
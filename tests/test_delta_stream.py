@@ -0,0 +1,79 @@
+"""
+delta 스트림(common.delta_stream)으로 다시 만든 상태가 get_state().values, values 스트림과 같은지 확인한다
+(example5: compact 노드의 RemoveMessage, 사람 검토 interrupt/resume 포함)
+"""
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from common.delta_stream import DeltaGapError, StateDelta, StateReconstructor, diff_messages, stream_deltas
+from tests.helpers import SCRIPT, config, example, fakes, transcript
+
+
+def build():
+    llm, search_tool = fakes()
+    return example("example5").setup_graph(MemorySaver(), llm=llm, search_tool=search_tool, max_history_tokens=300)
+
+
+def test_diff_messages():
+    first, second, third = (HumanMessage(content=text, id=text) for text in ("a", "b", "c"))
+    assert diff_messages([first], [first, second]) == ([second], [])
+    # 다시 읽은 객체는 id와 내용으로 비교한다
+    edited = AIMessage(content="b2", id="b")
+    assert diff_messages([first, second], [first.model_copy(), edited, third]) == ([edited, third], [])
+    assert diff_messages([first, second, third], [third]) == ([], ["a", "b"])
+
+
+def test_reconstructed_state_matches_get_state():
+    graph = build()
+    remote = StateReconstructor()
+    removed = interrupted = 0
+    for step in SCRIPT:
+        # 전송을 흉내 내 JSON으로 바꾼 delta만 받는다
+        for delta in stream_deltas(graph, step, config(), base=remote.values if remote.loaded else None,
+                                   seq=remote.seq):
+            remote.apply(StateDelta.from_json(delta.to_json()))
+            removed += len(delta.removed)
+        state = graph.get_state(config())
+        interrupted += bool(state.next)
+        assert remote.values == state.values
+    assert removed and interrupted, "압축과 interrupt가 모두 일어나야 한다"
+
+
+def others(values: dict) -> dict:
+    return {key: value for key, value in values.items() if key != "messages"}
+
+
+def test_every_delta_matches_values_event():
+    """stream_mode="values"를 쓰던 드라이버가 이벤트마다 보던 상태를 그대로 만든다"""
+    expected, actual = build(), build()
+    reconstructor = StateReconstructor()
+    for step in SCRIPT:
+        events = expected.stream(step, config(), stream_mode="values")
+        deltas = reconstructor.stream(actual, step, config())
+        for event, _ in zip(events, deltas, strict=True):
+            assert transcript(reconstructor.messages) == transcript(event["messages"])
+            assert others(reconstructor.values) == others(event)
+
+
+def test_async_stream():
+    graph = build()
+    reconstructor = StateReconstructor()
+
+    async def run():
+        for step in SCRIPT:
+            async for _ in reconstructor.astream(graph, step, config()):
+                pass
+
+    asyncio.run(run())
+    assert reconstructor.values == graph.get_state(config()).values
+
+
+def test_gap_is_detected():
+    reconstructor = StateReconstructor({"messages": [HumanMessage(content="a", id="a")]})
+    reconstructor.apply(StateDelta(seq=1, removed=["a"]))
+    assert reconstructor.messages == []
+    with pytest.raises(DeltaGapError):
+        reconstructor.apply(StateDelta(seq=3, messages=[RemoveMessage(id="x")]))
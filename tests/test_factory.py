@@ -0,0 +1,56 @@
+"""
+그래프 캐시(common.factory.memoize_graph): 같은 인자는 컴파일된 그래프를 재사용하고, 체크포인터 없는 호출은 캐시하지 않는다
+예제의 setup_graph: 체크포인터를 뺀 옵션은 키워드 인자로만 받는다
+"""
+import importlib
+
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+
+from common.factory import memoize_graph
+from tests.helpers import config, example, fakes
+
+
+def test_same_arguments_reuse_graph():
+    built = []
+
+    @memoize_graph(maxsize=2)
+    def setup_graph(checkpointer=None, llm=None):
+        built.append(llm)
+        return object()
+
+    saver = MemorySaver()
+    assert setup_graph(saver, llm="a") is setup_graph(checkpointer=saver, llm="a")
+    assert setup_graph(saver, llm="b") is not setup_graph(saver, llm="a")
+    setup_graph(saver, llm="c")
+    # maxsize를 넘으면 가장 오래 쓰지 않은 그래프부터 버린다
+    assert setup_graph.cache_size() == 2 and built == ["a", "b", "c"]
+    setup_graph(saver, llm="b")
+    assert built == ["a", "b", "c", "b"]
+    setup_graph.cache_clear()
+    assert setup_graph.cache_size() == 0
+
+
+def test_graphs_without_checkpointer_are_not_shared():
+    module = example("myproject")
+    llm, search_tool = fakes()
+    first = module.setup_graph(llm=llm, search_tool=search_tool)
+    second = module.setup_graph(llm=llm, search_tool=search_tool)
+    assert first is not second
+    first.invoke({"messages": [("human", "안녕하세요")]}, config())
+    # 각자 MemorySaver를 가지므로 다른 호출자의 대화가 보이지 않는다
+    assert second.get_state(config()).values == {}
+
+    saver = MemorySaver()
+    graph = module.setup_graph(saver, llm=llm, search_tool=search_tool)
+    assert module.setup_graph(saver, llm=llm, search_tool=search_tool) is graph
+
+
+@pytest.mark.parametrize("name", ["myproject.main", "example2.my_example", "example3.main", "example4.main", "example5.main"])
+def test_options_are_keyword_only(name):
+    module = importlib.import_module(name)
+    llm, search_tool = fakes()
+    # 체크포인터 다음 자리에 옵션을 위치 인자로 넘기면 다른 옵션에 들어가므로 받지 않는다
+    with pytest.raises(TypeError):
+        module.setup_graph(None, None, None, llm)
+    assert module.setup_graph(llm=llm, search_tool=search_tool) is not None
@@ -0,0 +1,63 @@
+"""
+가짜 모델/검색(common.fakes)이 결정적으로 동작하는지 확인한다
+"""
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from common.fakes import FakeChatModel, FakeSearchResults
+from tests.helpers import config, example, fakes
+
+
+def test_rules_call_bound_tools():
+    search_tool = FakeSearchResults()
+    llm = FakeChatModel().bind_tools([search_tool])
+    message = llm.invoke([HumanMessage(content="LangGraph 최신 뉴스 검색해줘")])
+    assert [(call["name"], call["args"]) for call in message.tool_calls] == [
+        (search_tool.name, {"query": "LangGraph 최신 뉴스 검색해줘"})
+    ]
+    # 도구를 바인딩하지 않으면 답변만 한다
+    assert not FakeChatModel().invoke([HumanMessage(content="최신 뉴스 검색해줘")]).tool_calls
+
+
+def test_answer_quotes_tool_results():
+    llm = FakeChatModel().bind_tools([FakeSearchResults()])
+    answer = llm.invoke([
+        HumanMessage(content="검색해줘"),
+        AIMessage(content="", tool_calls=[{"name": "search", "args": {}, "id": "1"}]),
+        ToolMessage(content="검색 결과 본문", tool_call_id="1"),
+    ])
+    assert not answer.tool_calls and "검색 결과 본문" in answer.content
+
+
+def test_search_is_deterministic():
+    search_tool = FakeSearchResults(max_results=3, content_size=50)
+    first, second = search_tool.invoke({"query": "q"}), search_tool.invoke({"query": "q"})
+    assert first == second and search_tool.calls == 2
+    results = search_tool.invoke({"type": "tool_call", "name": search_tool.name, "args": {"query": "q"}, "id": "1"})
+    assert len(results.artifact["results"]) == 3
+    assert all(len(result["content"]) == 50 for result in results.artifact["results"])
+
+
+def test_stream_matches_invoke():
+    llm = FakeChatModel()
+    prompt = [HumanMessage(content="안녕하세요")]
+    assert "".join(chunk.content for chunk in llm.stream(prompt)) == llm.invoke(prompt).content
+
+
+def test_example_graph_runs_offline():
+    llm, search_tool = fakes()
+    graph = example("myproject").setup_graph(llm=llm, search_tool=search_tool)
+    result = graph.invoke({"messages": [("human", "최신 뉴스 검색해줘")]}, config())
+    assert [message.type for message in result["messages"]] == ["human", "ai", "tool", "ai"]
+    assert search_tool.calls == 1 and llm.calls == 2
+
+
+def test_scripted_responses_are_fresh_messages():
+    scripted = AIMessage(content="정해진 답변입니다", id="scripted")
+    llm = FakeChatModel(responses=[scripted])
+    graph = example("myproject").setup_graph(llm=llm, search_tool=FakeSearchResults())
+    for question in ("안녕하세요", "고마워요"):
+        result = graph.invoke({"messages": [("human", question)]}, config())
+    # 두 번째 응답이 첫 번째 응답을 덮어쓰지 않고 따로 쌓인다
+    answers = [message for message in result["messages"] if isinstance(message, AIMessage)]
+    assert [answer.content for answer in answers] == [scripted.content] * 2
+    assert len({answer.id for answer in answers}) == 2 and scripted.id not in {answer.id for answer in answers}
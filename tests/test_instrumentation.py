@@ -0,0 +1,39 @@
+"""
+그래프 계측(common.instrumentation): thread_id별 시계열 개수 제한, 체크포인터를 한 번만 감싸기
+"""
+from langgraph.checkpoint.memory import MemorySaver
+
+from common.instrumentation import GraphMetrics
+from tests.helpers import config, example, fakes, history
+
+
+def build(saver, metrics, **options):
+    llm, search_tool = fakes()
+    return example("myproject").setup_graph(saver, llm=llm, search_tool=search_tool, metrics=metrics, **options)
+
+
+def test_thread_series_are_capped():
+    metrics = GraphMetrics(state_size=False, max_threads=2)
+    graph = build(MemorySaver(), metrics)
+    for thread_id in ("a", "b", "c", "a"):
+        graph.invoke({"messages": [("human", "안녕하세요")]}, config(thread_id))
+    # 가장 오래 기록이 없던 b부터 버린다
+    assert list(metrics.snapshot()["threads"]) == ["c", "a"]
+    assert metrics.evicted_threads == 2
+    assert "langgraph_thread_series_evicted_total 2" in metrics.prometheus_text()
+
+    unlabeled = GraphMetrics(state_size=False, max_threads=0)
+    build(MemorySaver(), unlabeled).invoke({"messages": [("human", "안녕하세요")]}, config())
+    assert unlabeled.snapshot()["threads"] == {} and unlabeled.snapshot()["node"]
+    assert 'thread_id="' not in unlabeled.prometheus_text()
+
+
+def test_shared_checkpointer_is_instrumented_once():
+    metrics = GraphMetrics(state_size=False)
+    saver = MemorySaver()
+    # 같은 체크포인터로 그래프를 두 번 만든다 (예: 설정이 다른 그래프)
+    build(saver, metrics)
+    graph = build(saver, metrics, max_history_tokens=1000)
+    graph.invoke({"messages": [("human", "최신 뉴스 검색해줘")]}, config())
+    puts = metrics.snapshot()["checkpoint"]["put"]["count"]
+    assert puts == len(history(graph))
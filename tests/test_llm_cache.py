@@ -0,0 +1,99 @@
+"""
+LLM 응답 캐시(common.llm_cache): 같은 프롬프트 재사용, 새 id, 바이패스, LRU/TTL/디스크
+"""
+import asyncio
+import time
+
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+from common.llm_cache import LLMCache, with_cache
+
+TOOLS = [{"type": "function", "function": {"name": "search", "parameters": {"type": "object", "properties": {}}}}]
+
+
+class ScriptedModel(FakeMessagesListChatModel):
+    """responses를 차례로 돌려주고 호출 횟수를 센다"""
+    calls: int = 0
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+
+class WarmModel(ScriptedModel):
+    temperature: float = 0.7
+
+
+def searching_model(model_class=ScriptedModel):
+    llm = model_class(responses=[
+        AIMessage(content="", id="run-1", tool_calls=[{"name": "search", "args": {"query": "q"}, "id": "call_1"}]),
+    ])
+    return llm, llm.bind(tools=TOOLS)
+
+
+def test_repeated_prompt_is_served_with_fresh_ids():
+    llm, model = searching_model()
+    cache = LLMCache()
+    cached = with_cache(model, cache)
+    prompt = [HumanMessage(content="최신 뉴스 검색해줘")]
+    first, second = cached.invoke(prompt), cached.invoke(prompt)
+    assert llm.calls == 1 and cache.stats()["memory_hits"] == 1
+    assert second.id is None and second.tool_calls[0]["args"] == first.tool_calls[0]["args"]
+    # 같은 대화에 다시 들어가도 tool_call id가 겹치지 않는다
+    assert second.tool_calls[0]["id"] != first.tool_calls[0]["id"]
+
+
+def test_key_ignores_message_ids_but_not_tools():
+    llm, model = searching_model()
+    cache = LLMCache()
+    with_cache(model, cache).invoke([HumanMessage(content="질문", id="a")])
+    with_cache(model, cache).invoke([HumanMessage(content="질문", id="b")])
+    with_cache(llm, cache).invoke([HumanMessage(content="질문", id="a")])
+    assert llm.calls == 2
+
+
+def test_async_hit():
+    llm, model = searching_model()
+    cached = with_cache(model, LLMCache())
+    prompt = [HumanMessage(content="안녕하세요")]
+
+    async def run():
+        return await cached.ainvoke(prompt), await cached.ainvoke(prompt)
+
+    first, second = asyncio.run(run())
+    assert first.tool_calls[0]["args"] == second.tool_calls[0]["args"] and llm.calls == 1
+
+
+def test_bypass():
+    prompt = [HumanMessage(content="안녕하세요")]
+    warm, model = searching_model(WarmModel)
+    cache = LLMCache()
+    cached = with_cache(model, cache)
+    cached.invoke(prompt)
+    cached.invoke(prompt)
+    assert warm.calls == 2 and cache.stats()["bypassed"] == 2
+
+    allowed = with_cache(model, LLMCache(allow_nonzero_temperature=True))
+    allowed.invoke(prompt)
+    allowed.invoke(prompt)
+    assert warm.calls == 3
+
+
+def test_lru_ttl_and_disk(tmp_path):
+    message = AIMessage(content="답")
+    cache = LLMCache(maxsize=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, message, 0.1)
+    assert cache.get("a") is None and cache.get("c")[0].content == "답"
+
+    expiring = LLMCache(ttl=0.01)
+    expiring.put("a", message, 0.1)
+    time.sleep(0.02)
+    assert expiring.get("a") is None
+
+    path = str(tmp_path / "llm_cache.sqlite")
+    LLMCache(path=path).put("a", message, 0.1)
+    reopened = LLMCache(path=path)
+    assert reopened.get("a")[0].content == "답"
+    assert reopened.stats()["disk_hits"] == 1
@@ -0,0 +1,104 @@
+"""
+턴 예산(common.loop_budget): 예산을 넘은 도구 호출을 finalize로 보내는 라우팅과 비동기 도구 시간 제한
+"""
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.types import Send
+
+from common.fakes import FakeChatModel, FakeSearchResults
+from common.loop_budget import TOOL_BUDGET_KEY, LoopBudget
+from tests.helpers import config, example
+
+
+def tool_round(index: int, seconds: float = 0.0) -> list:
+    call_id = f"call{index}"
+    return [
+        AIMessage(content="", tool_calls=[{"name": "search", "args": {"query": "q"}, "id": call_id}]),
+        ToolMessage(content="결과", tool_call_id=call_id, response_metadata={"tool_seconds": seconds}),
+    ]
+
+
+def turn(rounds: int, seconds: float = 0.0, previous: int = 0) -> list:
+    """이전 턴 previous번 + 이번 턴 rounds번 도구를 부르고 또 도구를 부르려는 대화"""
+    messages = [HumanMessage(content="이전 질문")]
+    for index in range(previous):
+        messages += tool_round(index)
+    messages += [AIMessage(content="이전 답변"), HumanMessage(content="질문")]
+    for index in range(rounds):
+        messages += tool_round(previous + index, seconds)
+    return messages + tool_round(previous + rounds)[:1]
+
+
+def routed(budget, messages, destination="tools"):
+    return budget.router(lambda state: destination)({"messages": messages})
+
+
+def test_iterations_route_to_finalize():
+    budget = LoopBudget(max_iterations=2)
+    assert routed(budget, turn(1)) == "tools"
+    # 대기 중인 호출까지 세어 max_iterations를 넘으면 실행하지 않는다
+    assert routed(budget, turn(2)) == "finalize"
+    assert budget.stats()["finalized"] == 1 and budget.stats()["iterations"] == 1
+
+
+def test_previous_turns_do_not_count():
+    budget = LoopBudget(max_iterations=2)
+    assert routed(budget, turn(1, previous=5)) == "tools"
+    assert budget.usage(turn(1, previous=5))["iterations"] == 2
+
+
+def test_answer_without_tool_calls_is_not_finalized():
+    budget = LoopBudget(max_iterations=0)
+    messages = turn(3)[:-1] + [AIMessage(content="답변")]
+    assert routed(budget, messages, "__end__") == "__end__"
+    assert budget.stats()["finalized"] == 0
+
+
+def test_tool_seconds_and_tokens():
+    seconds = LoopBudget(max_iterations=None, max_tool_seconds=1.0)
+    assert routed(seconds, turn(1, seconds=0.5)) == "tools"
+    assert routed(seconds, turn(2, seconds=0.5)) == "finalize"
+
+    tokens = LoopBudget(max_iterations=None, max_tokens=1)
+    assert routed(tokens, turn(1)) == "finalize"
+    assert seconds.stats()["tool_seconds"] == 1 and tokens.stats()["tokens"] == 1
+
+
+def test_send_carries_remaining_tool_seconds():
+    budget = LoopBudget(max_iterations=None, max_tool_seconds=1.0)
+    sends = [Send("tools", {"messages": []}), Send("other", {"messages": []})]
+    tools, other = routed(budget, turn(1, seconds=0.25), sends)
+    assert tools.arg[TOOL_BUDGET_KEY] == 0.75
+    assert TOOL_BUDGET_KEY not in other.arg
+
+
+def test_graph_finalizes_endless_tool_loop():
+    budget = LoopBudget(max_iterations=2)
+    llm = FakeChatModel(tool_rounds=10)
+    search_tool = FakeSearchResults()
+    graph = example("myproject").setup_graph(MemorySaver(), llm=llm, search_tool=search_tool, budget=budget)
+    result = graph.invoke({"messages": [("human", "최신 뉴스 검색해줘")]}, config())
+    messages = result["messages"]
+    assert not messages[-1].tool_calls and messages[-1].content
+    assert search_tool.calls == 2
+    # 실행하지 않은 도구 호출에도 결과가 채워졌다
+    assert messages[-2].type == "tool" and messages[-2].status == "error"
+    assert budget.stats()["finalized"] == 1
+    assert graph.get_state(config()).next == ()
+
+
+def test_async_tool_timeout():
+    budget = LoopBudget(max_iterations=None, max_tool_seconds=0.05)
+    llm = FakeChatModel(tool_rounds=10)
+    search_tool = FakeSearchResults(latency=1.0)
+    graph = example("myproject").setup_graph(MemorySaver(), llm=llm, search_tool=search_tool, budget=budget,
+                                             flavor="async")
+    result = asyncio.run(graph.ainvoke({"messages": [("human", "최신 뉴스 검색해줘")]}, config()))
+    messages = result["messages"]
+    assert not messages[-1].tool_calls
+    timed_out = [message for message in messages if message.type == "tool" and "중단" in message.content]
+    assert len(timed_out) == 1
+    stats = budget.stats()
+    assert (stats["tool_timeouts"], stats["finalized"], stats["tool_seconds"]) == (1, 1, 1)
@@ -0,0 +1,132 @@
+"""
+검색 prefetch(common.prefetch): 첫 모델 호출과 동시에 시작한 검색을 도구 호출이 가져가는지 확인한다
+"""
+import asyncio
+import contextvars
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import MemorySaver
+
+from common.fakes import FakeChatModel, FakeSearchResults
+from common.prefetch import SearchPrefetcher, query_similarity, with_prefetch
+from tests.helpers import config, example, transcript
+
+QUESTION = "LangGraph 최신 뉴스 검색해줘"
+
+
+def search_call(search_tool, query: str) -> dict:
+    return {"type": "tool_call", "name": search_tool.name, "args": {"query": query}, "id": "call"}
+
+
+def build(prefetch=None):
+    search_tool = FakeSearchResults(latency=0.05)
+    graph = example("myproject").setup_graph(MemorySaver(), llm=FakeChatModel(latency=0.05),
+                                             search_tool=search_tool, prefetch=prefetch)
+    return graph, search_tool
+
+
+def test_query_similarity():
+    assert query_similarity(QUESTION, QUESTION) == 1.0
+    assert query_similarity("LangGraph 뉴스", QUESTION) >= 0.6
+    assert query_similarity("서울 날씨", QUESTION) == 0.0
+
+
+def test_graph_uses_prefetched_search():
+    expected, _ = build()
+    prefetcher = SearchPrefetcher()
+    graph, search_tool = build(prefetcher)
+    graph_input = {"messages": [("human", QUESTION)]}
+    result = graph.invoke(graph_input, config())
+    assert transcript(result["messages"]) == transcript(expected.invoke(graph_input, config())["messages"])
+    stats = prefetcher.stats()
+    assert (stats["started"], stats["hits"], stats["misses"]) == (1, 1, 0)
+    assert search_tool.calls == 1 and stats["saved_seconds"] > 0
+
+
+def test_no_prefetch_without_search():
+    prefetcher = SearchPrefetcher()
+    graph, search_tool = build(prefetcher)
+    graph.invoke({"messages": [("human", "안녕하세요")]}, config())
+    assert prefetcher.stats()["started"] == 0 and search_tool.calls == 0
+
+
+def test_unused_prefetch_is_cancelled():
+    prefetcher = SearchPrefetcher()
+    with_prefetch(FakeSearchResults(latency=0.05), prefetcher)
+    prefetch = prefetcher.start({"messages": [HumanMessage(content=QUESTION)]})
+    prefetcher.resolve(prefetch, AIMessage(content="검색 없이 답합니다"))
+    assert prefetcher.stats()["cancelled"] == 1 and not prefetcher.ready
+    assert prefetcher.claim(QUESTION) is None
+
+
+def test_prefetch_is_claimed_only_by_the_same_thread():
+    prefetcher = SearchPrefetcher()
+    upstream = FakeSearchResults(latency=0.05)
+    tool = with_prefetch(upstream, prefetcher)
+    scope = lambda thread_id, node: {"configurable": {"thread_id": thread_id, "checkpoint_ns": f"{node}:task"}}
+    decided = AIMessage(content="", tool_calls=[{"name": upstream.name, "args": {"query": QUESTION}, "id": "1"}])
+
+    async def run():
+        prefetch = prefetcher.astart({"messages": [HumanMessage(content=QUESTION)]}, scope("a", "chatbot"))
+        prefetcher.resolve(prefetch, decided)
+        # 다른 대화의 tools 노드는 가져가지 않는다
+        assert prefetcher.claim(QUESTION, scope("b", "tools")) is None
+        return await tool.ainvoke(search_call(tool, QUESTION), scope("a", "tools"))
+
+    message = asyncio.run(run())
+    assert message.artifact["query"] == QUESTION
+    assert prefetcher.stats()["hits"] == 1 and upstream.calls == 1
+
+
+def test_cancelled_prefetch_falls_back_to_search():
+    prefetcher = SearchPrefetcher()
+    upstream = FakeSearchResults(latency=0.05)
+    tool = with_prefetch(upstream, prefetcher)
+    run_config = {"configurable": {"thread_id": "a", "checkpoint_ns": "chatbot:task"}}
+    decided = AIMessage(content="", tool_calls=[{"name": upstream.name, "args": {"query": QUESTION}, "id": "1"}])
+
+    async def run():
+        prefetch = prefetcher.astart({"messages": [HumanMessage(content=QUESTION)]}, run_config)
+        prefetcher.resolve(prefetch, decided)
+        prefetch.task.cancel()
+        return await tool.ainvoke(search_call(tool, QUESTION), run_config)
+
+    message = asyncio.run(run())
+    assert message.status == "success" and message.artifact["query"] == QUESTION
+    assert upstream.calls == 1
+
+
+def test_unclaimed_prefetch_is_released_when_chatbot_runs_again():
+    prefetcher = SearchPrefetcher()
+    upstream = FakeSearchResults(latency=0.05)
+    with_prefetch(upstream, prefetcher)
+    chatbot = {"configurable": {"thread_id": "a", "checkpoint_ns": "chatbot:task"}}
+    decided = AIMessage(content="", tool_calls=[{"name": upstream.name, "args": {"query": QUESTION}, "id": "1"}])
+    prefetch = prefetcher.start({"messages": [HumanMessage(content=QUESTION)]}, chatbot)
+    prefetcher.resolve(prefetch, decided)
+    other = prefetcher.start({"messages": [HumanMessage(content=QUESTION)]}, config("b"))
+    prefetcher.resolve(other, decided)
+    assert len(prefetcher.ready) == 2
+
+    # tools 노드가 가져가지 않고 (예: 도구 실행 실패) 같은 대화의 chatbot이 다시 불렸다
+    prefetcher.start({"messages": [ToolMessage(content="오류", tool_call_id="1")]}, chatbot)
+    assert prefetcher.stats()["cancelled"] == 1
+    assert prefetcher.claim(QUESTION, chatbot) is None
+    # 다른 대화의 prefetch는 그대로 둔다
+    assert [key[0] for key in prefetcher.ready] == ["b"]
+
+
+def test_sync_prefetch_runs_in_the_node_context():
+    current = contextvars.ContextVar("current", default=None)
+
+    @tool
+    def search(query: str) -> str:
+        """현재 contextvar 값을 돌려준다"""
+        return f"{query}: {current.get()}"
+
+    prefetcher = SearchPrefetcher()
+    with_prefetch(search, prefetcher)
+    current.set("chatbot")
+    prefetch = prefetcher.start({"messages": [HumanMessage(content=QUESTION)]})
+    assert prefetch.task.result().content == f"{QUESTION}: chatbot"
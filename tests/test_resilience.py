@@ -0,0 +1,133 @@
+"""
+hedged 요청/턴 마감 시간/서킷 브레이커(common.resilience)를 느린 꼬리 지연이 있는 가짜 모델로 확인한다
+"""
+import asyncio
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from common.fakes import FakeChatModel, FakeSearchResults
+from common.resilience import CircuitOpenError, DeadlineExceeded, ResiliencePolicy, with_deadline, with_resilience
+from tests.helpers import config, example
+
+PROMPT = [HumanMessage(content="안녕하세요")]
+SLOW = 0.2
+
+
+def search(tool, query: str = "최신 뉴스"):
+    return tool.invoke({"type": "tool_call", "name": tool.name, "args": {"query": query}, "id": "call"})
+
+
+def slow_tail_model():
+    # 5번 중 1번은 SLOW초 더 걸린다
+    return FakeChatModel(latency=0.01, slow_rate=0.2, slow_latency=SLOW, seed=7)
+
+
+def slow_calls(model, calls: int = 30) -> int:
+    """SLOW초 넘게 걸린 호출 수 (꼬리 지연)"""
+    count = 0
+    for _ in range(calls):
+        start = time.perf_counter()
+        model.invoke(PROMPT)
+        count += time.perf_counter() - start >= SLOW
+    return count
+
+
+def test_hedging_cuts_tail_latency():
+    unhedged = slow_calls(slow_tail_model())
+    policy = ResiliencePolicy(initial_hedge_delay=0.05, hedge_budget=0.5)
+    hedged = slow_calls(with_resilience(slow_tail_model(), policy))
+    stats = policy.stats()["fake-chat"]
+    assert stats["hedged"] > 0 and stats["hedge_wins"] > 0
+    # hedge 요청도 느릴 때만 꼬리에 남는다
+    assert hedged < unhedged
+
+
+def test_close_shuts_down_hedge_workers():
+    with ResiliencePolicy(initial_hedge_delay=0.01, hedge_budget=1.0) as policy:
+        model = with_resilience(FakeChatModel(latency=0.05), policy)
+        model.invoke(PROMPT)
+        executor = policy.guard("fake-chat").executor
+        assert executor is not None
+    assert executor._shutdown and policy.guard("fake-chat").executor is None
+    # 닫은 뒤에 다시 호출하면 작업 스레드를 새로 만든다
+    assert model.invoke(PROMPT).content
+    policy.close()
+
+
+def test_async_hedging():
+    policy = ResiliencePolicy(initial_hedge_delay=0.05, hedge_budget=0.5)
+    model = with_resilience(slow_tail_model(), policy)
+
+    async def run():
+        for _ in range(20):
+            await model.ainvoke(PROMPT)
+
+    asyncio.run(run())
+    assert policy.stats()["fake-chat"]["hedge_wins"] > 0
+
+
+def test_deadline_exceeded():
+    policy = ResiliencePolicy(hedge=False)
+    model = with_resilience(FakeChatModel(latency=0.5), policy)
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        model.invoke(PROMPT, with_deadline(config(), 0.05))
+    assert time.perf_counter() - start < 0.4
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(model.ainvoke(PROMPT, with_deadline(config(), 0.05)))
+    assert policy.stats()["fake-chat"]["deadline_exceeded"] == 2
+
+
+def test_turn_deadline_covers_the_whole_graph():
+    """chatbot ↔ tools 루프의 모든 호출이 같은 마감을 따른다"""
+    policy = ResiliencePolicy(hedge=False)
+    graph = example("myproject").setup_graph(MemorySaver(), llm=FakeChatModel(latency=0.05),
+                                             search_tool=FakeSearchResults(latency=0.2), resilience=policy)
+    with pytest.raises(DeadlineExceeded):
+        graph.invoke({"messages": [("human", "최신 뉴스 검색해줘")]}, with_deadline(config(), 0.15))
+    # 마감 안에 끝나는 턴은 그대로 답한다
+    result = graph.invoke({"messages": [("human", "안녕하세요")]}, with_deadline(config("other"), 5))
+    assert result["messages"][-1].content
+
+
+def test_circuit_breaker_opens_and_recovers():
+    policy = ResiliencePolicy(hedge=False, failure_threshold=2, reset_timeout=0.05)
+    failing = FakeChatModel(fail_rate=1.0)
+    model = with_resilience(failing, policy)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            model.invoke(PROMPT)
+    with pytest.raises(CircuitOpenError):
+        model.invoke(PROMPT)
+    assert failing.calls == 2
+
+    time.sleep(0.06)
+    failing.fail_rate = 0.0
+    assert model.invoke(PROMPT).content
+    stats = policy.stats()["fake-chat"]
+    assert stats["state"] == "closed" and stats["rejected"] == 1 and stats["opened"] == 1
+
+
+def test_swallowed_search_error_counts_as_failure():
+    """Tavily처럼 (repr(e), {})로 삼킨 검색 오류도 실패로 센다"""
+    policy = ResiliencePolicy(failure_threshold=2)
+    upstream = FakeSearchResults(fail_rate=1.0, swallow_errors=True, seed=0)
+    tool = with_resilience(upstream, policy)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            search(tool)
+    stats = policy.stats()[upstream.name]
+    assert stats["errors"] == upstream.swallowed == 2
+    assert stats["state"] == "open"
+
+
+def test_successful_search_passes_through():
+    policy = ResiliencePolicy()
+    upstream = FakeSearchResults()
+    message = search(with_resilience(upstream, policy))
+    assert message.artifact["query"] == "최신 뉴스"
+    assert policy.stats()[upstream.name]["errors"] == 0
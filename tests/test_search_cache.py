@@ -0,0 +1,163 @@
+"""
+검색 캐시(common.search_cache): TTL, 오류 미캐시, 같은 질의의 upstream 요청 합치기(single-flight)
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.tools import tool
+
+from common.fakes import FakeSearchResults
+from common.search_cache import CachedSearchTool, SearchCache
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "조건이 시간 안에 만족되지 않았습니다"
+        time.sleep(0.001)
+
+
+def search_call(search_tool, query: str, call_id: str = "call") -> dict:
+    return {"type": "tool_call", "name": search_tool.name, "args": {"query": query}, "id": call_id}
+
+
+def test_hit_within_ttl_and_expiry():
+    cache = SearchCache(ttl=0.05)
+    fetches = []
+    fetch = lambda: fetches.append(1) or len(fetches)
+    assert cache.call("q", fetch) == 1
+    assert cache.call("q", fetch) == 1
+    time.sleep(0.06)
+    assert cache.call("q", fetch) == 2
+    assert cache.stats()["hits"] == 1 and cache.stats()["upstream"] == 2
+
+
+def test_errors_and_uncacheable_results_are_not_cached():
+    cache = SearchCache()
+
+    def fail():
+        raise ConnectionError("upstream")
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            cache.call("q", fail)
+    assert cache.call("empty", lambda: "", cacheable=bool) == ""
+    assert cache.call("empty", lambda: "결과", cacheable=bool) == "결과"
+    assert cache.stats()["upstream"] == 4 and not cache.inflight
+
+
+def test_threads_coalesce_into_one_upstream_call():
+    cache = SearchCache()
+    release = threading.Event()
+
+    def fetch():
+        release.wait(5)
+        return "결과"
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(cache.call, "같은 질의", fetch) for _ in range(8)]
+        wait_until(lambda: cache.stats()["coalesced"] == 7)
+        release.set()
+        assert [future.result() for future in futures] == ["결과"] * 8
+    assert cache.stats()["upstream"] == 1
+
+
+def test_async_calls_coalesce():
+    cache = SearchCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "결과"
+
+    async def run():
+        return await asyncio.gather(*(cache.acall("q", fetch) for _ in range(10)))
+
+    assert asyncio.run(run()) == ["결과"] * 10
+    assert len(calls) == 1 and cache.stats()["coalesced"] == 9
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    cache = SearchCache()
+    started = []
+
+    async def fetch():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return "결과"
+
+    async def run():
+        leader = asyncio.create_task(cache.acall("q", fetch))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.create_task(cache.acall("q", fetch)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return results
+
+    assert asyncio.run(run()) == ["결과"] * 3
+    # 기다리던 호출 중 하나가 다시 요청했다
+    assert len(started) == 2
+    stats = cache.stats()
+    assert stats["cancelled"] == 1 and stats["calls"] == 4 and not cache.inflight
+
+
+def test_cancelled_follower_does_not_cancel_others():
+    cache = SearchCache()
+    started = []
+
+    async def fetch():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return "결과"
+
+    async def run():
+        tasks = [asyncio.create_task(cache.acall("q", fetch)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        tasks[1].cancel()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    leader, follower, other = asyncio.run(run())
+    assert (leader, other) == ("결과", "결과")
+    assert isinstance(follower, asyncio.CancelledError)
+    assert len(started) == 1
+
+
+def test_cached_tool_normalizes_queries():
+    queries = []
+
+    @tool(response_format="content_and_artifact")
+    def search(query: str):
+        """search query to look up"""
+        queries.append(query)
+        return f"{query} 결과", {"query": query}
+
+    cached = CachedSearchTool(search, SearchCache())
+    assert cached.name == search.name and cached.args == search.args
+    first = cached.invoke(search_call(cached, "LangGraph 뉴스", "call1"))
+    second = cached.invoke(search_call(cached, "  langgraph   뉴스 ", "call2"))
+    assert queries == ["LangGraph 뉴스"]
+    assert (second.content, second.artifact) == (first.content, first.artifact)
+    assert second.tool_call_id == "call2"
+
+
+def test_cached_tool_does_not_cache_swallowed_errors():
+    """Tavily처럼 오류를 (repr(e), {})로 돌려준 결과는 캐시하지 않는다"""
+    upstream = FakeSearchResults(fail_rate=1.0, swallow_errors=True, seed=0)
+    cached = CachedSearchTool(upstream, SearchCache())
+    for index in range(2):
+        message = cached.invoke(search_call(cached, "최신 뉴스", f"call{index}"))
+        assert message.artifact == {}
+    assert upstream.calls == 0 and upstream.swallowed == 2
+
+    working = FakeSearchResults()
+    cached = CachedSearchTool(working, SearchCache())
+    for index in range(2):
+        cached.invoke(search_call(cached, "최신  뉴스" if index else "최신 뉴스", f"call{index}"))
+    assert working.calls == 1
@@ -0,0 +1,47 @@
+"""
+SqliteSaver(common.sqlite_saver): put_writes는 다음 체크포인트를 기다리지 않고 바로 기록한다
+"""
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+
+from common.sqlite_saver import SqliteSaver
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "checkpoints.sqlite")
+
+
+def put_checkpoint(saver) -> dict:
+    checkpoint_config = {"configurable": {"thread_id": "test", "checkpoint_ns": ""}}
+    return saver.put(checkpoint_config, empty_checkpoint(), {"source": "loop", "step": 0}, {})
+
+
+def pending(saver, checkpoint_config) -> list:
+    return saver.get_tuple(checkpoint_config).pending_writes
+
+
+def test_writes_are_visible_without_next_checkpoint(path):
+    saver = SqliteSaver(path)
+    checkpoint_config = put_checkpoint(saver)
+    saver.put_writes(checkpoint_config, [("messages", "끝난 task의 결과")], "task-1")
+    # 같은 파일을 연 다른 연결에서도 바로 보인다
+    with SqliteSaver(path) as other:
+        assert pending(other, checkpoint_config) == [("task-1", "messages", "끝난 task의 결과")]
+    # 다음 체크포인트 전에 프로세스가 끝나도 (close 없이) 남는다
+    saver.conn.close()
+    with SqliteSaver(path) as reopened:
+        assert pending(reopened, checkpoint_config) == [("task-1", "messages", "끝난 task의 결과")]
+
+
+def test_batch_rolls_back_its_writes(path):
+    with SqliteSaver(path) as saver:
+        checkpoint_config = put_checkpoint(saver)
+        with pytest.raises(RuntimeError):
+            with saver.batch():
+                saver.put_writes(checkpoint_config, [("messages", "취소될 결과")], "task-1")
+                raise RuntimeError("boom")
+        assert pending(saver, checkpoint_config) == []
+        # 취소된 writes가 다음 트랜잭션에 섞이지 않는다
+        saver.put_writes(checkpoint_config, [("messages", "다음 결과")], "task-2")
+        assert pending(saver, checkpoint_config) == [("task-2", "messages", "다음 결과")]